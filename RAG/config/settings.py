@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from functools import lru_cache
 from app.utils.logging_config import get_logger
 logger = get_logger(__name__)
@@ -12,6 +12,7 @@ load_dotenv()
 class LLMSettings(BaseModel):
     max_tokens: Optional[int] = None
     max_retries: int = Field(default=3)
+    context_token_budget: int = Field(default_factory=lambda: int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", "6000")))
 
 
 class OpenAISettings(LLMSettings):
@@ -19,6 +20,15 @@ class OpenAISettings(LLMSettings):
     default_model: str = Field(default="gpt-4o-mini")
     embedding_model: str =  Field(default="text-embedding-3-small")
 
+class ProviderSettings(BaseModel):
+    """Backends for chat and embeddings: "openai" or the offline "local" stand-in."""
+    llm: str = Field(default_factory=lambda: os.getenv("LLM_PROVIDER", "openai"))
+    embedding: str = Field(default_factory=lambda: os.getenv("EMBEDDING_PROVIDER", os.getenv("LLM_PROVIDER", "openai")))
+    local_llm_latency: str = Field(default_factory=lambda: os.getenv("LOCAL_LLM_LATENCY", "lognormal:1500:0.4"))
+    local_embedding_latency: str = Field(default_factory=lambda: os.getenv("LOCAL_EMBEDDING_LATENCY", "lognormal:120:0.3"))
+    local_plan_file: Optional[str] = Field(default_factory=lambda: os.getenv("LOCAL_LLM_PLAN_FILE"))
+    local_seed: int = Field(default_factory=lambda: int(os.getenv("LOCAL_PROVIDER_SEED", "0")))
+
 class DatabaseSettings(BaseModel):
     service_url: str = Field(default_factory=lambda: os.getenv("RAG_DATABASE_URL"))
 
@@ -26,12 +36,76 @@ class VectorStoreSettings(BaseModel):
     embedding_dimensions: int = 1536
     table_name: str = "knowledge_chunks"
 
+class PlannerSettings(BaseModel):
+    algorithmic_enabled: bool = Field(default_factory=lambda: os.getenv("ALGORITHMIC_PLANNER_ENABLED", "true").lower() == "true")
+    validation_enabled: bool = Field(default_factory=lambda: os.getenv("PLAN_VALIDATION_ENABLED", "true").lower() == "true")
+    max_repairs: int = Field(default=5)
+
+class JobSettings(BaseModel):
+    """Async plan generation: queue limits and worker pool size."""
+    max_queue_depth: int = Field(default_factory=lambda: int(os.getenv("PLAN_JOB_MAX_QUEUE_DEPTH", "500")))
+    result_ttl: int = Field(default=86400)
+    retry_after: int = Field(default=30)
+    visibility_timeout: int = Field(default=300)  # requeue jobs whose worker died mid-run
+    worker_concurrency: int = Field(default_factory=lambda: int(os.getenv("PLAN_WORKER_CONCURRENCY", "4")))
+    webhook_retries: int = Field(default=3)
+    # Comma-separated; when set, webhooks may only target these hosts
+    webhook_allowed_hosts: List[str] = Field(default_factory=lambda: [
+        host.strip() for host in os.getenv("PLAN_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+    ])
+
+class AdmissionSettings(BaseModel):
+    """Limits in front of the LLM path. Rates of 0 disable that limit."""
+    max_concurrent_llm: int = Field(default_factory=lambda: int(os.getenv("LLM_MAX_CONCURRENCY", "8")))
+    max_waiting: int = Field(default_factory=lambda: int(os.getenv("LLM_MAX_WAITING", "32")))
+    max_wait_seconds: float = Field(default=20.0)
+    tokens_per_minute: int = Field(default_factory=lambda: int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000")))
+    expected_completion_tokens: int = Field(default=1500)
+    tenant_requests_per_minute: float = Field(default_factory=lambda: float(os.getenv("RATE_LIMIT_PER_MINUTE", "30")))
+    tenant_burst: int = Field(default_factory=lambda: int(os.getenv("RATE_LIMIT_BURST", "10")))
+
+class CacheWarmingSettings(BaseModel):
+    top_n: int = Field(default_factory=lambda: int(os.getenv("CACHE_WARM_TOP_N", "50")))
+    stats_days: int = Field(default=7)
+    interval_seconds: int = Field(default=900)
+    offpeak_hours: str = Field(default_factory=lambda: os.getenv("CACHE_WARM_OFFPEAK_HOURS", "2-6"))  # server local time
+    offpeak_horizon_seconds: int = Field(default=43200)  # off-peak: refresh anything expiring within this
+    beta: float = Field(default=1.0)  # probabilistic early expiration aggressiveness
+    plan_recompute_seconds: float = Field(default=20.0)
+    max_concurrent: int = Field(default=2)
+    # Count 1 in N requests (weighted by N), so popularity tracking rarely costs a Redis round trip
+    popularity_sample_rate: int = Field(default_factory=lambda: int(os.getenv("CACHE_WARM_SAMPLE_RATE", "10")))
+
+class CacheSettings(BaseModel):
+    """Encoding of cached plans and responses; see app/utils/cache_codec.py"""
+    serializer: str = Field(default_factory=lambda: os.getenv("CACHE_SERIALIZER", "json"))  # json | msgpack
+    compression: str = Field(default_factory=lambda: os.getenv("CACHE_COMPRESSION", "auto"))  # auto | zstd | zlib | none
+    min_compress_size: int = Field(default=512)  # bytes; smaller values aren't worth compressing
+
+class EmbeddingBackfillSettings(BaseModel):
+    batch_texts: int = Field(default=256)  # inputs per embeddings request
+    batch_tokens: int = Field(default=100000)  # estimated tokens per request (API cap is 300k)
+    concurrency: int = Field(default_factory=lambda: int(os.getenv("EMBEDDING_BACKFILL_CONCURRENCY", "4")))
+    tokens_per_minute: int = Field(default_factory=lambda: int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "1000000")))
+    max_retries: int = Field(default=5)  # on rate limit responses
+
+class ObservabilitySettings(BaseModel):
+    metrics_enabled: bool = Field(default_factory=lambda: os.getenv("METRICS_ENABLED", "false").lower() == "true")
+
 
 class Settings(BaseModel):
     """This include all the settings"""
     openai: OpenAISettings = Field(default_factory=OpenAISettings)
+    provider: ProviderSettings = Field(default_factory=ProviderSettings)
     database: DatabaseSettings = Field(default_factory=DatabaseSettings)
     vector_store: VectorStoreSettings = Field(default_factory=VectorStoreSettings)
+    planner: PlannerSettings = Field(default_factory=PlannerSettings)
+    observability: ObservabilitySettings = Field(default_factory=ObservabilitySettings)
+    jobs: JobSettings = Field(default_factory=JobSettings)
+    admission: AdmissionSettings = Field(default_factory=AdmissionSettings)
+    cache_warming: CacheWarmingSettings = Field(default_factory=CacheWarmingSettings)
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    embedding_backfill: EmbeddingBackfillSettings = Field(default_factory=EmbeddingBackfillSettings)
 
 
 @lru_cache
@@ -0,0 +1,174 @@
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+from bson.objectid import ObjectId
+from pymongo import ReplaceOne
+from app.db.connection.mongo_connection import MongoDB
+from app.db.services.mongo_services import PrerequisiteService
+from RAG.services.articulation_parser import ArticulationParser
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ArticulationIndex:
+    """In-memory articulation table for one college with set-based lookups."""
+    def __init__(self, college: str, rows: List[Dict[str, Any]]):
+        self.college = college
+        self.by_target: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.complete: Dict[Tuple[str, str], bool] = {}
+        self.by_course: Dict[str, Set[Tuple[str, str]]] = {}
+
+        for row in rows:
+            target = (row["university_name"], row["major_name"])
+            self.complete[target] = self.complete.get(target, True) and row.get("complete", True)
+            if not row.get("options"):
+                continue
+            self.by_target.setdefault(target, []).append({
+                "university_courses": row["university_courses"],
+                "options": row["options"]
+            })
+            for code in row["college_courses"]:
+                self.by_course.setdefault(code, set()).add(target)
+
+    def requirements_for(self, university: str, major: str) -> Optional[List[Dict[str, Any]]]:
+        """Requirements for a target, or None if it is missing or only partially parsed."""
+        target = (university, major)
+        if not self.complete.get(target):
+            return None
+        return self.by_target.get(target, [])
+
+    def courses_for(self, university: str, major: str) -> Set[str]:
+        """Every college course that appears in any option for the target."""
+        return {code for req in self.by_target.get((university, major), []) for option in req["options"] for code in option}
+
+    def targets_for_course(self, course_code: str) -> Set[Tuple[str, str]]:
+        return self.by_course.get(course_code, set())
+
+    def shared_courses(self, targets: List[Tuple[str, str]]) -> Set[str]:
+        """College courses that count toward every one of the targets."""
+        course_sets = [self.courses_for(university, major) for university, major in targets]
+        return set.intersection(*course_sets) if course_sets else set()
+
+    def course_overlap(self, targets: List[Tuple[str, str]]) -> List[Tuple[str, int]]:
+        """College courses ranked by how many of the targets they satisfy."""
+        wanted = set(targets)
+        counts = Counter({code: len(hits & wanted) for code, hits in self.by_course.items()})
+        return [(code, count) for code, count in counts.most_common() if count > 0]
+
+
+class ArticulationStore:
+    """Normalized articulation table (college course <-> university course <-> major)."""
+    _indexes: Dict[str, ArticulationIndex] = {}
+    _loaded_at: Dict[str, float] = {}
+
+    def __init__(self, index_ttl: int = 900):
+        self.mongo = MongoDB("vector_db")
+        self.collection_name = "articulations"
+        self.index_ttl = index_ttl
+        self.parser = ArticulationParser()
+
+    async def create_indexes(self):
+        """Create indexes for the articulation collection"""
+        try:
+            collection = self.mongo.get_collection(self.collection_name)
+            await collection.create_index(
+                [("college_name", 1), ("university_name", 1), ("major_name", 1), ("requirement_index", 1)],
+                unique=True
+            )
+            await collection.create_index([("college_name", 1), ("college_courses", 1)])
+            logger.info("Articulation indexes created successfully")
+        except Exception as e:
+            logger.error(f"Error creating articulation indexes: {e}")
+
+    async def rebuild_from_chunks(self, college: str) -> Dict[str, int]:
+        """Parse every articulation chunk for a college into the structured collection."""
+        chunks_collection = self.mongo.get_collection("knowledge_chunks")
+        collection = self.mongo.get_collection(self.collection_name)
+
+        prerequisite_data = await PrerequisiteService().get_all_prerequisites(college)
+        catalog = set(prerequisite_data.keys())
+
+        targets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        cursor = chunks_collection.find(
+            {"college_name": college, "chunk_type": "articulation"},
+            {"_id": 0, "id": 1, "content": 1, "university_name": 1, "major_name": 1}
+        )
+        async for chunk in cursor:
+            parsed = self.parser.parse_chunk(chunk.get("content", ""), catalog)
+            target = targets.setdefault(
+                (chunk["university_name"], chunk["major_name"]),
+                {"requirements": [], "complete": True, "chunk_ids": []}
+            )
+            target["requirements"].extend(parsed["requirements"])
+            target["complete"] = target["complete"] and parsed["complete"]
+            target["chunk_ids"].append(chunk.get("id"))
+
+        operations = []
+        now = datetime.utcnow()
+        # Rows this rebuild does not rewrite (removed targets, shorter parses) are deleted below
+        generation = ObjectId()
+        for (university, major), target in targets.items():
+            # Targets with nothing parsable still get a row so coverage is recorded
+            requirements = target["requirements"] or [{"university_courses": [], "options": []}]
+            for idx, requirement in enumerate(requirements):
+                key = {"college_name": college, "university_name": university, "major_name": major, "requirement_index": idx}
+                operations.append(ReplaceOne(key, {
+                    **key,
+                    "university_courses": requirement["university_courses"],
+                    "options": requirement["options"],
+                    "college_courses": sorted(self.parser.college_codes([requirement])),
+                    "complete": target["complete"],
+                    "source_chunk_ids": target["chunk_ids"],
+                    "updated_at": now,
+                    "generation": generation
+                }, upsert=True))
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        await collection.delete_many({"college_name": college, "generation": {"$ne": generation}})
+
+        self.invalidate(college)
+        complete_targets = sum(1 for target in targets.values() if target["complete"])
+        logger.info(f"Articulation table for {college}: {len(operations)} rows, {complete_targets}/{len(targets)} targets fully parsed")
+        return {"rows": len(operations), "targets": len(targets), "complete_targets": complete_targets}
+
+    async def get_index(self, college: str) -> ArticulationIndex:
+        """Return the in-memory index for a college, loading it from Mongo when stale."""
+        loaded_at = self._loaded_at.get(college)
+        if loaded_at is not None and time.monotonic() - loaded_at < self.index_ttl:
+            return self._indexes[college]
+
+        collection = self.mongo.get_collection(self.collection_name)
+        rows = await collection.find({"college_name": college}, {"_id": 0}).to_list(None)
+        index = ArticulationIndex(college, rows)
+        ArticulationStore._indexes[college] = index
+        ArticulationStore._loaded_at[college] = time.monotonic()
+        logger.info(f"Loaded articulation index for {college} with {len(rows)} rows")
+        return index
+
+    async def get_target_requirements(self, college: str, target_combinations: List[Dict]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Structured requirements keyed by (university, major) for fully parsed targets only."""
+        try:
+            index = await self.get_index(college)
+        except Exception as e:
+            logger.warning(f"Articulation index unavailable for {college}: {e}")
+            return {}
+
+        found = {}
+        for target in target_combinations:
+            requirements = index.requirements_for(target["university"], target["major"])
+            if requirements is not None:
+                found[(target["university"], target["major"])] = requirements
+        return found
+
+    @classmethod
+    def invalidate(cls, college: str = None):
+        """Drop cached in-memory indexes (all colleges when college is None)."""
+        if college is None:
+            cls._indexes.clear()
+            cls._loaded_at.clear()
+        else:
+            cls._indexes.pop(college, None)
+            cls._loaded_at.pop(college, None)
@@ -2,6 +2,7 @@ from typing import Dict, Any, List
 from RAG.services.embedding_services import EmbeddingService
 from RAG.config.settings import get_settings
 from app.db.connection.mongo_connection import MongoDB
+from app.utils.metrics import span, traced
 
 class VectorStore:
     def __init__(self):
@@ -31,14 +32,18 @@ class VectorStore:
         except Exception as e:
             print(f"Error creating vector collection indexes: {e}")
 
-    async def vector_search_v2(self, input_text: str, target_combinations: List[Dict]):
+    async def vector_search_v2(self, input_text: str, target_combinations: List[Dict], specific_chunks: List[Dict] = None):
         """Search for similar content using vector similarity across multiple targets"""        
-        combined_results = await self.get_specific_chunks(target_combinations)
+        # Callers that already fetched the articulation chunks can pass them in
+        if specific_chunks is None:
+            specific_chunks = await self.get_specific_chunks(target_combinations)
+        combined_results = list(specific_chunks)
         general_chunks = await self.get_general_chunks(target_combinations, input_text)
         combined_results.extend(general_chunks)
         
-        return [
-            {
+        results = []
+        for doc in combined_results:
+            row = {
                 "id": doc.get("id"),
                 "content": doc.get("content"),
                 "college_name": doc.get("college_name"),
@@ -47,8 +52,12 @@ class VectorStore:
                 "chunk_type": doc.get("chunk_type"),
                 "similarity": doc.get("similarity", 0)
             }
-            for doc in combined_results
-        ]
+            # Structured articulation rows carry parsed requirements instead of prose
+            if "requirements" in doc:
+                row["requirements"] = doc["requirements"]
+            results.append(row)
+
+        return results
     
     async def get_courses_data(self, source_college: str):
         """Get course data for a specific college"""
@@ -78,6 +87,7 @@ class VectorStore:
             print(f"Error getting courses data: {e}")
             return []
 
+    @traced("vector_store.specific_chunks")
     async def get_specific_chunks(self, target_combinations: List[Dict]):
         """Get specific articulation chunks for target combinations"""
         try:
@@ -109,6 +119,7 @@ class VectorStore:
             print(f"Error getting specific chunks: {e}")
             return []
 
+    @traced("vector_store.general_chunks")
     async def get_general_chunks(self, target_combinations: List[Dict], input_text: str):
         """Get general chunks using vector similarity search"""
         try:
@@ -149,10 +160,11 @@ class VectorStore:
             
             # If vector search is not available, fall back to regular search
             try:
-                cursor = collection.aggregate(pipeline)
-                async for doc in cursor:
-                    doc.pop('_id', None)  # Remove MongoDB _id
-                    combined_results.append(doc)
+                with span("vector_store.vector_search"):
+                    cursor = collection.aggregate(pipeline)
+                    async for doc in cursor:
+                        doc.pop('_id', None)  # Remove MongoDB _id
+                        combined_results.append(doc)
             except Exception as vector_error:
                 print(f"Vector search not available, falling back to text search: {vector_error}")
                 # Fallback to text-based search
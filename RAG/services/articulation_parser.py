@@ -0,0 +1,102 @@
+import re
+from typing import Dict, Any, List, Iterable, Set
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Department followed by a course number, with optional slash shorthand ("PHYS 008A/008B/008C")
+COURSE_CODE = re.compile(r"\b([A-Z][A-Z&]{1,7})\s?(\d{1,4}[A-Z]{0,2})((?:\s?/\s?\d{1,4}[A-Z]{0,2})*)(?![A-Za-z0-9])")
+SEGMENT_SPLIT = re.compile(r"[\n;]+|(?<=[a-z\)])\.\s+")
+OR_SPLIT = re.compile(r"\bor\b", re.I)
+# "UNIVERSITY COURSE <- COLLEGE COURSES"
+SIDE_SPLIT = re.compile(r"<-+|\u2190|<=")
+NOT_ARTICULATED = re.compile(r"no course articulated|not articulated|no articulation|no comparable course", re.I)
+
+
+class ArticulationParser:
+    """Turn free-text articulation chunks into structured course requirements."""
+
+    def parse_chunk(self, content: str, catalog: Set[str]) -> Dict[str, Any]:
+        """
+        Parse one articulation chunk against the college catalog.
+
+        Returns a dict with:
+            requirements: list of {"university_courses": [...], "options": [[...], ...]} where
+                options is an OR of AND groups of college course codes
+            complete: False when a segment references courses that could not be mapped
+        """
+        requirements = []
+        complete = True
+
+        for segment in SEGMENT_SPLIT.split(content or ""):
+            if not segment or not segment.strip():
+                continue
+
+            codes = self.extract_codes(segment)
+            if not codes:
+                continue
+
+            sides = SIDE_SPLIT.split(segment, maxsplit=1)
+            if len(sides) == 2:
+                university_side, college_side = sides
+                university_courses = self.extract_codes(university_side)
+                # Padding only applies to college codes; a university code that pads to a
+                # real college course must not be treated as one
+                match = lambda code: self.match_catalog(code, catalog)
+            else:
+                # Sides can't be told apart, so only exact catalog codes count as college courses
+                college_side = segment
+                university_courses = [code for code in codes if code not in catalog]
+                match = lambda code: code if code in catalog else None
+
+            options = []
+            for part in OR_SPLIT.split(college_side):
+                group = []
+                for code in self.extract_codes(part):
+                    college_code = match(code)
+                    if college_code and college_code not in group:
+                        group.append(college_code)
+                if group and group not in options:
+                    options.append(group)
+
+            if options:
+                requirements.append({
+                    "university_courses": university_courses,
+                    "options": options
+                })
+            elif not NOT_ARTICULATED.search(segment):
+                # Only university courses and no explicit "not articulated" marker
+                logger.debug(f"Unmapped articulation segment: {segment.strip()[:80]}")
+                complete = False
+
+        if not requirements and not NOT_ARTICULATED.search(content or ""):
+            complete = False
+
+        return {"requirements": requirements, "complete": complete}
+
+    def extract_codes(self, text: str) -> List[str]:
+        """Extract course codes in order, expanding slash shorthand into separate codes."""
+        codes = []
+        for dept, number, shorthand in COURSE_CODE.findall(text):
+            for num in [number] + [n.strip() for n in shorthand.split("/") if n.strip()]:
+                code = f"{dept} {num}"
+                if code not in codes:
+                    codes.append(code)
+        return codes
+
+    def match_catalog(self, code: str, catalog: Set[str]):
+        """Return the catalog spelling of a code ("MATH 5A" -> "MATH 005A") or None."""
+        if code in catalog:
+            return code
+
+        dept, _, number = code.partition(" ")
+        digits = re.match(r"\d+", number)
+        if digits:
+            padded = f"{dept} {digits.group().zfill(3)}{number[digits.end():]}"
+            if padded in catalog:
+                return padded
+        return None
+
+    def college_codes(self, requirements: Iterable[Dict[str, Any]]) -> Set[str]:
+        """All college courses referenced by any option of the given requirements."""
+        return {code for req in requirements for option in req["options"] for code in option}
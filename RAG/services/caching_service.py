@@ -27,15 +27,15 @@ class CachingService:
         except Exception as e:
             logger.error(f"Error creating cache indexes: {e}")
 
-    async def get_cached_embedding(self, content: str) -> Optional[List[float]]:
-        """Get cached embedding for content"""
+    async def get_cached_embedding(self, content: str, model: Optional[str] = None) -> Optional[List[float]]:
+        """Get cached embedding for content; with model, entries recorded for another model are misses"""
         try:
             content_hash = self._hash_content(content)
             collection = self.mongo.get_collection(self.collection_name)
             
             doc = await collection.find_one({"content_hash": content_hash})
             
-            if doc:
+            if doc and not (model and doc.get("model") not in (None, model)):
                 return doc.get("embedding")
             return None
             
@@ -43,8 +43,8 @@ class CachingService:
             logger.error(f"Error getting cached embedding: {e}")
             return None
 
-    async def cache_embedding(self, content: str, embedding: List[float]):
-        """Cache an embedding for content"""
+    async def cache_embedding(self, content: str, embedding: List[float], model: Optional[str] = None):
+        """Cache an embedding for content, recording the model that produced it"""
         try:
             content_hash = self._hash_content(content)
             collection = self.mongo.get_collection(self.collection_name)
@@ -55,6 +55,8 @@ class CachingService:
                 "embedding": embedding,
                 "created_at": datetime.utcnow()
             }
+            if model:
+                document["model"] = model
             
             # Use upsert to avoid duplicates
             await collection.update_one(
@@ -66,8 +68,8 @@ class CachingService:
         except Exception as e:
             logger.error(f"Error caching embedding: {e}")
 
-    async def batch_cache_embeddings(self, content_list: List[str], embeddings: List[List[float]]):
-        """Cache multiple embeddings at once"""
+    async def batch_cache_embeddings(self, content_list: List[str], embeddings: List[List[float]], model: Optional[str] = None):
+        """Cache multiple embeddings at once, recording the model that produced them"""
         try:
             if len(content_list) != len(embeddings):
                 raise ValueError("Content list and embeddings list must have the same length")
@@ -77,12 +79,15 @@ class CachingService:
             documents = []
             for content, embedding in zip(content_list, embeddings):
                 content_hash = self._hash_content(content)
-                documents.append({
+                document = {
                     "content_hash": content_hash,
                     "content": content,
                     "embedding": embedding,
                     "created_at": datetime.utcnow()
-                })
+                }
+                if model:
+                    document["model"] = model
+                documents.append(document)
             
             # Use bulk write for better performance
             operations = []
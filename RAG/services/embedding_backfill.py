@@ -0,0 +1,206 @@
+import asyncio
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from pymongo import UpdateMany
+from app.db.connection.mongo_connection import MongoDB
+from app.services.admission import TokenBudget
+from app.utils.logging_config import get_logger
+from RAG.services.embedding_services import EmbeddingService
+
+logger = get_logger(__name__)
+
+PROGRESS_COLLECTION = "embedding_backfill_progress"
+
+
+@dataclass
+class BackfillStats:
+    candidates: int = 0          # chunks with a missing or stale embedding
+    unique_texts: int = 0        # distinct normalized contents among them
+    cache_hits: int = 0          # distinct texts already in embedding_cache for the current model
+    embedded: int = 0            # distinct texts sent to the embedding API
+    api_calls: int = 0
+    chunks_updated: int = 0
+
+    def summary(self) -> str:
+        return (f"{self.candidates} chunks need embeddings ({self.unique_texts} distinct texts): "
+                f"{self.cache_hits} from cache, {self.embedded} embedded in {self.api_calls} API calls, "
+                f"{self.chunks_updated} chunks updated")
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class EmbeddingBackfill:
+    """
+    Embed knowledge_chunks whose embedding is missing or stale, spending as few API
+    calls as possible: identical contents (by CachingService's normalized hash) are
+    embedded once, contents already in embedding_cache are not embedded at all, and
+    the rest go out in token-bounded batches under a tokens-per-minute budget.
+
+    A chunk is stale when it was embedded with another model or its content changed
+    since (embedding_content_hash). Chunks seeded with an embedding but without that
+    metadata are trusted. embedding_cache entries record their model; entries from
+    another model are never used, and entries seeded without one are used only for
+    texts that aren't being re-embedded because of a model change. Each batch is written back as soon as it is embedded, so an
+    interrupted run resumes by running again; embedding_backfill_progress holds the
+    counts of the latest run.
+    """
+    def __init__(self, settings, embedding_service: EmbeddingService = None, database: str = "vector_db"):
+        self.settings = settings
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.caching_service = self.embedding_service.caching_service
+        self.model = self.embedding_service.model
+        self.mongo = MongoDB(database)
+        self.chunks = self.mongo.get_collection("knowledge_chunks")
+        self.cache = self.mongo.get_collection("embedding_cache")
+        self.progress = self.mongo.get_collection(PROGRESS_COLLECTION)
+        self.budget = TokenBudget(settings.tokens_per_minute)
+        self.budget_lock = asyncio.Lock()
+        self.colleges = set()  # colleges with chunks among the candidates
+        self.stats = BackfillStats()  # of the latest run, also when it raised partway
+        self.model_stale = set()  # content hashes with a chunk embedded by another model
+
+    async def find_candidates(self, query: Dict[str, Any] = None) -> Dict[str, Tuple[str, List[Any]]]:
+        """Group chunks needing an embedding by content hash: {hash: (content, [chunk _ids])}."""
+        query = query or {}
+        groups: Dict[str, Tuple[str, List[Any]]] = {}
+
+        def add(doc):
+            content_hash = self.caching_service._hash_content(doc["content"])
+            groups.setdefault(content_hash, (doc["content"], []))[1].append(doc["_id"])
+            if doc.get("college_name"):
+                self.colleges.add(doc["college_name"])
+
+        missing = {"$or": [{"embedding": {"$exists": False}}, {"embedding": None}, {"embedding": []}]}
+        async for doc in self.chunks.find({"$and": [query, missing]}, {"content": 1, "college_name": 1}):
+            add(doc)
+
+        embedded = {"embedding_content_hash": {"$exists": True}}
+        projection = {"content": 1, "college_name": 1, "embedding_model": 1, "embedding_content_hash": 1}
+        async for doc in self.chunks.find({"$and": [query, embedded]}, projection):
+            if doc.get("embedding_model") != self.model:
+                add(doc)
+                self.model_stale.add(self.caching_service._hash_content(doc["content"]))
+            elif doc["embedding_content_hash"] != self.caching_service._hash_content(doc["content"]):
+                add(doc)
+        return groups
+
+    async def _cached(self, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for start in range(0, len(hashes), 1000):
+            cursor = self.cache.find({"content_hash": {"$in": hashes[start:start + 1000]}},
+                                     {"content_hash": 1, "embedding": 1, "model": 1})
+            async for doc in cursor:
+                model = doc.get("model")
+                if model is None and doc["content_hash"] in self.model_stale:
+                    continue  # may hold the very vector the chunk is being re-embedded to replace
+                if doc.get("embedding") and model in (None, self.model):
+                    found[doc["content_hash"]] = doc["embedding"]
+        return found
+
+    def _batches(self, items: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """Split (hash, content) pairs into batches bounded by text count and tokens."""
+        # A batch larger than a minute's budget could never be admitted
+        batch_tokens = self.settings.batch_tokens
+        if self.budget.tokens_per_minute > 0:
+            batch_tokens = min(batch_tokens, self.budget.tokens_per_minute)
+        batches, current, tokens = [], [], 0
+        for item in items:
+            item_tokens = estimate_tokens(item[1])
+            if current and (len(current) >= self.settings.batch_texts or tokens + item_tokens > batch_tokens):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(item)
+            tokens += item_tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _reserve(self, tokens: int):
+        # A single text above the budget still goes out alone, once the window is empty
+        if self.budget.tokens_per_minute > 0:
+            tokens = min(tokens, self.budget.tokens_per_minute)
+        # One waiter at a time, so batches are admitted in order as the window frees up
+        async with self.budget_lock:
+            while (wait := self.budget.wait_time(tokens)) > 0:
+                logger.info(f"Embedding token budget exhausted, waiting {wait:.1f}s")
+                await asyncio.sleep(wait)
+            self.budget.reserve(tokens)
+
+    async def _embed(self, texts: List[str], stats: BackfillStats) -> List[List[float]]:
+        await self._reserve(sum(estimate_tokens(text) for text in texts))
+        for attempt in range(self.settings.max_retries + 1):
+            try:
+                stats.api_calls += 1
+                return await self.embedding_service._generate_embeddings(texts)
+            except Exception as e:
+                rate_limited = getattr(e, "status_code", None) == 429 or "rate limit" in str(e).lower()
+                if not rate_limited or attempt == self.settings.max_retries:
+                    raise
+                delay = min(60, 2 ** attempt)
+                logger.warning(f"Embedding API rate limited, retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    async def _write_back(self, embeddings: Dict[str, List[float]], groups, stats: BackfillStats):
+        operations = []
+        for content_hash, embedding in embeddings.items():
+            operations.append(UpdateMany({"_id": {"$in": groups[content_hash][1]}}, {"$set": {
+                "embedding": embedding,
+                "embedding_model": self.model,
+                "embedding_content_hash": content_hash,
+                "embedded_at": datetime.utcnow(),
+            }}))
+        if operations:
+            await self.chunks.bulk_write(operations, ordered=False)
+            stats.chunks_updated += sum(len(groups[content_hash][1]) for content_hash in embeddings)
+
+    async def _save_progress(self, stats: BackfillStats, started_at: datetime, finished: bool = False):
+        await self.progress.update_one(
+            {"_id": self.model},
+            {"$set": {**asdict(stats), "started_at": started_at, "updated_at": datetime.utcnow(), "finished": finished}},
+            upsert=True
+        )
+
+    async def run(self, query: Dict[str, Any] = None, dry_run: bool = False) -> BackfillStats:
+        stats = self.stats = BackfillStats()
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        groups = await self.find_candidates(query)
+        stats.candidates = sum(len(ids) for _, ids in groups.values())
+        stats.unique_texts = len(groups)
+
+        cached = await self._cached(list(groups))
+        stats.cache_hits = len(cached)
+        to_embed = [(content_hash, content) for content_hash, (content, _) in groups.items() if content_hash not in cached]
+        batches = self._batches(to_embed)
+        logger.info(f"Embedding backfill: {stats.candidates} chunks, {stats.unique_texts} distinct texts, "
+                    f"{stats.cache_hits} cached, {len(to_embed)} to embed in {len(batches)} batches")
+        if dry_run:
+            stats.embedded = len(to_embed)
+            stats.api_calls = len(batches)
+            return stats
+
+        await self._write_back(cached, groups, stats)
+        await self._save_progress(stats, started_at)
+
+        semaphore = asyncio.Semaphore(self.settings.concurrency)
+
+        async def process(batch: List[Tuple[str, str]]):
+            async with semaphore:
+                texts = [content for _, content in batch]
+                vectors = await self._embed(texts, stats)
+                await self.caching_service.batch_cache_embeddings(texts, vectors, self.model)
+                await self._write_back({content_hash: vector for (content_hash, _), vector in zip(batch, vectors)}, groups, stats)
+                stats.embedded += len(batch)
+                await self._save_progress(stats, started_at)
+
+        results = await asyncio.gather(*(process(batch) for batch in batches), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        await self._save_progress(stats, started_at, finished=not errors)
+        logger.info(f"Embedding backfill {'stopped' if errors else 'finished'} in {time.perf_counter() - started:.1f}s: {stats.summary()}")
+        if errors:
+            raise errors[0]
+        return stats
@@ -1,16 +1,18 @@
-from openai import OpenAI
 from typing import List
 from app.utils.logging_config import get_logger
+from app.utils.metrics import traced, record_cache
 from RAG.config.settings import get_settings
 from RAG.services.caching_service import CachingService
+from RAG.services.providers import EmbeddingProvider, get_embedding_provider
 
 logger = get_logger(__name__)
 
 class EmbeddingService:
-    def __init__(self):
+    def __init__(self, provider: EmbeddingProvider = None):
         settings = get_settings()
         self.model = settings.openai.embedding_model
-        self.client = OpenAI(api_key=settings.openai.api_key)
+        self.provider = provider or get_embedding_provider(settings)
+        self.client = getattr(self.provider, "client", None)
         self.caching_service = CachingService()
 
     async def batch_create_embedding(self, texts: List[str], use_cache: bool = True) -> List[List[float]]:
@@ -30,7 +32,7 @@ class EmbeddingService:
             
             # First, check cache for each text
             for idx, text in enumerate(texts):
-                cached_embedding = await self.caching_service.get_cached_embedding(text)
+                cached_embedding = await self.caching_service.get_cached_embedding(text, self.model)
                 if cached_embedding:
                     logger.debug(f"Cache hit for text: {text[:30]}...")
                     result_embeddings[idx] = cached_embedding
@@ -53,7 +55,7 @@ class EmbeddingService:
                 text = texts[orig_idx]
                 
                 # Update cache with new embedding
-                await self.caching_service.cache_embedding(text, embedding)
+                await self.caching_service.cache_embedding(text, embedding, self.model)
                 
                 # Place in result at original position
                 result_embeddings[orig_idx] = embedding
@@ -63,15 +65,11 @@ class EmbeddingService:
             logger.error(f"Error in cached batch embeddings: {e}")
             raise
 
+    @traced("embedding.generate")
     async def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Internal method to generate embeddings from OpenAI API"""
+        """Internal method to generate embeddings from the configured provider"""
         try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=texts
-            )
-            
-            embeddings = [data.embedding for data in response.data]
+            embeddings = await self.provider.embed(self.model, texts)
             logger.info("Finish created embedding")
             return embeddings
         except Exception as e:
@@ -82,6 +80,7 @@ class EmbeddingService:
                 logger.error(f"Error generating embeddings from OpenAI: {e}")
                 raise
 
+    @traced("embedding")
     async def create_embedding(self, text: str, use_cache: bool = True) -> List[float]:
         """Create a single embedding with optional caching"""
         if not use_cache:
@@ -91,7 +90,8 @@ class EmbeddingService:
             
         try:
             # First check cache
-            cached_embedding = await self.caching_service.get_cached_embedding(text)
+            cached_embedding = await self.caching_service.get_cached_embedding(text, self.model)
+            record_cache("embedding", bool(cached_embedding))
             if cached_embedding:
                 logger.debug(f"Using cached embedding for: {text[:30]}...")
                 return cached_embedding
@@ -102,7 +102,7 @@ class EmbeddingService:
             embedding = embeddings[0]
             
             # Cache the new embedding
-            await self.caching_service.cache_embedding(text, embedding)
+            await self.caching_service.cache_embedding(text, embedding, self.model)
             
             return embedding
         except Exception as e:
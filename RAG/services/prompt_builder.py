@@ -0,0 +1,243 @@
+import json
+from typing import Dict, Any, List, Tuple
+from app.utils.logging_config import get_logger
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to a character-based estimate
+    tiktoken = None
+
+logger = get_logger(__name__)
+
+# Static system prompts: anything request-specific goes in the user message so the
+# prefix stays byte-identical across calls and provider-side prompt caching applies.
+PLAN_SYSTEM_PROMPT = """\
+You are an expert academic transfer advisor.  
+► The user message states the requested number of academic terms (N); use **EXACTLY N terms**.
+
+You will receive:
+• **Context** – compact JSON from a course-articulation knowledge base:  
+− `college`  source college (applies to every entry)  
+− `targets`  list of `{"university", "major", "articulation": [...]}`; each
+  articulation item is either a natural-language mapping string or
+  `{"university_courses": [...], "options": [[...], ...]}` where `options` is an
+  OR-list of AND-groups of PCC course codes  
+− `courses`  `[chunk_type, content]` pairs with class/prerequisite details,
+  most relevant first
+
+--------------------  CRITICAL RULES  --------------------
+1. MUST-INCLUDE CHECKLIST  
+• Every PCC course mentioned in any `articulation` entry of any target
+    **must** be scheduled.  
+• For structured entries, schedule every course of exactly one group in
+    `options` per requirement, preferring groups shared with other targets.
+• If an articulation entry lists multiple PCC course codes separated by commas,
+    slashes, or the word “and” (e.g. “PHYS 008A/008B/008C”), treat **each code
+    as a separate course** that must be placed.
+
+2. TERM COUNT  
+• Use exactly **N terms** (no more, no less).  
+• Do **not** create extra terms, summer sessions, or remove courses just
+    to lighten a heavy load.
+
+3. PREREQUISITE HANDLING  
+• Some courses have prerequisites that must be taken beforehand — always respect prerequisite chains.
+• Some university course requirements may be satisfied by alternative courses — include all valid options.
+• If correct ordering is impossible, **still place the course** and add a
+    `"note"` field, e.g.  
+    `"note": "Concurrent with prerequisite MATH 005A; allowed but not recommended."`
+
+4. NO HALLUCINATIONS  
+• Use only PCC course codes present in the context.  
+• If you encounter a truly invalid or duplicate mapping that cannot be
+    scheduled at all, you may create an `unscheduled_courses` array with a
+    brief reason; do **not** add extra terms.
+
+5. UNIFIED PLAN  
+• Produce one schedule that satisfies **all** university-major targets while
+    minimising duplicate PCC courses and balancing units/difficulty across the
+    fixed number of terms.
+
+6. NO EXTRA COURSES  
+• Schedule **only** courses that meet at least one of these conditions:  
+    – appears in an `articulation` entry for any target university/major, **or**  
+    – is an explicit prerequisite of a scheduled course.  
+• Do NOT add electives, GEs, or “nice-to-have” courses unless they satisfy
+    the rule above.
+
+CRITICAL INSTRUCTION:
+• Do NOT add courses like ENGL or STAT unless they're specifically mentioned in the retrieved articulation data.
+
+
+
+--------------------  OPTIMISATION GOALS  ----------------
+• Distribute difficult courses evenly across terms.  
+• Ensure a mix of STEM, GE, and electives each term when possible.  
+• Minimise total units while satisfying every requirement.  
+• For alternatives containing “placement”, include `{ "need_placement": true }`.
+
+--------------------  OUTPUT SCHEMA  ---------------------
+```json
+{
+"targets": [
+    {"university": "<university1>", "major": "<major1>"},
+    {"university": "<university2>", "major": "<major2>"}
+],
+"source_college": "<college_name>",
+"term_plan": [
+    {
+    "term": <int>,                 // 1 … N
+    "courses": [
+        {
+        "code": "<PCC_course_code>",
+        "name": "<PCC_course_name>",
+        "units": <float>,
+        "difficulty": <1-5>,
+        "prerequisites": [ ... ],
+        "satisfies": [
+            {
+            "university": "<university>",
+            "major": "<major>",
+            "university_courses": ["<univ_course_code>", ...]
+            }
+        ],
+        "alternatives": [ ... ],
+        "note": <string>
+        }
+    ]
+    }
+],
+"unscheduled_courses": [           // include only if Rule 4 applies
+    {
+    "code": "<PCC_course_code>",
+    "reason": "<short explanation>"
+    }
+]
+}
+```
+"""
+
+REORDER_SYSTEM_PROMPT = """\
+You are an expert academic advisor responsible for reorganizing a student's transfer plan 
+after they've marked some courses as already taken.
+
+Your task is to:
+1. Remove courses that are marked as "taken" from the plan
+2. Redistribute remaining courses across the same number of terms
+3. Respect all prerequisite requirements
+4. Balance course difficulty across terms
+5. Ensure a variety of course types in each term
+6. Preserve the overall structure and format of the plan
+
+IMPORTANT CONSTRAINTS:
+- Do NOT add any new courses that weren't in the original plan
+- Maintain the same number of terms as the original plan
+- Keep all required courses from the original plan that haven't been taken
+- If a prerequisite has been taken, courses dependent on it can be moved earlier
+- Output must follow the exact same JSON format as the original plan
+"""
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise ~4 characters per token."""
+    if tiktoken is not None:
+        return len(_get_encoding().encode(text))
+    return len(text) // 4 + 1
+
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return _encoding
+
+
+def to_compact_json(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class PromptBuilder:
+    """Assemble LLM messages within a context token budget."""
+    def __init__(self, context_token_budget: int = 6000):
+        self.context_token_budget = context_token_budget
+        self.system_prompt_tokens = {
+            "plan": count_tokens(PLAN_SYSTEM_PROMPT),
+            "reorder": count_tokens(REORDER_SYSTEM_PROMPT),
+        }
+
+    def build_plan_messages(self, question: str, number_of_terms: int, vector_res: List[Dict[str, Any]]) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        """Messages for plan generation plus token stats for instrumentation."""
+        context, stats = self.build_context(vector_res)
+        user_content = f"# Number of terms (N): {number_of_terms}\n# User question:\n{question}\n\n# Retrieved information:\n{context}"
+        return self._messages(PLAN_SYSTEM_PROMPT, user_content, "plan", stats)
+
+    def build_reorder_messages(self, question: str, courses_data: List[Dict[str, Any]]) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        # Plan course rows, not retrieved chunks: every row goes in as is, just without whitespace
+        context = to_compact_json(courses_data)
+        stats = {
+            "context_tokens": count_tokens(context),
+            "rows_in": len(courses_data),
+            "general_chunks_kept": 0,
+            "general_chunks_dropped": 0
+        }
+        user_content = f"# User question:\n{question}\n\n# Retrieved information:\n{context}"
+        return self._messages(REORDER_SYSTEM_PROMPT, user_content, "reorder", stats)
+
+    def build_context(self, rows: List[Dict[str, Any]]) -> Tuple[str, Dict[str, int]]:
+        """
+        Compact context: college and target names appear once, articulation rows are always
+        kept, general chunks are added by descending similarity until the budget is spent.
+        """
+        colleges = {row.get("college_name") for row in rows if row.get("college_name")}
+        context = {"college": colleges.pop() if len(colleges) == 1 else sorted(colleges), "targets": [], "courses": []}
+
+        targets = {}
+        general = []
+        seen_content = set()
+        for row in rows:
+            if row.get("chunk_type") == "articulation":
+                key = (row.get("university_name"), row.get("major_name"))
+                if key not in targets:
+                    targets[key] = {"university": key[0], "major": key[1], "articulation": []}
+                    context["targets"].append(targets[key])
+                if "requirements" in row:
+                    targets[key]["articulation"].extend(row["requirements"])
+                elif row.get("content") and row["content"] not in seen_content:
+                    seen_content.add(row["content"])
+                    targets[key]["articulation"].append(row["content"])
+            elif row.get("content") and row["content"] not in seen_content:
+                seen_content.add(row["content"])
+                general.append(row)
+
+        used = count_tokens(to_compact_json(context))
+        dropped = 0
+        for row in sorted(general, key=lambda r: r.get("similarity") or 0, reverse=True):
+            entry = [row.get("chunk_type"), row["content"]]
+            cost = count_tokens(to_compact_json(entry)) + 1
+            if used + cost > self.context_token_budget:
+                dropped += 1
+                continue
+            context["courses"].append(entry)
+            used += cost
+
+        if not context["courses"]:
+            del context["courses"]
+
+        return to_compact_json(context), {
+            "context_tokens": used,
+            "rows_in": len(rows),
+            "general_chunks_kept": len(general) - dropped,
+            "general_chunks_dropped": dropped
+        }
+
+    def _messages(self, system_prompt: str, user_content: str, kind: str, stats: Dict[str, int]):
+        stats["system_tokens"] = self.system_prompt_tokens[kind]
+        stats["user_tokens"] = count_tokens(user_content)
+        stats["prompt_tokens_estimate"] = stats["system_tokens"] + stats["user_tokens"]
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ], stats
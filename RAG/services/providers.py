@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
+from openai import OpenAI
+from app.utils.logging_config import get_logger
+from RAG.services.prompt_builder import count_tokens
+
+logger = get_logger(__name__)
+
+COURSE_CODE = re.compile(r"\b[A-Z]{2,5} \d{3}[A-Z]?\b")
+
+
+class LatencyModel:
+    """
+    Simulated call latency parsed from a spec string:
+        "0"                     no delay
+        "fixed:<ms>"            constant
+        "uniform:<min>:<max>"   uniform between min and max ms
+        "lognormal:<median>:<sigma>"  long-tailed, like real LLM calls
+    """
+    def __init__(self, spec: str = "0", seed: int = 0):
+        self.kind, *params = (spec or "0").split(":")
+        self.params = [float(p) for p in params]
+        self.random = random.Random(seed)
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.random.uniform(self.params[0], self.params[1])
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return self.random.lognormvariate(math.log(median), sigma)
+        return 0.0
+
+    async def wait(self):
+        delay = self.sample_ms()
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+
+class LLMProvider(ABC):
+    """Chat completion backend used by Synthesizer; responses mirror the OpenAI client's shape."""
+    @abstractmethod
+    async def complete(self, model: str, messages: List[Dict[str, str]], response_format: Optional[Dict] = None):
+        ...
+
+
+class EmbeddingProvider(ABC):
+    """Embedding backend used by EmbeddingService."""
+    @abstractmethod
+    async def embed(self, model: str, texts: List[str]) -> List[List[float]]:
+        ...
+
+
+class OpenAILLMProvider(LLMProvider):
+    def __init__(self, api_key: str):
+        self.client = OpenAI(api_key=api_key)
+
+    async def complete(self, model, messages, response_format=None):
+        kwargs = {"model": model, "messages": messages}
+        if response_format:
+            kwargs["response_format"] = response_format
+        # The client is synchronous; keep the event loop free while waiting on the API
+        return await asyncio.to_thread(self.client.chat.completions.create, **kwargs)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, api_key: str):
+        self.client = OpenAI(api_key=api_key)
+
+    async def embed(self, model, texts):
+        response = await asyncio.to_thread(self.client.embeddings.create, model=model, input=texts)
+        return [data.embedding for data in response.data]
+
+
+class LocalLLMProvider(LLMProvider):
+    """
+    Deterministic offline stand-in for load testing. Returns a canned plan (from a file, or
+    built from the course codes in the prompt context) after a simulated latency.
+    """
+    def __init__(self, latency: str = "0", seed: int = 0, plan_file: Optional[str] = None):
+        self.latency = LatencyModel(latency, seed)
+        self.canned_plan = None
+        if plan_file:
+            with open(plan_file, "r", encoding="utf-8") as f:
+                self.canned_plan = json.load(f)
+
+    async def complete(self, model, messages, response_format=None):
+        await self.latency.wait()
+        prompt = "\n".join(message["content"] for message in messages)
+        plan = self.canned_plan or self._plan_from_prompt(messages[-1]["content"])
+        content = json.dumps(plan)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=count_tokens(prompt),
+                completion_tokens=count_tokens(content),
+                prompt_tokens_details=SimpleNamespace(cached_tokens=0)
+            )
+        )
+
+    def _plan_from_prompt(self, user_content: str) -> Dict[str, Any]:
+        terms_match = re.search(r"Number of terms \(N\): (\d+)", user_content)
+        number_of_terms = int(terms_match.group(1)) if terms_match else 4
+
+        context = {}
+        if "# Retrieved information:\n" in user_content:
+            try:
+                context = json.loads(user_content.split("# Retrieved information:\n", 1)[1])
+            except json.JSONDecodeError:
+                context = {}
+
+        targets = context.get("targets", [])
+        codes = []
+        for code in COURSE_CODE.findall(json.dumps([t.get("articulation") for t in targets])):
+            if code not in codes:
+                codes.append(code)
+
+        term_plan = [{"term": term, "courses": []} for term in range(1, number_of_terms + 1)]
+        for idx, code in enumerate(codes):
+            term_plan[idx % number_of_terms]["courses"].append({
+                "code": code, "name": code, "units": 4.0, "difficulty": 3,
+                "prerequisites": [], "satisfies": [], "alternatives": [], "note": None
+            })
+
+        return {
+            "targets": [{"university": t.get("university"), "major": t.get("major")} for t in targets],
+            "source_college": context.get("college"),
+            "term_plan": term_plan,
+            "unscheduled_courses": []
+        }
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Deterministic hash-seeded unit vectors; identical text always gets the same embedding."""
+    def __init__(self, dimensions: int = 1536, latency: str = "0", seed: int = 0):
+        self.dimensions = dimensions
+        self.latency = LatencyModel(latency, seed)
+
+    async def embed(self, model, texts):
+        await self.latency.wait()
+        return [self.hash_embedding(text) for text in texts]
+
+    def hash_embedding(self, text: str) -> List[float]:
+        digest = hashlib.blake2b(text.strip().lower().encode("utf-8"), digest_size=8).digest()
+        rng = random.Random(int.from_bytes(digest, "big"))
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.dimensions)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def get_llm_provider(settings) -> LLMProvider:
+    if settings.provider.llm == "local":
+        logger.info("Using local LLM provider")
+        local = settings.provider
+        return LocalLLMProvider(local.local_llm_latency, local.local_seed, local.local_plan_file)
+    return OpenAILLMProvider(settings.openai.api_key)
+
+
+def get_embedding_provider(settings) -> EmbeddingProvider:
+    if settings.provider.embedding == "local":
+        logger.info("Using local embedding provider")
+        local = settings.provider
+        return LocalEmbeddingProvider(settings.vector_store.embedding_dimensions, local.local_embedding_latency, local.local_seed)
+    return OpenAIEmbeddingProvider(settings.openai.api_key)
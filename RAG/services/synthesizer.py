@@ -1,168 +1,77 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import json
-from app.utils.logging_config import get_logger
+from app.utils.logging_config import get_logger, LazyPayload
+from app.utils.metrics import traced, record_tokens
 from RAG.config.settings import get_settings
+from RAG.services.prompt_builder import PromptBuilder
+from RAG.services.providers import LLMProvider, get_llm_provider
+from app.services.admission import AdmissionController, get_admission_controller
 
 logger = get_logger(__name__)
 
 load_dotenv()
 
 class Synthesizer:
-    def __init__(self):
+    def __init__(self, provider: LLMProvider = None, admission: AdmissionController = None):
         settings = get_settings()
         self.model = settings.openai.default_model
-        self.client = OpenAI(api_key=settings.openai.api_key)
+        self.provider = provider or get_llm_provider(settings)
+        self.client = getattr(self.provider, "client", None)
+        self.prompt_builder = PromptBuilder(settings.openai.context_token_budget)
+        self.admission = admission or get_admission_controller()
+        self.last_usage = {}
 
+    @traced("llm.plan")
     async def generate_response(self, question: str, number_of_terms, vector_res):
-        json_context = await self.vector_result_to_json(vector_res)
-        system_prompt = f"""
-            You are an expert academic transfer advisor.  
-            ► The user has requested **EXACTLY {number_of_terms} academic terms**.
-
-            You will receive:
-            • **Context** – JSON rows from a course-articulation knowledge base.  
-            Each row may include  
-            − `id`     unique row ID (optional)  
-            − `chunk_type` 'articulation', 'class', 'prerequisite', 'ge', …  
-            − `content`  natural-language mapping or detail
-
-            --------------------  CRITICAL RULES  --------------------
-            1. MUST-INCLUDE CHECKLIST  
-            • Every PCC course mentioned in any row where `chunk_type == "articulation"`
-                **must** be scheduled.  
-            • If an articulation row lists multiple PCC course codes separated by commas,
-                slashes, or the word “and” (e.g. “PHYS 008A/008B/008C”), treat **each code
-                as a separate course** that must be placed.
-
-            2. TERM COUNT  
-            • Use exactly **{number_of_terms} terms** (no more, no less).  
-            • Do **not** create extra terms, summer sessions, or remove courses just
-                to lighten a heavy load.
-
-            3. PREREQUISITE HANDLING  
-            • Some courses have prerequisites that must be taken beforehand — always respect prerequisite chains.
-            • Some university course requirements may be satisfied by alternative courses — include all valid options.
-            • If correct ordering is impossible, **still place the course** and add a
-                `"note"` field, e.g.  
-                `"note": "Concurrent with prerequisite MATH 005A; allowed but not recommended."`
-
-            4. NO HALLUCINATIONS  
-            • Use only PCC course codes present in the context.  
-            • If you encounter a truly invalid or duplicate mapping that cannot be
-                scheduled at all, you may create an `unscheduled_courses` array with a
-                brief reason; do **not** add extra terms.
-
-            5. UNIFIED PLAN  
-            • Produce one schedule that satisfies **all** university-major targets while
-                minimising duplicate PCC courses and balancing units/difficulty across the
-                fixed number of terms.
-            
-            6. NO EXTRA COURSES  
-            • Schedule **only** courses that meet at least one of these conditions:  
-                – appears in an `articulation` row for any target university/major, **or**  
-                – is an explicit prerequisite of a scheduled course.  
-            • Do NOT add electives, GEs, or “nice-to-have” courses unless they satisfy
-                the rule above.
-                
-            CRITICAL INSTRUCTION:
-            • Do NOT add courses like ENGL or STAT unless they're specifically mentioned in the retrieved articulation data.
-
-
-
-            --------------------  OPTIMISATION GOALS  ----------------
-            • Distribute difficult courses evenly across terms.  
-            • Ensure a mix of STEM, GE, and electives each term when possible.  
-            • Minimise total units while satisfying every requirement.  
-            • For alternatives containing “placement”, include `{{ "need_placement": true }}`.
-
-            --------------------  OUTPUT SCHEMA  ---------------------
-            ```json
-            {{
-            "targets": [
-                {{"university": "<university1>", "major": "<major1>"}},
-                {{"university": "<university2>", "major": "<major2>"}}
-            ],
-            "source_college": "<college_name>",
-            "term_plan": [
-                {{
-                "term": <int>,                 // 1 … {number_of_terms}
-                "courses": [
-                    {{
-                    "code": "<PCC_course_code>",
-                    "name": "<PCC_course_name>",
-                    "units": <float>,
-                    "difficulty": <1-5>,
-                    "prerequisites": [ ... ],
-                    "satisfies": [
-                        {{
-                        "university": "<university>",
-                        "major": "<major>",
-                        "university_courses": ["<univ_course_code>", ...]
-                        }}
-                    ],
-                    "alternatives": [ ... ],
-                    "note": <string>
-                    }}
-                ]
-                }}
-            ],
-            "unscheduled_courses": [           // include only if Rule 4 applies
-                {{
-                "code": "<PCC_course_code>",
-                "reason": "<short explanation>"
-                }}
-            ]
-            }}
-            ```"""
-
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"# User question:\n{question}\n\n# Retrieved information:\n{json_context}"}
-            ],
-            response_format={"type": "json_object"}
-        )
+        messages, prompt_stats = self.prompt_builder.build_plan_messages(question, number_of_terms, vector_res)
+        async with self.admission.llm_slot(self.admission.estimate(prompt_stats["prompt_tokens_estimate"])) as slot:
+            response = await self.provider.complete(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"}
+            )
+            self._record_usage("plan", prompt_stats, response)
+            slot.record(self._total_tokens())
         # Parse the JSON string into a Python dictionary before returning
         json_response = json.loads(response.choices[0].message.content)
-        logger.debug("Parsed response: %s", json_response)
+        logger.debug("Parsed response: %s", LazyPayload(json_response))
         return json_response
 
 
+    @traced("llm.reorder")
     async def generate_reorder_plan_response(self, question: str, courses_data):
-        json_context = await self.vector_result_to_json(courses_data)
-        system_prompt = f"""
-            You are an expert academic advisor responsible for reorganizing a student's transfer plan 
-            after they've marked some courses as already taken.
-            
-            Your task is to:
-            1. Remove courses that are marked as "taken" from the plan
-            2. Redistribute remaining courses across the same number of terms
-            3. Respect all prerequisite requirements
-            4. Balance course difficulty across terms
-            5. Ensure a variety of course types in each term
-            6. Preserve the overall structure and format of the plan
-            
-            IMPORTANT CONSTRAINTS:
-            - Do NOT add any new courses that weren't in the original plan
-            - Maintain the same number of terms as the original plan
-            - Keep all required courses from the original plan that haven't been taken
-            - If a prerequisite has been taken, courses dependent on it can be moved earlier
-            - Output must follow the exact same JSON format as the original plan
-            
-        """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"# User question:\n{question}\n\n# Retrieved information:\n{json_context}"}
-            ],
-            response_format={"type": "json_object"}
-        )
+        messages, prompt_stats = self.prompt_builder.build_reorder_messages(question, courses_data)
+        async with self.admission.llm_slot(self.admission.estimate(prompt_stats["prompt_tokens_estimate"])) as slot:
+            response = await self.provider.complete(
+                model=self.model,
+                messages=messages,
+                response_format={"type": "json_object"}
+            )
+            self._record_usage("reorder", prompt_stats, response)
+            slot.record(self._total_tokens())
         json_response = json.loads(response.choices[0].message.content)
-        logger.debug("Parsed response: %s", json_response)
+        logger.debug("Parsed response: %s", LazyPayload(json_response))
         return json_response
 
-    async def vector_result_to_json(self, vector_res):
-        return json.dumps(vector_res, ensure_ascii=False, indent=2)
+    def _total_tokens(self):
+        if self.last_usage.get("prompt_tokens") is None:
+            return None
+        return self.last_usage["prompt_tokens"] + (self.last_usage.get("completion_tokens") or 0)
+
+    def _record_usage(self, kind: str, prompt_stats, response):
+        """Log estimated vs. actual token counts for a completion."""
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.last_usage = {
+            **prompt_stats,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+            "cached_tokens": getattr(details, "cached_tokens", None),
+        }
+        record_tokens(kind, self.last_usage["prompt_tokens"], self.last_usage["completion_tokens"])
+        logger.info(
+            f"LLM {kind} tokens: prompt={self.last_usage['prompt_tokens']} "
+            f"(est {prompt_stats['prompt_tokens_estimate']}, cached {self.last_usage['cached_tokens']}), "
+            f"completion={self.last_usage['completion_tokens']}, "
+            f"general chunks kept/dropped={prompt_stats['general_chunks_kept']}/{prompt_stats['general_chunks_dropped']}"
+        )
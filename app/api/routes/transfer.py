@@ -1,24 +1,67 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse
 from app.services.transfer_service import TransferPlanService
-from app.schemas.transferPlanRequest import FullRequest, ReOrderRequestModel
+from app.services.plan_jobs import DuplicateJobError, PlanJobQueue, QueueFullError
+from app.services.admission import AdmissionRejected, enforce_tenant_limit
+from app.schemas.transferPlanRequest import FullRequest, ReOrderRequestModel, PlanUpdateRequestModel, PlanJobRequest
+from app.services.cache_invalidation import MAJOR_LIST_TAGS
+from app.services.cache_warming import MAJOR_LIST_TTL
+from app.services.transfer_matrix import TransferMatrixStore
 from app.utils.cache_wrapper import cache_response
+from app.utils.http_cache import cache_control, conditional_response, http_cache
+from app.utils.webhooks import WebhookRejected, resolve_webhook_host
+from RAG.config.settings import get_settings
 
 def create_transfer_router() -> APIRouter:
     transfer_plan_service = TransferPlanService()
+    plan_jobs = PlanJobQueue(transfer_plan_service.redis_client, get_settings().jobs, cache_key=transfer_plan_service.plan_cache_key)
+    transfer_matrix_store = TransferMatrixStore()
     router = APIRouter(
         prefix="/transfer-plan",
         tags=["Transfer Plan"]
     )
 
-    @router.post("/v2/rag")
+    @router.post("/v2/rag", dependencies=[Depends(enforce_tenant_limit)])
     async def rag_transfer_plan_v2(
         request: FullRequest,
     ):
         try:
             return await transfer_plan_service.create_RAG_transfer_plan_v2(request)
+        except AdmissionRejected as e:
+            raise e.to_http()
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.post("/v2/jobs", status_code=202, dependencies=[Depends(enforce_tenant_limit)])
+    async def submit_plan_job(
+        request: PlanJobRequest,
+    ):
+        """Queue plan generation for the worker pool; poll /v2/jobs/{job_id} or pass webhook_url."""
+        if request.webhook_url:
+            try:
+                await resolve_webhook_host(request.webhook_url, get_settings().jobs.webhook_allowed_hosts)
+            except WebhookRejected as e:
+                raise HTTPException(status_code=422, detail=str(e))
+        try:
+            job = plan_jobs.submit(request.plan_request(), request.priority, request.webhook_url)
+        except QueueFullError as e:
+            return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": str(e.retry_after)})
+        except DuplicateJobError as e:
+            return JSONResponse(status_code=409, content={
+                "detail": str(e), "job_id": e.job_id, "poll_url": f"/transfer-plan/v2/jobs/{e.job_id}"
+            })
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"job_id": job["job_id"], "status": job["status"], "poll_url": f"/transfer-plan/v2/jobs/{job['job_id']}"}
+
+    @router.get("/v2/jobs/{job_id}")
+    async def get_plan_job(job_id: str):
+        job = plan_jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found or expired")
+        return {k: job[k] for k in ("job_id", "status", "priority", "result", "error", "created_at", "updated_at")}
+
     @router.post("/v2/reorder")
     async def re_order_plan_v2(
         request: ReOrderRequestModel, 
@@ -28,15 +71,37 @@ def create_transfer_router() -> APIRouter:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.post("/v2/update", dependencies=[Depends(enforce_tenant_limit)])
+    async def update_plan_v2(
+        request: PlanUpdateRequestModel,
+    ):
+        try:
+            return await transfer_plan_service.update_transfer_plan_v2(request)
+        except AdmissionRejected as e:
+            raise e.to_http()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
     @router.get("/v1/majorlist/{university_id}/{college_id}")
-    @cache_response("major_list:{university_id}:{college_id}", expiration=3600)  # 1 hour
+    @http_cache(max_age=600, stale_while_revalidate=3600)
+    @cache_response("major_list:{university_id}:{college_id}", expiration=MAJOR_LIST_TTL, track_popularity=True, tags=MAJOR_LIST_TAGS)
     async def major_list(university_id: str, college_id: str):
         try:
             return await transfer_plan_service.get_major_list(university_id, college_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get("/v1/transfer-matrix/{college_id}")
+    async def transfer_matrix(college_id: str, if_none_match: Optional[str] = Header(None)):
+        """Every university and the majors it accepts from this college, in one response"""
+        try:
+            body, etag = await transfer_matrix_store.get_college(college_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return conditional_response(body, etag, if_none_match, cache_control(600, stale_while_revalidate=3600))
+
     @router.get("/v1/universities")
+    @http_cache(max_age=3600, stale_while_revalidate=21600)
     @cache_response("universities_list", expiration=21600)  # 6 hours
     async def get_universities():
         """Get list of all universities"""
@@ -46,6 +111,7 @@ def create_transfer_router() -> APIRouter:
             raise HTTPException(status_code=500, detail=str(e))
 
     @router.get("/v1/colleges")
+    @http_cache(max_age=3600, stale_while_revalidate=21600)
     @cache_response("colleges_list", expiration=21600)  # 6 hours
     async def get_colleges():
         """Get list of all colleges"""
@@ -41,6 +41,6 @@ class MongoDB:
     @classmethod
     def close_all_connections(cls):
         """Close all MongoDB connections"""
-        for instance in cls._instances.values():
+        for instance in list(cls._instances.values()):
             instance.close_connection()
         cls._instances.clear()
\ No newline at end of file
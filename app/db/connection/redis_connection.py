@@ -0,0 +1,27 @@
+import os
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class RedisConnection:
+    """Process-wide Redis client; redis-py pools connections internally, so share one."""
+    _client = None
+
+    @classmethod
+    def get_client(cls):
+        if cls._client is None:
+            cls._client = redis.Redis(
+                host=os.getenv("REDIS_HOST"),
+                port=int(os.getenv("REDIS_PORT")),
+                username=os.getenv("REDIS_USERNAME"),
+                password=os.getenv("REDIS_PASSWORD"),
+                decode_responses=False  # Keep binary for efficient storage
+            )
+        return cls._client
+
+    @classmethod
+    def close_connection(cls):
+        if cls._client is not None:
+            cls._client.close()
+            cls._client = None
@@ -0,0 +1,138 @@
+"""
+Materialized view of college_uni_major_pair with major names stored inline.
+
+The major list endpoint used to join every pair with majors twice ($lookup) per
+request. The view holds one document per pair, already shaped like the endpoint's
+rows (ids as strings, names resolved). A compound index on
+(from_college_id, to_university_id, is_active, major_name) answers the lookup and
+the sort.
+
+The seed pipeline rebuilds it with refresh(), and the cache invalidator worker
+patches it with apply_change() as pairs and majors change. Until a refresh has
+written its views_meta marker, readers fall back to the aggregation.
+"""
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from bson.objectid import ObjectId
+from pymongo import ReplaceOne, UpdateMany
+from app.db.connection.mongo_connection import MongoDB
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PAIR_COLLECTION = "college_uni_major_pair"
+VIEW_COLLECTION = "college_uni_major_pair_view"
+META_COLLECTION = "views_meta"
+UNKNOWN_MAJOR = "Unknown Major"
+ROW_PROJECTION = {"_id": 0, "major_id": 1, "major_name": 1, "alter_major_id": 1, "alter_major_name": 1}
+
+
+def view_document(pair: Dict[str, Any], major_names: Dict[Any, str]) -> Dict[str, Any]:
+    """Pair -> view row, matching what the $lookup aggregation returned."""
+    alter_major_id = pair.get("alter_major_id")
+    return {
+        "_id": pair["_id"],
+        "from_college_id": pair.get("from_college_id"),
+        "to_university_id": pair.get("to_university_id"),
+        "is_active": pair.get("is_active"),
+        "major_id": str(pair.get("major_id")),
+        "major_name": major_names.get(pair.get("major_id"), UNKNOWN_MAJOR),
+        "alter_major_id": str(alter_major_id) if alter_major_id is not None else None,
+        "alter_major_name": major_names.get(alter_major_id) if alter_major_id is not None else None,
+        "source_major_id": pair.get("major_id"),
+        "source_alter_major_id": alter_major_id,
+    }
+
+
+class MajorPairView:
+    # Readiness is rechecked at most this often while the view is not built yet
+    READY_RECHECK_SECONDS = 60.0
+    _ready: Optional[bool] = None
+    _checked_at = 0.0
+
+    def __init__(self, database: str = "main_db"):
+        self.mongo_db = MongoDB(database)
+        self.pairs = self.mongo_db.get_collection(PAIR_COLLECTION)
+        self.majors = self.mongo_db.get_collection("majors")
+        self.collection = self.mongo_db.get_collection(VIEW_COLLECTION)
+        self.meta = self.mongo_db.get_collection(META_COLLECTION)
+
+    async def create_indexes(self):
+        await self.collection.create_index(
+            [("from_college_id", 1), ("to_university_id", 1), ("is_active", 1), ("major_name", 1)]
+        )
+        # Renames fan out by major
+        await self.collection.create_index([("source_major_id", 1)])
+        await self.collection.create_index([("source_alter_major_id", 1)])
+
+    async def is_ready(self) -> bool:
+        cls = MajorPairView
+        if cls._ready or (cls._ready is False and time.monotonic() - cls._checked_at < self.READY_RECHECK_SECONDS):
+            return bool(cls._ready)
+        cls._ready = await self.meta.find_one({"_id": VIEW_COLLECTION}) is not None
+        cls._checked_at = time.monotonic()
+        return cls._ready
+
+    @classmethod
+    def reset(cls):
+        cls._ready, cls._checked_at = None, 0.0
+
+    async def get_rows(self, university_id, college_id) -> List[Dict[str, Any]]:
+        cursor = self.collection.find(
+            {"from_college_id": college_id, "to_university_id": university_id, "is_active": True},
+            ROW_PROJECTION
+        ).sort("major_name", 1)
+        return await cursor.to_list(None)
+
+    async def _major_names(self, major_ids=None) -> Dict[Any, str]:
+        query = {"_id": {"$in": list(major_ids)}} if major_ids is not None else {}
+        return {doc["_id"]: doc.get("major_name") async for doc in self.majors.find(query, {"major_name": 1})}
+
+    async def refresh(self, batch_size: int = 1000) -> int:
+        """Rebuild the whole view from the pairs; returns the number of rows."""
+        started = time.perf_counter()
+        await self.create_indexes()
+        major_names = await self._major_names()
+        # Rows not rewritten by this refresh belong to deleted pairs
+        generation = ObjectId()
+        rows = 0
+        operations = []
+        async for pair in self.pairs.find({}):
+            document = {**view_document(pair, major_names), "generation": generation}
+            operations.append(ReplaceOne({"_id": pair["_id"]}, document, upsert=True))
+            rows += 1
+            if len(operations) >= batch_size:
+                await self.collection.bulk_write(operations, ordered=False)
+                operations = []
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+        await self.collection.delete_many({"generation": {"$ne": generation}})
+
+        await self.meta.update_one(
+            {"_id": VIEW_COLLECTION},
+            {"$set": {"refreshed_at": datetime.utcnow(), "rows": rows}},
+            upsert=True
+        )
+        logger.info(f"Refreshed {VIEW_COLLECTION}: {rows} rows in {time.perf_counter() - started:.2f}s")
+        return rows
+
+    async def apply_change(self, collection: str, change: Dict[str, Any]):
+        """Patch the view for one change stream event on main_db."""
+        operation = change.get("operationType")
+        if collection == PAIR_COLLECTION:
+            pair_id = (change.get("documentKey") or {}).get("_id")
+            pair = change.get("fullDocument")
+            if operation == "delete" or pair is None:
+                await self.collection.delete_one({"_id": pair_id})
+                return
+            major_names = await self._major_names({pair.get("major_id"), pair.get("alter_major_id")} - {None})
+            await self.collection.replace_one({"_id": pair_id}, view_document(pair, major_names), upsert=True)
+        elif collection == "majors":
+            major_id = (change.get("documentKey") or {}).get("_id")
+            name = (change.get("fullDocument") or {}).get("major_name")
+            # A deleted major reads as the aggregation would show it: unknown / missing
+            await self.collection.bulk_write([
+                UpdateMany({"source_major_id": major_id}, {"$set": {"major_name": name or UNKNOWN_MAJOR}}),
+                UpdateMany({"source_alter_major_id": major_id}, {"$set": {"alter_major_name": name}}),
+            ], ordered=False)
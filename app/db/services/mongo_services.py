@@ -1,17 +1,31 @@
 from app.db.connection.mongo_connection import MongoDB
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from app.db.services.major_pair_view import MajorPairView
 from app.utils.logging_config import get_logger
 from bson.objectid import ObjectId
 
 logger = get_logger(__name__)
 
 class PrerequisiteService:
+    # college -> (prerequisite_versions version, catalog); a sync bumps the version
+    _catalogs: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
     def __init__(self):
         self.mongo_db = MongoDB("course_prerequisite")
         self.collection = self.mongo_db.get_collection("pcc_course_prerequisites")
+        self.versions = self.mongo_db.get_collection("prerequisite_versions")
 
+    async def get_version(self, college: str) -> Optional[int]:
+        """Version of a college's prerequisite data, or None if it was never synced."""
+        doc = await self.versions.find_one({"_id": college}, {"version": 1})
+        return doc.get("version") if doc else None
 
     async def get_all_prerequisites(self, college: str) -> Dict[str, Any]:
+        version = await self.get_version(college)
+        cached = self._catalogs.get(college)
+        if version is not None and cached and cached[0] == version:
+            return cached[1]
+
         cursor = self.collection.find({"college": college})
 
         res = {}
@@ -27,19 +41,28 @@ class PrerequisiteService:
                 "department": course["department"]
             }
 
+        # Unversioned data (seeded before prerequisite syncs) is always read fresh
+        if version is not None:
+            PrerequisiteService._catalogs[college] = (version, res)
         return res
 
 class CollegeUniMajorPairService:
     def __init__(self):
         self.mongo_db = MongoDB("main_db")
         self.collection = self.mongo_db.get_collection("college_uni_major_pair")
+        self.view = MajorPairView()
 
     async def get_majors_with_names(self, university_id: str, college_id: str):
-        """Get majors with names using aggregation pipeline"""
+        """Get majors with names from the materialized view, or the aggregation pipeline until it is built"""
         try:
             uni_object_id = ObjectId(university_id)
             college_object_id = ObjectId(college_id)
 
+            if await self.view.is_ready():
+                results = await self.view.get_rows(uni_object_id, college_object_id)
+                logger.info(f"Major pair view returned {len(results)} results")
+                return results
+
             pipeline = [
                 {
                     "$match": {
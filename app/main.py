@@ -1,5 +1,11 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request, Response
 from app.api.routes.transfer import create_transfer_router
+from app.db.connection.redis_connection import RedisConnection
+from app.services.cache_invalidation import InvalidationBus
+from app.utils.logging_config import get_logger
+from app.utils import metrics
+from RAG.config.settings import get_settings
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -9,22 +15,66 @@ def create_application() -> FastAPI:
         description="Transfer planning API with RAG capabilities",
         version="1.0.0"
     )
-    
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],  # Allow all origins
-        allow_credentials=False,  
+        allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"]
     )
-    
+
     # Health check endpoint for Azure
     @app.get("/health")
     async def health_check():
         return {"status": "healthy", "message": "Better Transfer API is running"}
-    
+
+    metrics.configure(get_settings().observability.metrics_enabled)
+    if metrics.is_enabled():
+        register_metrics(app)
+
     transfer_router = create_transfer_router()
     app.include_router(transfer_router)
+    register_invalidation_listener(app)
     return app
 
-app = create_application()
\ No newline at end of file
+
+def register_invalidation_listener(app: FastAPI):
+    """Clear this process's in-memory caches when data changes are published."""
+    bus = InvalidationBus(RedisConnection.get_client())
+
+    @app.on_event("startup")
+    async def start_invalidation_listener():
+        try:
+            bus.start_listener()
+        except Exception as e:
+            # In-memory caches still expire on their own TTLs
+            get_logger(__name__).warning(f"Cache invalidation listener unavailable: {e}")
+
+    @app.on_event("shutdown")
+    async def stop_invalidation_listener():
+        bus.stop_listener()
+
+
+def register_metrics(app: FastAPI):
+    """Request latency/trace middleware and the Prometheus scrape endpoint."""
+    @app.middleware("http")
+    async def track_request(request: Request, call_next):
+        token = metrics.start_trace()
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            spans = metrics.finish_trace(token)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, request.method, route, response.status_code)
+        if spans:
+            response.headers["Server-Timing"] = metrics.server_timing(spans)
+        return response
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+app = create_application()
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+from typing import List, Optional, Literal
+from app.utils.webhooks import check_webhook_url
+from RAG.config.settings import get_settings
 
 
 class TransferPlanRequest(BaseModel):
@@ -14,6 +16,22 @@ class FullRequest(BaseModel):
     number_of_terms: int = Field(default=4, description="Number of Semesters")
 
 
+class PlanJobRequest(FullRequest):
+    priority: Literal["high", "normal", "low"] = Field(default="normal", description="Queue priority")
+    webhook_url: Optional[str] = Field(default=None, description="https URL POSTed the finished job")
+
+    @field_validator("webhook_url")
+    @classmethod
+    def webhook_must_be_public_https(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return value
+        return check_webhook_url(value, get_settings().jobs.webhook_allowed_hosts)
+
+    def plan_request(self) -> FullRequest:
+        """The plain FullRequest, so cache keys match the synchronous endpoint."""
+        return FullRequest(request=self.request, number_of_terms=self.number_of_terms)
+
+
 class TargetInstitution(BaseModel):
     university: str = Field(..., description="University Name")
     major: str = Field(..., description="Major")
@@ -55,4 +73,10 @@ class FullTransferPlanModel(BaseModel):
 
 class ReOrderRequestModel(BaseModel):
     original_plan: FullTransferPlanModel
-    taken_classes: List[str] = Field(..., description="List of taken classes code")
\ No newline at end of file
+    taken_classes: List[str] = Field(..., description="List of taken classes code")
+
+
+class PlanUpdateRequestModel(BaseModel):
+    original_plan: FullTransferPlanModel
+    added_targets: List[TransferPlanRequest] = Field(default=[], description="University-major targets to add")
+    removed_targets: List[TargetInstitution] = Field(default=[], description="Targets to remove from the plan")
\ No newline at end of file
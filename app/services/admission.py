@@ -0,0 +1,193 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+from fastapi import HTTPException, Request
+from RAG.config.settings import get_settings
+from app.utils.metrics import record_rejection
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Request shed before reaching the LLM; surfaces as 429 with Retry-After."""
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Server busy ({reason}), retry in {math.ceil(retry_after)}s")
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        record_rejection(reason)
+
+    def to_http(self) -> HTTPException:
+        return HTTPException(status_code=429, detail=str(self), headers={"Retry-After": str(self.retry_after)})
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def try_acquire(self, amount: float = 1.0) -> Tuple[bool, float]:
+        """Take `amount` tokens if available; otherwise report seconds until they would be."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True, 0.0
+        return False, (amount - self.tokens) / self.rate
+
+
+class TenantRateLimiter:
+    """One token bucket per tenant (client IP), least recently seen evicted first."""
+    def __init__(self, requests_per_minute: float, burst: int, max_tenants: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.rate = requests_per_minute / 60
+        self.burst = burst
+        self.max_tenants = max_tenants
+        self.clock = clock
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def acquire(self, tenant: str) -> Tuple[bool, float]:
+        bucket = self.buckets.get(tenant)
+        if bucket is None:
+            bucket = self.buckets[tenant] = TokenBucket(self.rate, self.burst, self.clock)
+            if len(self.buckets) > self.max_tenants:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(tenant)
+        return bucket.try_acquire()
+
+
+class TokenBudget:
+    """Sliding one-minute window of LLM tokens (reserved estimates, corrected to actual usage)."""
+    def __init__(self, tokens_per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.tokens_per_minute = tokens_per_minute
+        self.clock = clock
+        self.events = deque()  # [timestamp, tokens]
+        self.used = 0
+
+    def _expire(self, now: float):
+        while self.events and self.events[0][0] <= now - 60:
+            self.used -= self.events.popleft()[1]
+
+    def wait_time(self, tokens: int) -> float:
+        if self.tokens_per_minute <= 0:
+            return 0.0
+        now = self.clock()
+        self._expire(now)
+        excess = self.used + tokens - self.tokens_per_minute
+        if excess <= 0:
+            return 0.0
+        # Walk the window until enough tokens have aged out
+        freed = 0
+        for timestamp, amount in self.events:
+            freed += amount
+            if freed >= excess:
+                return timestamp + 60 - now
+        return 60.0
+
+    def reserve(self, tokens: int) -> list:
+        entry = [self.clock(), tokens]
+        self.events.append(entry)
+        self.used += tokens
+        return entry
+
+    def adjust(self, entry: list, actual_tokens: int):
+        if entry in self.events:
+            self.used += actual_tokens - entry[1]
+        entry[1] = actual_tokens
+
+
+class LLMSlot:
+    def __init__(self, budget: TokenBudget, reservation: list):
+        self.budget = budget
+        self.reservation = reservation
+
+    def record(self, actual_tokens: Optional[int]):
+        """Replace the reserved estimate with the model-reported token count."""
+        if actual_tokens is not None:
+            self.budget.adjust(self.reservation, actual_tokens)
+
+
+class AdmissionController:
+    """
+    Gate for LLM calls: a global concurrency limit, a bounded wait queue (excess is
+    shed rather than piling up) and a tokens-per-minute budget.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self.semaphore = asyncio.Semaphore(settings.max_concurrent_llm)
+        self.budget = TokenBudget(settings.tokens_per_minute)
+        self.waiting = 0
+        self.active = 0
+
+    def estimate(self, prompt_tokens: int) -> int:
+        return prompt_tokens + self.settings.expected_completion_tokens
+
+    @asynccontextmanager
+    async def llm_slot(self, estimated_tokens: int):
+        if self.waiting >= self.settings.max_waiting:
+            raise AdmissionRejected("queue_full", self.settings.max_wait_seconds)
+
+        if self.semaphore.locked():
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self.settings.max_wait_seconds)
+            except asyncio.TimeoutError:
+                raise AdmissionRejected("concurrency", self.settings.max_wait_seconds)
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+
+        if self.budget.tokens_per_minute > 0:
+            estimated_tokens = min(estimated_tokens, self.budget.tokens_per_minute)
+
+        self.active += 1
+        try:
+            delay = self.budget.wait_time(estimated_tokens)
+            if delay > self.settings.max_wait_seconds:
+                raise AdmissionRejected("token_budget", delay)
+            if delay > 0:
+                logger.info(f"Token budget exhausted, delaying LLM call {delay:.1f}s")
+                await asyncio.sleep(delay)
+            yield LLMSlot(self.budget, self.budget.reserve(estimated_tokens))
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(get_settings().admission)
+
+
+@lru_cache
+def get_tenant_limiter() -> TenantRateLimiter:
+    settings = get_settings().admission
+    return TenantRateLimiter(settings.tenant_requests_per_minute, settings.tenant_burst)
+
+
+def tenant_key(request: Request) -> str:
+    """
+    Client IP. Unauthenticated headers such as x-api-key are not used: a client could send
+    a new value per request and get a fresh bucket each time. Behind a proxy, run uvicorn
+    with --proxy-headers (and --forwarded-allow-ips) so request.client is the real client.
+    """
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def enforce_tenant_limit(request: Request):
+    """FastAPI dependency for routes that may reach the LLM."""
+    limiter = get_tenant_limiter()
+    if limiter.rate <= 0:
+        return
+    allowed, retry_after = limiter.acquire(tenant_key(request))
+    if not allowed:
+        raise AdmissionRejected("tenant_rate", retry_after).to_http()
@@ -0,0 +1,302 @@
+from typing import Dict, Any, List, Optional, Set, Tuple
+from app.services.course_scheduler import CourseScheduler
+from RAG.services.articulation_parser import ArticulationParser
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AlgorithmicPlanner:
+    """
+    Build transfer plans without the LLM when articulation data fully covers the targets.
+
+    parse_targets and plan_from_requirements return None whenever coverage is incomplete
+    or the chains don't fit, so the caller can fall back to the RAG + LLM pipeline.
+    """
+    def __init__(self, scheduler: CourseScheduler = None):
+        self.parser = ArticulationParser()
+        self.scheduler = scheduler or CourseScheduler()
+
+    def parse_targets(
+        self,
+        target_combinations: List[Dict],
+        articulation_chunks: List[Dict],
+        prerequisite_data: Dict[str, Any],
+        structured_requirements: Dict[Tuple[str, str], List[Dict[str, Any]]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Requirements for every target, or None if any target is not fully covered."""
+        known = self.known_requirements(target_combinations, articulation_chunks, prerequisite_data, structured_requirements)
+        if len(known) != len(target_combinations):
+            return None
+        return known
+
+    def known_requirements(
+        self,
+        target_combinations: List[Dict],
+        articulation_chunks: List[Dict],
+        prerequisite_data: Dict[str, Any],
+        structured_requirements: Dict[Tuple[str, str], List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Requirements for the fully covered targets, taken from the structured articulation
+        index when available and parsed from the raw chunks otherwise.
+        """
+        catalog = set(prerequisite_data.keys())
+        structured_requirements = structured_requirements or {}
+        target_requirements = []
+
+        for target in target_combinations:
+            key = (target["university"], target["major"])
+            if key in structured_requirements:
+                target_requirements.append({
+                    "university": target["university"],
+                    "major": target["major"],
+                    "requirements": structured_requirements[key]
+                })
+                continue
+
+            chunks = [
+                chunk for chunk in articulation_chunks
+                if chunk.get("university_name") == target["university"]
+                and chunk.get("major_name") == target["major"]
+            ]
+            if not chunks:
+                logger.info(f"No articulation chunks for {target['university']} - {target['major']}")
+                continue
+
+            requirements = []
+            complete = True
+            for chunk in chunks:
+                parsed = self.parser.parse_chunk(chunk.get("content", ""), catalog)
+                complete = complete and parsed["complete"]
+                requirements.extend(parsed["requirements"])
+
+            if not complete:
+                logger.info(f"Incomplete articulation coverage for {target['university']} - {target['major']}")
+                continue
+
+            target_requirements.append({
+                "university": target["university"],
+                "major": target["major"],
+                "requirements": requirements
+            })
+
+        return target_requirements
+
+    def plan_from_requirements(
+        self,
+        college: str,
+        target_requirements: List[Dict[str, Any]],
+        prerequisite_data: Dict[str, Any],
+        number_of_terms: int
+    ) -> Optional[Dict[str, Any]]:
+        """Select courses for structured requirements and schedule them over number_of_terms."""
+        selected = {}  # code -> {"satisfies": {(university, major): [...]}, "alternatives": [...]}
+        self.select_courses(target_requirements, selected)
+
+        notes = {}
+        if not self.add_prerequisites(selected, prerequisite_data, notes):
+            return None
+
+        courses = [
+            self.build_course(code, info, prerequisite_data, set(selected), notes.get(code))
+            for code, info in selected.items()
+        ]
+
+        course_graph = self.scheduler.build_course_graph(courses, prerequisite_data)
+        if self.scheduler.max_chain_length(course_graph) > number_of_terms:
+            logger.info("Prerequisite chain longer than requested terms, falling back")
+            return None
+
+        plan = {
+            "targets": [{"university": t["university"], "major": t["major"]} for t in target_requirements],
+            "source_college": college,
+            "term_plan": [{"term": term, "courses": []} for term in range(1, number_of_terms + 1)],
+            "unscheduled_courses": []
+        }
+        self.scheduler.distribute_courses(plan, course_graph)
+
+        logger.info(f"Algorithmic plan built with {len(courses)} courses over {number_of_terms} terms")
+        return plan
+
+    def update_plan(
+        self,
+        plan: Dict[str, Any],
+        removed_targets: List[Tuple[str, str]],
+        added_requirements: List[Dict[str, Any]],
+        prerequisite_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Apply target additions/removals to an existing plan and reschedule it locally.
+
+        Returns None when the result can't fit in the plan's term count so the caller
+        can regenerate from scratch.
+        """
+        removed = set(removed_targets)
+        original_courses = {}
+        selected = {}
+        for term in plan["term_plan"]:
+            for course in term["courses"]:
+                original_courses[course["code"]] = course
+                satisfies = {}
+                for entry in course.get("satisfies") or []:
+                    target = (entry["university"], entry["major"])
+                    if target not in removed:
+                        satisfies[target] = list(entry["university_courses"])
+                selected[course["code"]] = {"satisfies": satisfies, "alternatives": list(course.get("alternatives") or [])}
+
+        self._drop_orphaned_courses(original_courses, selected, removed, prerequisite_data)
+        self.select_courses(added_requirements, selected)
+
+        notes = {}
+        if not self.add_prerequisites(selected, prerequisite_data, notes):
+            return None
+
+        plan_codes = set(selected)
+        courses = []
+        for code, info in selected.items():
+            if code in original_courses:
+                course = dict(original_courses[code])
+                course["satisfies"] = [
+                    {"university": university, "major": major, "university_courses": university_courses}
+                    for (university, major), university_courses in info["satisfies"].items()
+                ]
+                course["alternatives"] = info["alternatives"]
+                courses.append(course)
+            elif code in prerequisite_data:
+                courses.append(self.build_course(code, info, prerequisite_data, plan_codes, notes.get(code)))
+            else:
+                return None
+
+        number_of_terms = len(plan["term_plan"])
+        course_graph = self.scheduler.build_course_graph(courses, prerequisite_data)
+        if self.scheduler.max_chain_length(course_graph) > number_of_terms:
+            logger.info("Updated plan no longer fits the term count")
+            return None
+
+        targets = [target for target in plan["targets"] if (target["university"], target["major"]) not in removed]
+        known = {(target["university"], target["major"]) for target in targets}
+        for target in added_requirements:
+            if (target["university"], target["major"]) not in known:
+                targets.append({"university": target["university"], "major": target["major"]})
+
+        new_plan = {
+            "targets": targets,
+            "source_college": plan["source_college"],
+            "term_plan": [{"term": term["term"], "courses": []} for term in plan["term_plan"]],
+            "unscheduled_courses": [
+                course for course in plan.get("unscheduled_courses") or [] if course["code"] not in plan_codes
+            ]
+        }
+        self.scheduler.distribute_courses(new_plan, course_graph)
+
+        logger.info(f"Updated plan: {len(removed)} targets removed, {len(added_requirements)} added, {len(courses)} courses")
+        return new_plan
+
+    def _drop_orphaned_courses(self, original_courses, selected, removed, prerequisite_data):
+        """Remove courses that only served removed targets, plus prerequisites only they needed."""
+        dropped = {
+            code for code, course in original_courses.items()
+            if not selected[code]["satisfies"] and any(
+                (entry["university"], entry["major"]) in removed for entry in course.get("satisfies") or []
+            )
+        }
+
+        def prerequisites_of(code):
+            codes = set(original_courses.get(code, {}).get("prerequisites") or [])
+            for group in prerequisite_data.get(code, {}).get("prerequisites", []):
+                codes.update(group)
+            return codes
+
+        changed = bool(dropped)
+        while changed:
+            changed = False
+            needed_by_kept = set()
+            needed_by_dropped = set()
+            for code in selected:
+                (needed_by_dropped if code in dropped else needed_by_kept).update(prerequisites_of(code))
+
+            for code, info in selected.items():
+                if code in dropped or info["satisfies"]:
+                    continue
+                if code in needed_by_dropped and code not in needed_by_kept:
+                    dropped.add(code)
+                    changed = True
+
+        for code in dropped:
+            del selected[code]
+
+    def select_courses(self, target_requirements: List[Dict[str, Any]], selected: Dict[str, Any]):
+        """Pick one option per requirement, preferring courses already selected for other targets."""
+        pending = []
+        for target in target_requirements:
+            for requirement in target["requirements"]:
+                pending.append((target["university"], target["major"], requirement))
+
+        # Forced (single option) requirements first so OR choices can reuse them
+        pending.sort(key=lambda item: len(item[2]["options"]))
+
+        for university, major, requirement in pending:
+            option = min(
+                requirement["options"],
+                key=lambda group: (sum(1 for code in group if code not in selected), len(group))
+            )
+            alternatives = [code for group in requirement["options"] if group is not option for code in group]
+
+            for code in option:
+                info = selected.setdefault(code, {"satisfies": {}, "alternatives": []})
+                university_courses = info["satisfies"].setdefault((university, major), [])
+                for uni_course in requirement["university_courses"]:
+                    if uni_course not in university_courses:
+                        university_courses.append(uni_course)
+                for alt in alternatives:
+                    if alt not in info["alternatives"] and alt not in option:
+                        info["alternatives"].append(alt)
+
+    def add_prerequisites(self, selected: Dict[str, Any], prerequisite_data: Dict[str, Any], notes: Dict[str, str]) -> bool:
+        """Close the selection over prerequisite chains; False if a chain can't be resolved."""
+        queue = list(selected)
+        while queue:
+            code = queue.pop()
+            groups = [list(group) for group in prerequisite_data.get(code, {}).get("prerequisites", [])]
+            if not groups or any(all(p in selected for p in group) for group in groups):
+                continue
+
+            if prerequisite_data[code].get("assessment_allow"):
+                notes[code] = "Prerequisite may be satisfied by placement/assessment."
+                continue
+
+            candidates = [group for group in groups if all(p in prerequisite_data for p in group)]
+            if not candidates:
+                logger.info(f"Prerequisites for {code} are not in the catalog")
+                return False
+
+            group = min(candidates, key=lambda g: (sum(1 for p in g if p not in selected), len(g)))
+            for prereq in group:
+                if prereq not in selected:
+                    selected[prereq] = {"satisfies": {}, "alternatives": []}
+                    queue.append(prereq)
+        return True
+
+    def build_course(self, code: str, info: Dict[str, Any], prerequisite_data: Dict[str, Any], plan_codes: Set[str], note: str = None):
+        """Build a CourseModel-shaped dict from catalog data."""
+        catalog_entry = prerequisite_data[code]
+        prerequisites = []
+        for group in catalog_entry.get("prerequisites", []):
+            for prereq in group:
+                if prereq in plan_codes and prereq not in prerequisites:
+                    prerequisites.append(prereq)
+
+        return {
+            "code": code,
+            "name": catalog_entry.get("name", code),
+            "units": catalog_entry.get("units", 0.0),
+            "difficulty": catalog_entry.get("difficulty", 3),
+            "prerequisites": prerequisites,
+            "satisfies": [
+                {"university": university, "major": major, "university_courses": university_courses}
+                for (university, major), university_courses in info["satisfies"].items()
+            ],
+            "alternatives": info["alternatives"],
+            "note": note
+        }
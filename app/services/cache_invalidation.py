@@ -0,0 +1,194 @@
+"""
+Dependency-tagged cache entries and the invalidation bus.
+
+Each cached response is registered under the tags of the data it was built from
+(cache_tag:{tag} sets of cache keys). When data changes, the seed scripts or the
+change stream watcher publish the affected tags: tagged keys are deleted from Redis
+once, and the event is broadcast so every API process drops in-process caches
+(articulation indexes, the transfer matrix) for the same data.
+
+Tags:
+    college:{name} / university:{name} / major:{name}   plans built from that entity
+    articulation:{college}|{university}|{major}         plans using that articulation
+    college_id:{id} / university_id:{id}                major lists for that pair
+    kind:{cache prefix}                                 every key of a cache, e.g. kind:transfer_plan
+"""
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TAG_KEY = "cache_tag:{}"
+CHANNEL = "cache_invalidation"
+KIND_PREFIX = "kind:"
+
+# Tag templates shared by the major_list route and the cache warmer
+MAJOR_LIST_TAGS = ("college_id:{college_id}", "university_id:{university_id}")
+
+
+def plan_tags(target_combinations: List[Dict[str, Any]]) -> List[str]:
+    """Tags for a transfer plan built from these (college, university, major) name triples."""
+    tags = set()
+    for target in target_combinations:
+        college, university, major = target["college"], target["university"], target["major"]
+        tags.update((f"college:{college}", f"university:{university}", f"major:{major}"))
+        tags.add(f"articulation:{college}|{university}|{major}")
+    return sorted(tags)
+
+
+def tag_key(redis_client, cache_key: str, tags: Iterable[str], ttl: int):
+    """Register cache_key under each tag; tag sets expire with the entries they index."""
+    tags = list(tags)
+    if not tags:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for tag in tags:
+        pipe.sadd(TAG_KEY.format(tag), cache_key)
+        # Entries of one kind share a TTL, so the newest entry outlives the rest
+        pipe.expire(TAG_KEY.format(tag), ttl)
+    pipe.execute()
+
+
+def invalidate_tags(redis_client, tags: Iterable[str]) -> int:
+    """Delete every cache key registered under any of the tags. Returns keys deleted."""
+    deleted = 0
+    for tag in set(tags):
+        if tag.startswith(KIND_PREFIX):
+            deleted += _delete_prefix(redis_client, tag[len(KIND_PREFIX):])
+            continue
+        tag_set = TAG_KEY.format(tag)
+        keys = list(redis_client.smembers(tag_set))
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(key)
+        pipe.delete(tag_set)
+        deleted += sum(pipe.execute()[:-1])
+    return deleted
+
+
+def _delete_prefix(redis_client, prefix: str, batch_size: int = 500) -> int:
+    deleted = 0
+    batch = []
+    for key in redis_client.scan_iter(match=f"{prefix}*", count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            deleted += redis_client.delete(*batch)
+            batch = []
+    if batch:
+        deleted += redis_client.delete(*batch)
+    return deleted
+
+
+def change_to_tags(database: str, collection: str, change: Dict[str, Any]) -> List[str]:
+    """
+    Map a Mongo change stream event to cache tags. Deletes (and updates whose document
+    is gone) carry no names, so they fall back to evicting the whole affected cache.
+    """
+    doc = change.get("fullDocument") or {}
+    doc_id = str((change.get("documentKey") or {}).get("_id", ""))
+
+    if database == "main_db":
+        if collection == "colleges":
+            name = doc.get("college_name")
+            return ["kind:colleges_list", f"college_id:{doc_id}", f"college:{name}" if name else "kind:transfer_plan"]
+        if collection == "universities":
+            name = doc.get("university_name")
+            return ["kind:universities_list", f"university_id:{doc_id}", f"university:{name}" if name else "kind:transfer_plan"]
+        if collection == "majors":
+            name = doc.get("major_name")
+            # Major lists are keyed by college/university, so any of them may show this major
+            return ["kind:major_list", f"major:{name}" if name else "kind:transfer_plan"]
+        if collection == "college_uni_major_pair":
+            if doc.get("from_college_id") and doc.get("to_university_id"):
+                return [f"college_id:{doc['from_college_id']}", f"university_id:{doc['to_university_id']}"]
+            return ["kind:major_list"]
+
+    if database == "course_prerequisite":
+        return [f"college:{doc['college']}"] if doc.get("college") else ["kind:transfer_plan"]
+
+    if database == "vector_db" and collection in ("articulations", "knowledge_chunks"):
+        college, university, major = doc.get("college_name"), doc.get("university_name"), doc.get("major_name")
+        if college and university and major:
+            return [f"articulation:{college}|{university}|{major}"]
+        return [f"college:{college}"] if college else ["kind:transfer_plan"]
+
+    return []
+
+
+def _drop_articulation_indexes(tags: List[str]):
+    from RAG.db.articulation_store import ArticulationStore
+
+    if any(tag.startswith(KIND_PREFIX) for tag in tags):
+        ArticulationStore.invalidate()
+        return
+    for tag in tags:
+        if tag.startswith("college:"):
+            ArticulationStore.invalidate(tag[len("college:"):])
+        elif tag.startswith("articulation:"):
+            ArticulationStore.invalidate(tag[len("articulation:"):].split("|")[0])
+
+
+def _drop_transfer_matrix(tags: List[str]):
+    from app.services.transfer_matrix import TransferMatrixStore
+
+    # The matrix is built in one pass, so any major list change rebuilds all of it
+    if any(tag == "kind:major_list" or tag.startswith(("college_id:", "university_id:")) for tag in tags):
+        TransferMatrixStore.invalidate()
+
+
+# Applied in every process that runs a listener, for caches Redis doesn't hold
+LOCAL_HANDLERS: List[Callable[[List[str]], None]] = [_drop_articulation_indexes, _drop_transfer_matrix]
+
+
+class InvalidationBus:
+    """Evict tagged Redis entries once, then broadcast so each process clears its local caches."""
+    def __init__(self, redis_client, handlers: Optional[List[Callable[[List[str]], None]]] = None):
+        self.redis = redis_client
+        self.handlers = LOCAL_HANDLERS if handlers is None else handlers
+        self._listener = None
+
+    def publish(self, tags: Iterable[str], reason: str = "") -> int:
+        tags = sorted(set(tags))
+        if not tags:
+            return 0
+        deleted = invalidate_tags(self.redis, tags)
+        self.redis.publish(CHANNEL, json.dumps({"tags": tags, "reason": reason}))
+        logger.info(f"Invalidated {deleted} cache entries for {len(tags)} tags ({reason or 'unspecified'})")
+        return deleted
+
+    def handle_message(self, message: Dict[str, Any]):
+        try:
+            tags = json.loads(message["data"])["tags"]
+        except Exception as e:
+            logger.warning(f"Ignoring malformed invalidation message: {e}")
+            return
+        for handler in self.handlers:
+            try:
+                handler(tags)
+            except Exception as e:
+                logger.warning(f"Invalidation handler {getattr(handler, '__name__', handler)} failed: {e}")
+
+    def start_listener(self) -> threading.Thread:
+        """Subscribe in a daemon thread; redis-py delivers each message to handle_message."""
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{CHANNEL: self.handle_message})
+        self._listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        return self._listener
+
+    def stop_listener(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+def publish_invalidation(tags: Iterable[str], reason: str = "") -> int:
+    """Fire-and-forget entry point for scripts; a missing Redis must not fail a seed run."""
+    from app.db.connection.redis_connection import RedisConnection
+
+    try:
+        return InvalidationBus(RedisConnection.get_client()).publish(tags, reason)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed ({reason}): {e}")
+        return 0
@@ -0,0 +1,144 @@
+import asyncio
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+from app.schemas.transferPlanRequest import FullRequest
+from app.services.cache_invalidation import MAJOR_LIST_TAGS
+from app.utils.cache_wrapper import fresh_ttl, store_cached
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+POPULARITY_KEY = "popularity:{kind}:{day}"
+
+# Shared with the major_list route's cache_response expiration
+MAJOR_LIST_TTL = 3600
+
+
+class RequestStats:
+    """
+    Daily request counters per cache kind (sorted sets), summed over a trailing window.
+    With sample_rate N, one request in N is counted with weight N, so the ranking holds
+    while most requests skip the Redis write.
+    """
+    def __init__(self, redis_client, retention_days: int = 8, sample_rate: int = 1, rng: random.Random = random):
+        self.redis = redis_client
+        self.retention_days = retention_days
+        self.sample_rate = max(1, sample_rate)
+        self.rng = rng
+
+    def _key(self, kind: str, day: datetime) -> str:
+        return POPULARITY_KEY.format(kind=kind, day=day.strftime("%Y%m%d"))
+
+    def record(self, kind: str, member: str):
+        if self.sample_rate > 1 and self.rng.random() * self.sample_rate >= 1:
+            return
+        try:
+            key = self._key(kind, datetime.now())
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zincrby(key, self.sample_rate, member)
+            pipe.expire(key, self.retention_days * 86400)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not record request stats for {kind}: {e}")
+
+    def top(self, kind: str, n: int, days: int = 7) -> List[Tuple[str, float]]:
+        today = datetime.now()
+        keys = [self._key(kind, today - timedelta(days=offset)) for offset in range(days)]
+        # Sum the daily sets client-side; ZUNIONSTORE would need a scratch key
+        totals = {}
+        for key in keys:
+            for member, score in self.redis.zrevrange(key, 0, n * 4, withscores=True):
+                member = member.decode() if isinstance(member, bytes) else member
+                totals[member] = totals.get(member, 0) + score
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def should_refresh_early(ttl: float, recompute_seconds: float, beta: float = 1.0, rng: random.Random = random) -> bool:
+    """
+    Probabilistic early expiration (XFetch): refresh with a probability that rises
+    as the entry nears expiry, scaled by how long a recompute takes.
+    """
+    if ttl is None or ttl <= 0:
+        return True
+    return ttl <= -recompute_seconds * beta * math.log(max(rng.random(), 1e-12))
+
+
+def in_offpeak(hours: str, now: datetime = None) -> bool:
+    """`hours` is "start-end" in server-local hours, e.g. "2-6" or "22-4"."""
+    start, _, end = hours.partition("-")
+    start, end = int(start), int(end)
+    hour = (now or datetime.now()).hour
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class CacheWarmer:
+    """Pre-generate plans and major lists for the most requested combinations."""
+    def __init__(self, service, settings, rng: random.Random = None):
+        self.service = service
+        self.redis = service.redis_client
+        self.settings = settings
+        self.stats = RequestStats(self.redis)
+        self.rng = rng or random.Random()
+        self.recompute_seconds = settings.plan_recompute_seconds
+
+    def _needs_refresh(self, key: str, recompute_seconds: float, offpeak: bool) -> bool:
+        # Judge by the soft expiry; past it, requests are already being served stale
+        ttl = fresh_ttl(self.redis, key)
+        if ttl is None or ttl <= 0:
+            return ttl != -1  # -1: legacy value without expiry
+        if offpeak and ttl < self.settings.offpeak_horizon_seconds:
+            return True
+        # Account for the gap until the next warming pass
+        return should_refresh_early(ttl - self.settings.interval_seconds, recompute_seconds, self.settings.beta, self.rng)
+
+    async def warm_plans(self, offpeak: bool) -> int:
+        popular = self.stats.top("transfer_plan", self.settings.top_n, self.settings.stats_days)
+        semaphore = asyncio.Semaphore(self.settings.max_concurrent)
+        refreshed = 0
+
+        async def warm(member: str):
+            nonlocal refreshed
+            full_request = FullRequest.model_validate_json(member)
+            if not self._needs_refresh(self.service.plan_cache_key(full_request), self.recompute_seconds, offpeak):
+                return
+            async with semaphore:
+                start = time.perf_counter()
+                result = await self.service.create_RAG_transfer_plan_v2(full_request, use_cache=False)
+                elapsed = time.perf_counter() - start
+                # Moving average of recompute cost feeds the early-expiration odds
+                self.recompute_seconds = 0.8 * self.recompute_seconds + 0.2 * elapsed
+                if isinstance(result, dict) and "error" not in result:
+                    refreshed += 1
+
+        results = await asyncio.gather(*(warm(member) for member, _ in popular), return_exceptions=True)
+        for error in (r for r in results if isinstance(r, Exception)):
+            logger.warning(f"Plan warming failed: {error}")
+        return refreshed
+
+    async def warm_major_lists(self, offpeak: bool) -> int:
+        refreshed = 0
+        for key, _ in self.stats.top("major_list", self.settings.top_n, self.settings.stats_days):
+            # Major lists are cheap to rebuild, so a nominal recompute time is enough
+            if not self._needs_refresh(key, 1.0, offpeak):
+                continue
+            _, university_id, college_id = key.split(":")
+            result = await self.service.get_major_list(university_id, college_id)
+            if isinstance(result, dict) and "error" in result:
+                continue
+            tags = [tag.format(university_id=university_id, college_id=college_id) for tag in MAJOR_LIST_TAGS]
+            store_cached(self.redis, key, result, MAJOR_LIST_TTL, tags=tags)
+            refreshed += 1
+        return refreshed
+
+    async def run_once(self, offpeak: bool = None) -> dict:
+        if offpeak is None:
+            offpeak = in_offpeak(self.settings.offpeak_hours)
+        majors = await self.warm_major_lists(offpeak)
+        plans = await self.warm_plans(offpeak)
+        logger.info(f"Cache warming ({'off-peak' if offpeak else 'early expiry'}): {plans} plans, {majors} major lists refreshed")
+        return {"offpeak": offpeak, "plans": plans, "major_lists": majors}
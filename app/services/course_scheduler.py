@@ -0,0 +1,174 @@
+from typing import Dict, Any, List
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CourseScheduler:
+    """Prerequisite-aware course scheduler shared by the reorder and algorithmic planners."""
+
+    def build_course_graph(self, courses: List[Dict[str, Any]], prerequisite_data: Dict[str, Any]):
+        """Build a graph of courses with dependencies for scheduling."""
+        course_graph = {}
+        plan_codes = {course["code"] for course in courses}
+
+        # Initialize the graph
+        for course in courses:
+            code = course["code"]
+            course_graph[code] = {
+                "data": course,
+                "prerequisites": [],
+                "difficulty": course.get("difficulty", 3),
+                "department": self.get_department(code),
+                "earliest_term": 1
+            }
+
+            # Add prerequisite information
+            if code in prerequisite_data:
+                # Flatten the prerequisite groups
+                prereqs = []
+                for group in prerequisite_data[code]["prerequisites"]:
+                    for prereq in group:
+                        # Only add prerequisites that are still in our course list
+                        if prereq in plan_codes and prereq != code and prereq not in prereqs:
+                            prereqs.append(prereq)
+                course_graph[code]["prerequisites"] = prereqs
+
+        # Calculate earliest possible term for each course
+        for code in course_graph:
+            self._calculate_earliest_term(code, course_graph, set())
+
+        return course_graph
+
+    def _calculate_earliest_term(self, code, graph, visited):
+        """Recursively determine the earliest term a course can be placed in."""
+        if code in visited:
+            return  # Prevent cycles
+
+        visited.add(code)
+
+        if not graph[code]["prerequisites"]:
+            graph[code]["earliest_term"] = 1
+            return
+
+        max_term = 0
+        for prereq in graph[code]["prerequisites"]:
+            if prereq in graph:
+                self._calculate_earliest_term(prereq, graph, visited)
+                max_term = max(max_term, graph[prereq]["earliest_term"])
+
+        graph[code]["earliest_term"] = max_term + 1
+
+    def get_department(self, course_code: str) -> str:
+        """Extract department code from course code."""
+        return course_code.split(" ")[0]
+
+    def max_chain_length(self, course_graph) -> int:
+        """Length of the longest prerequisite chain, i.e. the minimum number of terms needed."""
+        return max((course["earliest_term"] for course in course_graph.values()), default=0)
+
+    def distribute_courses(self, plan, course_graph):
+        """
+        Distribute courses across terms respecting prerequisites and balancing.
+
+        Balancing never moves a course so late that the courses depending on it run out
+        of terms. A course whose prerequisites still leave no later term is listed in
+        unscheduled_courses rather than placed alongside its prerequisite.
+        """
+        # Sort courses by earliest possible term, then by prerequisite chain length
+        dependents = self._get_dependents(course_graph)
+        chain_depths = self._get_chain_depths(course_graph, dependents)
+        sorted_courses = sorted(
+            course_graph.keys(),
+            key=lambda x: (course_graph[x]["earliest_term"], -len(dependents[x]))
+        )
+
+        # Initialize term stats
+        num_terms = len(plan["term_plan"])
+        term_difficulties = [0] * num_terms
+        term_departments = [{} for _ in range(num_terms)]
+        placed_terms = {}
+        unscheduled = set()
+
+        # Place each course in the best term
+        for code in sorted_courses:
+            course = course_graph[code]
+            earliest = course["earliest_term"] - 1  # Convert to 0-indexed
+
+            # A prerequisite may have been pushed later for balancing, so never go before it
+            for prereq in course["prerequisites"]:
+                if prereq in placed_terms:
+                    earliest = max(earliest, placed_terms[prereq] + 1)
+
+            blocked = next((prereq for prereq in course["prerequisites"] if prereq in unscheduled), None)
+            if blocked or earliest >= num_terms:
+                unscheduled.add(code)
+                if plan.get("unscheduled_courses") is None:
+                    plan["unscheduled_courses"] = []
+                plan["unscheduled_courses"].append({
+                    "code": code,
+                    "reason": f"Prerequisite {blocked} could not be scheduled" if blocked
+                    else f"Prerequisites leave no term for it within {num_terms} terms"
+                })
+                continue
+
+            # Leave a term for every course in the chain that depends on this one
+            latest = max(earliest, num_terms - chain_depths[code])
+
+            # Find the best term based on balancing criteria
+            best_term = earliest
+            best_score = float('inf')
+
+            for term_idx in range(earliest, latest + 1):
+                # Calculate balance score (lower is better)
+                difficulty_score = term_difficulties[term_idx]
+
+                # Diversity penalty - discourage too many courses from same department
+                dept = course["department"]
+                dept_count = term_departments[term_idx].get(dept, 0)
+                diversity_penalty = dept_count * 2
+
+                # Total score
+                score = difficulty_score + diversity_penalty
+
+                # Prefer earlier terms when scores are equal
+                if score < best_score:
+                    best_score = score
+                    best_term = term_idx
+
+            # Add course to chosen term
+            plan["term_plan"][best_term]["courses"].append(course["data"])
+            placed_terms[code] = best_term
+
+            # Update term stats
+            term_difficulties[best_term] += course["difficulty"]
+            if course["department"] not in term_departments[best_term]:
+                term_departments[best_term][course["department"]] = 0
+            term_departments[best_term][course["department"]] += 1
+
+    def _get_dependents(self, graph) -> Dict[str, List[str]]:
+        """Direct dependents of every course, in a single pass."""
+        dependents = {code: [] for code in graph}
+        for code, course in graph.items():
+            for prereq in course["prerequisites"]:
+                if prereq in dependents:
+                    dependents[prereq].append(code)
+        return dependents
+
+    def _get_chain_depths(self, graph, dependents) -> Dict[str, int]:
+        """Length of the longest dependent chain starting at each course, the course included."""
+        depths = {}
+
+        def depth(code, visiting):
+            if code in depths:
+                return depths[code]
+            if code in visiting:
+                return 0  # Prevent cycles
+            visiting.add(code)
+            depths[code] = 1 + max((depth(dependent, visiting) for dependent in dependents[code]), default=0)
+            visiting.discard(code)
+            return depths[code]
+
+        for code in graph:
+            depth(code, set())
+        return depths
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import time
+import uuid
+from typing import Dict, Any, Callable, Optional
+from app.schemas.transferPlanRequest import FullRequest
+from app.utils.cache_codec import get_codec
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+QUEUE_KEY = "plan_jobs:queue"
+RUNNING_KEY = "plan_jobs:running"
+WEBHOOK_QUEUE_KEY = "plan_jobs:webhooks"
+JOB_KEY = "plan_job:{}"
+FINGERPRINT_KEY = "plan_job_fingerprint:{}"
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class DuplicateJobError(Exception):
+    """Raised when an identical job is already live with a different webhook; poll that job instead."""
+    def __init__(self, job_id: str):
+        super().__init__(f"An identical plan job ({job_id}) is already queued or running with another webhook_url")
+        self.job_id = job_id
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity; callers should retry later."""
+    def __init__(self, retry_after: int):
+        super().__init__(f"Plan queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def request_fingerprint(full_request: FullRequest) -> str:
+    serialized = json.dumps(full_request.model_dump(), sort_keys=True)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class PlanJobQueue:
+    """
+    Redis-backed queue of plan generation jobs.
+        plan_jobs:queue         ZSET job_id -> priority band + enqueue time (lowest first)
+        plan_jobs:running       ZSET job_id -> claim time, for requeueing dead workers' jobs
+        plan_jobs:webhooks      LIST job_ids finished at submit (cache hits) whose webhook is still owed
+        plan_job:<id>           JSON job record
+        plan_job_fingerprint:<sha256>  job_id of the queued/running job for an identical request
+
+    Finished jobs release their fingerprint. An identical submit after that goes
+    through the tagged plan cache, so it never returns a result that has since
+    been invalidated.
+    """
+    def __init__(self, redis_client, settings, cache_key: Optional[Callable[[FullRequest], str]] = None):
+        self.redis = redis_client
+        self.settings = settings
+        self.cache_key = cache_key  # plan cache key of the synchronous endpoint
+
+    def submit(self, full_request: FullRequest, priority: str = "normal", webhook_url: Optional[str] = None) -> Dict[str, Any]:
+        fingerprint = request_fingerprint(full_request)
+        fingerprint_key = FINGERPRINT_KEY.format(fingerprint)
+
+        # Identical request already queued or running: hand back that job
+        existing = self._live_job(fingerprint_key)
+        if existing:
+            return self._deduplicated(existing, webhook_url)
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "priority": priority,
+            "fingerprint": fingerprint,
+            "request": full_request.model_dump(),
+            "webhook_url": webhook_url,
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "updated_at": time.time(),
+        }
+
+        # Already computed by the synchronous endpoint or an earlier job
+        cached = self.redis.get(self.cache_key(full_request)) if self.cache_key else None
+        if cached:
+            job.update(status="done", result=get_codec().decode(cached))
+            self._save(job)
+            if webhook_url:
+                # No worker ran this job, so hand the delivery to one
+                self.redis.rpush(WEBHOOK_QUEUE_KEY, job["job_id"])
+            return job
+
+        if self.redis.zcard(QUEUE_KEY) >= self.settings.max_queue_depth:
+            raise QueueFullError(self.settings.retry_after)
+
+        if not self.redis.set(fingerprint_key, job["job_id"], nx=True, ex=self.settings.result_ttl):
+            # Lost a race with an identical submit
+            existing = self._live_job(fingerprint_key)
+            if existing:
+                return self._deduplicated(existing, webhook_url)
+            self.redis.set(fingerprint_key, job["job_id"], ex=self.settings.result_ttl)
+
+        self._save(job)
+        self.redis.zadd(QUEUE_KEY, {job["job_id"]: self._score(priority, job["created_at"])})
+        logger.info(f"Queued plan job {job['job_id']} ({priority})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis.get(JOB_KEY.format(job_id))
+        return json.loads(raw) if raw else None
+
+    def queue_depth(self) -> int:
+        return self.redis.zcard(QUEUE_KEY)
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Pop the highest-priority job and mark it running; None when the queue is empty."""
+        popped = self.redis.zpopmin(QUEUE_KEY, 1)
+        if not popped:
+            return None
+        job_id = popped[0][0]
+        job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+        job = self.get(job_id)
+        if not job:
+            return None
+        job.update(status="running", updated_at=time.time())
+        self._save(job)
+        self.redis.zadd(RUNNING_KEY, {job_id: time.time()})
+        return job
+
+    def claim_webhook(self) -> Optional[Dict[str, Any]]:
+        """Pop a finished job whose webhook still has to be called; None when there is none."""
+        job_id = self.redis.lpop(WEBHOOK_QUEUE_KEY)
+        if not job_id:
+            return None
+        return self.get(job_id.decode() if isinstance(job_id, bytes) else job_id)
+
+    def complete(self, job: Dict[str, Any], result: Dict[str, Any]):
+        job.update(status="done", result=result, updated_at=time.time())
+        self._save(job)
+        self.redis.zrem(RUNNING_KEY, job["job_id"])
+        # Later identical submits are answered from the plan cache, which invalidation keeps current
+        self._release_fingerprint(job)
+
+    def fail(self, job: Dict[str, Any], error: str):
+        job.update(status="failed", error=error, updated_at=time.time())
+        self._save(job)
+        self.redis.zrem(RUNNING_KEY, job["job_id"])
+        # Let the next identical submit start a fresh job
+        self._release_fingerprint(job)
+
+    def requeue(self, job: Dict[str, Any]):
+        """Return a claimed job to the queue, e.g. when the LLM path is shedding load."""
+        job.update(status="queued", updated_at=time.time())
+        self._save(job)
+        self.redis.zrem(RUNNING_KEY, job["job_id"])
+        self.redis.zadd(QUEUE_KEY, {job["job_id"]: self._score(job["priority"], job["created_at"])})
+
+    def requeue_stale(self) -> int:
+        """Put back jobs claimed longer than the visibility timeout ago (worker crashed)."""
+        cutoff = time.time() - self.settings.visibility_timeout
+        requeued = 0
+        for job_id in self.redis.zrangebyscore(RUNNING_KEY, 0, cutoff):
+            job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+            self.redis.zrem(RUNNING_KEY, job_id)
+            job = self.get(job_id)
+            if not job or job["status"] != "running":
+                continue
+            self.requeue(job)
+            requeued += 1
+        if requeued:
+            logger.warning(f"Requeued {requeued} stale plan jobs")
+        return requeued
+
+    def _live_job(self, fingerprint_key: str) -> Optional[Dict[str, Any]]:
+        job_id = self.redis.get(fingerprint_key)
+        if not job_id:
+            return None
+        job = self.get(job_id.decode() if isinstance(job_id, bytes) else job_id)
+        return job if job and job["status"] in ("queued", "running") else None
+
+    def _deduplicated(self, existing: Dict[str, Any], webhook_url: Optional[str]) -> Dict[str, Any]:
+        # A job delivers to one webhook; silently dropping the second caller's would lose it
+        if webhook_url and webhook_url != existing.get("webhook_url"):
+            raise DuplicateJobError(existing["job_id"])
+        logger.info(f"Deduplicated plan job {existing['job_id']}")
+        return existing
+
+    def _release_fingerprint(self, job: Dict[str, Any]):
+        """Delete the fingerprint only if it still points at this job."""
+        fingerprint_key = FINGERPRINT_KEY.format(job["fingerprint"])
+        owner = self.redis.get(fingerprint_key)
+        if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == job["job_id"]:
+            self.redis.delete(fingerprint_key)
+
+    def _save(self, job: Dict[str, Any]):
+        self.redis.set(JOB_KEY.format(job["job_id"]), json.dumps(job), ex=self.settings.result_ttl)
+
+    def _score(self, priority: str, created_at: float) -> float:
+        # Priority band dominates; FIFO inside a band
+        return PRIORITIES.get(priority, 1) * 1e10 + created_at
@@ -0,0 +1,135 @@
+from typing import Dict, Any, List, Optional
+from app.services.algorithmic_planner import AlgorithmicPlanner
+from app.services.course_scheduler import CourseScheduler
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Violation types that need courses added/removed rather than just rescheduling
+STRUCTURAL_VIOLATIONS = {"missing_articulation", "unknown_course", "duplicate_course"}
+
+
+class PlanValidator:
+    """Check generated plans against the prerequisite DAG and articulation requirements."""
+    def __init__(self, scheduler: CourseScheduler = None, max_repairs: int = 5):
+        self.scheduler = scheduler or CourseScheduler()
+        self.planner = AlgorithmicPlanner(self.scheduler)
+        self.max_repairs = max_repairs
+
+    def validate(
+        self,
+        plan: Dict[str, Any],
+        prerequisite_data: Dict[str, Any],
+        target_requirements: List[Dict[str, Any]],
+        number_of_terms: int
+    ) -> Dict[str, Any]:
+        """
+        Score a plan. Returns {"valid", "score", "violations"} where each violation is
+        {"type", "course", "detail"}.
+        """
+        if not isinstance(plan, dict) or not isinstance(plan.get("term_plan"), list):
+            return {"valid": False, "score": 0.0, "violations": [{"type": "malformed", "course": None, "detail": "Missing term_plan"}]}
+
+        violations = []
+        term_plan = plan["term_plan"]
+        if len(term_plan) != number_of_terms:
+            violations.append({"type": "term_count", "course": None, "detail": f"{len(term_plan)} terms instead of {number_of_terms}"})
+
+        placed = {}
+        for term_idx, term in enumerate(term_plan):
+            for course in term.get("courses") or []:
+                code = course.get("code")
+                if code in placed:
+                    violations.append({"type": "duplicate_course", "course": code, "detail": "Scheduled more than once"})
+                    continue
+                placed[code] = term_idx
+                if code not in prerequisite_data:
+                    violations.append({"type": "unknown_course", "course": code, "detail": "Not in college catalog"})
+
+        for code, term_idx in placed.items():
+            groups = prerequisite_data.get(code, {}).get("prerequisites") or []
+            # A group is met when every course in it that is part of the plan comes earlier
+            if groups and not any(all(placed.get(p, -1) < term_idx for p in group) for group in groups):
+                violations.append({"type": "prerequisite_order", "course": code, "detail": "Prerequisite not scheduled in an earlier term"})
+
+        for target in target_requirements:
+            for requirement in target["requirements"]:
+                if not any(all(code in placed for code in option) for option in requirement["options"]):
+                    violations.append({
+                        "type": "missing_articulation",
+                        "course": requirement["options"][0][0] if requirement["options"] and requirement["options"][0] else None,
+                        "detail": f"{target['university']} - {target['major']}: {', '.join(requirement['university_courses'])}"
+                    })
+
+        score = max(0.0, 1.0 - len(violations) / max(len(placed), 1))
+        return {"valid": not violations, "score": round(score, 3), "violations": violations}
+
+    def repair(
+        self,
+        plan: Dict[str, Any],
+        report: Dict[str, Any],
+        prerequisite_data: Dict[str, Any],
+        target_requirements: List[Dict[str, Any]],
+        number_of_terms: int
+    ) -> Optional[Dict[str, Any]]:
+        """Fix small violations by editing the course set and rescheduling; None if the result still fails validation."""
+        structural = [v for v in report["violations"] if v["type"] in STRUCTURAL_VIOLATIONS]
+        if any(v["type"] == "malformed" for v in report["violations"]) or len(structural) > self.max_repairs:
+            return None
+
+        selected = {}
+        original_courses = {}
+        unscheduled = list(plan.get("unscheduled_courses") or [])
+        for term in plan["term_plan"]:
+            for course in term.get("courses") or []:
+                code = course.get("code")
+                if code in original_courses:
+                    continue
+                if code not in prerequisite_data:
+                    unscheduled.append({"code": code, "reason": "Not offered in the college catalog"})
+                    continue
+                original_courses[code] = course
+                selected[code] = {"satisfies": {}, "alternatives": list(course.get("alternatives") or [])}
+
+        # Add the cheapest option for every articulation requirement the plan missed
+        missing = []
+        for target in target_requirements:
+            unmet = [
+                requirement for requirement in target["requirements"]
+                if not any(all(code in selected for code in option) for option in requirement["options"])
+            ]
+            if unmet:
+                missing.append({"university": target["university"], "major": target["major"], "requirements": unmet})
+        self.planner.select_courses(missing, selected)
+
+        notes = {}
+        if not self.planner.add_prerequisites(selected, prerequisite_data, notes):
+            return None
+
+        plan_codes = set(selected)
+        courses = []
+        for code, info in selected.items():
+            if code in original_courses:
+                courses.append(original_courses[code])
+            else:
+                courses.append(self.planner.build_course(code, info, prerequisite_data, plan_codes, notes.get(code)))
+
+        course_graph = self.scheduler.build_course_graph(courses, prerequisite_data)
+        if self.scheduler.max_chain_length(course_graph) > number_of_terms:
+            return None
+
+        repaired = {
+            "targets": plan.get("targets", []),
+            "source_college": plan.get("source_college"),
+            "term_plan": [{"term": term, "courses": []} for term in range(1, number_of_terms + 1)],
+            "unscheduled_courses": unscheduled
+        }
+        self.scheduler.distribute_courses(repaired, course_graph)
+
+        remaining = self.validate(repaired, prerequisite_data, target_requirements, number_of_terms)["violations"]
+        if remaining:
+            logger.warning(f"Repaired plan still has {len(remaining)} violations")
+            return None
+
+        logger.info(f"Repaired plan locally ({len(report['violations'])} violations)")
+        return repaired
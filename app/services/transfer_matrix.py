@@ -0,0 +1,153 @@
+"""
+Precomputed college -> university -> majors transfer matrix.
+
+The transfer page used to call /v1/majorlist once per university. The matrix is
+built in one pass over the active college_uni_major_pair rows plus one read of
+majors. It is kept in each API process and served per college as one prebuilt
+JSON body with a content-hash ETag.
+
+Storage is compact: each major id and name is held once in a shared table, and a
+(college, university) cell is an array of [major, alternate] index pairs (-1 for
+no alternate), already sorted by major name.
+
+Each per-college body looks like this, with rows as [major_id, alter_major_id or null]:
+    {"college_id": ..., "majors": {major_id: major_name}, "universities": {university_id: [[...], ...]}}
+
+The matrix is rebuilt lazily once it is older than ttl seconds. It is also rebuilt
+after an invalidation for major list data (see cache_invalidation).
+"""
+import asyncio
+import json
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from app.db.connection.mongo_connection import MongoDB
+from app.db.services.major_pair_view import PAIR_COLLECTION, UNKNOWN_MAJOR
+from app.utils.http_cache import body_etag
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+NO_MAJOR = -1
+
+
+class TransferMatrix:
+    """Interned major table plus per-(college, university) arrays of major index pairs."""
+    def __init__(self):
+        self.major_ids: List[str] = []
+        self.major_names: List[str] = []
+        self.colleges: Dict[str, Dict[str, array]] = {}
+        self.pairs = 0
+        self._major_index: Dict[Any, int] = {}
+        self._bodies: Dict[str, Tuple[bytes, str]] = {}
+
+    def _intern(self, major_id, major_names: Dict[Any, str], default_name: Optional[str]) -> int:
+        if major_id is None:
+            return NO_MAJOR
+        idx = self._major_index.get(major_id)
+        if idx is None:
+            idx = self._major_index[major_id] = len(self.major_ids)
+            self.major_ids.append(str(major_id))
+            self.major_names.append(major_names.get(major_id, default_name))
+        return idx
+
+    @classmethod
+    def build(cls, pairs, major_names: Dict[Any, str]) -> "TransferMatrix":
+        """Single pass over pair documents (from_college_id, to_university_id, major_id, alter_major_id)."""
+        matrix = cls()
+        cells: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        for pair in pairs:
+            major = matrix._intern(pair.get("major_id"), major_names, UNKNOWN_MAJOR)
+            alter = matrix._intern(pair.get("alter_major_id"), major_names, None)
+            cells.setdefault((str(pair.get("from_college_id")), str(pair.get("to_university_id"))), []).append((major, alter))
+            matrix.pairs += 1
+
+        # Same order as the major list endpoint
+        sort_key = lambda row: matrix.major_names[row[0]] or ""
+        for (college_id, university_id), rows in cells.items():
+            rows.sort(key=sort_key)
+            matrix.colleges.setdefault(college_id, {})[university_id] = array("i", (idx for row in rows for idx in row))
+        return matrix
+
+    def college_payload(self, college_id: str) -> Dict[str, Any]:
+        majors: Dict[str, str] = {}
+        universities: Dict[str, List[List[Optional[str]]]] = {}
+        for university_id, cell in sorted(self.colleges.get(college_id, {}).items()):
+            rows = []
+            for major, alter in zip(cell[::2], cell[1::2]):
+                majors[self.major_ids[major]] = self.major_names[major]
+                if alter != NO_MAJOR:
+                    majors[self.major_ids[alter]] = self.major_names[alter]
+                rows.append([self.major_ids[major], self.major_ids[alter] if alter != NO_MAJOR else None])
+            universities[university_id] = rows
+        return {"college_id": college_id, "majors": majors, "universities": universities}
+
+    def college_body(self, college_id: str) -> Tuple[bytes, str]:
+        """(JSON body, ETag) for one college, serialized once per build."""
+        cached = self._bodies.get(college_id)
+        if cached is None:
+            body = json.dumps(self.college_payload(college_id), separators=(",", ":"), sort_keys=True).encode()
+            cached = (body, body_etag(body))
+            # Only known colleges are kept, so arbitrary ids can't grow the cache
+            if college_id in self.colleges:
+                self._bodies[college_id] = cached
+        return cached
+
+
+class TransferMatrixStore:
+    """Process-wide matrix; concurrent requests after it goes stale share one rebuild."""
+    _matrix: Optional[TransferMatrix] = None
+    _built_at: Optional[float] = None  # None once invalidated
+    _building: Optional[asyncio.Task] = None
+    _generation = 0
+
+    def __init__(self, ttl: int = 3600):
+        self.mongo_db = MongoDB("main_db")
+        self.pairs = self.mongo_db.get_collection(PAIR_COLLECTION)
+        self.majors = self.mongo_db.get_collection("majors")
+        self.ttl = ttl
+
+    async def build(self) -> TransferMatrix:
+        started = time.perf_counter()
+        major_names = {doc["_id"]: doc.get("major_name") async for doc in self.majors.find({}, {"major_name": 1})}
+        cursor = self.pairs.find(
+            {"is_active": True},
+            {"_id": 0, "from_college_id": 1, "to_university_id": 1, "major_id": 1, "alter_major_id": 1}
+        )
+        matrix = TransferMatrix.build([pair async for pair in cursor], major_names)
+        logger.info(f"Built transfer matrix: {matrix.pairs} pairs, {len(matrix.colleges)} colleges, "
+                    f"{len(matrix.major_ids)} majors in {time.perf_counter() - started:.2f}s")
+        return matrix
+
+    async def _rebuild(self) -> TransferMatrix:
+        cls = TransferMatrixStore
+        generation = cls._generation
+        try:
+            matrix = await self.build()
+            # Invalidated while building: serve it, but rebuild on the next request
+            cls._matrix, cls._built_at = matrix, time.monotonic() if generation == cls._generation else None
+            return matrix
+        finally:
+            TransferMatrixStore._building = None
+
+    async def get_matrix(self) -> TransferMatrix:
+        cls = TransferMatrixStore
+        if cls._built_at is not None and time.monotonic() - cls._built_at < self.ttl:
+            return cls._matrix
+        if cls._building is None:
+            cls._building = asyncio.create_task(self._rebuild())
+        return await asyncio.shield(cls._building)
+
+    async def get_college(self, college_id: str) -> Tuple[bytes, str]:
+        """(JSON body, ETag) of the matrix row for one college; unknown colleges have no universities."""
+        return (await self.get_matrix()).college_body(college_id)
+
+    @classmethod
+    def invalidate(cls):
+        """Make the next request rebuild the matrix."""
+        cls._built_at = None
+        cls._generation += 1
+
+    @classmethod
+    def reset(cls):
+        cls._matrix, cls._built_at, cls._building, cls._generation = None, None, None, 0
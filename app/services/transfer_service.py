@@ -1,14 +1,23 @@
 
 from app.db.queries.institution_queries import db_get_basic_info
-from app.schemas.transferPlanRequest import FullRequest, ReOrderRequestModel
+from app.schemas.transferPlanRequest import FullRequest, ReOrderRequestModel, PlanUpdateRequestModel
 from RAG.db.vector_store import VectorStore
+from RAG.db.articulation_store import ArticulationStore
 from RAG.services.synthesizer import Synthesizer
+from RAG.config.settings import get_settings
+from app.services.course_scheduler import CourseScheduler
+from app.services.algorithmic_planner import AlgorithmicPlanner
+from app.services.plan_validator import PlanValidator
+from app.services.admission import AdmissionRejected
+from app.services.cache_warming import RequestStats
+from app.services.cache_invalidation import plan_tags, tag_key
 from app.utils.logging_config import get_logger
+from app.utils.metrics import span, record_cache
+from app.utils.cache_codec import get_codec
 import traceback
 import json
-import redis
-import os
 from dotenv import load_dotenv
+from app.db.connection.redis_connection import RedisConnection
 from app.db.services.mongo_services import PrerequisiteService, CollegeUniMajorPairService, InstitutionService
 load_dotenv()
 logger = get_logger(__name__)
@@ -16,32 +25,39 @@ logger = get_logger(__name__)
 class TransferPlanService:
     """Service for generating transfer plans."""
     def __init__(self):
+        settings = get_settings()
         self.vector_store = VectorStore()
+        self.articulation_store = ArticulationStore()
         self.synthesizer = Synthesizer()
         self.prerequisite_service = PrerequisiteService()
         self.major_pair_sevice = CollegeUniMajorPairService()
         self.institution_service = InstitutionService()
-        self.redis_client = redis.Redis(
-            host=os.getenv("REDIS_HOST"),
-            port=int(os.getenv("REDIS_PORT")),
-            username=os.getenv("REDIS_USERNAME"),
-            password=os.getenv("REDIS_PASSWORD"),
-            decode_responses=False  # Keep binary for efficient storage
-        )
+        self.scheduler = CourseScheduler()
+        self.algorithmic_planner = AlgorithmicPlanner(self.scheduler)
+        self.plan_validator = PlanValidator(self.scheduler, max_repairs=settings.planner.max_repairs)
+        self.algorithmic_enabled = settings.planner.algorithmic_enabled
+        self.validation_enabled = settings.planner.validation_enabled
+        self.redis_client = RedisConnection.get_client()
+        self.request_stats = RequestStats(self.redis_client, sample_rate=settings.cache_warming.popularity_sample_rate)
         logger.info("Redis connection initialized")
 
-    async def create_RAG_transfer_plan_v2(self, full_request: FullRequest):
+    async def create_RAG_transfer_plan_v2(self, full_request: FullRequest, use_cache: bool = True):
+        """use_cache=False always regenerates (and re-caches) the plan; the cache warmer uses it."""
         try:
             # Create a cache key from the full_request
-            cache_key = f"transfer_plan:{self._get_request_hash(full_request)}"
+            cache_key = self.plan_cache_key(full_request)
 
-            # Check if result exists in cache
-            cached_result = self.redis_client.get(cache_key)
-            if cached_result:
-                logger.info("Cache hit for transfer plan request")
-                return json.loads(cached_result)
+            if use_cache:
+                self.request_stats.record("transfer_plan", self._get_request_hash(full_request))
 
-            logger.info("Cache miss for transfer plan request")
+                # Check if result exists in cache
+                cached_result = self.redis_client.get(cache_key)
+                record_cache("transfer_plan", bool(cached_result))
+                if cached_result:
+                    logger.info("Cache hit for transfer plan request")
+                    return get_codec().decode(cached_result)
+
+                logger.info("Cache miss for transfer plan request")
 
             # Validate input
             if not full_request.request:
@@ -51,51 +67,44 @@ class TransferPlanService:
             target_combinations = []
             college = None
 
-            for request in full_request.request:
-                basic_info = await db_get_basic_info(request)
-                if not basic_info:
-                    logger.error(f"Could not find information for request: {request}")
-                    continue
+            with span("plan.basic_info"):
+                for request in full_request.request:
+                    basic_info = await db_get_basic_info(request)
+                    if not basic_info:
+                        logger.error(f"Could not find information for request: {request}")
+                        continue
 
-                # All requests have the same college
-                if not college:
-                    college = basic_info["college"]
+                    # All requests have the same college
+                    if not college:
+                        college = basic_info["college"]
 
-                target_combinations.append({
-                    "college": basic_info["college"],
-                    "university": basic_info["university"],
-                    "major": basic_info["major"]
-                })
+                    target_combinations.append({
+                        "college": basic_info["college"],
+                        "university": basic_info["university"],
+                        "major": basic_info["major"]
+                    })
 
             if not target_combinations:
                 return {"error": "No valid university-major combinations found"}
 
-            # Build the multi-target query
-            query_parts = ["Create an optimized transfer plan from " + college + " that satisfies requirements for:"]
-            for idx, target in enumerate(target_combinations):
-                query_parts.append(f"{idx+1}. {target['university']} - {target['major']}")
-            query_parts.append(f"Duration: {full_request.number_of_terms} terms.")
-            query_parts.append("Find courses that satisfy requirements for multiple universities when possible.")
-            query = "\n".join(query_parts)
-
-            # Get context for all targets at once
-            vector_res = await self.vector_store.vector_search_v2(query, target_combinations)
+            result, cacheable = await self._plan_for_targets(college, target_combinations, full_request.number_of_terms)
 
-            # Generate the optimized plan
-            result = await self.synthesizer.generate_response(question=query, number_of_terms=full_request.number_of_terms, vector_res=vector_res)
-
-            # Cache the result before returning
-            self.redis_client.set(cache_key, json.dumps(result), ex=86400)  # Cache for 24 hours
-            logger.info(f"Cached transfer plan result with key: {cache_key}")
+            # Cache the result before returning, but never an unrepaired invalid plan
+            if cacheable:
+                self.redis_client.set(cache_key, get_codec().encode(result), ex=86400)  # Cache for 24 hours
+                tag_key(self.redis_client, cache_key, plan_tags(target_combinations), 86400)
+                logger.info(f"Cached transfer plan result with key: {cache_key}")
 
             return result
 
+        except AdmissionRejected:
+            # Shed load must reach the route as a 429, not an error payload
+            raise
         except Exception as e:
             logger.error(f"Error RAG creating transfer plan: {str(e)}")
             traceback.print_exc()
             return {"error": str(e)}
 
-
     async def re_order_transfer_plan_v2(self, request: ReOrderRequestModel):
         """Algorithmically reorder a transfer plan after removing taken courses."""
         try:
@@ -107,7 +116,8 @@ class TransferPlanService:
             source_college = original_plan["source_college"]  # Use dict access, not attribute
 
             # Get prerequisite map from mongodb
-            prerequisite_data = await self.prerequisite_service.get_all_prerequisites(source_college)
+            with span("reorder.prerequisites"):
+                prerequisite_data = await self.prerequisite_service.get_all_prerequisites(source_college)
             if not prerequisite_data:
                 logger.warning(f"No prerequisite data found for {source_college}")
                 return {"error": f"Prerequisite data not available for {source_college}"}
@@ -121,11 +131,12 @@ class TransferPlanService:
             # Create a new plan structure
             new_plan = await self._create_plan_structure(original_plan)
 
-            # Build course dependency graph
-            course_graph = await self._build_course_graph(remaining_courses, prerequisite_data)
+            with span("reorder.schedule"):
+                # Build course dependency graph
+                course_graph = self.scheduler.build_course_graph(remaining_courses, prerequisite_data)
 
-            # Distribute courses across terms
-            await self._distribute_courses(new_plan, course_graph)
+                # Distribute courses across terms
+                self.scheduler.distribute_courses(new_plan, course_graph)
 
             logger.info(f"Successfully reordered plan, removed {len(all_courses) - len(remaining_courses)} courses")
             return new_plan
@@ -136,6 +147,71 @@ class TransferPlanService:
             return {"error": str(e)}
 
 
+    async def update_transfer_plan_v2(self, request: PlanUpdateRequestModel):
+        """Add or remove targets on an existing plan without regenerating it from scratch."""
+        try:
+            if not request.added_targets and not request.removed_targets:
+                return {"error": "Please specify at least one target to add or remove"}
+
+            original_plan = request.original_plan.model_dump()
+            source_college = original_plan["source_college"]
+            number_of_terms = len(original_plan["term_plan"])
+            removed = [(t.university, t.major) for t in request.removed_targets]
+            removed_set = set(removed)
+            existing = {(t["university"], t["major"]) for t in original_plan["targets"]}
+
+            # Only the delta needs name lookups and articulation data
+            added = []
+            for target_request in request.added_targets:
+                basic_info = await db_get_basic_info(target_request)
+                if basic_info["college"] != source_college:
+                    return {"error": f"Target college {basic_info['college']} does not match plan college {source_college}"}
+                if (basic_info["university"], basic_info["major"]) in existing:
+                    continue
+                added.append({
+                    "college": basic_info["college"],
+                    "university": basic_info["university"],
+                    "major": basic_info["major"]
+                })
+
+            remaining = [
+                {"college": source_college, "university": t["university"], "major": t["major"]}
+                for t in original_plan["targets"] if (t["university"], t["major"]) not in removed_set
+            ]
+            all_targets = remaining + added
+            if not all_targets:
+                return {"error": "Plan would have no targets left"}
+
+            result = None
+            prerequisite_data = await self.prerequisite_service.get_all_prerequisites(source_college)
+            if prerequisite_data:
+                added_requirements = []
+                if added:
+                    structured = await self.articulation_store.get_target_requirements(source_college, added)
+                    uncovered = [t for t in added if (t["university"], t["major"]) not in structured]
+                    chunks = await self.vector_store.get_specific_chunks(uncovered) if uncovered else []
+                    added_requirements = self.algorithmic_planner.parse_targets(added, chunks, prerequisite_data, structured)
+
+                if added_requirements is not None:
+                    result = self.algorithmic_planner.update_plan(original_plan, removed, added_requirements, prerequisite_data)
+
+            if result is None:
+                logger.info("Incremental update not possible, regenerating full plan")
+                result, _ = await self._plan_for_targets(source_college, all_targets, number_of_terms)
+            else:
+                logger.info(f"Incrementally updated plan (+{len(added)} / -{len(removed)} targets)")
+
+            return result
+
+        except AdmissionRejected:
+            # Shed load must reach the route as a 429, not an error payload
+            raise
+        except Exception as e:
+            logger.error(f"Error in update_transfer_plan_v2: {str(e)}")
+            traceback.print_exc()
+            return {"error": str(e)}
+
+
     async def get_universities(self):
         try:
             return await self.institution_service.get_institutions_by_type("university")
@@ -170,6 +246,82 @@ class TransferPlanService:
 
 # =================================== Helper Functions ===============================================
 
+    async def _plan_for_targets(self, college, target_combinations, number_of_terms):
+        """
+        Build a plan algorithmically when articulation coverage allows and the result validates,
+        otherwise via the LLM.
+        Returns (plan, cacheable); LLM plans that fail validation and can't be repaired are not cacheable.
+        """
+        # Structured articulation covers most targets; only fetch raw chunks for the rest
+        with span("plan.articulation"):
+            structured = await self.articulation_store.get_target_requirements(college, target_combinations)
+            uncovered = [t for t in target_combinations if (t["university"], t["major"]) not in structured]
+            articulation_chunks = await self.vector_store.get_specific_chunks(uncovered) if uncovered else []
+
+        prerequisite_data = {}
+        known_requirements = []
+        if self.algorithmic_enabled or self.validation_enabled:
+            with span("plan.prerequisites"):
+                prerequisite_data = await self.prerequisite_service.get_all_prerequisites(college)
+                if prerequisite_data:
+                    known_requirements = self.algorithmic_planner.known_requirements(
+                        target_combinations, articulation_chunks, prerequisite_data, structured
+                    )
+
+        if self.algorithmic_enabled and prerequisite_data and len(known_requirements) == len(target_combinations):
+            with span("plan.algorithmic"):
+                result = self.algorithmic_planner.plan_from_requirements(college, known_requirements, prerequisite_data, number_of_terms)
+            if result is not None:
+                with span("plan.validate"):
+                    report = self.plan_validator.validate(result, prerequisite_data, known_requirements, number_of_terms)
+                if report["valid"]:
+                    logger.info("Built transfer plan algorithmically, skipped LLM")
+                    return result, True
+                logger.warning(f"Algorithmic plan failed validation ({len(report['violations'])} violations), using the LLM")
+
+        result = await self._generate_llm_plan(college, target_combinations, number_of_terms, articulation_chunks, structured)
+
+        if not self.validation_enabled or not prerequisite_data:
+            return result, True
+
+        with span("plan.validate"):
+            report = self.plan_validator.validate(result, prerequisite_data, known_requirements, number_of_terms)
+        if report["valid"]:
+            return result, True
+
+        logger.warning(f"LLM plan failed validation (score {report['score']}, {len(report['violations'])} violations)")
+        with span("plan.repair"):
+            repaired = self.plan_validator.repair(result, report, prerequisite_data, known_requirements, number_of_terms)
+        if repaired is None:
+            return result, False
+        return repaired, True
+
+    async def _generate_llm_plan(self, college, target_combinations, number_of_terms, articulation_chunks=None, structured=None):
+        """Generate a plan with vector retrieval + LLM synthesis."""
+        if structured:
+            # Compact structured rows replace the prose chunks for indexed targets
+            articulation_chunks = list(articulation_chunks or []) + [
+                {"chunk_type": "articulation", "university_name": university, "major_name": major, "requirements": requirements}
+                for (university, major), requirements in structured.items()
+            ]
+
+        # Build the multi-target query
+        query_parts = ["Create an optimized transfer plan from " + college + " that satisfies requirements for:"]
+        for idx, target in enumerate(target_combinations):
+            query_parts.append(f"{idx+1}. {target['university']} - {target['major']}")
+        query_parts.append(f"Duration: {number_of_terms} terms.")
+        query_parts.append("Find courses that satisfy requirements for multiple universities when possible.")
+        query = "\n".join(query_parts)
+
+        # Get context for all targets at once
+        vector_res = await self.vector_store.vector_search_v2(query, target_combinations, specific_chunks=articulation_chunks)
+
+        # Generate the optimized plan
+        return await self.synthesizer.generate_response(question=query, number_of_terms=number_of_terms, vector_res=vector_res)
+
+    def plan_cache_key(self, full_request: FullRequest) -> str:
+        return f"transfer_plan:{self._get_request_hash(full_request)}"
+
     def _get_request_hash(self, full_request: FullRequest):
         """Create a consistent hash from a FullRequest object for use as a cache key"""
         # Convert to dict first
@@ -240,114 +392,3 @@ class TransferPlanService:
             new_plan["unscheduled_courses"] = []
 
         return new_plan
-
-    async def _build_course_graph(self, courses, prerequisite_data):
-        """Build a graph of courses with dependencies for scheduling."""
-        course_graph = {}
-
-        # Initialize the graph
-        for course in courses:
-            code = course["code"]
-            course_graph[code] = {
-                "data": course,
-                "prerequisites": [],
-                "difficulty": course.get("difficulty", 3),
-                "department": await self._get_department(code),
-                "earliest_term": 1
-            }
-
-            # Add prerequisite information
-            if code in prerequisite_data:
-                # Flatten the prerequisite groups
-                prereqs = []
-                for group in prerequisite_data[code]["prerequisites"]:
-                    for prereq in group:
-                        # Only add prerequisites that are still in our course list
-                        if any(c["code"] == prereq for c in courses):
-                            prereqs.append(prereq)
-                course_graph[code]["prerequisites"] = prereqs
-
-        # Calculate earliest possible term for each course
-        for code in course_graph:
-            await self._calculate_earliest_term(code, course_graph, set())
-
-        return course_graph
-
-    async def _calculate_earliest_term(self, code, graph, visited):
-        """Recursively determine the earliest term a course can be placed in."""
-        if code in visited:
-            return  # Prevent cycles
-
-        visited.add(code)
-
-        if not graph[code]["prerequisites"]:
-            graph[code]["earliest_term"] = 1
-            return
-
-        max_term = 0
-        for prereq in graph[code]["prerequisites"]:
-            if prereq in graph:
-                await self._calculate_earliest_term(prereq, graph, visited)
-                max_term = max(max_term, graph[prereq]["earliest_term"])
-
-        graph[code]["earliest_term"] = max_term + 1
-
-    async def _get_department(self, course_code):
-        """Extract department code from course code."""
-        return course_code.split(" ")[0]
-
-    async def _distribute_courses(self, plan, course_graph):
-        """Distribute courses across terms respecting prerequisites and balancing."""
-        # Sort courses by earliest possible term, then by prerequisite chain length
-        sorted_courses = sorted(
-            course_graph.keys(),
-            key=lambda x: (course_graph[x]["earliest_term"], -len(self._get_dependents(x, course_graph)))
-        )
-
-        # Initialize term stats
-        num_terms = len(plan["term_plan"])
-        term_difficulties = [0] * num_terms
-        term_departments = [{} for _ in range(num_terms)]
-
-        # Place each course in the best term
-        for code in sorted_courses:
-            course = course_graph[code]
-            earliest = min(course["earliest_term"] - 1, num_terms - 1)  # Convert to 0-indexed
-
-            # Find the best term based on balancing criteria
-            best_term = earliest
-            best_score = float('inf')
-
-            for term_idx in range(earliest, num_terms):
-                # Calculate balance score (lower is better)
-                difficulty_score = term_difficulties[term_idx]
-
-                # Diversity penalty - discourage too many courses from same department
-                dept = course["department"]
-                dept_count = term_departments[term_idx].get(dept, 0)
-                diversity_penalty = dept_count * 2
-
-                # Total score
-                score = difficulty_score + diversity_penalty
-
-                # Prefer earlier terms when scores are equal
-                if score < best_score:
-                    best_score = score
-                    best_term = term_idx
-
-            # Add course to chosen term
-            plan["term_plan"][best_term]["courses"].append(course_graph[code]["data"])
-
-            # Update term stats
-            term_difficulties[best_term] += course["difficulty"]
-            if course["department"] not in term_departments[best_term]:
-                term_departments[best_term][course["department"]] = 0
-            term_departments[best_term][course["department"]] += 1
-
-    def _get_dependents(self, code, graph):
-        """Get all courses that depend on this one."""
-        dependents = []
-        for other_code, other_course in graph.items():
-            if code in other_course["prerequisites"]:
-                dependents.append(other_code)
-        return dependents
\ No newline at end of file
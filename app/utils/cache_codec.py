@@ -0,0 +1,121 @@
+"""
+Binary codec for cached values.
+
+Encoded values start with one header byte: 0x80 | serializer << 3 | compression.
+JSON text always starts with an ASCII character, so values written before the codec
+existed (plain json.dumps strings) are told apart and still decode.
+"""
+import json
+import zlib
+from functools import lru_cache
+from typing import Any, Union
+from RAG.config.settings import get_settings
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib json writes the same format, just slower
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for CACHE_SERIALIZER=msgpack
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: zlib is used instead
+    zstandard = None
+
+HEADER_FLAG = 0x80
+
+SERIALIZERS = {"json": 0, "msgpack": 1}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+class CacheCodecError(ValueError):
+    pass
+
+
+def _dump_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _load_json(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class CacheCodec:
+    """
+    Serialize (JSON via orjson, or msgpack) and compress (zstd, or zlib) cache values.
+
+    Values smaller than min_compress_size are stored uncompressed; decoding follows
+    the header, so any codec configuration can read what another one wrote.
+    """
+    def __init__(self, serializer: str = "json", compression: str = "auto",
+                 min_compress_size: int = 512, level: int = 3):
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "zlib"
+        if serializer not in SERIALIZERS:
+            raise CacheCodecError(f"Unknown cache serializer: {serializer}")
+        if compression not in COMPRESSIONS:
+            raise CacheCodecError(f"Unknown cache compression: {compression}")
+        if serializer == "msgpack" and msgpack is None:
+            raise CacheCodecError("CACHE_SERIALIZER=msgpack requires the msgpack package")
+        if compression == "zstd" and zstandard is None:
+            raise CacheCodecError("CACHE_COMPRESSION=zstd requires the zstandard package")
+
+        self.serializer = serializer
+        self.compression = compression
+        self.min_compress_size = min_compress_size
+        self.level = level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=level) if compression == "zstd" else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def encode(self, value: Any) -> bytes:
+        if self.serializer == "msgpack":
+            body = msgpack.packb(value, use_bin_type=True)
+        else:
+            body = _dump_json(value)
+
+        compression = self.compression if len(body) >= self.min_compress_size else "none"
+        if compression == "zstd":
+            body = self._zstd_compressor.compress(body)
+        elif compression == "zlib":
+            body = zlib.compress(body, self.level)
+
+        header = HEADER_FLAG | SERIALIZERS[self.serializer] << 3 | COMPRESSIONS[compression]
+        return bytes((header,)) + body
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data or not data[0] & HEADER_FLAG:
+            return _load_json(data)  # legacy plain JSON
+
+        header, body = data[0], data[1:]
+        compression = header & 0x07
+        if compression == COMPRESSIONS["zstd"]:
+            if self._zstd_decompressor is None:
+                raise CacheCodecError("Cached value is zstd-compressed but zstandard is not installed")
+            body = self._zstd_decompressor.decompress(body)
+        elif compression == COMPRESSIONS["zlib"]:
+            body = zlib.decompress(body)
+        elif compression != COMPRESSIONS["none"]:
+            raise CacheCodecError(f"Unknown cache compression id {compression}")
+
+        serializer = (header >> 3) & 0x0F
+        if serializer == SERIALIZERS["msgpack"]:
+            if msgpack is None:
+                raise CacheCodecError("Cached value is msgpack but msgpack is not installed")
+            return msgpack.unpackb(body, raw=False)
+        if serializer == SERIALIZERS["json"]:
+            return _load_json(body)
+        raise CacheCodecError(f"Unknown cache serializer id {serializer}")
+
+
+@lru_cache
+def get_codec() -> CacheCodec:
+    settings = get_settings().cache
+    return CacheCodec(settings.serializer, settings.compression, settings.min_compress_size)
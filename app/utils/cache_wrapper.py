@@ -1,51 +1,205 @@
 from functools import wraps
-import json
+import asyncio
 import logging
-from typing import Any, Callable
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from redis.exceptions import WatchError
+from app.db.connection.redis_connection import RedisConnection
+from app.services.cache_invalidation import tag_key
+from app.utils.cache_codec import get_codec
+from app.utils.metrics import record_cache
+from RAG.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
-def cache_response(cache_key_template: str, expiration: int = 3600):
+LOCK_KEY = "lock:{}"
+LOCK_TTL = 30  # seconds; bounds how long a crashed refresher blocks others
+MISS_WAIT = 2.0  # seconds a caller waits for another worker's recompute on a hard miss
+
+# Refresh tasks in flight in this process, by cache key
+_refreshing: Dict[str, asyncio.Task] = {}
+# Recomputes in flight in this process; concurrent misses await the same future
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def load_cached(redis_client, cache_key: str) -> Tuple[Any, bool]:
     """
-    Decorator to cache API responses using Redis
-    
+    Returns (value, stale). Values are stored as {"v": value, "soft": epoch seconds};
+    plain JSON written before soft TTLs existed is treated as fresh.
+    """
+    cached_result = redis_client.get(cache_key)
+    if not cached_result:
+        return None, False
+    payload = get_codec().decode(cached_result)
+    if isinstance(payload, dict) and payload.keys() == {"v", "soft"}:
+        return payload["v"], time.time() >= payload["soft"]
+    return payload, False
+
+
+def store_cached(redis_client, cache_key: str, value: Any, expiration: int, stale_ttl: Optional[int] = None,
+                 tags: Iterable[str] = ()):
+    """Fresh for `expiration` seconds, then servable as stale for `stale_ttl` more."""
+    stale_ttl = expiration if stale_ttl is None else stale_ttl
+    envelope = {"v": value, "soft": time.time() + expiration}
+    redis_client.set(cache_key, get_codec().encode(envelope), ex=expiration + stale_ttl)
+    tag_key(redis_client, cache_key, tags, expiration + stale_ttl)
+
+
+def fresh_ttl(redis_client, cache_key: str) -> Optional[float]:
+    """Seconds until the value goes stale (negative once it has); None when missing."""
+    cached_result = redis_client.get(cache_key)
+    if not cached_result:
+        return None
+    payload = get_codec().decode(cached_result)
+    if isinstance(payload, dict) and payload.keys() == {"v", "soft"}:
+        return payload["soft"] - time.time()
+    return redis_client.ttl(cache_key)
+
+
+def is_error_result(result: Any) -> bool:
+    """Services report failures as {"error": ...} instead of raising."""
+    return isinstance(result, dict) and "error" in result
+
+
+def acquire_lock(redis_client, cache_key: str) -> Optional[str]:
+    token = uuid.uuid4().hex
+    if redis_client.set(LOCK_KEY.format(cache_key), token, nx=True, ex=LOCK_TTL):
+        return token
+    return None
+
+
+def release_lock(redis_client, cache_key: str, token: str):
+    """Delete the lock only if we still own it (it may have expired and been re-taken)."""
+    lock_key = LOCK_KEY.format(cache_key)
+    try:
+        with redis_client.pipeline() as pipe:
+            pipe.watch(lock_key)
+            owner = pipe.get(lock_key)
+            if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == token:
+                pipe.multi()
+                pipe.delete(lock_key)
+                pipe.execute()
+            else:
+                pipe.unwatch()
+    except WatchError:
+        pass  # Lock changed hands while we checked; it isn't ours to delete
+    except Exception as e:
+        logger.warning(f"Could not release lock for {cache_key}: {e}")
+
+
+def cache_response(cache_key_template: str, expiration: int = 3600, stale_ttl: Optional[int] = None,
+                   track_popularity: bool = False, tags: Iterable[str] = ()):
+    """
+    Decorator to cache API responses using Redis, with stale-while-revalidate
+
     Args:
         cache_key_template: Template for cache key (can use {param_name} placeholders)
-        expiration: Cache expiration time in seconds
+        expiration: Seconds a cached value is fresh (soft TTL)
+        stale_ttl: Further seconds a stale value is served while one worker refreshes it
+            in the background (hard TTL = expiration + stale_ttl; defaults to expiration)
+        track_popularity: Count requests per key so the cache warmer can prefetch popular ones
+        tags: Invalidation tag templates (same placeholders as the key); see cache_invalidation
     """
 
+    cache_name = cache_key_template.split(":")[0]
+
     def decorator(func: Callable) -> Callable:
+        async def compute_and_store(redis_client, cache_key, args, kwargs):
+            result = await func(*args, **kwargs)
+            if is_error_result(result):
+                # A transient failure must not be served for expiration + stale_ttl
+                logger.warning(f"Not caching error result for {cache_key}")
+                return result
+            try:
+                store_cached(redis_client, cache_key, result, expiration, stale_ttl,
+                             tags=[tag.format(**kwargs) for tag in tags])
+                logger.info(f"Cached result for {cache_key} (fresh for {expiration}s)")
+            except Exception as e:
+                logger.warning(f"Cache write error for {cache_key}: {e}")
+            return result
+
+        async def refresh(redis_client, cache_key, token, args, kwargs):
+            try:
+                await compute_and_store(redis_client, cache_key, args, kwargs)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {cache_key}: {e}")
+            finally:
+                release_lock(redis_client, cache_key, token)
+                _refreshing.pop(cache_key, None)
+
+        async def recompute(redis_client, cache_key, args, kwargs):
+            """Hard miss: one worker recomputes, others briefly wait for its result."""
+            token = None
+            try:
+                token = acquire_lock(redis_client, cache_key)
+                if token is None:
+                    deadline = time.monotonic() + MISS_WAIT
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(0.05)
+                        value, _ = load_cached(redis_client, cache_key)
+                        if value is not None:
+                            return value
+            except Exception as e:
+                logger.warning(f"Cache lock error for {cache_key}: {e}")
+            try:
+                return await compute_and_store(redis_client, cache_key, args, kwargs)
+            finally:
+                if token:
+                    release_lock(redis_client, cache_key, token)
+
         @wraps(func)
         async def wrapper(*args, **kwargs) -> Any:
-            from app.services.transfer_service import TransferPlanService
-
-            service = TransferPlanService()
-            redis_client = service.redis_client
+            from app.services.cache_warming import RequestStats
 
+            redis_client = RedisConnection.get_client()
             cache_key = cache_key_template.format(**kwargs)
-            
+
+            if track_popularity:
+                RequestStats(redis_client, sample_rate=get_settings().cache_warming.popularity_sample_rate).record(cache_name, cache_key)
+
             # Check cache first
             try:
-                cached_result = redis_client.get(cache_key)
-                if cached_result:
-                    logger.info(f"Cache hit for {cache_key}")
-                    return json.loads(cached_result)
+                cached_result, stale = load_cached(redis_client, cache_key)
+                if cached_result is not None:
+                    if stale:
+                        record_cache(cache_name, "stale")
+                        if cache_key not in _refreshing:
+                            token = acquire_lock(redis_client, cache_key)
+                            if token:
+                                logger.info(f"Serving stale {cache_key}, refreshing in background")
+                                _refreshing[cache_key] = asyncio.create_task(refresh(redis_client, cache_key, token, args, kwargs))
+                    else:
+                        record_cache(cache_name, "hit")
+                        logger.info(f"Cache hit for {cache_key}")
+                    return cached_result
 
             except Exception as e:
                 logger.warning(f"Cache read error for {cache_key}: {e}")
-            
-            # Cache miss - execute function
+
+            # Cache miss - one recompute per key in this process
+            record_cache(cache_name, "miss")
             logger.info(f"Cache miss for {cache_key}")
-            result = await func(*args, **kwargs)
+            inflight = _inflight.get(cache_key)
+            if inflight is not None:
+                return await asyncio.shield(inflight)
 
+            future = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = future
             try:
-                redis_client.set(cache_key, json.dumps(result), ex=expiration)
-                logger.info(f"Cached result for {cache_key} (expires in {expiration}s)")
+                result = await recompute(redis_client, cache_key, args, kwargs)
+                future.set_result(result)
+                return result
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
             except Exception as e:
-                logger.warning(f"Cache write error for {cache_key}: {e}")
-            
-            return result
-        
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; don't warn if there were none
+                raise
+            finally:
+                _inflight.pop(cache_key, None)
+
         return wrapper
-    
-    return decorator
\ No newline at end of file
+
+    return decorator
@@ -0,0 +1,90 @@
+"""
+HTTP caching for read-only routes: content-hash ETags, Cache-Control and conditional GET.
+
+`http_cache` is stacked on top of `cache_response`. Browsers and CDNs keep the
+response for max_age seconds and serve it stale for up to stale_while_revalidate
+more while they revalidate. Revalidations carry If-None-Match; if the body has not
+changed, the route answers 304 without sending it again.
+
+    @router.get("/v1/colleges")
+    @http_cache(max_age=3600, stale_while_revalidate=21600)
+    @cache_response("colleges_list", expiration=21600)
+    async def get_colleges(): ...
+
+The ETag hashes the rendered JSON body, so every API process gives the same
+response the same ETag. Invalidations published after a seed cannot reach browsers
+or CDNs, so max_age should stay well below the Redis expiration.
+"""
+import hashlib
+import inspect
+from functools import wraps
+from typing import Any, Callable, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.utils.cache_wrapper import is_error_result
+
+
+def body_etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check; the comparison is weak, so W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def cache_control(max_age: int, stale_while_revalidate: int = 0) -> str:
+    directives = ["public", f"max-age={max_age}"]
+    if stale_while_revalidate:
+        directives.append(f"stale-while-revalidate={stale_while_revalidate}")
+    return ", ".join(directives)
+
+
+def conditional_response(body: bytes, etag: str, if_none_match: Optional[str], cache_control_header: str,
+                         media_type: str = "application/json") -> Response:
+    """200 with the body, or 304 when the client already has this ETag."""
+    headers = {"ETag": etag, "Cache-Control": cache_control_header}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def http_cache(max_age: int, stale_while_revalidate: int = 0):
+    """
+    Decorator adding ETag / Cache-Control headers and If-None-Match handling to a route
+
+    Args:
+        max_age: Seconds browsers and CDNs may reuse the response without asking
+        stale_while_revalidate: Further seconds they may serve it stale while revalidating
+    """
+    header = cache_control(max_age, stale_while_revalidate)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        wants_request = "request" in signature.parameters
+
+        @wraps(func)
+        async def wrapper(*args, request: Request, **kwargs) -> Any:
+            if wants_request:
+                kwargs["request"] = request
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            rendered = JSONResponse(jsonable_encoder(result))
+            # Shared caches must not keep service errors either
+            if is_error_result(result):
+                rendered.headers["Cache-Control"] = "no-store"
+                return rendered
+            return conditional_response(rendered.body, body_etag(rendered.body), request.headers.get("if-none-match"), header)
+
+        # FastAPI reads the signature to inject the Request alongside the route's own parameters
+        if not wants_request:
+            request_param = inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), request_param])
+        return wrapper
+
+    return decorator
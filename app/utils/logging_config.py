@@ -1,7 +1,13 @@
+import atexit
+import copy
+import json
 import logging
-import sys
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import random
+import sys
+from datetime import datetime, timezone
 
 # Create logs directory if it doesn't exist
 logs_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "logs")
@@ -10,15 +16,141 @@ os.makedirs(logs_dir, exist_ok=True)
 # Set up log file name with timestamp
 log_filename = os.path.join(logs_dir, f"better_transfer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
 
-# Configure root logger
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_filename),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # "json" or "text"
+PAYLOAD_LIMIT = int(os.getenv("LOG_PAYLOAD_LIMIT", "2000"))
+
+# Keep this fraction of INFO/DEBUG records from chatty loggers; warnings and errors always pass.
+# Override with LOG_SAMPLE_RATES="app.utils.cache_wrapper=0.1,RAG.services.embedding_services=1"
+DEFAULT_SAMPLE_RATES = {
+    "app.utils.cache_wrapper": 0.1,
+    "RAG.services.embedding_services": 0.1,
+    "RAG.services.caching_service": 0.1,
+}
+
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sample_rate"}
+
+
+class LazyPayload:
+    """
+    Defers serializing a large object until a handler actually emits the record,
+    which happens on the listener thread. The object must not be mutated after logging.
+    """
+    __slots__ = ("payload", "limit")
+
+    def __init__(self, payload, limit: int = None):
+        self.payload = payload
+        self.limit = PAYLOAD_LIMIT if limit is None else limit
+
+    def __str__(self):
+        try:
+            text = json.dumps(self.payload, default=str, separators=(",", ":"))
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        if self.limit and len(text) > self.limit:
+            return f"{text[:self.limit]}... ({len(text)} chars)"
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """Drop a share of low-severity records before they are queued."""
+    def __init__(self, rates=None, rng=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.random = rng or random.Random()
+
+    def rate_for(self, record: logging.LogRecord) -> float:
+        rate = getattr(record, "sample_rate", None)
+        if rate is not None:
+            return rate
+        name = record.name
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record)
+        return rate >= 1.0 or self.random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # Anything passed via extra={...} becomes a top-level field
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread. The stock
+    handler formats in prepare(), i.e. on the event loop for every record.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # Tracebacks hold frames; render them now and drop the reference
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JSONFormatter()
+    return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def parse_sample_rates(value: str):
+    rates = dict(DEFAULT_SAMPLE_RATES)
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging():
+    """Route all records through a queue so file/stdout writes happen off the event loop."""
+    formatter = build_formatter()
+    file_handler = logging.FileHandler(log_filename)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("LOG_SAMPLE_RATES"))))
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+    return listener
+
+
+listener = configure_logging()
+
 
 def get_logger(name):
     """Get a logger with the specified name."""
@@ -0,0 +1,279 @@
+"""
+In-process metrics and lightweight tracing, exposed in Prometheus text format.
+
+Everything is a no-op until configure(True) is called, so instrumented code pays
+one attribute check per span when metrics are disabled.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+# Spans finished during the current request: [(name, seconds)]
+_trace: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("trace", default=None)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def get(self, *labels) -> float:
+        return self.values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Tuple, List] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][idx] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class GaugeFunction:
+    """Gauge computed at scrape time, e.g. a ratio of two counters."""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], collect: Callable[[], Dict[Tuple, float]]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.metrics = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge_function(self, *args, **kwargs) -> GaugeFunction:
+        metric = GaugeFunction(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self.metrics:
+            if isinstance(metric, Counter):
+                metric.values.clear()
+            elif isinstance(metric, Histogram):
+                metric.series.clear()
+
+
+registry = MetricsRegistry()
+
+STAGE_LATENCY = registry.histogram(
+    "better_transfer_stage_duration_seconds", "Time spent in each pipeline stage", ["stage"]
+)
+HTTP_LATENCY = registry.histogram(
+    "better_transfer_http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+)
+LLM_TOKENS = registry.histogram(
+    "better_transfer_llm_tokens", "Tokens per LLM call", ["kind", "direction"], buckets=TOKEN_BUCKETS
+)
+CACHE_REQUESTS = registry.counter(
+    "better_transfer_cache_requests_total", "Cache lookups by result", ["cache", "result"]
+)
+ADMISSION_REJECTIONS = registry.counter(
+    "better_transfer_admission_rejections_total", "Requests shed by admission control", ["reason"]
+)
+
+
+def _cache_hit_ratios() -> Dict[Tuple, float]:
+    caches = {labels[0] for labels in CACHE_REQUESTS.values}
+    ratios = {}
+    for cache in caches:
+        # Stale responses are served from cache too, so they count toward the ratio
+        hits = CACHE_REQUESTS.get(cache, "hit") + CACHE_REQUESTS.get(cache, "stale")
+        total = sum(value for labels, value in CACHE_REQUESTS.values.items() if labels[0] == cache)
+        ratios[(cache,)] = round(hits / total, 4) if total else 0.0
+    return ratios
+
+
+registry.gauge_function("better_transfer_cache_hit_ratio", "Fresh and stale hits over all lookups per cache", ["cache"], _cache_hit_ratios)
+
+
+def configure(enabled: bool):
+    registry.enabled = enabled
+
+
+def is_enabled() -> bool:
+    return registry.enabled
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        STAGE_LATENCY.observe(elapsed, self.name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.append((self.name, elapsed))
+        return False
+
+
+def span(name: str):
+    """Time a block as a pipeline stage: `with span("vector_store.search"): ...`"""
+    if not registry.enabled:
+        return _NOOP_SPAN
+    return Span(name)
+
+
+def traced(name: str):
+    """Decorator form of span() for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not registry.enabled:
+                    return await func(*args, **kwargs)
+                with Span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache: str, result):
+    """`result` is "hit", "stale" or "miss"; a bool means hit/miss."""
+    if registry.enabled:
+        if isinstance(result, bool):
+            result = "hit" if result else "miss"
+        CACHE_REQUESTS.inc(cache, result)
+
+
+def record_rejection(reason: str):
+    if registry.enabled:
+        ADMISSION_REJECTIONS.inc(reason)
+
+
+def record_tokens(kind: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    if not registry.enabled:
+        return
+    if prompt_tokens is not None:
+        LLM_TOKENS.observe(prompt_tokens, kind, "prompt")
+    if completion_tokens is not None:
+        LLM_TOKENS.observe(completion_tokens, kind, "completion")
+
+
+def start_trace() -> contextvars.Token:
+    return _trace.set([])
+
+
+def finish_trace(token: contextvars.Token) -> List[Tuple[str, float]]:
+    spans = _trace.get() or []
+    _trace.reset(token)
+    return spans
+
+
+def server_timing(spans: List[Tuple[str, float]]) -> str:
+    """Server-Timing header value with total milliseconds per stage."""
+    totals: Dict[str, float] = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name.replace('.', '_')};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+def render() -> str:
+    return registry.render()
@@ -0,0 +1,64 @@
+"""
+Checks on client-supplied webhook URLs, so plan workers can't be pointed at
+internal services (metadata endpoints, Redis, Mongo, localhost).
+
+A URL must be https. When PLAN_WEBHOOK_ALLOWED_HOSTS is set, its host must be one
+of those names. Otherwise every address the host resolves to must be public.
+The schema does the checks that need no I/O. The DNS check runs when a job is
+submitted and again right before each delivery, because the host may resolve
+differently by then.
+"""
+import asyncio
+import ipaddress
+import socket
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+
+class WebhookRejected(ValueError):
+    pass
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_webhook_url(url: str, allowed_hosts: Optional[Iterable[str]] = None) -> str:
+    """Reject non-https URLs, hosts outside the allowlist and literal non-public IPs."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".").lower()
+    if parts.scheme != "https" or not host:
+        raise WebhookRejected("webhook_url must be an https URL")
+    if parts.username or parts.password:
+        raise WebhookRejected("webhook_url must not contain credentials")
+    allowed = {name.lower() for name in allowed_hosts or ()}
+    if allowed:
+        if host not in allowed:
+            raise WebhookRejected(f"webhook host {host} is not allowed")
+        return url
+    if host == "localhost" or host.endswith(".localhost"):
+        raise WebhookRejected("webhook host must be public")
+    try:
+        literal = ipaddress.ip_address(host)
+    except ValueError:
+        return url
+    if not is_public_address(str(literal)):
+        raise WebhookRejected("webhook host must be public")
+    return url
+
+
+async def resolve_webhook_host(url: str, allowed_hosts: Optional[Iterable[str]] = None):
+    """Raise WebhookRejected unless the host is allowlisted or resolves only to public addresses."""
+    check_webhook_url(url, allowed_hosts)
+    if allowed_hosts:
+        return
+    parts = urlsplit(url)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, parts.port or 443, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise WebhookRejected(f"webhook host {parts.hostname} does not resolve: {e}")
+    if not infos or not all(is_public_address(info[4][0]) for info in infos):
+        raise WebhookRejected(f"webhook host {parts.hostname} resolves to a non-public address")
@@ -0,0 +1,89 @@
+"""
+Change stream watcher that turns Mongo writes into cache invalidations.
+
+    python -m app.workers.cache_invalidator
+
+Change streams need a replica set (Atlas clusters are). Resume tokens are kept in
+Redis, so a restarted watcher picks up the changes it missed while down. The same
+events keep the materialized major pair view (college_uni_major_pair_view) current.
+"""
+import asyncio
+from typing import Dict, List
+from bson import json_util
+from app.db.connection.mongo_connection import MongoDB
+from app.db.connection.redis_connection import RedisConnection
+from app.db.services.major_pair_view import MajorPairView
+from app.services.cache_invalidation import InvalidationBus, change_to_tags
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+RESUME_KEY = "cache_invalidation:resume:{}"
+
+# Collections whose writes can make cached responses stale, per database
+WATCHED: Dict[str, List[str]] = {
+    "main_db": ["colleges", "universities", "majors", "college_uni_major_pair"],
+    "course_prerequisite": ["pcc_course_prerequisites"],
+    "vector_db": ["articulations", "knowledge_chunks"],
+}
+
+# main_db collections the materialized major pair view is derived from
+VIEW_SOURCES = ("college_uni_major_pair", "majors")
+
+
+class ChangeStreamInvalidator:
+    def __init__(self, bus: InvalidationBus = None, watched: Dict[str, List[str]] = None):
+        self.redis = RedisConnection.get_client()
+        self.bus = bus or InvalidationBus(self.redis)
+        self.watched = watched or WATCHED
+        self.major_pair_view = MajorPairView()
+
+    def _load_token(self, database: str):
+        token = self.redis.get(RESUME_KEY.format(database))
+        return json_util.loads(token) if token else None
+
+    def _save_token(self, database: str, token):
+        self.redis.set(RESUME_KEY.format(database), json_util.dumps(token))
+
+    def handle_change(self, database: str, change: Dict) -> int:
+        collection = change.get("ns", {}).get("coll")
+        tags = change_to_tags(database, collection, change)
+        if not tags:
+            return 0
+        return self.bus.publish(tags, reason=f"{database}.{collection} {change.get('operationType')}")
+
+    async def watch(self, database: str):
+        pipeline = [{"$match": {"ns.coll": {"$in": self.watched[database]}}}]
+        db = MongoDB(database).get_db()
+        async with db.watch(pipeline, full_document="updateLookup", resume_after=self._load_token(database)) as stream:
+            logger.info(f"Watching {database} for cache invalidation")
+            async for change in stream:
+                collection = change.get("ns", {}).get("coll")
+                if database == "main_db" and collection in VIEW_SOURCES:
+                    # Before invalidating, so refills read the patched view
+                    try:
+                        await self.major_pair_view.apply_change(collection, change)
+                    except Exception as e:
+                        logger.error(f"Major pair view update failed for {collection} change: {e}")
+                try:
+                    await asyncio.to_thread(self.handle_change, database, change)
+                except Exception as e:
+                    logger.error(f"Invalidation failed for {database} change: {e}")
+                self._save_token(database, stream.resume_token)
+
+    async def run(self):
+        await asyncio.gather(*(self.watch(database) for database in self.watched))
+
+
+async def main():
+    try:
+        await ChangeStreamInvalidator().run()
+    except Exception as e:
+        logger.error(f"Change stream watcher stopped: {e}")
+        raise
+    finally:
+        MongoDB.close_all_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
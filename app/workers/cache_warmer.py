@@ -0,0 +1,40 @@
+"""
+Background cache warmer for popular plans and major lists.
+
+    python -m app.workers.cache_warmer           # loop every interval_seconds
+    python -m app.workers.cache_warmer --once    # single pass, e.g. from cron
+
+During the off-peak window every popular entry expiring within the horizon is
+regenerated; outside it, entries are refreshed by probabilistic early expiration.
+"""
+import argparse
+import asyncio
+from app.services.cache_warming import CacheWarmer
+from app.services.transfer_service import TransferPlanService
+from RAG.config.settings import get_settings
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Warm the plan and major list caches")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    parser.add_argument("--offpeak", action="store_true", help="Force off-peak behaviour for this run")
+    args = parser.parse_args()
+
+    settings = get_settings().cache_warming
+    warmer = CacheWarmer(TransferPlanService(), settings)
+
+    while True:
+        try:
+            await warmer.run_once(offpeak=True if args.offpeak else None)
+        except Exception as e:
+            logger.error(f"Cache warming pass failed: {e}")
+        if args.once:
+            break
+        await asyncio.sleep(settings.interval_seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Plan generation worker pool. Runs separately from the web tier:
+
+    python -m app.workers.plan_worker
+
+Each worker process runs PLAN_WORKER_CONCURRENCY jobs at a time, so LLM capacity
+scales by adding processes/containers without touching the API.
+"""
+import asyncio
+import signal
+from typing import Dict, Any
+import httpx
+from app.schemas.transferPlanRequest import FullRequest
+from app.services.plan_jobs import PlanJobQueue
+from app.services.admission import AdmissionRejected
+from app.services.transfer_service import TransferPlanService
+from RAG.config.settings import get_settings
+from app.utils.logging_config import get_logger
+from app.utils.webhooks import WebhookRejected, resolve_webhook_host
+
+logger = get_logger(__name__)
+
+
+class PlanWorker:
+    def __init__(self, service: TransferPlanService = None, concurrency: int = None, poll_interval: float = 0.5):
+        settings = get_settings()
+        self.settings = settings.jobs
+        self.service = service or TransferPlanService()
+        self.queue = PlanJobQueue(self.service.redis_client, self.settings, cache_key=self.service.plan_cache_key)
+        self.concurrency = concurrency or self.settings.worker_concurrency
+        self.poll_interval = poll_interval
+        self.stopping = asyncio.Event()
+
+    async def run(self):
+        logger.info(f"Plan worker started with {self.concurrency} slots")
+        await asyncio.gather(self._requeue_loop(), self._webhook_loop(), *(self._slot(i) for i in range(self.concurrency)))
+        logger.info("Plan worker stopped")
+
+    def stop(self):
+        self.stopping.set()
+
+    async def _slot(self, slot: int):
+        while not self.stopping.is_set():
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                await self._sleep(self.poll_interval)
+                continue
+            await self.process(job)
+
+    async def _requeue_loop(self):
+        while not self.stopping.is_set():
+            await asyncio.to_thread(self.queue.requeue_stale)
+            await self._sleep(self.settings.visibility_timeout / 4)
+
+    async def _webhook_loop(self):
+        while not self.stopping.is_set():
+            await self.deliver_webhooks()
+            await self._sleep(self.poll_interval)
+
+    async def deliver_webhooks(self) -> int:
+        """Call the webhooks of jobs answered from the plan cache at submit time."""
+        delivered = 0
+        while (job := await asyncio.to_thread(self.queue.claim_webhook)) is not None:
+            await self.notify(job)
+            delivered += 1
+        return delivered
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def process(self, job: Dict[str, Any]):
+        """Run one job through the same code path as the synchronous endpoint."""
+        try:
+            result = await self.service.create_RAG_transfer_plan_v2(FullRequest(**job["request"]))
+            if isinstance(result, dict) and "error" in result:
+                self.queue.fail(job, result["error"])
+            else:
+                self.queue.complete(job, result)
+                logger.info(f"Completed plan job {job['job_id']}")
+        except AdmissionRejected as e:
+            # LLM capacity is saturated; back off and let any worker pick it up again
+            logger.info(f"Plan job {job['job_id']} deferred: {e}")
+            await self._sleep(e.retry_after)
+            self.queue.requeue(job)
+            return
+        except Exception as e:
+            logger.error(f"Plan job {job['job_id']} failed: {e}")
+            self.queue.fail(job, str(e))
+
+        if job.get("webhook_url"):
+            await self.notify(job)
+
+    async def notify(self, job: Dict[str, Any]):
+        payload = {k: job[k] for k in ("job_id", "status", "result", "error")}
+        # Redirects could lead anywhere, including internal hosts
+        async with httpx.AsyncClient(timeout=10, follow_redirects=False) as client:
+            for attempt in range(1, self.settings.webhook_retries + 1):
+                try:
+                    # Re-resolved on every attempt: the host may now point somewhere internal
+                    await resolve_webhook_host(job["webhook_url"], self.settings.webhook_allowed_hosts)
+                except WebhookRejected as e:
+                    logger.error(f"Not calling webhook for job {job['job_id']}: {e}")
+                    return
+                try:
+                    response = await client.post(job["webhook_url"], json=payload)
+                    if response.status_code < 500:
+                        return
+                    logger.warning(f"Webhook for job {job['job_id']} returned {response.status_code} (attempt {attempt})")
+                except httpx.HTTPError as e:
+                    logger.warning(f"Webhook for job {job['job_id']} failed: {e} (attempt {attempt})")
+                await asyncio.sleep(2 ** attempt)
+        logger.error(f"Giving up on webhook for job {job['job_id']}")
+
+
+async def main():
+    worker = PlanWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Size and decode cost of cached plans under each cache codec.
+
+Uses examples/multi_university_sample.json plus synthetic 4-8 term, 1-5 target
+plans built from it. "legacy" is the old json.dumps/json.loads path.
+
+    python -m benchmarks.codec_bench --iterations 2000
+    python -m benchmarks.codec_bench --redis-url redis://localhost:6379/15   # adds MEMORY USAGE
+
+Stored bytes are also the bytes sent over the network on every cache hit.
+"""
+import argparse
+import copy
+import json
+import os
+import time
+
+from app.utils import cache_codec
+from app.utils.cache_codec import CacheCodec
+
+SAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "multi_university_sample.json")
+
+UNIVERSITIES = [
+    "University of California, Los Angeles", "University of California, Berkeley",
+    "University of California, San Diego", "University of California, Irvine",
+    "University of California, Davis",
+]
+MAJORS = ["Computer Science", "Data Science", "Mathematics", "Statistics", "Cognitive Science"]
+
+
+def build_plan(sample: dict, targets: int, terms: int, courses_per_term: int = 5) -> dict:
+    """Scale the sample plan to `terms` terms and `targets` (university, major) targets."""
+    courses = [course for term in sample["term_plan"] for course in term["courses"]]
+    pairs = list(zip(UNIVERSITIES, MAJORS))[:targets]
+    term_plan = []
+    for term in range(terms):
+        term_courses = []
+        for slot in range(courses_per_term):
+            course = copy.deepcopy(courses[(term * courses_per_term + slot) % len(courses)])
+            course["satisfies"] = [
+                {"university": university, "major": major, "university_courses": [f"{course['code'].split()[0]} {term}{slot}"]}
+                for university, major in pairs
+            ]
+            term_courses.append(course)
+        term_plan.append({"term": term + 1, "courses": term_courses})
+    return {
+        "targets": [{"university": university, "major": major} for university, major in pairs],
+        "source_college": sample["source_college"],
+        "term_plan": term_plan,
+    }
+
+
+def codecs():
+    variants = {"json": CacheCodec("json", "none"), "json+zlib": CacheCodec("json", "zlib")}
+    if cache_codec.zstandard is not None:
+        variants["json+zstd"] = CacheCodec("json", "zstd")
+    if cache_codec.msgpack is not None:
+        variants["msgpack"] = CacheCodec("msgpack", "none")
+        variants["msgpack+zlib"] = CacheCodec("msgpack", "zlib")
+        if cache_codec.zstandard is not None:
+            variants["msgpack+zstd"] = CacheCodec("msgpack", "zstd")
+    return variants
+
+
+def time_per_call(func, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return 1e6 * (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cache codecs on transfer plans")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--redis-url", help="Measure MEMORY USAGE on this (scratch) Redis database")
+    args = parser.parse_args()
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+        redis_client = redis.Redis.from_url(args.redis_url)
+
+    with open(SAMPLE) as f:
+        sample = json.load(f)
+    plans = {"sample (2 targets)": sample}
+    for targets, terms in ((1, 4), (3, 6), (5, 8)):
+        plans[f"{targets} targets x {terms} terms"] = build_plan(sample, targets, terms)
+
+    print(f"orjson={'yes' if cache_codec.orjson else 'no'} msgpack={'yes' if cache_codec.msgpack else 'no'} "
+          f"zstandard={'yes' if cache_codec.zstandard else 'no'}")
+    for name, plan in plans.items():
+        print(f"\n{name}")
+        legacy = json.dumps(plan).encode()
+        rows = [("legacy", legacy, json.loads, json.dumps)]
+        rows += [(label, codec.encode(plan), codec.decode, codec.encode) for label, codec in codecs().items()]
+        for label, encoded, decode, encode in rows:
+            decode_us = time_per_call(decode, encoded, args.iterations)
+            encode_us = time_per_call(encode, plan, args.iterations)
+            line = (f"  {label:14s} {len(encoded):8d} B ({100 * len(encoded) / len(legacy):5.1f}%)  "
+                    f"decode {decode_us:8.1f} us  encode {encode_us:8.1f} us")
+            if redis_client is not None:
+                key = f"codec_bench:{label}"
+                redis_client.set(key, encoded)
+                line += f"  redis {redis_client.memory_usage(key):8d} B"
+                redis_client.delete(key)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
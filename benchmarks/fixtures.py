@@ -0,0 +1,114 @@
+"""Deterministic seed data for the benchmark stand-in databases."""
+import random
+from datetime import datetime
+from bson.objectid import ObjectId
+from RAG.services.providers import LocalEmbeddingProvider
+
+COLLEGE = "Pasadena City College"
+DEPARTMENTS = ["MATH", "CS", "PHYS", "CHEM", "BIOL", "ECON", "ENGL", "STAT"]
+MAJORS = [
+    "Computer Science", "Data Science", "Mathematics", "Physics", "Chemistry",
+    "Biology", "Economics", "Statistics", "Electrical Engineering", "Cognitive Science"
+]
+UNIVERSITIES = [
+    "University of California, Los Angeles", "University of California, Berkeley",
+    "University of California, San Diego", "University of California, Irvine",
+    "University of California, Davis", "University of California, Santa Barbara",
+    "University of California, Riverside", "University of California, Santa Cruz"
+]
+
+
+def build_catalog(courses_per_department: int = 8):
+    """Course catalog with linear prerequisite chains inside each department."""
+    catalog = {}
+    for dept in DEPARTMENTS:
+        previous = None
+        for idx in range(1, courses_per_department + 1):
+            code = f"{dept} {idx:03d}"
+            catalog[code] = {
+                "name": f"{dept.title()} Course {idx}",
+                "units": 4.0,
+                "difficulty": 1 + idx % 5,
+                "assessment_allow": idx == 1,
+                "prerequisites": [[previous]] if previous and idx % 3 != 1 else [],
+                "unlocks": [],
+                "department": dept.lower()
+            }
+            previous = code
+    for code, course in catalog.items():
+        for group in course["prerequisites"]:
+            for prereq in group:
+                catalog[prereq]["unlocks"].append(code)
+    return catalog
+
+
+def build_dataset(seed: int = 0, incomplete_ratio: float = 0.2):
+    """All collections keyed by (database, collection)."""
+    rng = random.Random(seed)
+    catalog = build_catalog()
+    codes = sorted(catalog)
+    embedder = LocalEmbeddingProvider(dimensions=1536)
+
+    college_id = ObjectId()
+    universities = [{"_id": ObjectId(), "id": i + 1, "university_name": name, "is_uc": True} for i, name in enumerate(UNIVERSITIES)]
+    majors = [{"_id": ObjectId(), "id": i + 1, "major_name": name} for i, name in enumerate(MAJORS)]
+
+    pairs = []
+    chunks = []
+    for university in universities:
+        for major in rng.sample(majors, 5):
+            pairs.append({
+                "_id": ObjectId(),
+                "from_college_id": college_id,
+                "to_university_id": university["_id"],
+                "major_id": major["_id"],
+                "alter_major_id": None,
+                "is_active": True
+            })
+
+            lines = []
+            for req_idx, code in enumerate(rng.sample(codes, rng.randint(4, 8))):
+                uni_code = f"{code.split()[0]}X {100 + req_idx}"
+                if rng.random() < 0.3:
+                    lines.append(f"{uni_code} <- {code} or {rng.choice(codes)}")
+                else:
+                    lines.append(f"{uni_code} <- {code}")
+            if rng.random() < incomplete_ratio:
+                lines.append("UPPERX 101 requires department approval")  # forces the LLM path
+
+            chunks.append({
+                "id": f"art-{university['id']}-{major['id']}",
+                "content": "\n".join(lines),
+                "college_name": COLLEGE,
+                "university_name": university["university_name"],
+                "major_name": major["major_name"],
+                "chunk_type": "articulation",
+                "created_at": datetime(2025, 1, 1)
+            })
+
+    for code, course in catalog.items():
+        for chunk_type, content in (
+            ("class", f"{code} {course['name']} ({course['units']} units)"),
+            ("prerequisite", f"{code} requires {' or '.join(' and '.join(g) for g in course['prerequisites']) or 'nothing'}"),
+        ):
+            chunks.append({
+                "id": f"{chunk_type}-{code}",
+                "content": content,
+                "college_name": COLLEGE,
+                "university_name": None,
+                "major_name": None,
+                "chunk_type": chunk_type,
+                "created_at": datetime(2025, 1, 1),
+                "embedding": embedder.hash_embedding(content)
+            })
+
+    prerequisites = [{"college": COLLEGE, "course_code": code, **course} for code, course in catalog.items()]
+
+    return {
+        ("main_db", "colleges"): [{"_id": college_id, "id": 1, "college_name": COLLEGE}],
+        ("main_db", "universities"): universities,
+        ("main_db", "majors"): majors,
+        ("main_db", "college_uni_major_pair"): pairs,
+        ("vector_db", "knowledge_chunks"): chunks,
+        ("course_prerequisite", "pcc_course_prerequisites"): prerequisites,
+    }
@@ -0,0 +1,284 @@
+"""
+Stand-in environment and load driver for the transfer API.
+
+Mongo is replaced by mongomock-motor, Redis by fakeredis and OpenAI by the local
+providers, so the real FastAPI app and services run unmodified in-process.
+"""
+import asyncio
+import math
+import os
+import time
+import tracemalloc
+from contextlib import ExitStack
+from functools import wraps
+from typing import Dict, Any, List, Callable
+from unittest.mock import patch
+
+import fakeredis
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+from benchmarks.fixtures import build_dataset, COLLEGE
+
+# Pipeline stages timed per request: (module path, attribute, method)
+STAGES = [
+    ("app.services.transfer_service", "db_get_basic_info", None),
+    ("RAG.db.articulation_store", "ArticulationStore", "get_target_requirements"),
+    ("RAG.db.vector_store", "VectorStore", "get_specific_chunks"),
+    ("RAG.db.vector_store", "VectorStore", "get_general_chunks"),
+    ("RAG.services.embedding_services", "EmbeddingService", "create_embedding"),
+    ("app.db.services.mongo_services", "PrerequisiteService", "get_all_prerequisites"),
+    ("app.services.algorithmic_planner", "AlgorithmicPlanner", "plan_from_requirements"),
+    ("app.services.plan_validator", "PlanValidator", "validate"),
+    ("RAG.services.synthesizer", "Synthesizer", "generate_response"),
+    ("app.db.services.mongo_services", "CollegeUniMajorPairService", "get_majors_with_names"),
+    ("app.db.services.mongo_services", "InstitutionService", "get_all_universities"),
+]
+
+
+class StageTimer:
+    """Accumulates wall time per pipeline stage."""
+    def __init__(self):
+        self.totals: Dict[str, List[float]] = {}
+
+    def record(self, name: str, seconds: float):
+        self.totals.setdefault(name, []).append(seconds)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        timer = self
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    timer.record(name, time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timer.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def report(self, requests: int) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                "calls": len(samples),
+                "mean_ms": round(1000 * sum(samples) / len(samples), 3),
+                "ms_per_request": round(1000 * sum(samples) / max(requests, 1), 3)
+            }
+            for name, samples in sorted(self.totals.items())
+        }
+
+    def reset(self):
+        self.totals.clear()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+class BenchmarkEnvironment:
+    """Patches external services, seeds data and exposes an in-process HTTP client."""
+    def __init__(self, llm_latency: str = "lognormal:80:0.4", embedding_latency: str = "lognormal:10:0.3", seed: int = 0):
+        self.llm_latency = llm_latency
+        self.embedding_latency = embedding_latency
+        self.seed = seed
+        self.stack = ExitStack()
+        self.timer = StageTimer()
+        self.redis = fakeredis.FakeRedis()
+        self.dataset = None
+        self.app = None
+
+    async def __aenter__(self):
+        self.stack.enter_context(patch.dict(os.environ, {
+            "LLM_PROVIDER": "local",
+            "EMBEDDING_PROVIDER": "local",
+            "LOCAL_LLM_LATENCY": self.llm_latency,
+            "LOCAL_EMBEDDING_LATENCY": self.embedding_latency,
+            "LOCAL_PROVIDER_SEED": str(self.seed),
+            "REDIS_PORT": "6379",
+            "RATE_LIMIT_PER_MINUTE": "0",  # a single client would trip the per-tenant limit
+            "LLM_TOKENS_PER_MINUTE": "0",
+        }))
+        self.stack.enter_context(patch("app.db.connection.mongo_connection.AsyncIOMotorClient", AsyncMongoMockClient))
+        self.stack.enter_context(patch("redis.Redis", lambda *args, **kwargs: self.redis))
+
+        from RAG.config.settings import get_settings
+        from app.db.connection.mongo_connection import MongoDB
+        from app.db.connection.redis_connection import RedisConnection
+        from app.services.admission import get_admission_controller, get_tenant_limiter
+        for cached in (get_settings, get_admission_controller, get_tenant_limiter):
+            cached.cache_clear()
+        MongoDB._instances.clear()
+        RedisConnection._client = None
+
+        await self._seed()
+        self._patch_vector_search()
+        self._patch_stages()
+
+        from app.main import create_application
+        self.app = create_application()
+        return self
+
+    async def __aexit__(self, *exc):
+        from RAG.config.settings import get_settings
+        from app.db.connection.mongo_connection import MongoDB
+        from app.db.connection.redis_connection import RedisConnection
+        from app.services.admission import get_admission_controller, get_tenant_limiter
+        self.stack.close()
+        for cached in (get_settings, get_admission_controller, get_tenant_limiter):
+            cached.cache_clear()
+        MongoDB._instances.clear()
+        RedisConnection._client = None
+
+    async def _seed(self):
+        from app.db.connection.mongo_connection import MongoDB
+        self.dataset = build_dataset(self.seed)
+        for (database, collection), documents in self.dataset.items():
+            await MongoDB(database).get_collection(collection).insert_many([dict(doc) for doc in documents])
+
+    def _patch_vector_search(self):
+        """mongomock has no $vectorSearch; rank seeded chunks by cosine similarity in memory."""
+        from RAG.db.vector_store import VectorStore
+        from RAG.services.embedding_services import EmbeddingService
+
+        general = [c for c in self.dataset[("vector_db", "knowledge_chunks")] if c["chunk_type"] in ("class", "prerequisite")]
+
+        async def get_general_chunks(store, target_combinations, input_text):
+            query = await EmbeddingService().create_embedding(input_text)
+            college = target_combinations[0]["college"]
+            scored = []
+            for chunk in general:
+                if chunk["college_name"] != college:
+                    continue
+                similarity = sum(a * b for a, b in zip(query, chunk["embedding"]))
+                scored.append({k: v for k, v in chunk.items() if k not in ("_id", "embedding")} | {"similarity": similarity})
+            scored.sort(key=lambda doc: doc["similarity"], reverse=True)
+            return scored[:50]
+
+        self.stack.enter_context(patch.object(VectorStore, "get_general_chunks", get_general_chunks))
+
+    def _patch_stages(self):
+        import importlib
+        for module_path, attr, method in STAGES:
+            module = importlib.import_module(module_path)
+            target = getattr(module, attr)
+            if method is None:
+                self.stack.enter_context(patch.object(module, attr, self.timer.wrap(attr, target)))
+            else:
+                original = getattr(target, method)
+                self.stack.enter_context(patch.object(target, method, self.timer.wrap(f"{attr}.{method}", original)))
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://bench")
+
+    # ------------------------------------------------------------------ request builders
+
+    def ids(self):
+        college = self.dataset[("main_db", "colleges")][0]
+        pairs = self.dataset[("main_db", "college_uni_major_pair")]
+        return college, pairs
+
+    def plan_requests(self, count: int, targets_per_request: int = 2, number_of_terms: int = 4) -> List[Dict[str, Any]]:
+        college, pairs = self.ids()
+        combinations = max(1, len(pairs) // targets_per_request)
+        requests = []
+        for idx in range(count):
+            picked = [pairs[(idx * targets_per_request + k) % len(pairs)] for k in range(targets_per_request)]
+            requests.append({
+                "request": [
+                    {"college_id": str(college["_id"]), "university_id": str(p["to_university_id"]), "major_id": str(p["major_id"])}
+                    for p in picked
+                ],
+                "number_of_terms": number_of_terms + idx // combinations  # distinct cache keys past one lap
+            })
+        return requests
+
+    def reorder_request(self) -> Dict[str, Any]:
+        catalog = {doc["course_code"]: doc for doc in self.dataset[("course_prerequisite", "pcc_course_prerequisites")]}
+        codes = ["MATH 001", "MATH 002", "CS 001", "CS 002", "PHYS 001", "PHYS 002", "CHEM 001", "STAT 001"]
+        courses = [{
+            "code": code, "name": catalog[code]["name"], "units": 4.0, "difficulty": catalog[code]["difficulty"],
+            "prerequisites": [], "satisfies": [], "alternatives": []
+        } for code in codes]
+        return {
+            "original_plan": {
+                "targets": [{"university": "University of California, Los Angeles", "major": "Computer Science"}],
+                "source_college": COLLEGE,
+                "term_plan": [{"term": t + 1, "courses": courses[t * 2:(t + 1) * 2]} for t in range(4)],
+                "unscheduled_courses": None
+            },
+            "taken_classes": ["MATH 001"]
+        }
+
+
+async def run_load(env: BenchmarkEnvironment, make_call: Callable, total: int, concurrency: int, measure_allocations: bool = True) -> Dict[str, Any]:
+    """Fire `total` calls with bounded concurrency and collect latency/throughput/allocation stats."""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with env.client() as client:
+        async def one(idx):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await make_call(client, idx)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400 or (response.headers.get("content-type", "").startswith("application/json") and "error" in response.text[:20]):
+                    errors += 1
+
+        env.timer.reset()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        stages = env.timer.report(total)
+
+        allocated_kb = None
+        if measure_allocations:
+            # Separate pass so tracemalloc overhead doesn't skew latency numbers
+            sample = max(1, min(total, 20))
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            for i in range(sample):
+                await make_call(client, total + i)
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+            allocated_kb = round(allocated / 1024 / sample, 2)
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(1000 * percentile(latencies, 50), 2),
+        "p95_ms": round(1000 * percentile(latencies, 95), 2),
+        "p99_ms": round(1000 * percentile(latencies, 99), 2),
+        "retained_kb_per_request": allocated_kb,
+        "stages": stages
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond `tolerance` (fraction) in p95 latency or throughput."""
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario}: p95 {result['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: throughput {result['throughput_rps']} rps vs baseline {base['throughput_rps']} rps")
+    return regressions
@@ -0,0 +1,115 @@
+"""
+Knowledge chunk CSV ingestion: the old sequential loop vs the pipelined engine.
+
+Writes a synthetic knowledge_chunks CSV (1536-float embeddings) and ingests it into
+a simulated Mongo whose insert_many costs a fixed round trip plus a per-document
+transfer time, so the comparison shows how well parsing and network I/O overlap.
+
+    python -m benchmarks.ingest_bench --rows 20000
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+import bson
+
+from scripts.seed_scripts.ingestion import IngestionPipeline
+from scripts.seed_scripts.seed_vectordb import encode_knowledge_chunk_rows, parse_knowledge_chunk_rows
+
+FIELDS = ["id", "content", "college_name", "university_name", "major_name", "chunk_type", "created_at", "embedding"]
+
+
+def write_csv(path: str, rows: int, dimensions: int, seed: int = 0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow({
+                "id": f"chunk-{i}",
+                "content": f"Course MATH {i % 300:03d} articulates to MATH {i % 50}A at the university. " * 4,
+                "college_name": f"College {i % 5}",
+                "university_name": f"University {i % 9}",
+                "major_name": f"Major {i % 40}",
+                "chunk_type": "articulation",
+                "created_at": "2025-01-01 00:00:00",
+                "embedding": json.dumps([round(rng.uniform(-1, 1), 8) for _ in range(dimensions)]),
+            })
+
+
+class SimulatedCollection:
+    def __init__(self, round_trip: float, per_document: float):
+        self.round_trip = round_trip
+        self.per_document = per_document
+        self.count = 0
+
+    async def insert(self, documents) -> int:
+        # pymongo BSON-encodes dicts on the calling thread; pre-encoded bytes pass through
+        for document in documents:
+            if isinstance(document, dict):
+                bson.encode(document)
+        await asyncio.sleep(self.round_trip + self.per_document * len(documents))
+        self.count += len(documents)
+        return len(documents)
+
+
+async def sequential(path: str, collection: SimulatedCollection, batch_size: int) -> int:
+    """The pre-pipeline loop: parse a batch on the event loop, then await its insert."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        batch = []
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await collection.insert(parse_knowledge_chunk_rows(batch)[0])
+                batch = []
+        if batch:
+            await collection.insert(parse_knowledge_chunk_rows(batch)[0])
+    return collection.count
+
+
+async def pipelined(path: str, collection: SimulatedCollection, batch_size: int, workers: int, writers: int) -> int:
+    pipeline = IngestionPipeline(path, encode_knowledge_chunk_rows, collection.insert, batch_size=batch_size,
+                                 parse_workers=workers, writers=writers, progress_interval=3600)
+    stats = await pipeline.run()
+    return stats.documents_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and pipelined CSV ingestion")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--round-trip-ms", type=float, default=40.0)
+    parser.add_argument("--per-document-us", type=float, default=100.0, help="Upload time per ~12 KB document")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "knowledge_chunks.csv")
+        write_csv(path, args.rows, args.dimensions)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 1e6:.0f} MB, {args.parse_workers} parser processes, {args.writers} writers")
+
+        def new_collection():
+            return SimulatedCollection(args.round_trip_ms / 1000, args.per_document_us / 1e6)
+
+        runs = [
+            ("sequential", lambda: sequential(path, new_collection(), args.batch_size)),
+            ("pipelined", lambda: pipelined(path, new_collection(), args.batch_size, args.parse_workers, args.writers)),
+        ]
+        baseline = None
+        for name, run in runs:
+            start = time.perf_counter()
+            written = asyncio.run(run())
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{name:12s} {written:8d} docs  {elapsed:7.2f}s  {written / elapsed:8.0f} rows/s  ({100 * elapsed / baseline:5.1f}% of sequential)")
+
+
+if __name__ == "__main__":
+    main()
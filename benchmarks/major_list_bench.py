@@ -0,0 +1,120 @@
+"""
+Latency of the major list query: the $lookup aggregation vs the materialized
+college_uni_major_pair_view.
+
+    python -m benchmarks.major_list_bench --universities 20 --majors 150
+    python -m benchmarks.major_list_bench --mongo-url mongodb://localhost:27017   # real server
+
+Runs against mongomock by default, whose $lookup is pure Python, so use
+--mongo-url for numbers that carry over to Atlas. Data goes to a scratch
+database (major_list_bench) that is dropped afterwards.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+
+from bson.objectid import ObjectId
+
+from app.db.connection.mongo_connection import MongoDB
+from app.db.services.major_pair_view import MajorPairView
+from app.db.services.mongo_services import CollegeUniMajorPairService
+
+SCRATCH_DB = "major_list_bench"
+
+
+def use_scratch_database(client):
+    """Point MongoDB("main_db") at the scratch database on `client`."""
+    instance = object.__new__(MongoDB)
+    instance._client = client
+    instance._db = client.get_database(SCRATCH_DB)
+    instance._database_name = "main_db"
+    MongoDB._instances["main_db"] = instance
+    return instance._db
+
+
+async def load_dataset(db, colleges: int, universities: int, majors: int, seed: int = 0):
+    rng = random.Random(seed)
+    college_ids = [ObjectId() for _ in range(colleges)]
+    university_ids = [ObjectId() for _ in range(universities)]
+    major_docs = [{"_id": ObjectId(), "id": idx, "major_name": f"Major {idx:04d}"} for idx in range(majors * 2)]
+    pairs = []
+    for college_id in college_ids:
+        for university_id in university_ids:
+            for major in rng.sample(major_docs, majors):
+                pairs.append({
+                    "_id": ObjectId(),
+                    "from_college_id": college_id,
+                    "to_university_id": university_id,
+                    "major_id": major["_id"],
+                    "alter_major_id": rng.choice(major_docs)["_id"] if rng.random() < 0.2 else None,
+                    "is_active": rng.random() < 0.95,
+                })
+    await db["majors"].insert_many(major_docs)
+    await db["college_uni_major_pair"].insert_many(pairs)
+    # What an index-aware deployment of the aggregation would have
+    await db["college_uni_major_pair"].create_index([("from_college_id", 1), ("to_university_id", 1), ("is_active", 1)])
+    return [(str(university_id), str(college_id)) for college_id in college_ids for university_id in university_ids], len(pairs)
+
+
+async def measure(service: CollegeUniMajorPairService, keys, iterations: int):
+    latencies = []
+    for idx in range(iterations):
+        university_id, college_id = keys[idx % len(keys)]
+        start = time.perf_counter()
+        rows = await service.get_majors_with_names(university_id, college_id)
+        latencies.append(1000 * (time.perf_counter() - start))
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "rows": len(rows),
+    }
+
+
+async def main(args):
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    db = use_scratch_database(client)
+    await client.drop_database(SCRATCH_DB)
+
+    try:
+        keys, pair_count = await load_dataset(db, args.colleges, args.universities, args.majors)
+        print(f"{pair_count} pairs, {args.majors} majors per (college, university), {args.iterations} queries each\n")
+        service = CollegeUniMajorPairService()
+
+        MajorPairView.reset()
+        MajorPairView.READY_RECHECK_SECONDS = float("inf")  # stay on the aggregation until refreshed
+        before = await measure(service, keys, args.iterations)
+
+        refresh_start = time.perf_counter()
+        await MajorPairView().refresh()
+        refresh_ms = 1000 * (time.perf_counter() - refresh_start)
+        MajorPairView.reset()
+        after = await measure(service, keys, args.iterations)
+    finally:
+        await client.drop_database(SCRATCH_DB)
+        MongoDB._instances.pop("main_db", None)
+
+    print(f"{'query':14s} {'mean ms':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'rows':>6s}")
+    for name, result in (("$lookup", before), ("view", after)):
+        print(f"{name:14s} {result['mean_ms']:9.3f} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} {result['rows']:6d}")
+    print(f"\nSpeedup {before['mean_ms'] / after['mean_ms']:.1f}x; full view refresh took {refresh_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare major list aggregation and materialized view latency")
+    parser.add_argument("--colleges", type=int, default=2)
+    parser.add_argument("--universities", type=int, default=10)
+    parser.add_argument("--majors", type=int, default=100, help="Majors per (college, university)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--mongo-url", help="Run against this server instead of mongomock")
+    logging.disable(logging.WARNING)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+"""
+End-to-end benchmark for the transfer API against local stand-ins.
+
+    python -m benchmarks.run                      # run and print results
+    python -m benchmarks.run --check              # fail if slower than baseline.json
+    python -m benchmarks.run --update-baseline    # record a new baseline
+
+Results are only comparable on the same machine; refresh the baseline when the
+hardware or the simulated LLM latency changes.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from benchmarks.harness import BenchmarkEnvironment, run_load, compare_to_baseline
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def scenarios(env: BenchmarkEnvironment, total: int):
+    college, pairs = env.ids()
+    plan_requests = env.plan_requests(total + 20)
+    reorder_request = env.reorder_request()
+    universities = env.dataset[("main_db", "universities")]
+
+    async def rag_cold(client, idx):
+        return await client.post("/transfer-plan/v2/rag", json=plan_requests[idx % len(plan_requests)])
+
+    async def rag_cached(client, idx):
+        return await client.post("/transfer-plan/v2/rag", json=plan_requests[idx % 4])
+
+    async def reorder(client, idx):
+        return await client.post("/transfer-plan/v2/reorder", json=reorder_request)
+
+    async def major_list(client, idx):
+        university = universities[idx % len(universities)]
+        return await client.get(f"/transfer-plan/v1/majorlist/{university['_id']}/{college['_id']}")
+
+    async def transfer_matrix(client, idx):
+        return await client.get(f"/transfer-plan/v1/transfer-matrix/{college['_id']}")
+
+    async def list_universities(client, idx):
+        return await client.get("/transfer-plan/v1/universities")
+
+    return {
+        "rag_v2_cold": rag_cold,
+        "rag_v2_cached": rag_cached,
+        "reorder_v2": reorder,
+        "majorlist_v1": major_list,
+        "transfer_matrix_v1": transfer_matrix,
+        "universities_v1": list_universities,
+    }
+
+
+async def main(args) -> int:
+    results = {}
+    async with BenchmarkEnvironment(llm_latency=args.llm_latency, embedding_latency=args.embedding_latency, seed=args.seed) as env:
+        for name, call in scenarios(env, args.requests).items():
+            if args.only and name not in args.only:
+                continue
+            if name == "rag_v2_cold":
+                env.redis.flushall()
+            results[name] = await run_load(env, call, args.requests, args.concurrency, measure_allocations=not args.no_alloc)
+            r = results[name]
+            print(
+                f"{name:18s} {r['throughput_rps']:8.1f} rps  p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  "
+                f"p99 {r['p99_ms']:8.2f}ms  errors {r['errors']}  retained {r['retained_kb_per_request']} KiB/req"
+            )
+            for stage, stats in r["stages"].items():
+                print(f"    {stage:48s} {stats['calls']:5d} calls  {stats['ms_per_request']:8.3f} ms/req")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            print("No baseline.json; run with --update-baseline first")
+            return 1
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        failed = [name for name, r in results.items() if r["errors"]]
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        for name in failed:
+            print(f"ERRORS {name}: {results[name]['errors']} failed requests")
+        return 1 if regressions or failed else 0
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the transfer API with local stand-ins")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", default="lognormal:80:0.4", help="Simulated LLM latency spec")
+    parser.add_argument("--embedding-latency", default="lognormal:10:0.3", help="Simulated embedding latency spec")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="Run only these scenarios")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", help="Also write results to this file")
+    parser.add_argument("--check", action="store_true", help="Compare against baseline.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression as a fraction")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.disable(logging.WARNING)
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,62 @@
+"""
+Cost of PlanValidator.validate per plan, which runs on every generated plan.
+
+    python -m benchmarks.validator_bench --terms 8 --courses-per-term 5
+
+Plans are built from the benchmark catalog (benchmarks.fixtures) in prerequisite
+order, so the validator walks every check without finding violations.
+"""
+import argparse
+import statistics
+import time
+
+from app.services.plan_validator import PlanValidator
+from benchmarks.fixtures import COLLEGE, DEPARTMENTS, build_catalog
+
+TARGET = {"university": "University of California, Los Angeles", "major": "Computer Science"}
+
+
+def build_plan(catalog: dict, terms: int, courses_per_term: int):
+    """Take each department's chain in order, one course per department per term."""
+    term_plan = []
+    for term in range(terms):
+        codes = [f"{dept} {term + 1:03d}" for dept in DEPARTMENTS[:courses_per_term]]
+        term_plan.append({"term": term + 1, "courses": [
+            {"code": code, "name": catalog[code]["name"], "units": catalog[code]["units"],
+             "difficulty": catalog[code]["difficulty"], "prerequisites": catalog[code]["prerequisites"],
+             "satisfies": [], "alternatives": []}
+            for code in codes
+        ]})
+    requirements = [{**TARGET, "requirements": [
+        {"university_courses": [f"REQ {idx}"], "options": [[course["code"]]]}
+        for idx, course in enumerate(course for term in term_plan for course in term["courses"])
+    ]}]
+    plan = {"targets": [TARGET], "source_college": COLLEGE, "term_plan": term_plan, "unscheduled_courses": []}
+    return plan, requirements
+
+
+def main(args):
+    catalog = build_catalog(courses_per_department=max(args.terms, 8))
+    plan, requirements = build_plan(catalog, args.terms, args.courses_per_term)
+    validator = PlanValidator()
+    report = validator.validate(plan, catalog, requirements, args.terms)
+    assert report["valid"], report["violations"]
+
+    rounds = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            validator.validate(plan, catalog, requirements, args.terms)
+        rounds.append(1e6 * (time.perf_counter() - start) / args.iterations)
+
+    print(f"{args.terms} terms x {args.courses_per_term} courses, {args.iterations} validations x {args.rounds} rounds")
+    print(f"validate: {statistics.median(rounds):8.1f} us/plan (median), {min(rounds):8.1f} us/plan (best)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure plan validation cost")
+    parser.add_argument("--terms", type=int, default=4)
+    parser.add_argument("--courses-per-term", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,46 @@
+import os
+import sys
+import asyncio
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from app.db.connection.mongo_connection import MongoDB
+from app.services.cache_invalidation import publish_invalidation
+from RAG.config.settings import get_settings
+from RAG.services.embedding_backfill import EmbeddingBackfill
+
+async def backfill_embeddings(colleges=None, dry_run: bool = False):
+    """Embed knowledge_chunks with missing or stale embeddings"""
+    query = {"college_name": {"$in": colleges}} if colleges else {}
+    backfill = EmbeddingBackfill(get_settings().embedding_backfill)
+    try:
+        stats = await backfill.run(query, dry_run=dry_run)
+        print(f"Embedding backfill{' (dry run)' if dry_run else ''}: {stats.summary()}")
+        return stats
+    except Exception as e:
+        print(f"Error during embedding backfill (rerun to continue where it stopped): {e}")
+        return None
+    finally:
+        # Newly embedded chunks change retrieval results for these colleges' plans, also
+        # when the run stopped after writing some batches
+        if backfill.stats.chunks_updated and not dry_run:
+            publish_invalidation([f"college:{college}" for college in sorted(backfill.colleges)], reason="embedding backfill")
+
+async def main():
+    """Main function to run the backfill"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Embed knowledge_chunks that have no (or a stale) embedding")
+    parser.add_argument("colleges", nargs="*", help="Limit to these colleges (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be embedded and the API calls needed")
+    args = parser.parse_args()
+
+    await backfill_embeddings(args.colleges, dry_run=args.dry_run)
+
+    # Close the connection
+    MongoDB("vector_db").close_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
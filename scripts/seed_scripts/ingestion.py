@@ -0,0 +1,216 @@
+"""
+Pipelined CSV ingestion: reader -> parser processes -> concurrent bulk writers.
+
+The reader streams fixed-size row batches into a bounded queue, parse_batch runs in
+a process pool (JSON/float parsing is CPU bound), and several writer tasks push the
+parsed batches to the database, so parsing and network I/O overlap. Bounded queues
+keep memory flat however large the file is.
+
+A checkpoint file records the row offset below which every batch has been written;
+a rerun against the same (unchanged) file resumes from there. Writers must tolerate
+re-receiving the batch that was in flight when a run died.
+
+With dedupe_column set, the reader drops rows whose value in that column was already
+seen, so the first row in file order wins even when no unique index exists yet.
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# parse_batch(rows) -> (documents, rejected row count); must be a picklable top-level function
+ParseBatch = Callable[[List[Dict[str, str]]], Tuple[List[Dict[str, Any]], int]]
+WriteBatch = Callable[[List[Dict[str, Any]]], Awaitable[int]]
+
+_DONE = None
+
+
+@dataclass
+class IngestionStats:
+    resumed_from: int = 0
+    rows_read: int = 0
+    rows_rejected: int = 0
+    rows_duplicate: int = 0
+    duplicate_keys: List[str] = field(default_factory=list)  # first few, for the report
+    documents_written: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.rows_read} rows read, {self.documents_written} written, {self.rows_rejected} rejected"
+                + (f", {self.rows_duplicate} duplicates skipped" if self.rows_duplicate else "")
+                + f" in {self.elapsed:.1f}s ({self.rows_per_second:.0f} rows/s)"
+                + (f", resumed at row {self.resumed_from}" if self.resumed_from else ""))
+
+
+class Checkpoint:
+    """Committed row offset for one source file, invalidated if the file changes."""
+    def __init__(self, path: str, source_path: str):
+        self.path = path
+        self.source_path = source_path
+
+    def _signature(self) -> Dict[str, Any]:
+        stat = os.stat(self.source_path)
+        return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+    def load(self) -> int:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return 0
+        if saved.get("source") != self._signature():
+            print(f"Ignoring checkpoint {self.path}: {self.source_path} changed since it was written")
+            return 0
+        return int(saved.get("rows", 0))
+
+    def save(self, rows: int):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "source": self._signature()}, f)
+        os.replace(tmp_path, self.path)  # atomic, so a crash never leaves a torn checkpoint
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class IngestionPipeline:
+    def __init__(self, csv_path: str, parse_batch: ParseBatch, write_batch: WriteBatch,
+                 batch_size: int = 1000, parse_workers: Optional[int] = None, writers: int = 4,
+                 queue_size: int = 8, checkpoint_path: Optional[str] = None, progress_interval: float = 5.0,
+                 dedupe_column: Optional[str] = None):
+        self.csv_path = csv_path
+        self.parse_batch = parse_batch
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.writers = writers
+        self.queue_size = queue_size
+        self.checkpoint = Checkpoint(checkpoint_path, csv_path) if checkpoint_path else None
+        self.progress_interval = progress_interval
+        self.dedupe_column = dedupe_column
+
+    async def run(self) -> IngestionStats:
+        start_row = self.checkpoint.load() if self.checkpoint else 0
+        self.stats = IngestionStats(resumed_from=start_row)
+        self._committed = start_row
+        self._finished: Dict[int, int] = {}  # batch index -> end row, written but not yet contiguous
+        self._next_index = 0
+        self._parsers_left = self.parse_workers
+        self._last_progress = time.perf_counter()
+
+        raw_batches = asyncio.Queue(maxsize=self.queue_size)
+        parsed_batches = asyncio.Queue(maxsize=self.queue_size)
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            tasks = [asyncio.create_task(self._read(raw_batches, start_row))]
+            tasks += [asyncio.create_task(self._parse(raw_batches, parsed_batches, pool)) for _ in range(self.parse_workers)]
+            tasks += [asyncio.create_task(self._write(parsed_batches)) for _ in range(self.writers)]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+        if self.checkpoint:
+            self.checkpoint.clear()
+        return self.stats
+
+    async def _read(self, raw_batches: asyncio.Queue, start_row: int):
+        with open(self.csv_path, "r", encoding="utf-8", newline="") as csvfile:
+            reader = csv.DictReader(csvfile)
+            seen = set()
+            # Rows before the checkpoint were written; later copies of them are still duplicates.
+            # Skipped a batch at a time so resuming near the end doesn't hold the prefix in memory.
+            remaining = start_row
+            while remaining:
+                skipped = await asyncio.to_thread(lambda: list(islice(reader, min(remaining, self.batch_size))))
+                if not skipped:
+                    break
+                remaining -= len(skipped)
+                if self.dedupe_column:
+                    seen.update(skipped_row.get(self.dedupe_column) for skipped_row in skipped)
+            row = start_row
+            index = 0
+            while True:
+                rows = await asyncio.to_thread(lambda: list(islice(reader, self.batch_size)))
+                if not rows:
+                    break
+                end_row = row + len(rows)
+                self.stats.rows_read += len(rows)
+                if self.dedupe_column:
+                    rows = self._drop_duplicates(rows, seen)
+                # Sent even when every row was a duplicate, so the checkpoint advances past it
+                await raw_batches.put((index, end_row, rows))
+                row = end_row
+                index += 1
+        for _ in range(self.parse_workers):
+            await raw_batches.put(_DONE)
+
+    def _drop_duplicates(self, rows: List[Dict[str, str]], seen: set) -> List[Dict[str, str]]:
+        kept = []
+        for row in rows:
+            key = row.get(self.dedupe_column)
+            if key in seen:
+                self.stats.rows_duplicate += 1
+                if len(self.stats.duplicate_keys) < 10:
+                    self.stats.duplicate_keys.append(key)
+                continue
+            seen.add(key)
+            kept.append(row)
+        return kept
+
+    async def _parse(self, raw_batches: asyncio.Queue, parsed_batches: asyncio.Queue, pool: ProcessPoolExecutor):
+        loop = asyncio.get_running_loop()
+        while (batch := await raw_batches.get()) is not _DONE:
+            index, end_row, rows = batch
+            documents, rejected = await loop.run_in_executor(pool, self.parse_batch, rows)
+            self.stats.rows_rejected += rejected
+            await parsed_batches.put((index, end_row, documents))
+        # The last parser to finish releases the writers
+        self._parsers_left -= 1
+        if self._parsers_left == 0:
+            for _ in range(self.writers):
+                await parsed_batches.put(_DONE)
+
+    async def _write(self, parsed_batches: asyncio.Queue):
+        while (batch := await parsed_batches.get()) is not _DONE:
+            index, end_row, documents = batch
+            if documents:
+                written = await self.write_batch(documents)  # not `+= await`: that reads the total before awaiting
+                self.stats.documents_written += written
+            self._commit(index, end_row)
+            self._report_progress()
+
+    def _commit(self, index: int, end_row: int):
+        """Advance the checkpoint only over a contiguous prefix of written batches."""
+        self._finished[index] = end_row
+        advanced = False
+        while self._next_index in self._finished:
+            self._committed = self._finished.pop(self._next_index)
+            self._next_index += 1
+            advanced = True
+        if advanced and self.checkpoint:
+            self.checkpoint.save(self._committed)
+
+    def _report_progress(self):
+        now = time.perf_counter()
+        if now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            print(f"  {self.stats.summary()}; checkpoint at row {self._committed}")
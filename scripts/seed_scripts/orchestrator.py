@@ -0,0 +1,118 @@
+"""
+Dependency-ordered seeding: every stage starts as soon as the stages it depends on
+have finished, so independent collections load concurrently.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], Awaitable]
+    depends_on: Sequence[str] = ()
+    status: str = "pending"
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    error: Optional[BaseException] = field(default=None, repr=False)
+
+    @property
+    def duration(self) -> float:
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+async def should_defer_indexes(collection, defer_indexes: bool) -> bool:
+    """
+    Build indexes after a bulk load only when loading into an empty collection; with
+    data already there (a reseed or a resumed load) the unique indexes must exist first.
+    """
+    return defer_indexes and await collection.estimated_document_count() == 0
+
+
+class SeedOrchestrator:
+    def __init__(self, stages: Iterable[Stage], max_concurrency: Optional[int] = None):
+        self.stages: Dict[str, Stage] = {stage.name: stage for stage in stages}
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self._validate()
+
+    def _validate(self):
+        for stage in self.stages.values():
+            unknown = [dep for dep in stage.depends_on if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(unknown)}")
+        visiting, done = set(), set()
+
+        def visit(name: str, path: List[str]):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+    async def run(self) -> bool:
+        """Run every stage; returns False if any stage failed or was skipped."""
+        self._t0 = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage):
+            deps = [tasks[dep] for dep in stage.depends_on]
+            if deps:
+                await asyncio.wait(deps)
+            failed = [dep for dep in stage.depends_on if self.stages[dep].status != "ok"]
+            if failed:
+                stage.status = "skipped"
+                print(f"[{self._elapsed():7.1f}s] {stage.name}: skipped ({', '.join(failed)} did not succeed)")
+                return
+            if self.semaphore:
+                async with self.semaphore:
+                    await self._execute(stage)
+            else:
+                await self._execute(stage)
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+        # Tasks are created before any runs, so every dependency lookup above succeeds
+        await asyncio.gather(*tasks.values())
+        self.report()
+        return all(stage.status == "ok" for stage in self.stages.values())
+
+    async def _execute(self, stage: Stage):
+        stage.started = time.perf_counter()
+        print(f"[{self._elapsed():7.1f}s] {stage.name}: started")
+        try:
+            await stage.run()
+            stage.status = "ok"
+        except Exception as e:
+            stage.status = "failed"
+            stage.error = e
+            print(f"[{self._elapsed():7.1f}s] {stage.name}: failed: {e}")
+        finally:
+            stage.finished = time.perf_counter()
+        if stage.status == "ok":
+            print(f"[{self._elapsed():7.1f}s] {stage.name}: done in {stage.duration:.1f}s")
+
+    def _elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def report(self):
+        total = self._elapsed()
+        serial = sum(stage.duration for stage in self.stages.values())
+        print("\n" + "=" * 60)
+        print(f"{'stage':28s} {'status':8s} {'start':>8s} {'duration':>9s}")
+        ordered = sorted(self.stages.values(), key=lambda s: (s.started is None, s.started or 0))
+        for stage in ordered:
+            start = f"{stage.started - self._t0:7.1f}s" if stage.started is not None else "       -"
+            print(f"{stage.name:28s} {stage.status:8s} {start:>8s} {stage.duration:8.1f}s")
+        print(f"Wall time {total:.1f}s (stages add up to {serial:.1f}s)")
+        print("=" * 60)
@@ -0,0 +1,163 @@
+"""
+Incremental writes of scraped courses into course_prerequisite.pcc_course_prerequisites.
+
+Departments stream in through add_department() as the scraper parses them. A course
+is written only when its own fields changed, detected with a `source_hash` like the
+CSV sync in sync.py. finish() then derives `unlocks` (the reverse prerequisite edges)
+from the complete graph. It updates just the courses whose unlocks differ and deletes
+courses that left the catalog. When anything changed it bumps
+prerequisite_versions[college].version, which readers can key their caches on.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import DeleteMany, ReturnDocument, UpdateOne
+from app.db.connection.mongo_connection import MongoDB
+
+PREREQUISITE_DATABASE = "course_prerequisite"
+PREREQUISITE_COLLECTION = "pcc_course_prerequisites"
+VERSION_COLLECTION = "prerequisite_versions"
+COURSE_FIELDS = ("name", "units", "difficulty", "assessment_allow", "prerequisites", "department")
+
+
+def normalize_prerequisites(groups) -> List[List[str]]:
+    """OR-groups of AND-ed course codes; the scraper yields tuples, JSON yields lists."""
+    return [list(group) for group in groups or [] if group]
+
+
+def course_hash(course: Dict[str, Any]) -> str:
+    canonical = json.dumps({name: course.get(name) for name in COURSE_FIELDS}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def compute_unlocks(graph: Dict[str, List[List[str]]]) -> Dict[str, List[str]]:
+    """Reverse edges: the courses each course is a prerequisite of, within the catalog."""
+    unlocks = {code: set() for code in graph}
+    for code, groups in graph.items():
+        for group in groups:
+            for prereq in group:
+                if prereq in unlocks and prereq != code:
+                    unlocks[prereq].add(code)
+    return {code: sorted(codes) for code, codes in unlocks.items()}
+
+
+@dataclass
+class PrerequisiteSyncStats:
+    departments: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    unlocks_updated: int = 0
+    deleted: int = 0
+    version: Optional[int] = None  # college version after the sync
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.unlocks_updated + self.deleted
+
+    def summary(self) -> str:
+        return (f"{self.departments} departments: {self.inserted} inserted, {self.updated} updated, "
+                f"{self.unchanged} unchanged, {self.unlocks_updated} unlocks updated, {self.deleted} deleted"
+                + (f"; version {self.version}" if self.version is not None else ""))
+
+
+class PrerequisiteSync:
+    def __init__(self, college: str, collection=None, versions=None, batch_size: int = 500, dry_run: bool = False):
+        mongo = MongoDB(PREREQUISITE_DATABASE)
+        self.college = college
+        self.collection = collection if collection is not None else mongo.get_collection(PREREQUISITE_COLLECTION)
+        self.versions = versions if versions is not None else mongo.get_collection(VERSION_COLLECTION)
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.stats = PrerequisiteSyncStats()
+        self._existing: Optional[Dict[str, Dict[str, Any]]] = None
+        self._graph: Dict[str, List[List[str]]] = {}  # scraped courses -> prerequisites
+        self._operations: List = []
+
+    async def start(self):
+        projection = {"_id": 0, "course_code": 1, "source_hash": 1, "prerequisites": 1, "unlocks": 1}
+        self._existing = {}
+        async for doc in self.collection.find({"college": self.college}, projection):
+            self._existing[doc["course_code"]] = doc
+
+    async def add_department(self, slug: str, courses: Dict[str, Dict[str, Any]]):
+        """Queue writes for the courses of one department whose fields changed."""
+        if self._existing is None:
+            await self.start()
+        self.stats.departments += 1
+        for code, data in courses.items():
+            course = {name: data.get(name) for name in COURSE_FIELDS}
+            course["prerequisites"] = normalize_prerequisites(course["prerequisites"])
+            self._graph[code] = course["prerequisites"]
+            source_hash = course_hash(course)
+            current = self._existing.get(code)
+            if current is not None and current.get("source_hash") == source_hash:
+                self.stats.unchanged += 1
+                continue
+            self._operations.append(UpdateOne(
+                {"college": self.college, "course_code": code},
+                {"$set": {"college": self.college, "course_code": code, **course, "source_hash": source_hash},
+                 "$setOnInsert": {"unlocks": []}},
+                upsert=True
+            ))
+            if current is None:
+                self.stats.inserted += 1
+            else:
+                self.stats.updated += 1
+        if len(self._operations) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self):
+        # Swap first: departments arrive concurrently and must not share a batch mid-write
+        operations, self._operations = self._operations, []
+        if operations and not self.dry_run:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def finish(self, delete_missing: bool = True) -> PrerequisiteSyncStats:
+        """
+        Rebuild unlocks and bump the college version. Pass delete_missing=False unless every
+        department of the catalog was seen, or courses of a department that failed to scrape
+        would be deleted.
+        """
+        if self._existing is None:
+            await self.start()
+        # Unordered bulk writes may run in any order, so new courses must exist before their unlocks are set
+        await self._flush()
+        graph = dict(self._graph)
+        missing = [code for code in self._existing if code not in graph]
+        if delete_missing:
+            if missing:
+                self._operations.append(DeleteMany({"college": self.college, "course_code": {"$in": missing}}))
+            self.stats.deleted = len(missing)
+        else:
+            for code in missing:
+                graph[code] = normalize_prerequisites(self._existing[code].get("prerequisites"))
+
+        for code, unlocks in compute_unlocks(graph).items():
+            current = self._existing.get(code, {}).get("unlocks") or []
+            if sorted(current) != unlocks:
+                self._operations.append(UpdateOne(
+                    {"college": self.college, "course_code": code}, {"$set": {"unlocks": unlocks}}
+                ))
+                self.stats.unlocks_updated += 1
+        await self._flush()
+
+        if self.stats.changed and not self.dry_run:
+            doc = await self.versions.find_one_and_update(
+                {"_id": self.college},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow(), "course_count": len(graph)}},
+                upsert=True, return_document=ReturnDocument.AFTER
+            )
+            self.stats.version = doc["version"]
+        else:
+            doc = await self.versions.find_one({"_id": self.college})
+            self.stats.version = doc["version"] if doc else None
+        return self.stats
+
+    async def run(self, departments: Iterable[Tuple[str, Dict[str, Dict[str, Any]]]],
+                  delete_missing: bool = True) -> PrerequisiteSyncStats:
+        for slug, courses in departments:
+            await self.add_department(slug, courses)
+        return await self.finish(delete_missing)
@@ -1,47 +1,122 @@
 import os
 import sys
 import asyncio
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
-from scripts.seed_scripts.seed_maindb import main as seed_main_db
-from scripts.seed_scripts.seed_vectordb import main as seed_vector_db
-from scripts.seed_scripts.seed_embedded_cache import main as seed_embedding_cache
-from seed_mongo_db import seed_mongodb  # Original course prerequisite seeding
+from app.db.connection.mongo_connection import MongoDB
+from app.services.cache_invalidation import publish_invalidation
+from scripts.seed_scripts.orchestrator import SeedOrchestrator, Stage
+from scripts.seed_scripts.seed_maindb import (
+    MAIN_DB_CSV_FILES, MAIN_DB_RESEED_TAGS,
+    seed_colleges_from_csv, seed_universities_from_csv, seed_majors_from_csv, refresh_major_pair_view
+)
+from scripts.seed_scripts.seed_vectordb import seed_vector_db_from_csv
+from scripts.seed_scripts.seed_embedded_cache import seed_embedding_cache_from_csv
+from scripts.seed_scripts.seed_articulations import seed_articulations
+from scripts.seed_scripts.backfill_embeddings import backfill_embeddings
+from scripts.seed_scripts.seed_mongo_db import seed_mongodb
+
+KNOWLEDGE_CHUNKS_CSV = "csv_exports/vector_db/knowledge_chunks_v2.csv"
+EMBEDDING_CACHE_CSV = "csv_exports/vector_db/embedding_cache.csv"
+MAIN_DB_STAGES = ("colleges", "universities", "majors", "major_pair_view")
+
+
+async def seed_from_csv(name, seed, csv_file_path):
+    if await seed(csv_file_path, defer_indexes=True) is None:
+        raise RuntimeError(f"{name} seeding did not finish")
+
+
+async def seed_knowledge_chunks():
+    if await seed_vector_db_from_csv(KNOWLEDGE_CHUNKS_CSV, defer_indexes=True) is None:
+        raise RuntimeError("knowledge_chunks ingestion did not finish")
+
+
+async def seed_prerequisites():
+    if await seed_mongodb() is None:
+        raise RuntimeError("prerequisite sync did not run")
+
+
+async def backfill_chunk_embeddings():
+    if await backfill_embeddings() is None:
+        raise RuntimeError("embedding backfill did not finish")
+
+
+def build_stages():
+    """
+    Seeding DAG: every collection loads independently except the embedding backfill,
+    which reuses the seeded embedding cache, the articulation table, which is
+    extracted from the knowledge chunks and checked against the prerequisites, and
+    the major pair view, which inlines the seeded major names.
+    """
+    return [
+        Stage("colleges", lambda: seed_from_csv("colleges", seed_colleges_from_csv, MAIN_DB_CSV_FILES["colleges"])),
+        Stage("universities", lambda: seed_from_csv("universities", seed_universities_from_csv,
+                                                    MAIN_DB_CSV_FILES["universities"])),
+        Stage("majors", lambda: seed_from_csv("majors", seed_majors_from_csv, MAIN_DB_CSV_FILES["majors"])),
+        Stage("major_pair_view", refresh_major_pair_view, depends_on=("majors",)),
+        Stage("knowledge_chunks", seed_knowledge_chunks),
+        Stage("embedding_cache", lambda: seed_from_csv("embedding_cache", seed_embedding_cache_from_csv,
+                                                       EMBEDDING_CACHE_CSV)),
+        Stage("prerequisites", seed_prerequisites),
+        Stage("embedding_backfill", backfill_chunk_embeddings, depends_on=("knowledge_chunks", "embedding_cache")),
+        Stage("articulations", seed_articulations, depends_on=("knowledge_chunks", "prerequisites")),
+    ]
+
+
+def select_stages(stages, only=None, skip=None):
+    """
+    Keep the stages named in `only` (all by default) minus those in `skip`. Dependencies
+    on dropped stages are removed, i.e. those collections are taken as already seeded.
+    """
+    names = {stage.name for stage in stages}
+    unknown = (set(only or ()) | set(skip or ())) - names
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(sorted(names))})")
+    selected = [stage for stage in stages
+                if (not only or stage.name in only) and stage.name not in (skip or ())]
+    kept = {stage.name for stage in selected}
+    for stage in selected:
+        stage.depends_on = tuple(dep for dep in stage.depends_on if dep in kept)
+    return selected
+
 
 async def main():
     """Main function to seed all MongoDB databases"""
     load_dotenv()
-    
+
+    parser = argparse.ArgumentParser(description="Seed every MongoDB collection, independent ones concurrently")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="Run only these stages")
+    parser.add_argument("--skip", nargs="+", metavar="STAGE", help="Don't run these stages")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Stages running at once (default: unlimited)")
+    parser.add_argument("--list", action="store_true", help="Print the stages and their dependencies, then exit")
+    args = parser.parse_args()
+
+    stages = select_stages(build_stages(), args.only, args.skip)
+    if args.list:
+        for stage in stages:
+            print(f"{stage.name}{' <- ' + ', '.join(stage.depends_on) if stage.depends_on else ''}")
+        return
+
     print("=" * 60)
     print("Starting complete MongoDB seeding process...")
     print("=" * 60)
-    
-    try:
-        # 1. Seed main database (colleges, universities, majors)
-        print("\n1. Seeding main database...")
-        await seed_main_db()
-        
-        # 2. Seed vector database (knowledge chunks)
-        # print("\n2. Seeding vector database with knowledge chunks...")
-        # await seed_vector_db()
-        
-        # 3. Seed embedding cache
-        # print("\n3. Seeding embedding cache...")
-        # await seed_embedding_cache()
-        
-        # 4. Seed course prerequisites (original)
-        # print("\n4. Seeding course prerequisites...")
-        # await seed_mongodb()
-        
-        print("\n" + "=" * 60)
-        print("All MongoDB databases seeded successfully!")
-        print("=" * 60)
-        
-    except Exception as e:
-        print(f"\nError during seeding process: {e}")
-        raise
+
+    orchestrator = SeedOrchestrator(stages, max_concurrency=args.max_concurrency)
+    succeeded = await orchestrator.run()
+
+    # Names and ids may have changed under every cached list and plan
+    if any(orchestrator.stages[name].status == "ok" for name in MAIN_DB_STAGES if name in orchestrator.stages):
+        publish_invalidation(MAIN_DB_RESEED_TAGS, reason="main_db reseed")
+
+    MongoDB.close_all_connections()
+
+    if not succeeded:
+        print("\nSeeding finished with failed or skipped stages")
+        sys.exit(1)
+    print("\nAll MongoDB databases seeded successfully!")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
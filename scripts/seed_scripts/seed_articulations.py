@@ -0,0 +1,47 @@
+import os
+import sys
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from app.db.connection.mongo_connection import MongoDB
+from RAG.db.articulation_store import ArticulationStore
+from app.services.cache_invalidation import publish_invalidation
+
+async def seed_articulations(colleges=None):
+    """Extract the structured articulation table from knowledge_chunks"""
+    print("Starting articulation extraction from knowledge_chunks...")
+
+    store = ArticulationStore()
+    await store.create_indexes()
+
+    if not colleges:
+        chunks = MongoDB("vector_db").get_collection("knowledge_chunks")
+        colleges = await chunks.distinct("college_name", {"chunk_type": "articulation"})
+
+    for college in colleges:
+        try:
+            stats = await store.rebuild_from_chunks(college)
+            publish_invalidation([f"college:{college}"], reason="articulation reseed")
+            print(
+                f"{college}: {stats['rows']} requirement rows, "
+                f"{stats['complete_targets']}/{stats['targets']} targets fully parsed"
+            )
+        except Exception as e:
+            print(f"Error extracting articulations for {college}: {e}")
+
+    print("Articulation extraction completed")
+
+async def main():
+    """Main function to run the extraction process"""
+    load_dotenv()
+
+    await seed_articulations(sys.argv[1:])
+
+    # Close the connection
+    mongo = MongoDB("vector_db")
+    mongo.close_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
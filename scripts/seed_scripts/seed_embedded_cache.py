@@ -2,6 +2,7 @@ import os
 import sys
 import csv
 import asyncio
+import argparse
 from datetime import datetime
 from typing import List, Dict, Any
 import json
@@ -10,10 +11,47 @@ import hashlib
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError
 from app.db.connection.mongo_connection import MongoDB
+from scripts.seed_scripts.orchestrator import should_defer_indexes
+from scripts.seed_scripts.sync import CollectionSync
 
-async def seed_embedding_cache_from_csv(csv_file_path: str):
-    """Seed embedding_cache collection with data from CSV file"""
+DUPLICATE_KEY = 11000
+
+def embedding_cache_document(row: Dict[str, str]) -> Dict[str, Any]:
+    """Turn one CSV row into an embedding_cache document"""
+    # Parse embedding from string to list if it's stored as JSON string
+    embedding = row['embedding']
+    if isinstance(embedding, str):
+        embedding = json.loads(embedding)
+
+    # Parse created_at if it exists and is a string
+    created_at = datetime.now()  # Default value
+    if 'created_at' in row and row['created_at']:
+        created_at_str = row['created_at']
+        if isinstance(created_at_str, str):
+            try:
+                created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
+            except ValueError:
+                try:
+                    created_at = datetime.strptime(created_at_str, '%Y-%m-%d %H:%M:%S')
+                except ValueError:
+                    created_at = datetime.now()
+
+    return {
+        "content_hash": row['content_hash'],
+        "content": row['content'],
+        "embedding": embedding,
+        "created_at": created_at
+    }
+
+async def create_embedding_cache_indexes(collection):
+    """Create indexes for better performance"""
+    await collection.create_index([("content_hash", 1)], unique=True)
+    await collection.create_index([("created_at", 1)])
+
+async def seed_embedding_cache_from_csv(csv_file_path: str, defer_indexes: bool = False):
+    """Seed embedding_cache collection from CSV file; defer_indexes builds the indexes after the load; returns the document count, or None on failure"""
     print(f"Starting migration of embedding cache from CSV file: {csv_file_path}")
     
     if not os.path.exists(csv_file_path):
@@ -28,11 +66,12 @@ async def seed_embedding_cache_from_csv(csv_file_path: str):
     # Uncomment the next line if you want to clear existing data
     # await collection.drop()
     
-    # Create indexes for better performance
-    await collection.create_index([("content_hash", 1)], unique=True)
-    await collection.create_index([("created_at", 1)])
+    deferred = await should_defer_indexes(collection, defer_indexes)
+    if not deferred:
+        await create_embedding_cache_indexes(collection)
     
     documents = []
+    seen = set()  # content hashes already read; the unique index may not exist yet
     
     try:
         with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
@@ -40,45 +79,26 @@ async def seed_embedding_cache_from_csv(csv_file_path: str):
             
             for row_number, row in enumerate(reader, start=1):
                 try:
-                    # Parse embedding from string to list if it's stored as JSON string
-                    embedding = row['embedding']
-                    if isinstance(embedding, str):
-                        try:
-                            embedding = json.loads(embedding)
-                        except json.JSONDecodeError:
-                            print(f"Warning: Could not parse embedding for row {row_number}, skipping...")
-                            continue
-                    
-                    # Parse created_at if it exists and is a string
-                    created_at = datetime.now()  # Default value
-                    if 'created_at' in row and row['created_at']:
-                        created_at_str = row['created_at']
-                        if isinstance(created_at_str, str):
-                            try:
-                                created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-                            except ValueError:
-                                try:
-                                    created_at = datetime.strptime(created_at_str, '%Y-%m-%d %H:%M:%S')
-                                except ValueError:
-                                    created_at = datetime.now()
-                    
-                    document = {
-                        "content_hash": row['content_hash'],
-                        "content": row['content'],
-                        "embedding": embedding,
-                        "created_at": created_at
-                    }
+                    try:
+                        document = embedding_cache_document(row)
+                    except json.JSONDecodeError:
+                        print(f"Warning: Could not parse embedding for row {row_number}, skipping...")
+                        continue
                     
+                    if document["content_hash"] in seen:
+                        print(f"Skipping duplicate content_hash in row {row_number}")
+                        continue
+                    seen.add(document["content_hash"])
                     documents.append(document)
-                    
-                    # Insert in batches of 1000 for better performance
-                    if len(documents) >= 1000:
-                        await insert_batch(collection, documents)
-                        documents = []
                         
                 except Exception as e:
                     print(f"Error processing row {row_number}: {e}")
                     continue
+                
+                # Insert in batches of 1000 for better performance
+                if len(documents) >= 1000:
+                    await insert_batch(collection, documents)
+                    documents = []
             
             # Insert remaining documents
             if documents:
@@ -88,26 +108,56 @@ async def seed_embedding_cache_from_csv(csv_file_path: str):
         print(f"Error reading CSV file: {e}")
         return
     
+    if deferred:
+        await create_embedding_cache_indexes(collection)
+
     # Get final count
     total_count = await collection.count_documents({})
     print(f"Embedding cache migration completed. Total documents in collection: {total_count}")
+    return total_count
+
+async def sync_embedding_cache_from_csv(csv_file_path: str, dry_run: bool = False):
+    """Upsert only new or changed embedding_cache rows from the CSV file"""
+    print(f"Syncing embedding cache with CSV file: {csv_file_path}")
+
+    if not os.path.exists(csv_file_path):
+        print(f"Error: CSV file not found at {csv_file_path}")
+        return
+
+    collection = MongoDB("vector_db").get_collection("embedding_cache")
+    # The API adds entries at runtime, so rows missing from the CSV are kept
+    sync = CollectionSync("vector_db", collection, "content_hash", embedding_cache_document,
+                          delete_missing=False, dry_run=dry_run)
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as csvfile:
+        stats = await sync.run(csv.DictReader(csvfile))
+    print(f"embedding_cache sync{' (dry run)' if dry_run else ''}: {stats.summary()}")
+    return stats
 
 async def insert_batch(collection, documents: List[Dict[str, Any]]):
-    """Insert a batch of documents into the collection"""
+    """Insert a batch of documents; entries already cached are skipped, any other error raises"""
     try:
         result = await collection.insert_many(documents, ordered=False)
         print(f"Successfully inserted batch of {len(result.inserted_ids)} documents")
-    except Exception as e:
-        print(f"Error inserting batch: {e}")
+    except BulkWriteError as e:
+        if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+        print(f"Inserted {e.details.get('nInserted', 0)} documents, skipped already cached ones")
 
 async def main():
     """Main function to run the seeding process"""
     load_dotenv()
     
+    parser = argparse.ArgumentParser(description="Seed vector_db.embedding_cache from CSV")
     # Path to the embedding cache CSV file
-    csv_file_path = "csv_exports/vector_db/embedding_cache.csv"
+    parser.add_argument("csv_file_path", nargs="?", default="csv_exports/vector_db/embedding_cache.csv")
+    parser.add_argument("--sync", action="store_true", help="Write only rows that changed since the last sync")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync: report changes without writing")
+    args, _ = parser.parse_known_args()
     
-    await seed_embedding_cache_from_csv(csv_file_path)
+    if args.sync:
+        await sync_embedding_cache_from_csv(args.csv_file_path, dry_run=args.dry_run)
+    else:
+        await seed_embedding_cache_from_csv(args.csv_file_path, defer_indexes=True)
     
     # Close the connection
     mongo = MongoDB("vector_db")
@@ -2,15 +2,102 @@ import os
 import sys
 import csv
 import asyncio
-from typing import List, Dict, Any
+import argparse
+from typing import Any, Dict, List, Sequence, Set
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError
 from app.db.connection.mongo_connection import MongoDB
+from app.db.services.major_pair_view import MajorPairView
+from app.services.cache_invalidation import publish_invalidation
+from scripts.seed_scripts.orchestrator import should_defer_indexes
+from scripts.seed_scripts.sync import CollectionSync, SyncStats
 
-async def seed_colleges_from_csv(csv_file_path: str):
-    """Seed colleges collection with data from CSV file"""
+def college_document(row: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "id": int(row['id']),
+        "college_name": row['college_name']
+    }
+
+def university_document(row: Dict[str, str]) -> Dict[str, Any]:
+    # Convert is_uc to boolean
+    is_uc = row['is_uc'].lower() in ('true', '1', 'yes')
+
+    return {
+        "id": int(row['id']),
+        "university_name": row['university_name'],
+        "is_uc": is_uc
+    }
+
+def major_document(row: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "id": int(row['id']),
+        "major_name": row['major_name']
+    }
+
+DUPLICATE_KEY = 11000
+
+# collection -> (document builder, field holding the name used in cache tags)
+MAIN_DB_COLLECTIONS = {
+    "colleges": (college_document, "college_name"),
+    "universities": (university_document, "university_name"),
+    "majors": (major_document, "major_name"),
+}
+
+# collection -> college_uni_major_pair fields holding its _id; a sync won't delete referenced rows
+MAIN_DB_PAIR_REFERENCES = {
+    "colleges": ("from_college_id",),
+    "universities": ("to_university_id",),
+    "majors": ("major_id", "alter_major_id"),
+}
+
+MAIN_DB_CSV_FILES = {
+    "colleges": "csv_exports/main_db/colleges.csv",
+    "universities": "csv_exports/main_db/universities.csv",
+    "majors": "csv_exports/main_db/majors.csv"
+}
+
+# Cached lists and plans whose names and ids a reseed may change
+MAIN_DB_RESEED_TAGS = ["kind:colleges_list", "kind:universities_list", "kind:major_list", "kind:transfer_plan"]
+
+# Fields with a unique index; deferred indexes don't exist yet to reject repeated CSV rows
+MAIN_DB_UNIQUE_FIELDS = {
+    "colleges": ("id", "college_name"),
+    "universities": ("id", "university_name"),
+    "majors": ("id",),
+}
+
+def drop_duplicates(documents: List[Dict[str, Any]], unique_fields: Sequence[str], collection_name: str) -> List[Dict[str, Any]]:
+    """Keep the first document for each value of the unique fields, as the unique indexes would"""
+    seen = {name: set() for name in unique_fields}
+    kept = []
+    for document in documents:
+        clash = next((name for name in unique_fields if document[name] in seen[name]), None)
+        if clash:
+            print(f"Skipping duplicate {collection_name} row with {clash}={document[clash]!r}")
+            continue
+        for name in unique_fields:
+            seen[name].add(document[name])
+        kept.append(document)
+    return kept
+
+async def create_college_indexes(collection):
+    await collection.create_index([("id", 1)], unique=True)
+    await collection.create_index([("college_name", 1)], unique=True)
+
+async def create_university_indexes(collection):
+    await collection.create_index([("id", 1)], unique=True)
+    await collection.create_index([("university_name", 1)], unique=True)
+    await collection.create_index([("is_uc", 1)])
+
+async def create_major_indexes(collection):
+    await collection.create_index([("id", 1)], unique=True)
+    await collection.create_index([("major_name", 1)])
+
+async def seed_colleges_from_csv(csv_file_path: str, defer_indexes: bool = False):
+    """Seed colleges collection from CSV file; defer_indexes builds the indexes after the load; returns the document count, or None on failure"""
     print(f"Starting migration of colleges from CSV file: {csv_file_path}")
     
     if not os.path.exists(csv_file_path):
@@ -24,9 +111,9 @@ async def seed_colleges_from_csv(csv_file_path: str):
     # Optional: Drop existing collection to start fresh
     # await collection.drop()
     
-    # Create indexes
-    await collection.create_index([("id", 1)], unique=True)
-    await collection.create_index([("college_name", 1)], unique=True)
+    deferred = await should_defer_indexes(collection, defer_indexes)
+    if not deferred:
+        await create_college_indexes(collection)
     
     documents = []
     
@@ -36,11 +123,7 @@ async def seed_colleges_from_csv(csv_file_path: str):
             
             for row_number, row in enumerate(reader, start=1):
                 try:
-                    document = {
-                        "id": int(row['id']),
-                        "college_name": row['college_name']
-                    }
-                    documents.append(document)
+                    documents.append(college_document(row))
                     
                 except Exception as e:
                     print(f"Error processing row {row_number}: {e}")
@@ -48,18 +131,22 @@ async def seed_colleges_from_csv(csv_file_path: str):
             
             # Insert all documents
             if documents:
-                await insert_batch(collection, documents, "colleges")
+                await insert_batch(collection, drop_duplicates(documents, MAIN_DB_UNIQUE_FIELDS["colleges"], "colleges"), "colleges")
                 
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return
     
+    if deferred:
+        await create_college_indexes(collection)
+
     # Get final count
     total_count = await collection.count_documents({})
     print(f"Colleges migration completed. Total documents: {total_count}")
+    return total_count
 
-async def seed_universities_from_csv(csv_file_path: str):
-    """Seed universities collection with data from CSV file"""
+async def seed_universities_from_csv(csv_file_path: str, defer_indexes: bool = False):
+    """Seed universities collection from CSV file; defer_indexes builds the indexes after the load; returns the document count, or None on failure"""
     print(f"Starting migration of universities from CSV file: {csv_file_path}")
     
     if not os.path.exists(csv_file_path):
@@ -73,10 +160,9 @@ async def seed_universities_from_csv(csv_file_path: str):
     # Optional: Drop existing collection to start fresh
     # await collection.drop()
     
-    # Create indexes
-    await collection.create_index([("id", 1)], unique=True)
-    await collection.create_index([("university_name", 1)], unique=True)
-    await collection.create_index([("is_uc", 1)])
+    deferred = await should_defer_indexes(collection, defer_indexes)
+    if not deferred:
+        await create_university_indexes(collection)
     
     documents = []
     
@@ -86,15 +172,7 @@ async def seed_universities_from_csv(csv_file_path: str):
             
             for row_number, row in enumerate(reader, start=1):
                 try:
-                    # Convert is_uc to boolean
-                    is_uc = row['is_uc'].lower() in ('true', '1', 'yes')
-                    
-                    document = {
-                        "id": int(row['id']),
-                        "university_name": row['university_name'],
-                        "is_uc": is_uc
-                    }
-                    documents.append(document)
+                    documents.append(university_document(row))
                     
                 except Exception as e:
                     print(f"Error processing row {row_number}: {e}")
@@ -102,18 +180,22 @@ async def seed_universities_from_csv(csv_file_path: str):
             
             # Insert all documents
             if documents:
-                await insert_batch(collection, documents, "universities")
+                await insert_batch(collection, drop_duplicates(documents, MAIN_DB_UNIQUE_FIELDS["universities"], "universities"), "universities")
                 
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return
     
+    if deferred:
+        await create_university_indexes(collection)
+
     # Get final count
     total_count = await collection.count_documents({})
     print(f"Universities migration completed. Total documents: {total_count}")
+    return total_count
 
-async def seed_majors_from_csv(csv_file_path: str):
-    """Seed majors collection with data from CSV file"""
+async def seed_majors_from_csv(csv_file_path: str, defer_indexes: bool = False):
+    """Seed majors collection from CSV file; defer_indexes builds the indexes after the load; returns the document count, or None on failure"""
     print(f"Starting migration of majors from CSV file: {csv_file_path}")
     
     if not os.path.exists(csv_file_path):
@@ -127,9 +209,9 @@ async def seed_majors_from_csv(csv_file_path: str):
     # Optional: Drop existing collection to start fresh
     # await collection.drop()
     
-    # Create indexes
-    await collection.create_index([("id", 1)], unique=True)
-    await collection.create_index([("major_name", 1)])
+    deferred = await should_defer_indexes(collection, defer_indexes)
+    if not deferred:
+        await create_major_indexes(collection)
     
     documents = []
     
@@ -139,11 +221,7 @@ async def seed_majors_from_csv(csv_file_path: str):
             
             for row_number, row in enumerate(reader, start=1):
                 try:
-                    document = {
-                        "id": int(row['id']),
-                        "major_name": row['major_name']
-                    }
-                    documents.append(document)
+                    documents.append(major_document(row))
                     
                 except Exception as e:
                     print(f"Error processing row {row_number}: {e}")
@@ -151,41 +229,113 @@ async def seed_majors_from_csv(csv_file_path: str):
             
             # Insert all documents
             if documents:
-                await insert_batch(collection, documents, "majors")
+                await insert_batch(collection, drop_duplicates(documents, MAIN_DB_UNIQUE_FIELDS["majors"], "majors"), "majors")
                 
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return
     
+    if deferred:
+        await create_major_indexes(collection)
+
     # Get final count
     total_count = await collection.count_documents({})
     print(f"Majors migration completed. Total documents: {total_count}")
+    return total_count
+
+def pair_references(mongo: MongoDB, fields: Sequence[str]):
+    """Callback for CollectionSync: which of the given _ids college_uni_major_pair still points at"""
+    pairs = mongo.get_collection("college_uni_major_pair")
+
+    async def referenced(object_ids: List[Any]) -> Set[Any]:
+        found = set()
+        query = {"$or": [{name: {"$in": object_ids}} for name in fields]}
+        async for pair in pairs.find(query, {name: 1 for name in fields}):
+            found.update(pair.get(name) for name in fields)
+        return found
+
+    return referenced
+
+async def sync_main_db(csv_files: Dict[str, str], dry_run: bool = False, delete_missing: bool = False) -> Dict[str, SyncStats]:
+    """
+    Apply only the colleges, universities and majors that changed since the last sync.
+    Rows absent from the CSVs are deleted only with delete_missing, and never while a
+    college_uni_major_pair row still references them.
+    """
+    mongo = MongoDB("main_db")
+    results = {}
+    tags = set()
+    for collection_name, (build_document, name_field) in MAIN_DB_COLLECTIONS.items():
+        csv_file_path = csv_files[collection_name]
+        if not os.path.exists(csv_file_path):
+            print(f"Error: CSV file not found at {csv_file_path}")
+            continue
+
+        sync = CollectionSync(
+            "main_db", mongo.get_collection(collection_name), "id", build_document,
+            key_from_row=lambda row: int(row['id']), delete_missing=delete_missing,
+            tag_fields=(name_field,), dry_run=dry_run,
+            referenced=pair_references(mongo, MAIN_DB_PAIR_REFERENCES[collection_name])
+        )
+        with open(csv_file_path, 'r', encoding='utf-8', newline='') as csvfile:
+            stats = await sync.run(csv.DictReader(csvfile))
+        print(f"{collection_name} sync{' (dry run)' if dry_run else ''}: {stats.summary()}")
+        results[collection_name] = stats
+        tags.update(stats.tags)
+
+    if tags and not dry_run:
+        # Refreshed first, so major lists refilled after the invalidation read the new names
+        await refresh_major_pair_view()
+        publish_invalidation(tags, reason="main_db sync")
+    return results
+
+async def refresh_major_pair_view():
+    """Rebuild college_uni_major_pair_view so major lists pick up renamed or reseeded majors"""
+    rows = await MajorPairView().refresh()
+    print(f"Major pair view refreshed: {rows} rows")
 
 async def insert_batch(collection, documents: List[Dict[str, Any]], collection_name: str):
-    """Insert a batch of documents into the collection"""
+    """Insert a batch of documents; rows already present (a reseed) are skipped, any other error raises"""
     try:
         result = await collection.insert_many(documents, ordered=False)
         print(f"Successfully inserted {len(result.inserted_ids)} {collection_name} documents")
-    except Exception as e:
-        print(f"Error inserting {collection_name} batch: {e}")
+    except BulkWriteError as e:
+        if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+        print(f"Inserted {e.details.get('nInserted', 0)} {collection_name} documents, skipped existing ones")
 
 async def main():
     """Main function to run the seeding process"""
     load_dotenv()
     
     # Define CSV file paths
-    csv_files = {
-        "colleges": "csv_exports/main_db/colleges.csv",
-        "universities": "csv_exports/main_db/universities.csv", 
-        "majors": "csv_exports/main_db/majors.csv"
-    }
+    csv_files = MAIN_DB_CSV_FILES
     
-    # Seed each collection
-    await seed_colleges_from_csv(csv_files["colleges"])
-    await seed_universities_from_csv(csv_files["universities"])
-    await seed_majors_from_csv(csv_files["majors"])
-    
-    print("\nAll main_db collections seeded successfully!")
+    parser = argparse.ArgumentParser(description="Seed main_db colleges, universities and majors from CSV")
+    parser.add_argument("--sync", action="store_true", help="Write only rows that changed since the last sync")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync: report changes without writing")
+    parser.add_argument("--delete-missing", action="store_true",
+                        help="With --sync: delete rows absent from the CSVs unless a major pair references them")
+    args, _ = parser.parse_known_args()
+
+    if args.sync:
+        await sync_main_db(csv_files, dry_run=args.dry_run, delete_missing=args.delete_missing)
+    else:
+        # The collections are independent, so load them concurrently
+        counts = await asyncio.gather(
+            seed_colleges_from_csv(csv_files["colleges"], defer_indexes=True),
+            seed_universities_from_csv(csv_files["universities"], defer_indexes=True),
+            seed_majors_from_csv(csv_files["majors"], defer_indexes=True),
+        )
+        
+        if None in counts:
+            print("\nSome main_db collections failed to seed, see the errors above")
+        else:
+            print("\nAll main_db collections seeded successfully!")
+        await refresh_major_pair_view()
+
+        # Names and ids may have changed under every cached list and plan
+        publish_invalidation(MAIN_DB_RESEED_TAGS, reason="main_db reseed")
     
     # Close the connection
     mongo = MongoDB("main_db")
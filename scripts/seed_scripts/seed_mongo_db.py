@@ -1,55 +1,79 @@
 import os
 import sys
+import json
+import asyncio
+import argparse
+import pathlib
+from collections import defaultdict
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import asyncio
 from dotenv import load_dotenv
-from RAG.db.prereqisite_graph import prerequisite_graph
 from app.db.connection.mongo_connection import MongoDB
+from app.services.cache_invalidation import publish_invalidation
+from scripts.seed_scripts.prerequisite_sync import PREREQUISITE_COLLECTION, PREREQUISITE_DATABASE, PrerequisiteSync
+
+PCC = "Pasadena City College"
+ALL_COURSES_PATH = "all_courses.json"  # written by webscrapper_tool/pcc_scrape_course.py
+
+async def create_prerequisite_indexes(collection):
+    await collection.create_index([("college", 1), ("course_code", 1)], unique=True)
+    await collection.create_index([("department", 1)])
+
+def departments_from_file(path: str):
+    """Group the scraper's all_courses.json ({course_code: course}) by department."""
+    with open(path, "r", encoding="utf-8") as f:
+        courses = json.load(f)
+    departments = defaultdict(dict)
+    for code, course in courses.items():
+        departments[course.get("department") or ""][code] = course
+    return sorted(departments.items())
+
+async def seed_mongodb(courses_path: str = ALL_COURSES_PATH, college: str = PCC, scrape: bool = False,
+                       dry_run: bool = False, cache_dir: str = ".scrape_cache"):
+    """Sync scraped course prerequisites into MongoDB, writing only courses that changed"""
+    print(f"Starting prerequisite sync for {college}...")
+
+    collection = MongoDB(PREREQUISITE_DATABASE).get_collection(PREREQUISITE_COLLECTION)
+    # Upserts look courses up by (college, course_code), so the index is needed before writing
+    await create_prerequisite_indexes(collection)
+
+    sync = PrerequisiteSync(college, dry_run=dry_run)
+    await sync.start()
 
-async def seed_mongodb():
-    """Migrate prerequisite data from Python file to MongoDB"""
-    print("Starting migration of prerequisite data to MongoDB...")
-
-    mongo = MongoDB("course_prerequisite")
-    collection = mongo.get_collection("pcc_course_prerequisites")
-    
-    # Drop existing collection to start fresh
-    collection.drop()
-    
-    # Create indexes
-    collection.create_index([("college", 1), ("course_code", 1)], unique=True)
-    collection.create_index([("department", 1)])
-    
-
-    # Prepare documents for batch insertion
-    documents = []
-    
-    for college, courses in prerequisite_graph.items():
-        print(f"Processing college: {college}")
-        for course_code, course_data in courses.items():
-            document = {
-                "college": college,
-                "course_code": course_code,
-                "name": course_data["name"],
-                "units": course_data["units"],
-                "difficulty": course_data["difficulty"],
-                "assessment_allow": course_data["assessment_allow"],
-                "prerequisites": course_data["prerequisites"],
-                "unlocks": course_data["unlocks"],
-                "department": course_data["department"]
-            }
-            documents.append(document)
-    
-    # Insert all documents
-    if documents:
-        result = collection.insert_many(documents)
-        print(f"Successfully migrated {len(result.inserted_ids)} course prerequisites to MongoDB")
+    if scrape:
+        # Stream departments from the scraper as they are parsed
+        from webscrapper_tool.pcc_scrape_course import scrape_catalog
+        from webscrapper_tool.scraper_engine import AsyncFetcher, HttpCache
+
+        async with AsyncFetcher(HttpCache(cache_dir)) as fetcher:
+            scrape_stats = await scrape_catalog(fetcher, pathlib.Path("pcc_courses"), on_department=sync.add_department,
+                                                all_courses_path=pathlib.Path(courses_path))
+        print(f"Scrape: {scrape_stats.summary()}")
+        # A department that failed to scrape must not look like deleted courses
+        stats = await sync.finish(delete_missing=scrape_stats.failed == 0)
     else:
-        print("No documents to migrate")
-    
-    print("Migration completed")
+        if not os.path.exists(courses_path):
+            print(f"Error: course file not found at {courses_path} (run webscrapper_tool/pcc_scrape_course.py or pass --scrape)")
+            return None
+        stats = await sync.run(departments_from_file(courses_path))
 
-if __name__ == "__main__":
+    print(f"Prerequisite sync{' (dry run)' if dry_run else ''}: {stats.summary()}")
+    if stats.changed and not dry_run:
+        publish_invalidation([f"college:{college}"], reason="prerequisite sync")
+    return stats
+
+async def main():
     load_dotenv()
-    asyncio.run(seed_mongodb())
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="Sync course prerequisites from the catalog scraper into MongoDB")
+    parser.add_argument("courses_path", nargs="?", default=ALL_COURSES_PATH)
+    parser.add_argument("--college", default=PCC)
+    parser.add_argument("--scrape", action="store_true", help="Scrape the catalog and stream it in instead of reading the file")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    args = parser.parse_args()
+
+    await seed_mongodb(args.courses_path, college=args.college, scrape=args.scrape, dry_run=args.dry_run)
+    MongoDB(PREREQUISITE_DATABASE).close_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,121 +2,208 @@ import os
 import sys
 import csv
 import asyncio
+import argparse
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import json
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import bson
+from bson.raw_bson import RawBSONDocument
 from dotenv import load_dotenv
+from pymongo.errors import BulkWriteError
 from app.db.connection.mongo_connection import MongoDB
+from app.services.cache_invalidation import publish_invalidation
+from scripts.seed_scripts.ingestion import IngestionPipeline
+from scripts.seed_scripts.orchestrator import should_defer_indexes
+from scripts.seed_scripts.sync import CollectionSync
 
-async def seed_vector_db_from_csv(csv_file_path: str):
-    """Seed vector_db database with data from CSV file"""
+try:
+    import orjson
+    parse_json = orjson.loads
+except ImportError:  # Optional: several times faster on 1536-float embeddings
+    parse_json = json.loads
+
+DUPLICATE_KEY = 11000
+
+
+def parse_created_at(created_at):
+    """Parse created_at if it's a string"""
+    if not isinstance(created_at, str):
+        return created_at
+    try:
+        return datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            return datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return datetime.now()
+
+
+def knowledge_chunk_document(row: Dict[str, str]) -> Dict[str, Any]:
+    """Turn one CSV row into a knowledge_chunks document"""
+    # Parse embedding from string to list if it's stored as JSON string;
+    # rows exported without one are left for backfill_embeddings.py
+    embedding = row.get('embedding') or None
+    if isinstance(embedding, str):
+        try:
+            embedding = parse_json(embedding)
+        except ValueError:
+            raise ValueError("could not parse embedding")
+
+    return {
+        "id": row['id'],
+        "content": row['content'],
+        "college_name": row['college_name'],
+        "university_name": row['university_name'],
+        "major_name": row['major_name'],
+        "chunk_type": row['chunk_type'],
+        "created_at": parse_created_at(row['created_at']),
+        "embedding": embedding
+    }
+
+
+def parse_knowledge_chunk_rows(rows: List[Dict[str, str]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Turn CSV rows into knowledge_chunks documents (runs in a parser process)"""
+    documents = []
+    rejected = 0
+    for row in rows:
+        try:
+            documents.append(knowledge_chunk_document(row))
+        except Exception as e:
+            print(f"Error processing chunk {row.get('id')}: {e}")
+            rejected += 1
+    return documents, rejected
+
+
+def encode_knowledge_chunk_rows(rows: List[Dict[str, str]]) -> Tuple[List[bytes], int]:
+    """Parse and BSON-encode rows in the parser process, so writers only ship bytes"""
+    documents, rejected = parse_knowledge_chunk_rows(rows)
+    return [bson.encode({"_id": bson.ObjectId(), **document}) for document in documents], rejected
+
+
+async def create_knowledge_chunk_indexes(collection):
+    """Create indexes for better performance"""
+    await collection.create_index([("id", 1)], unique=True)
+    await collection.create_index([("college_name", 1)])
+    await collection.create_index([("university_name", 1)])
+    await collection.create_index([("major_name", 1)])
+    await collection.create_index([("chunk_type", 1)])
+    await collection.create_index([("created_at", 1)])
+
+async def seed_vector_db_from_csv(csv_file_path: str, batch_size: int = 1000, parse_workers: int = None,
+                                  writers: int = 4, resume: bool = True, defer_indexes: bool = False):
+    """Seed vector_db database with data from CSV file; returns the ingestion stats, or None on failure"""
     print(f"Starting migration from CSV file: {csv_file_path}")
-    
+
     if not os.path.exists(csv_file_path):
         print(f"Error: CSV file not found at {csv_file_path}")
         return
-    
+
     # Connect to vector_db database
     mongo = MongoDB("vector_db")
     collection = mongo.get_collection("knowledge_chunks")
-    
+
     # Optional: Drop existing collection to start fresh
     # Uncomment the next line if you want to clear existing data
     # await collection.drop()
-    
-    # Create indexes for better performance
-    await collection.create_index([("id", 1)], unique=True)
-    await collection.create_index([("college_name", 1)])
-    await collection.create_index([("university_name", 1)])
-    await collection.create_index([("major_name", 1)])
-    await collection.create_index([("chunk_type", 1)])
-    await collection.create_index([("created_at", 1)])
-    
-    documents = []
-    
+
+    # Maintaining six indexes per insert slows a fresh bulk load, so they are built afterwards
+    deferred = await should_defer_indexes(collection, defer_indexes)
+    if not deferred:
+        await create_knowledge_chunk_indexes(collection)
+
+    async def write(encoded: List[bytes]) -> int:
+        return await insert_batch(collection, [RawBSONDocument(raw) for raw in encoded])
+
+    checkpoint_path = f"{csv_file_path}.checkpoint" if resume else None
+    pipeline = IngestionPipeline(
+        csv_file_path, encode_knowledge_chunk_rows, write,
+        batch_size=batch_size, parse_workers=parse_workers, writers=writers, checkpoint_path=checkpoint_path,
+        # Before the deferred unique index exists, nothing else stops a repeated id
+        dedupe_column="id"
+    )
     try:
-        with open(csv_file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            
-            for row_number, row in enumerate(reader, start=1):
-                try:
-                    # Parse embedding from string to list if it's stored as JSON string
-                    embedding = row['embedding']
-                    if isinstance(embedding, str):
-                        try:
-                            embedding = json.loads(embedding)
-                        except json.JSONDecodeError:
-                            print(f"Warning: Could not parse embedding for row {row_number}, skipping...")
-                            continue
-                    
-                    # Parse created_at if it's a string
-                    created_at = row['created_at']
-                    if isinstance(created_at, str):
-                        try:
-                            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        except ValueError:
-                            try:
-                                created_at = datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')
-                            except ValueError:
-                                created_at = datetime.now()
-                    
-                    document = {
-                        "id": row['id'],
-                        "content": row['content'],
-                        "college_name": row['college_name'],
-                        "university_name": row['university_name'],
-                        "major_name": row['major_name'],
-                        "chunk_type": row['chunk_type'],
-                        "created_at": created_at,
-                        "embedding": embedding
-                    }
-                    
-                    documents.append(document)
-                    
-                    # Insert in batches of 1000 for better performance
-                    if len(documents) >= 1000:
-                        await insert_batch(collection, documents)
-                        documents = []
-                        
-                except Exception as e:
-                    print(f"Error processing row {row_number}: {e}")
-                    continue
-            
-            # Insert remaining documents
-            if documents:
-                await insert_batch(collection, documents)
-                
+        stats = await pipeline.run()
     except Exception as e:
-        print(f"Error reading CSV file: {e}")
+        print(f"Error ingesting CSV file (rerun to resume from the last checkpoint): {e}")
         return
-    
+    print(f"Ingestion finished: {stats.summary()}")
+    if stats.rows_duplicate:
+        print(f"Skipped {stats.rows_duplicate} rows repeating an earlier id (kept the first), "
+              f"e.g. {', '.join(stats.duplicate_keys)}")
+
+    if deferred:
+        await create_knowledge_chunk_indexes(collection)
+
     # Get final count
     total_count = await collection.count_documents({})
     print(f"Migration completed. Total documents in collection: {total_count}")
 
-async def insert_batch(collection, documents: List[Dict[str, Any]]):
-    """Insert a batch of documents into the collection"""
+    # Plans for these colleges were built from the old chunks
+    colleges = await collection.distinct("college_name")
+    publish_invalidation([f"college:{college}" for college in sorted(colleges)], reason="vector_db reseed")
+    return stats
+
+async def sync_vector_db_from_csv(csv_file_path: str, dry_run: bool = False):
+    """Apply only the knowledge chunks that were added, changed or removed since the last sync"""
+    print(f"Syncing knowledge_chunks with CSV file: {csv_file_path}")
+
+    if not os.path.exists(csv_file_path):
+        print(f"Error: CSV file not found at {csv_file_path}")
+        return
+
+    collection = MongoDB("vector_db").get_collection("knowledge_chunks")
+    sync = CollectionSync(
+        "vector_db", collection, "id", knowledge_chunk_document,
+        tag_fields=("college_name", "university_name", "major_name"), dry_run=dry_run
+    )
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as csvfile:
+        stats = await sync.run(csv.DictReader(csvfile))
+    print(f"knowledge_chunks sync{' (dry run)' if dry_run else ''}: {stats.summary()}")
+
+    if stats.changed and not dry_run:
+        publish_invalidation(stats.tags, reason="knowledge_chunks sync")
+    return stats
+
+async def insert_batch(collection, documents: List[Dict[str, Any]]) -> int:
+    """Insert a batch of documents; chunks already present (e.g. after a resume) are skipped"""
     try:
-        result = await collection.insert_many(documents, ordered=False)
-        print(f"Successfully inserted batch of {len(result.inserted_ids)} documents")
-    except Exception as e:
-        print(f"Error inserting batch: {e}")
+        await collection.insert_many(documents, ordered=False)
+        return len(documents)  # inserted_ids stays empty for raw BSON documents
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        return e.details.get("nInserted", 0)
 
 async def main():
     """Main function to run the seeding process"""
     load_dotenv()
-    
+
+    parser = argparse.ArgumentParser(description="Seed vector_db.knowledge_chunks from CSV")
     # Update this path to your CSV file location
-    csv_file_path = "csv_exports/vector_db/knowledge_chunks_v2.csv"
-    
-    await seed_vector_db_from_csv(csv_file_path)
-    
+    parser.add_argument("csv_file_path", nargs="?", default="csv_exports/vector_db/knowledge_chunks_v2.csv")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent insert_many calls")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore and don't write a checkpoint")
+    parser.add_argument("--sync", action="store_true", help="Write only rows that changed since the last sync")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync: report changes without writing")
+    args, _ = parser.parse_known_args()
+
+    if args.sync:
+        await sync_vector_db_from_csv(args.csv_file_path, dry_run=args.dry_run)
+    else:
+        await seed_vector_db_from_csv(
+            args.csv_file_path, batch_size=args.batch_size, parse_workers=args.parse_workers,
+            writers=args.writers, resume=not args.no_resume, defer_indexes=True
+        )
+
     # Close the connection
     mongo = MongoDB("vector_db")
     mongo.close_connection()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
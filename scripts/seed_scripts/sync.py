@@ -0,0 +1,142 @@
+"""
+Diff-based sync of a CSV-sourced collection: only rows that changed are written.
+
+Every synced document carries `source_hash`, a hash of the raw CSV row it was built
+from. A sync loads {key: source_hash} from the collection, hashes each incoming row
+and issues ReplaceOne upserts for new or changed rows and deletes for keys that are
+no longer in the source. Unchanged rows are never parsed (no embedding decoding)
+and never written, so rerunning a sync is a no-op.
+
+ReplaceOne keeps the existing _id, so references such as college_uni_major_pair ->
+majors._id survive an update. Deletes can be guarded by a `referenced` callback; documents
+it reports as still referenced are kept and counted instead of deleted. Documents seeded before sync existed have no
+source_hash and are rewritten once.
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set
+from pymongo import DeleteMany, ReplaceOne
+from app.services.cache_invalidation import change_to_tags
+
+
+def row_hash(row: Dict[str, Any]) -> str:
+    canonical = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SyncStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    rejected: int = 0
+    kept_referenced: int = 0  # missing from the source but still referenced, so not deleted
+    tags: Set[str] = field(default_factory=set)  # cache tags touched by the changes
+
+    @property
+    def changed(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    def summary(self) -> str:
+        return (f"{self.inserted} inserted, {self.updated} updated, {self.deleted} deleted, "
+                f"{self.unchanged} unchanged, {self.rejected} rejected"
+                + (f", {self.kept_referenced} kept (still referenced)" if self.kept_referenced else ""))
+
+
+class CollectionSync:
+    def __init__(self, database: str, collection, key_field: str,
+                 build_document: Callable[[Dict[str, str]], Dict[str, Any]],
+                 key_from_row: Callable[[Dict[str, str]], Any] = None,
+                 delete_missing: bool = True, tag_fields: Sequence[str] = (),
+                 batch_size: int = 1000, dry_run: bool = False,
+                 referenced: Optional[Callable[[List[Any]], Awaitable[Set[Any]]]] = None):
+        """
+        Args:
+            database: Database name, used to map changes to cache tags
+            collection: Motor collection to sync into
+            key_field: Natural key shared by the CSV and the collection (e.g. "id")
+            build_document: Turns a CSV row into the document to store
+            key_from_row: Key of a raw row without building the document (defaults to row[key_field])
+            delete_missing: Delete documents whose key is absent from the source; keep False for
+                collections the app also writes to (e.g. embedding_cache)
+            tag_fields: Stored fields needed to compute cache tags for updated/deleted documents
+            dry_run: Count the changes without writing them
+            referenced: Given the _ids of documents about to be deleted, returns those other
+                collections still point at; they are kept
+        """
+        self.database = database
+        self.collection = collection
+        self.key_field = key_field
+        self.build_document = build_document
+        self.key_from_row = key_from_row or (lambda row: row[key_field])
+        self.delete_missing = delete_missing
+        self.tag_fields = tag_fields
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.referenced = referenced
+
+    async def _load_existing(self) -> Dict[Any, Dict[str, Any]]:
+        projection = {self.key_field: 1, "source_hash": 1, **{name: 1 for name in self.tag_fields}}
+        existing = {}
+        async for doc in self.collection.find({}, projection):
+            existing[doc[self.key_field]] = doc
+        return existing
+
+    def _tags(self, doc: Dict[str, Any]) -> List[str]:
+        change = {"fullDocument": doc, "documentKey": {"_id": doc.get("_id", "")}}
+        return change_to_tags(self.database, self.collection.name, change)
+
+    async def _flush(self, operations: List):
+        if operations and not self.dry_run:
+            await self.collection.bulk_write(operations, ordered=False)
+        operations.clear()
+
+    async def run(self, rows: Iterable[Dict[str, str]]) -> SyncStats:
+        stats = SyncStats()
+        existing = await self._load_existing()
+        seen = set()
+        operations = []
+
+        for row in rows:
+            try:
+                key = self.key_from_row(row)
+                seen.add(key)
+                source_hash = row_hash(row)
+                current = existing.get(key)
+                if current is not None and current.get("source_hash") == source_hash:
+                    stats.unchanged += 1
+                    continue
+                document = {**self.build_document(row), "source_hash": source_hash}
+            except Exception as e:
+                print(f"Error processing {self.key_field}={row.get(self.key_field)}: {e}")
+                stats.rejected += 1
+                continue
+
+            operations.append(ReplaceOne({self.key_field: key}, document, upsert=True))
+            stats.tags.update(self._tags(document))
+            if current is None:
+                stats.inserted += 1
+            else:
+                stats.updated += 1
+                stats.tags.update(self._tags(current))  # old names, e.g. before a rename
+            if len(operations) >= self.batch_size:
+                await self._flush(operations)
+
+        if self.delete_missing:
+            missing = [key for key in existing if key not in seen]
+            if missing and self.referenced:
+                in_use = await self.referenced([existing[key]["_id"] for key in missing])
+                stats.kept_referenced = sum(1 for key in missing if existing[key]["_id"] in in_use)
+                missing = [key for key in missing if existing[key]["_id"] not in in_use]
+            for start in range(0, len(missing), self.batch_size):
+                chunk = missing[start:start + self.batch_size]
+                operations.append(DeleteMany({self.key_field: {"$in": chunk}}))
+                for key in chunk:
+                    stats.tags.update(self._tags(existing[key]))
+                await self._flush(operations)
+            stats.deleted = len(missing)
+
+        await self._flush(operations)
+        return stats
@@ -0,0 +1,20 @@
+"""Sample Pasadena City College catalog shared by the planner and validator tests."""
+
+PREREQUISITES = {
+    "MATH 005A": {"name": "Single Variable Calculus I", "units": 5.0, "difficulty": 4, "assessment_allow": True,
+                  "prerequisites": [["MATH 009"]], "unlocks": ["MATH 005B"], "department": "math"},
+    "MATH 005B": {"name": "Single Variable Calculus II", "units": 5.0, "difficulty": 4, "assessment_allow": False,
+                  "prerequisites": [["MATH 005A"]], "unlocks": ["MATH 005C"], "department": "math"},
+    "MATH 005C": {"name": "Multivariable Calculus", "units": 5.0, "difficulty": 5, "assessment_allow": False,
+                  "prerequisites": [["MATH 005B"]], "unlocks": [], "department": "math"},
+    "MATH 009": {"name": "Precalculus", "units": 5.0, "difficulty": 3, "assessment_allow": False,
+                 "prerequisites": [], "unlocks": ["MATH 005A"], "department": "math"},
+    "CS 002": {"name": "Fundamentals of Computer Science I", "units": 4.0, "difficulty": 4, "assessment_allow": False,
+               "prerequisites": [], "unlocks": ["CS 003"], "department": "cs"},
+    "CS 003": {"name": "Fundamentals of Computer Science II", "units": 4.0, "difficulty": 4, "assessment_allow": False,
+               "prerequisites": [["CS 002"]], "unlocks": [], "department": "cs"},
+    "PHYS 008A": {"name": "Physics I", "units": 4.0, "difficulty": 4, "assessment_allow": False,
+                  "prerequisites": [["MATH 005A"]], "unlocks": [], "department": "phys"},
+    "PHYS 008B": {"name": "Physics II", "units": 4.0, "difficulty": 4, "assessment_allow": False,
+                  "prerequisites": [["PHYS 008A"]], "unlocks": [], "department": "phys"},
+}
@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from starlette.requests import Request
+from RAG.config.settings import AdmissionSettings
+from app.services.admission import AdmissionController, AdmissionRejected, TenantRateLimiter, TokenBucket, TokenBudget, tenant_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_settings(**overrides):
+    return AdmissionSettings(**{
+        "max_concurrent_llm": 2, "max_waiting": 2, "max_wait_seconds": 0.05,
+        "tokens_per_minute": 10000, "expected_completion_tokens": 0, **overrides
+    })
+
+
+def test_token_bucket_refills_and_reports_retry_after():
+    """Test burst capacity, refusal with a retry hint and refill over time."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_second=1.0, capacity=2, clock=clock)
+
+    assert bucket.try_acquire() == (True, 0.0)
+    assert bucket.try_acquire() == (True, 0.0)
+    allowed, retry_after = bucket.try_acquire()
+    assert not allowed and retry_after == pytest.approx(1.0)
+
+    clock.now += 1.5
+    assert bucket.try_acquire()[0]
+
+
+def test_tenant_limiter_isolates_and_evicts_tenants():
+    """Test that tenants get separate buckets and the oldest is evicted past the cap."""
+    clock = FakeClock()
+    limiter = TenantRateLimiter(requests_per_minute=60, burst=1, max_tenants=2, clock=clock)
+
+    assert limiter.acquire("key:a")[0]
+    assert not limiter.acquire("key:a")[0]
+    assert limiter.acquire("ip:10.0.0.1")[0]
+    limiter.acquire("ip:10.0.0.2")
+
+    assert list(limiter.buckets) == ["ip:10.0.0.1", "ip:10.0.0.2"]
+
+
+def test_tenant_key_ignores_unauthenticated_api_key_header():
+    """Test that rotating x-api-key values cannot buy a fresh rate-limit bucket."""
+    def request(api_key):
+        return Request({"type": "http", "headers": [(b"x-api-key", api_key.encode())], "client": ("203.0.113.7", 5000)})
+
+    assert tenant_key(request("first")) == tenant_key(request("second")) == "ip:203.0.113.7"
+
+def test_token_budget_waits_for_window_and_uses_actual_counts():
+    """Test sliding-window waits and correcting a reservation to the real token count."""
+    clock = FakeClock()
+    budget = TokenBudget(1000, clock=clock)
+
+    entry = budget.reserve(800)
+    assert budget.wait_time(300) == pytest.approx(60.0)
+
+    budget.adjust(entry, 500)
+    assert budget.wait_time(300) == 0.0
+
+    clock.now += 30
+    budget.reserve(500)
+    assert budget.wait_time(100) == pytest.approx(30.0)
+    clock.now += 31
+    assert budget.wait_time(400) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_controller_sheds_when_slots_and_queue_are_full():
+    """Test that excess concurrent calls are rejected instead of piling up."""
+    controller = AdmissionController(make_settings(max_concurrent_llm=1, max_waiting=1))
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.llm_slot(10):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0.001)
+    waiter = asyncio.create_task(controller.llm_slot(10).__aenter__())
+    await asyncio.sleep(0.001)
+
+    with pytest.raises(AdmissionRejected) as shed:
+        async with controller.llm_slot(10):
+            pass
+    assert shed.value.reason == "queue_full"
+
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await waiter
+    assert timed_out.value.reason == "concurrency"
+    assert timed_out.value.to_http().headers["Retry-After"] == "1"
+
+    release.set()
+    await holder
+    assert controller.active == 0 and controller.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_controller_rejects_when_token_budget_exhausted():
+    """Test that calls which would blow the tokens-per-minute budget are shed."""
+    controller = AdmissionController(make_settings(tokens_per_minute=1000))
+
+    async with controller.llm_slot(900) as slot:
+        slot.record(950)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        async with controller.llm_slot(200):
+            pass
+    assert rejected.value.reason == "token_budget"
+    assert rejected.value.retry_after >= 59
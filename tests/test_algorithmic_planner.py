@@ -0,0 +1,178 @@
+from app.services.algorithmic_planner import AlgorithmicPlanner
+from app.services.course_scheduler import CourseScheduler
+from app.services.plan_validator import PlanValidator
+from RAG.services.articulation_parser import ArticulationParser
+from tests.catalog_data import PREREQUISITES
+
+TARGETS = [
+    {"college": "Pasadena City College", "university": "University of California, Los Angeles", "major": "Computer Science"},
+    {"college": "Pasadena City College", "university": "University of California, Berkeley", "major": "Data Science"},
+]
+
+
+def plan_from_chunks(planner, targets, chunks, number_of_terms, structured=None):
+    requirements = planner.parse_targets(targets, chunks, PREREQUISITES, structured)
+    if requirements is None:
+        return None
+    return planner.plan_from_requirements("Pasadena City College", requirements, PREREQUISITES, number_of_terms)
+
+
+def make_chunk(university, major, content):
+    return {"university_name": university, "major_name": major, "chunk_type": "articulation", "content": content}
+
+
+def test_parser_expands_slash_shorthand():
+    """Test that "PHYS 008A/008B" is treated as separate courses."""
+    parser = ArticulationParser()
+    parsed = parser.parse_chunk("PHYSICS 1A <- PHYS 008A/008B", set(PREREQUISITES))
+
+    assert parsed["complete"]
+    assert parsed["requirements"] == [{"university_courses": ["PHYSICS 1A"], "options": [["PHYS 008A", "PHYS 008B"]]}]
+
+
+def test_parser_or_groups_and_unpadded_codes():
+    """Test OR alternatives and matching of unpadded college codes."""
+    parser = ArticulationParser()
+    parsed = parser.parse_chunk("COMPSCI 61A <- CS 2 or MATH 5A and MATH 5B", set(PREREQUISITES))
+
+    assert parsed["requirements"][0]["options"] == [["CS 002"], ["MATH 005A", "MATH 005B"]]
+
+
+def test_parser_pads_only_college_side_codes():
+    """Test that a university code padding to a real college course stays a university course."""
+    parser = ArticulationParser()
+    parsed = parser.parse_chunk("MATH 9 <- MATH 5A", set(PREREQUISITES))
+
+    assert parsed["requirements"] == [{"university_courses": ["MATH 9"], "options": [["MATH 005A"]]}]
+
+    # Without a separator only exact catalog codes count as college courses
+    parsed = parser.parse_chunk("MATH 9 MATH 005A", set(PREREQUISITES))
+    assert parsed["requirements"] == [{"university_courses": ["MATH 9"], "options": [["MATH 005A"]]}]
+
+
+def test_parser_flags_unmapped_segments():
+    """Test that a requirement without college courses marks the chunk incomplete."""
+    parser = ArticulationParser()
+
+    assert not parser.parse_chunk("MATH 31A requires an equivalent course", set(PREREQUISITES))["complete"]
+    assert parser.parse_chunk("MATH 31A <- MATH 005A\nMATH 61 No Course Articulated", set(PREREQUISITES))["complete"]
+
+
+def test_plan_respects_prerequisites_and_term_count():
+    """Test that the algorithmic plan orders prerequisite chains across terms."""
+    chunks = [
+        make_chunk(TARGETS[0]["university"], TARGETS[0]["major"], "MATH 31A <- MATH 005A\nMATH 31B <- MATH 005B\nCOM SCI 31 <- CS 002"),
+        make_chunk(TARGETS[1]["university"], TARGETS[1]["major"], "MATH 1A <- MATH 005A\nMATH 53 <- MATH 005C"),
+    ]
+
+    plan = plan_from_chunks(AlgorithmicPlanner(), TARGETS, chunks, 4)
+
+    assert plan is not None
+    assert len(plan["term_plan"]) == 4
+    placed = {course["code"]: term["term"] for term in plan["term_plan"] for course in term["courses"]}
+    assert set(placed) == {"MATH 005A", "MATH 005B", "MATH 005C", "CS 002"}
+    assert placed["MATH 005A"] < placed["MATH 005B"] < placed["MATH 005C"]
+
+    math_5a = next(c for t in plan["term_plan"] for c in t["courses"] if c["code"] == "MATH 005A")
+    assert {s["university"] for s in math_5a["satisfies"]} == {t["university"] for t in TARGETS}
+    assert math_5a["note"]  # Precalculus skipped in favour of placement
+
+
+def test_plan_prefers_shared_courses_for_alternatives():
+    """Test that OR options reuse courses already required by another target."""
+    chunks = [
+        make_chunk(TARGETS[0]["university"], TARGETS[0]["major"], "COM SCI 31 <- CS 002"),
+        make_chunk(TARGETS[1]["university"], TARGETS[1]["major"], "CS 61A <- CS 003 or CS 002"),
+    ]
+
+    plan = plan_from_chunks(AlgorithmicPlanner(), TARGETS, chunks, 2)
+
+    codes = [course["code"] for term in plan["term_plan"] for course in term["courses"]]
+    assert codes == ["CS 002"]
+
+
+def test_plan_falls_back_on_incomplete_coverage():
+    """Test that missing or unparsable articulation returns None so the LLM is used."""
+    planner = AlgorithmicPlanner()
+    only_first = [make_chunk(TARGETS[0]["university"], TARGETS[0]["major"], "COM SCI 31 <- CS 002")]
+
+    assert plan_from_chunks(planner, TARGETS, only_first, 4) is None
+
+
+def test_plan_falls_back_when_chain_exceeds_terms():
+    """Test that a prerequisite chain longer than the term count is left to the LLM."""
+    chunks = [make_chunk(TARGETS[0]["university"], TARGETS[0]["major"], "MATH 32A <- MATH 005C")]
+
+    plan = plan_from_chunks(AlgorithmicPlanner(), TARGETS[:1], chunks, 2)
+
+    assert plan is None
+
+
+def test_plan_uses_structured_requirements():
+    """Test that indexed requirements are used without any raw chunks."""
+    structured = {
+        (TARGETS[0]["university"], TARGETS[0]["major"]): [{"university_courses": ["COM SCI 32"], "options": [["CS 003"]]}]
+    }
+
+    plan = plan_from_chunks(AlgorithmicPlanner(), TARGETS[:1], [], 2, structured)
+
+    assert [[c["code"] for c in term["courses"]] for term in plan["term_plan"]] == [["CS 002"], ["CS 003"]]
+
+
+def test_update_plan_removes_and_adds_targets():
+    """Test that a delta update drops orphaned courses and merges new requirements."""
+    chunks = [
+        make_chunk(TARGETS[0]["university"], TARGETS[0]["major"], "COM SCI 32 <- CS 003"),
+        make_chunk(TARGETS[1]["university"], TARGETS[1]["major"], "MATH 1A <- MATH 005A"),
+    ]
+    planner = AlgorithmicPlanner()
+    plan = plan_from_chunks(planner, TARGETS, chunks, 3)
+
+    added = [{
+        "university": "University of California, Irvine",
+        "major": "Physics",
+        "requirements": [{"university_courses": ["PHYSICS 7C"], "options": [["PHYS 008A"]]}]
+    }]
+    removed = [(TARGETS[0]["university"], TARGETS[0]["major"])]
+
+    updated = planner.update_plan(plan, removed, added, PREREQUISITES)
+
+    placed = {course["code"]: term["term"] for term in updated["term_plan"] for course in term["courses"]}
+    assert set(placed) == {"MATH 005A", "PHYS 008A"}  # CS 003 and its prerequisite CS 002 dropped
+    assert placed["MATH 005A"] < placed["PHYS 008A"]
+    assert [t["university"] for t in updated["targets"]] == [TARGETS[1]["university"], "University of California, Irvine"]
+    assert len(updated["term_plan"]) == 3
+
+
+def test_update_plan_signals_regeneration_when_terms_too_few():
+    """Test that an addition that can't fit the term count returns None."""
+    chunks = [make_chunk(TARGETS[0]["university"], TARGETS[0]["major"], "COM SCI 31 <- CS 002")]
+    planner = AlgorithmicPlanner()
+    plan = plan_from_chunks(planner, TARGETS[:1], chunks, 2)
+
+    added = [{"university": "U", "major": "M", "requirements": [{"university_courses": [], "options": [["MATH 005C"]]}]}]
+
+    assert planner.update_plan(plan, [], added, PREREQUISITES) is None
+
+
+def test_scheduler_keeps_terms_free_for_dependent_courses():
+    """Test that balancing never pushes a prerequisite into the last term, and impossible chains go unscheduled."""
+    catalog = {
+        "CHEM 001": {"difficulty": 5, "prerequisites": []},
+        "CHEM 002": {"difficulty": 3, "prerequisites": [["CHEM 001"]]},
+        "CHEM 003": {"difficulty": 3, "prerequisites": [["CHEM 001"]]},
+        "MATH 001": {"difficulty": 3, "prerequisites": []},
+        "MATH 002": {"difficulty": 3, "prerequisites": [["MATH 001"]]},
+    }
+    scheduler = CourseScheduler()
+    courses = [{"code": code, "difficulty": entry["difficulty"]} for code, entry in catalog.items()]
+    plan = {"term_plan": [{"term": 1, "courses": []}, {"term": 2, "courses": []}], "unscheduled_courses": []}
+
+    scheduler.distribute_courses(plan, scheduler.build_course_graph(courses, catalog))
+
+    assert PlanValidator().validate(plan, catalog, [], 2)["valid"]
+
+    plan = {"term_plan": [{"term": 1, "courses": []}], "unscheduled_courses": None}
+    scheduler.distribute_courses(plan, scheduler.build_course_graph(courses[3:], catalog))
+    assert [course["code"] for course in plan["term_plan"][0]["courses"]] == ["MATH 001"]
+    assert [course["code"] for course in plan["unscheduled_courses"]] == ["MATH 002"]
@@ -0,0 +1,87 @@
+import mongomock_motor
+import pytest
+from unittest.mock import patch
+from app.db.connection.mongo_connection import MongoDB
+from RAG.db.articulation_store import ArticulationIndex, ArticulationStore
+
+COLLEGE = "Pasadena City College"
+
+UCLA_CS = ("University of California, Los Angeles", "Computer Science")
+UCB_DS = ("University of California, Berkeley", "Data Science")
+UCI_CS = ("University of California, Irvine", "Computer Science")
+
+
+def make_row(target, university_courses, options, complete=True):
+    return {
+        "college_name": "Pasadena City College",
+        "university_name": target[0],
+        "major_name": target[1],
+        "university_courses": university_courses,
+        "options": options,
+        "college_courses": sorted({code for option in options for code in option}),
+        "complete": complete
+    }
+
+
+ROWS = [
+    make_row(UCLA_CS, ["MATH 31A"], [["MATH 005A"]]),
+    make_row(UCLA_CS, ["COM SCI 31"], [["CS 002"]]),
+    make_row(UCB_DS, ["MATH 1A"], [["MATH 005A"]]),
+    make_row(UCB_DS, ["CS 61A"], [["CS 003"], ["CS 002"]]),
+    make_row(UCI_CS, ["I&C SCI 31"], [["CS 002"]], complete=False),
+]
+
+
+def make_chunk(chunk_id, target, content):
+    return {"id": chunk_id, "college_name": COLLEGE, "university_name": target[0], "major_name": target[1],
+            "chunk_type": "articulation", "content": content}
+
+
+def test_requirements_for_complete_targets_only():
+    """Test that partially parsed targets are not served from the index."""
+    index = ArticulationIndex("Pasadena City College", ROWS)
+
+    assert len(index.requirements_for(*UCLA_CS)) == 2
+    assert index.requirements_for(*UCI_CS) is None
+    assert index.requirements_for("Unknown", "Major") is None
+
+
+def test_course_overlap_and_shared_courses():
+    """Test cross-target overlap answered with set operations."""
+    index = ArticulationIndex("Pasadena City College", ROWS)
+
+    overlap = dict(index.course_overlap([UCLA_CS, UCB_DS]))
+    assert overlap == {"MATH 005A": 2, "CS 002": 2, "CS 003": 1}
+    assert index.shared_courses([UCLA_CS, UCB_DS]) == {"MATH 005A", "CS 002"}
+    assert index.targets_for_course("CS 002") == {UCLA_CS, UCB_DS, UCI_CS}
+
+
+@pytest.mark.asyncio
+async def test_rebuild_drops_rows_of_removed_targets():
+    """Test that a rebuild deletes rows for targets whose chunks are gone and for shorter parses."""
+    with patch("app.db.connection.mongo_connection.AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient):
+        MongoDB._instances.clear()
+        ArticulationStore.invalidate()
+        try:
+            await MongoDB("course_prerequisite").get_collection("pcc_course_prerequisites").insert_many([
+                {"college": COLLEGE, "course_code": code, "name": code, "units": 4.0, "difficulty": 3,
+                 "assessment_allow": False, "prerequisites": [], "unlocks": [], "department": "x"}
+                for code in ("MATH 005A", "CS 002", "CS 003")
+            ])
+            chunks = MongoDB("vector_db").get_collection("knowledge_chunks")
+            await chunks.insert_many([
+                make_chunk(1, UCLA_CS, "MATH 31A <- MATH 005A\nCOM SCI 31 <- CS 002"),
+                make_chunk(2, UCB_DS, "CS 61A <- CS 003"),
+            ])
+            store = ArticulationStore()
+            assert (await store.rebuild_from_chunks(COLLEGE))["rows"] == 3
+
+            await chunks.delete_many({"id": 2})
+            await chunks.update_one({"id": 1}, {"$set": {"content": "MATH 31A <- MATH 005A"}})
+            assert (await store.rebuild_from_chunks(COLLEGE))["rows"] == 1
+
+            rows = await MongoDB("vector_db").get_collection("articulations").find({}).to_list(None)
+            assert [(row["university_name"], row["university_courses"]) for row in rows] == [(UCLA_CS[0], ["MATH 31A"])]
+        finally:
+            ArticulationStore.invalidate()
+            MongoDB._instances.clear()
@@ -0,0 +1,49 @@
+import json
+import pytest
+from app.utils import cache_codec
+from app.utils.cache_codec import CacheCodec, CacheCodecError
+
+PLAN = {
+    "source_college": "Pasadena City College",
+    "term_plan": [{"term": t, "courses": [{"code": f"MATH {t:03d}", "units": 4.0, "prerequisites": []}] * 5} for t in range(1, 9)],
+}
+
+
+def available_codecs():
+    codecs = [CacheCodec("json", "none"), CacheCodec("json", "zlib")]
+    if cache_codec.zstandard is not None:
+        codecs.append(CacheCodec("json", "zstd"))
+    if cache_codec.msgpack is not None:
+        codecs.append(CacheCodec("msgpack", "auto"))
+    return codecs
+
+
+@pytest.mark.parametrize("codec", available_codecs(), ids=lambda c: f"{c.serializer}+{c.compression}")
+def test_round_trip_is_readable_by_any_codec(codec):
+    """Test that values decode the same whichever codec configuration reads them."""
+    encoded = codec.encode(PLAN)
+
+    assert encoded[0] & cache_codec.HEADER_FLAG
+    assert CacheCodec("json", "none").decode(encoded) == PLAN
+
+
+def test_compression_shrinks_large_values_only():
+    """Test that plans are compressed while small values are stored as-is."""
+    codec = CacheCodec("json", "zlib", min_compress_size=512)
+
+    assert len(codec.encode(PLAN)) < len(json.dumps(PLAN)) / 4
+    assert codec.encode([1, 2]) == b"\x80[1,2]"
+
+
+def test_legacy_json_still_decodes():
+    """Test that plain json.dumps values cached before the codec are read back."""
+    codec = CacheCodec()
+
+    assert codec.decode(json.dumps(PLAN).encode()) == PLAN
+    assert codec.decode(json.dumps({"a": 1})) == {"a": 1}
+
+
+def test_unknown_configuration_is_rejected():
+    """Test that a misconfigured serializer fails fast instead of at cache write."""
+    with pytest.raises(CacheCodecError):
+        CacheCodec("pickle")
@@ -0,0 +1,71 @@
+import fakeredis
+from bson import ObjectId
+from app.services.cache_invalidation import InvalidationBus, change_to_tags, invalidate_tags, plan_tags, tag_key
+from app.utils.cache_wrapper import store_cached
+
+TARGETS = [{"college": "Pasadena City College", "university": "UCLA", "major": "Computer Science"}]
+
+
+def test_invalidate_evicts_only_tagged_keys():
+    """Test that a tag evicts the entries registered under it and nothing else."""
+    redis_client = fakeredis.FakeRedis()
+    redis_client.set("transfer_plan:a", "{}")
+    tag_key(redis_client, "transfer_plan:a", plan_tags(TARGETS), 600)
+    store_cached(redis_client, "major_list:u1:c1", [], 60, tags=["college_id:c1", "university_id:u1"])
+    store_cached(redis_client, "major_list:u2:c2", [], 60, tags=["college_id:c2", "university_id:u2"])
+
+    assert invalidate_tags(redis_client, ["major:Computer Science", "college_id:c1"]) == 2
+
+    assert redis_client.get("transfer_plan:a") is None
+    assert redis_client.get("major_list:u1:c1") is None
+    assert redis_client.get("major_list:u2:c2") is not None
+    assert 0 < redis_client.ttl("cache_tag:college_id:c2") <= 120
+
+
+def test_kind_tag_evicts_whole_cache():
+    """Test that kind: tags evict every key with that cache prefix."""
+    redis_client = fakeredis.FakeRedis()
+    for key in ("major_list:a:b", "major_list:c:d", "universities_list"):
+        redis_client.set(key, "[]")
+
+    assert invalidate_tags(redis_client, ["kind:major_list"]) == 2
+    assert redis_client.exists("universities_list")
+
+
+def test_change_events_map_to_tags():
+    """Test change stream events with and without the full document."""
+    college_id, university_id = ObjectId(), ObjectId()
+    update = {
+        "operationType": "update",
+        "documentKey": {"_id": ObjectId()},
+        "fullDocument": {"from_college_id": college_id, "to_university_id": university_id},
+    }
+    assert change_to_tags("main_db", "college_uni_major_pair", update) == [
+        f"college_id:{college_id}", f"university_id:{university_id}"
+    ]
+
+    articulation = {"fullDocument": {"college_name": "PCC", "university_name": "UCLA", "major_name": "CS"}}
+    assert change_to_tags("vector_db", "articulations", articulation) == ["articulation:PCC|UCLA|CS"]
+
+    delete = {"operationType": "delete", "documentKey": {"_id": ObjectId()}}
+    assert change_to_tags("course_prerequisite", "pcc_course_prerequisites", delete) == ["kind:transfer_plan"]
+
+
+def test_bus_publishes_and_runs_local_handlers():
+    """Test that publishing evicts keys and the broadcast reaches local handlers."""
+    redis_client = fakeredis.FakeRedis()
+    redis_client.set("transfer_plan:a", "{}")
+    tag_key(redis_client, "transfer_plan:a", ["college:PCC"], 600)
+    received = []
+    bus = InvalidationBus(redis_client, handlers=[received.append])
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe("cache_invalidation")
+
+    assert bus.publish(["college:PCC"], reason="test") == 1
+
+    message = None
+    for _ in range(5):  # the subscribe confirmation is read (and skipped) first
+        message = message or pubsub.get_message(timeout=1)
+    bus.handle_message(message)
+    assert received == [["college:PCC"]]
+    assert redis_client.get("transfer_plan:a") is None
@@ -0,0 +1,92 @@
+import json
+import random
+from datetime import datetime
+import fakeredis
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from RAG.config.settings import CacheWarmingSettings
+from app.schemas.transferPlanRequest import FullRequest
+from app.services.cache_warming import CacheWarmer, RequestStats, in_offpeak, should_refresh_early
+from app.utils.cache_wrapper import load_cached
+
+
+def plan_member(major_id: str) -> str:
+    request = FullRequest(request=[{"college_id": "c1", "university_id": "u1", "major_id": major_id}])
+    return json.dumps(request.model_dump(), sort_keys=True)
+
+
+def make_warmer(redis_client, **overrides):
+    service = MagicMock()
+    service.redis_client = redis_client
+    service.plan_cache_key = lambda r: f"transfer_plan:{json.dumps(r.model_dump(), sort_keys=True)}"
+    service.create_RAG_transfer_plan_v2 = AsyncMock(return_value={"term_plan": []})
+    service.get_major_list = AsyncMock(return_value=[{"major_name": "Computer Science"}])
+    settings = CacheWarmingSettings(**{"top_n": 2, **overrides})
+    return CacheWarmer(service, settings, rng=random.Random(0)), service
+
+
+def test_request_stats_rank_members():
+    """Test that request counts are summed and ranked."""
+    stats = RequestStats(fakeredis.FakeRedis())
+    for member, count in (("a", 3), ("b", 5), ("c", 1)):
+        for _ in range(count):
+            stats.record("major_list", member)
+
+    assert stats.top("major_list", 2) == [("b", 5.0), ("a", 3.0)]
+
+
+def test_sampled_request_stats_write_rarely_but_keep_the_ranking():
+    """Test that sampling counts about 1 in N requests, each weighted by N."""
+    stats = RequestStats(fakeredis.FakeRedis(), sample_rate=10, rng=random.Random(1))
+    for member, count in (("a", 300), ("b", 1000)):
+        for _ in range(count):
+            stats.record("plan", member)
+
+    ranking = stats.top("plan", 2)
+    assert [member for member, _ in ranking] == ["b", "a"]
+    assert all(score % 10 == 0 for _, score in ranking)  # one write per sampled request
+    assert 700 <= ranking[0][1] <= 1300 and 100 <= ranking[1][1] <= 500
+
+
+def test_early_expiration_probability_rises_near_expiry():
+    """Test XFetch: fresh entries rarely refresh, nearly-expired ones usually do."""
+    rng = random.Random(42)
+    far = sum(should_refresh_early(3600, 20, rng=rng) for _ in range(1000))
+    near = sum(should_refresh_early(10, 20, rng=rng) for _ in range(1000))
+
+    assert far == 0
+    assert near > 500
+    assert should_refresh_early(-2, 20)
+
+
+def test_offpeak_window_wraps_midnight():
+    """Test off-peak windows inside a day and across midnight."""
+    assert in_offpeak("2-6", datetime(2025, 1, 1, 3))
+    assert not in_offpeak("2-6", datetime(2025, 1, 1, 6))
+    assert in_offpeak("22-4", datetime(2025, 1, 1, 23))
+    assert in_offpeak("22-4", datetime(2025, 1, 1, 1))
+    assert not in_offpeak("22-4", datetime(2025, 1, 1, 12))
+
+
+@pytest.mark.asyncio
+async def test_warmer_refreshes_popular_missing_and_expiring_entries():
+    """Test that only the top-N entries that are missing or expiring get regenerated."""
+    redis_client = fakeredis.FakeRedis()
+    warmer, service = make_warmer(redis_client, offpeak_horizon_seconds=3600)
+    for member, count in ((plan_member("m1"), 5), (plan_member("m2"), 4), (plan_member("m3"), 1)):
+        for _ in range(count):
+            warmer.stats.record("transfer_plan", member)
+    warmer.stats.record("major_list", "major_list:u1:c1")
+
+    # m1 is fresh for a day, m2 expires within the off-peak horizon, m3 is not popular enough
+    redis_client.set(service.plan_cache_key(FullRequest.model_validate_json(plan_member("m1"))), "{}", ex=86400)
+    redis_client.set(service.plan_cache_key(FullRequest.model_validate_json(plan_member("m2"))), "{}", ex=600)
+
+    summary = await warmer.run_once(offpeak=True)
+
+    assert summary == {"offpeak": True, "plans": 1, "major_lists": 1}
+    refreshed = service.create_RAG_transfer_plan_v2.call_args_list
+    assert len(refreshed) == 1
+    assert refreshed[0].args[0].request[0].major_id == "m2"
+    assert refreshed[0].kwargs == {"use_cache": False}
+    assert load_cached(redis_client, "major_list:u1:c1") == ([{"major_name": "Computer Science"}], False)
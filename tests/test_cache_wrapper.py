@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+import fakeredis
+import pytest
+from app.db.connection.redis_connection import RedisConnection
+from app.utils import cache_wrapper
+from app.utils.cache_wrapper import cache_response, load_cached, store_cached
+
+
+@pytest.fixture
+def redis_client():
+    client = fakeredis.FakeRedis()
+    RedisConnection._client = client
+    yield client
+    RedisConnection._client = None
+
+
+def make_cached(calls, expiration=60, delay=0):
+    @cache_response("swr:{key}", expiration=expiration, stale_ttl=60)
+    async def compute(key: str):
+        calls.append(key)
+        await asyncio.sleep(delay)
+        return {"n": len(calls)}
+    return compute
+
+
+@pytest.mark.asyncio
+async def test_fresh_value_is_served_from_cache(redis_client):
+    """Test that a second call within the soft TTL does not recompute."""
+    calls = []
+    compute = make_cached(calls)
+
+    assert await compute(key="a") == {"n": 1}
+    assert await compute(key="a") == {"n": 1}
+    assert calls == ["a"]
+    assert 60 < redis_client.ttl("swr:a") <= 120
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_refreshing_once(redis_client):
+    """Test that stale values return immediately and only one background refresh runs."""
+    calls = []
+    compute = make_cached(calls, delay=0.01)
+    redis_client.set("swr:a", json.dumps({"v": {"n": 0}, "soft": time.time() - 1}), ex=60)
+
+    first, second = await asyncio.gather(compute(key="a"), compute(key="a"))
+    assert first == second == {"n": 0}
+    await asyncio.gather(*cache_wrapper._refreshing.values())
+
+    assert calls == ["a"]
+    assert load_cached(redis_client, "swr:a") == ({"n": 1}, False)
+    assert redis_client.get("lock:swr:a") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(redis_client):
+    """Test that concurrent misses for one key share a single recompute."""
+    calls = []
+    compute = make_cached(calls, delay=0.01)
+
+    results = await asyncio.gather(*(compute(key="a") for _ in range(5)))
+
+    assert results == [{"n": 1}] * 5
+    assert calls == ["a"]
+
+
+def test_legacy_plain_json_is_fresh(redis_client):
+    """Test that values cached before the envelope format are still readable."""
+    redis_client.set("swr:old", json.dumps([1, 2]))
+    store_cached(redis_client, "swr:new", [3], expiration=10)
+
+    assert load_cached(redis_client, "swr:old") == ([1, 2], False)
+    assert load_cached(redis_client, "swr:new") == ([3], False)
+
+
+@pytest.mark.asyncio
+async def test_error_results_are_not_cached(redis_client):
+    """Test that {"error": ...} results are returned but recomputed on the next call."""
+    calls = []
+
+    @cache_response("err:{key}", expiration=60)
+    async def compute(key: str):
+        calls.append(key)
+        return {"error": "db down"} if len(calls) == 1 else {"n": len(calls)}
+
+    assert await compute(key="a") == {"error": "db down"}
+    assert redis_client.get("err:a") is None
+    assert await compute(key="a") == {"n": 2}
+    assert await compute(key="a") == {"n": 2}
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import pathlib
+import time
+import httpx
+import pytest
+from webscrapper_tool.catalog_crawler import CatalogCrawler
+from webscrapper_tool.catalog_parsers import CourseLeafParser, load_catalogs
+from webscrapper_tool.pcc_scrape_course import BASE, parse_department, scrape_catalog
+from webscrapper_tool.scraper_engine import AsyncFetcher, HttpCache
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "pcc_catalog"
+
+
+class CatalogSite:
+    """Serves the saved catalog pages with ETags, like the real site."""
+    def __init__(self, bases=(BASE,)):
+        self.pages = {}
+        for base in bases:
+            self.pages.update({
+                f"{base}/": (FIXTURES / "index.html").read_bytes(),
+                f"{base}/math/": (FIXTURES / "math.html").read_bytes(),
+                f"{base}/chem/": (FIXTURES / "chem.html").read_bytes(),
+            })
+        self.log = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.log.append((url, request.headers.get("If-None-Match")))
+        if url not in self.pages:
+            return httpx.Response(404)
+        etag = '"%s"' % hashlib.md5(self.pages[url]).hexdigest()
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=self.pages[url], headers={"ETag": etag})
+
+    def fetcher(self, cache_dir, **kwargs):
+        kwargs.setdefault("per_host_interval", 0)
+        return AsyncFetcher(HttpCache(str(cache_dir)), transport=httpx.MockTransport(self.handler), **kwargs)
+
+
+def test_parse_department_from_saved_page():
+    """Test that courses, units, prerequisites and the assessment flag are parsed and honors skipped."""
+    catalog = parse_department((FIXTURES / "math.html").read_text(encoding="utf-8"), "math")
+
+    assert set(catalog) == {"MATH 005A", "MATH 005B"}
+    assert catalog["MATH 005A"]["units"] == 5.0
+    assert catalog["MATH 005A"]["assessment_allow"] is True
+    assert catalog["MATH 005B"]["prerequisites"] == [("MATH 005A",)]
+    assert catalog["MATH 005B"]["name"] == "Single Variable Calculus Ii"
+
+
+@pytest.mark.asyncio
+async def test_fetcher_revalidates_with_etag(tmp_path):
+    """Test that a cached page is revalidated with If-None-Match and a change is detected."""
+    site = CatalogSite()
+    url = f"{BASE}/math/"
+    async with site.fetcher(tmp_path) as fetcher:
+        first = await fetcher.fetch(url)
+        second = await fetcher.fetch(url)
+        site.pages[url] += b"<!-- updated -->"
+        third = await fetcher.fetch(url)
+
+    assert (first.source, first.changed) == ("network", True)
+    assert (second.source, second.changed) == ("revalidated", False)
+    assert second.body == first.body
+    assert site.log[1][1] is not None  # conditional request
+    assert (third.source, third.changed) == ("network", True)
+
+    async with site.fetcher(tmp_path, offline=True) as offline:
+        assert (await offline.fetch(url)).body == site.pages[url]
+        with pytest.raises(LookupError):
+            await offline.fetch(f"{BASE}/phys/")
+
+
+@pytest.mark.asyncio
+async def test_fetcher_rate_limits_per_host_and_retries(tmp_path):
+    """Test that requests to one host are spaced out and a 429 is retried after Retry-After."""
+    stamps, calls = [], {"n": 0}
+
+    def handler(request):
+        stamps.append(time.monotonic())
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, content=b"ok")
+
+    fetcher = AsyncFetcher(None, per_host_interval=0.05, transport=httpx.MockTransport(handler))
+    async with fetcher:
+        results = await asyncio.gather(*(fetcher.fetch(f"https://example.edu/{i}") for i in range(3)))
+
+    assert [r.body for r in results] == [b"ok"] * 3
+    assert fetcher.requests == 4
+    gaps = [later - earlier for earlier, later in zip(stamps, stamps[1:])]
+    assert min(gaps) >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_scrape_catalog_reparses_only_changed_departments(tmp_path, capsys):
+    """Test that a rerun revalidates every page but re-parses and rewrites only the changed one."""
+    site = CatalogSite()
+    out_dir = tmp_path / "pcc_courses"
+    all_courses = tmp_path / "all_courses.json"
+
+    async with site.fetcher(tmp_path / "cache") as fetcher:
+        first = await scrape_catalog(fetcher, out_dir, parse_workers=1, all_courses_path=all_courses)
+    assert (first.parsed, first.unchanged, first.failed) == (2, 0, 0)
+    assert set(json.loads(all_courses.read_text())) == {"MATH 005A", "MATH 005B", "CHEM 001A"}
+
+    site.pages[f"{BASE}/chem/"] = site.pages[f"{BASE}/chem/"].replace(b"GENERAL CHEMISTRY I", b"GENERAL CHEMISTRY ONE")
+    math_written = (out_dir / "math.json").stat().st_mtime_ns
+    async with site.fetcher(tmp_path / "cache") as fetcher:
+        second = await scrape_catalog(fetcher, out_dir, parse_workers=1, all_courses_path=all_courses)
+
+    assert (second.parsed, second.unchanged) == (1, 1)
+    assert (out_dir / "math.json").stat().st_mtime_ns == math_written
+    assert json.loads(all_courses.read_text())["CHEM 001A"]["name"] == "General Chemistry One"
+
+
+def test_catalog_config_adds_colleges_and_rejects_unknown_parsers(tmp_path):
+    """Test that a config file adds catalogs to the defaults and names unknown parser kinds."""
+    config = tmp_path / "catalogs.json"
+    config.write_text(json.dumps([{"college": "Glendale Community College", "parser": "courseleaf",
+                                   "base_url": "https://catalog.glendale.test/course-descriptions/", "skip_honors": False}]))
+
+    parsers = {parser.college: parser for parser in load_catalogs(str(config))}
+
+    assert set(parsers) == {"Pasadena City College", "Glendale Community College"}
+    assert parsers["Glendale Community College"].department_url("math") == "https://catalog.glendale.test/course-descriptions/math/"
+    assert parsers["Glendale Community College"].key == "glendale-community-college"
+    config.write_text(json.dumps([{"college": "X", "parser": "acalog", "base_url": "https://x.test"}]))
+    with pytest.raises(ValueError, match="acalog"):
+        load_catalogs(str(config))
+
+
+@pytest.mark.asyncio
+async def test_crawler_scrapes_colleges_in_parallel_with_per_college_metrics(tmp_path):
+    """Test that each college is crawled into its own directory and sink, with its own metrics."""
+    bases = ["https://catalog.one.test/course-descriptions", "https://catalog.two.test/course-descriptions"]
+    site = CatalogSite(bases)
+    parsers = [CourseLeafParser("College One", bases[0]), CourseLeafParser("College Two", bases[1], skip_honors=False)]
+    received = {}
+
+    class RecordingSink:
+        def __init__(self, college):
+            self.college = college
+            received[college] = {}
+
+        async def add_department(self, slug, courses):
+            received[self.college].update(courses)
+
+        async def finish(self, delete_missing=True):
+            received[self.college]["finished"] = delete_missing
+
+    async def sink(parser):
+        return RecordingSink(parser.college)
+
+    async with site.fetcher(tmp_path / "cache") as fetcher:
+        crawler = CatalogCrawler(parsers, fetcher, tmp_path / "catalogs", parse_workers=1)
+        first = await crawler.crawl(sink)
+        second = await crawler.crawl(sink)
+
+    assert (first["College One"].parsed, first["College One"].requests) == (2, 3)
+    assert first["College One"].courses == 3 and first["College Two"].courses == 4  # honors kept
+    assert "MATH 005AH" in received["College Two"] and received["College Two"]["finished"] is True
+    assert (tmp_path / "catalogs" / "college-two" / "math.json").exists()
+    assert (second["College One"].unchanged, second["College One"].not_modified) == (2, 3)
+    assert second["College One"].bytes_downloaded == 0
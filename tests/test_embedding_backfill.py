@@ -0,0 +1,130 @@
+import asyncio
+import mongomock_motor
+import pytest
+from unittest.mock import patch
+from app.db.connection.mongo_connection import MongoDB
+from RAG.config.settings import EmbeddingBackfillSettings
+from RAG.services.embedding_backfill import EmbeddingBackfill
+from RAG.services.embedding_services import EmbeddingService
+from RAG.services.providers import LocalEmbeddingProvider
+
+
+class CountingProvider(LocalEmbeddingProvider):
+    def __init__(self):
+        super().__init__(dimensions=4)
+        self.calls = []
+
+    async def embed(self, model, texts):
+        self.calls.append(list(texts))
+        return await super().embed(model, texts)
+
+
+@pytest.fixture
+def vector_db():
+    with patch("app.db.connection.mongo_connection.AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient):
+        MongoDB._instances.clear()
+        yield MongoDB("vector_db")
+        MongoDB._instances.clear()
+
+
+@pytest.mark.asyncio
+async def test_backfill_dedupes_and_skips_cached_content(vector_db):
+    """Test that identical and cached contents cost no extra API calls and stale chunks are re-embedded."""
+    provider = CountingProvider()
+    service = EmbeddingService(provider=provider)
+    chunks = vector_db.get_collection("knowledge_chunks")
+    await chunks.insert_many([
+        {"id": "1", "college_name": "PCC", "content": "MATH 5A -> MATH 31A"},
+        {"id": "2", "college_name": "PCC", "content": "  math 5a -> math 31a "},  # same after normalization
+        {"id": "3", "college_name": "PCC", "content": "CS 2 -> CS 31", "embedding": []},
+        {"id": "4", "college_name": "PCC", "content": "PHYS 1A -> PHYS 1A", "embedding": [0.1]},  # seeded, trusted
+        {"id": "5", "college_name": "PCC", "content": "CHEM 1A -> CHEM 14A", "embedding": [0.1],
+         "embedding_model": "old-model", "embedding_content_hash": "x"},
+        {"id": "6", "college_name": "PCC", "content": "ENGL 1A -> ENGCOMP 3"},
+    ])
+    await service.caching_service.cache_embedding("ENGL 1A -> ENGCOMP 3", [0.5, 0.5, 0.5, 0.5])
+
+    settings = EmbeddingBackfillSettings(batch_texts=2, concurrency=2, tokens_per_minute=0)
+    stats = await EmbeddingBackfill(settings, embedding_service=service).run()
+
+    assert (stats.candidates, stats.unique_texts, stats.cache_hits, stats.embedded) == (5, 4, 1, 3)
+    assert stats.api_calls == len(provider.calls) == 2
+    assert sorted(text for call in provider.calls for text in call) == ["CHEM 1A -> CHEM 14A", "CS 2 -> CS 31", "MATH 5A -> MATH 31A"]
+    one, two = await chunks.find_one({"id": "1"}), await chunks.find_one({"id": "2"})
+    assert one["embedding"] == two["embedding"] and one["embedding_model"] == service.model
+    assert (await chunks.find_one({"id": "6"}))["embedding"] == [0.5, 0.5, 0.5, 0.5]
+    assert (await chunks.find_one({"id": "4"}))["embedding"] == [0.1]
+
+    rerun = await EmbeddingBackfill(settings, embedding_service=service).run()
+    assert (rerun.candidates, rerun.api_calls) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_backfill_ignores_cache_entries_of_another_model(vector_db):
+    """Test that a model change re-embeds chunks instead of copying old-model vectors from the cache."""
+    provider = CountingProvider()
+    service = EmbeddingService(provider=provider)
+    chunks = vector_db.get_collection("knowledge_chunks")
+    await chunks.insert_many([
+        {"id": "1", "content": "MATH 5A -> MATH 31A", "embedding": [0.1], "embedding_model": "old-model",
+         "embedding_content_hash": service.caching_service._hash_content("MATH 5A -> MATH 31A")},
+        {"id": "2", "content": "CS 2 -> CS 31"},
+        {"id": "3", "content": "ENGL 1A -> ENGCOMP 3"},
+    ])
+    await service.caching_service.cache_embedding("MATH 5A -> MATH 31A", [0.1])  # seeded without a model
+    await service.caching_service.cache_embedding("CS 2 -> CS 31", [0.2], model="old-model")
+    await service.caching_service.cache_embedding("ENGL 1A -> ENGCOMP 3", [0.3], model=service.model)
+
+    settings = EmbeddingBackfillSettings(tokens_per_minute=0)
+    stats = await EmbeddingBackfill(settings, embedding_service=service).run()
+
+    assert (stats.cache_hits, stats.embedded) == (1, 2)
+    assert sorted(text for call in provider.calls for text in call) == ["CS 2 -> CS 31", "MATH 5A -> MATH 31A"]
+    assert (await chunks.find_one({"id": "1"}))["embedding"] != [0.1]
+    assert (await chunks.find_one({"id": "3"}))["embedding"] == [0.3]
+    assert await service.caching_service.get_cached_embedding("CS 2 -> CS 31", service.model) != [0.2]
+
+
+
+@pytest.mark.asyncio
+async def test_backfill_batches_fit_a_small_token_budget(vector_db):
+    """Test that batches stay under the per-minute budget and an oversized text doesn't wait forever."""
+    provider = CountingProvider()
+    service = EmbeddingService(provider=provider)
+    settings = EmbeddingBackfillSettings(tokens_per_minute=150, batch_tokens=100000)
+    backfill = EmbeddingBackfill(settings, embedding_service=service)
+
+    assert [len(batch) for batch in backfill._batches([("a", "a" * 400), ("b", "b" * 400)])] == [1, 1]
+
+    await vector_db.get_collection("knowledge_chunks").insert_one({"id": "1", "content": "c" * 4000})  # 1000 tokens
+    stats = await asyncio.wait_for(backfill.run(), timeout=5)
+    assert (stats.embedded, stats.api_calls) == (1, 1)
+
+
+
+@pytest.mark.asyncio
+async def test_failed_backfill_still_invalidates_updated_colleges(vector_db):
+    """Test that plans are invalidated for chunks written before the backfill failed."""
+    from scripts.seed_scripts.backfill_embeddings import backfill_embeddings
+
+    class FailingSecondCall(CountingProvider):
+        async def embed(self, model, texts):
+            if self.calls:
+                raise RuntimeError("embedding API down")
+            return await super().embed(model, texts)
+
+    await vector_db.get_collection("knowledge_chunks").insert_many([
+        {"id": "1", "college_name": "PCC", "content": "MATH 5A -> MATH 31A"},
+        {"id": "2", "college_name": "PCC", "content": "CS 2 -> CS 31"},
+    ])
+    settings = EmbeddingBackfillSettings(batch_texts=1, concurrency=1, tokens_per_minute=0)
+    service = EmbeddingService(provider=FailingSecondCall())
+
+    with patch("scripts.seed_scripts.backfill_embeddings.get_settings") as get_settings, \
+            patch("scripts.seed_scripts.backfill_embeddings.EmbeddingBackfill",
+                  lambda backfill_settings: EmbeddingBackfill(backfill_settings, embedding_service=service)), \
+            patch("scripts.seed_scripts.backfill_embeddings.publish_invalidation") as publish:
+        get_settings.return_value.embedding_backfill = settings
+        assert await backfill_embeddings() is None
+
+    publish.assert_called_once_with(["college:PCC"], reason="embedding backfill")
@@ -41,8 +41,8 @@ async def test_create_embedding_with_cache_miss():
         # Verify result and API call
         assert embedding == mock_result
         embedding_service.client.embeddings.create.assert_called_once()
-        mock_caching_service.get_cached_embedding.assert_called_once_with("test")
-        mock_caching_service.cache_embedding.assert_called_once_with("test", mock_result)
+        mock_caching_service.get_cached_embedding.assert_called_once_with("test", embedding_service.model)
+        mock_caching_service.cache_embedding.assert_called_once_with("test", mock_result, embedding_service.model)
 
 @pytest.mark.asyncio
 async def test_create_embedding_with_cache_hit():
@@ -62,7 +62,7 @@ async def test_create_embedding_with_cache_hit():
         # Verify result and that API wasn't called
         assert embedding == mock_cached_result
         embedding_service.client.embeddings.create.assert_not_called()
-        mock_caching_service.get_cached_embedding.assert_called_once_with("test")
+        mock_caching_service.get_cached_embedding.assert_called_once_with("test", embedding_service.model)
 
 @pytest.mark.asyncio
 async def test_batch_create_embedding_no_cache():
@@ -101,7 +101,7 @@ async def test_batch_create_embedding_mixed_cache():
         mock_caching_service = AsyncMock()
         
         # Setup cache behavior - hit for text1, miss for text2
-        async def mock_get_cached(text):
+        async def mock_get_cached(text, model=None):
             if text == "text1":
                 return cached_embedding
             return None
@@ -128,7 +128,7 @@ async def test_batch_create_embedding_mixed_cache():
         
         # Verify caching calls
         assert mock_caching_service.get_cached_embedding.call_count == 2
-        mock_caching_service.cache_embedding.assert_called_once_with("text2", new_embedding)
+        mock_caching_service.cache_embedding.assert_called_once_with("text2", new_embedding, embedding_service.model)
 
 @pytest.mark.asyncio
 async def test_batch_create_embedding_all_cached():
@@ -139,7 +139,7 @@ async def test_batch_create_embedding_all_cached():
         mock_caching_service = AsyncMock()
         
         # Setup cache hits for all items
-        async def mock_get_cached(text):
+        async def mock_get_cached(text, model=None):
             if text == "text1":
                 return cached_embeddings[0]
             return cached_embeddings[1]
@@ -271,7 +271,7 @@ async def test_batch_embedding_order_preservation():
     with patch('RAG.services.embedding_services.CachingService') as mock_caching_service_class:
         mock_caching_service = AsyncMock()
         
-        async def mock_get_cached(text):
+        async def mock_get_cached(text, model=None):
             return cached_embeddings.get(text, None)
             
         mock_caching_service.get_cached_embedding.side_effect = mock_get_cached
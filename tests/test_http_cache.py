@@ -0,0 +1,56 @@
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.db.connection.redis_connection import RedisConnection
+from app.utils.cache_wrapper import cache_response
+from app.utils.http_cache import http_cache
+
+
+@pytest.fixture
+def client():
+    RedisConnection._client = fakeredis.FakeRedis()
+    app, calls = FastAPI(), []
+
+    @app.get("/items/{kind}")
+    @http_cache(max_age=60, stale_while_revalidate=600)
+    @cache_response("items:{kind}", expiration=60)
+    async def items(kind: str):
+        calls.append(kind)
+        return {"error": "unavailable"} if kind == "broken" else [{"kind": kind, "n": 1}]
+
+    app.state.calls = calls
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    RedisConnection._client = None
+
+
+@pytest.mark.asyncio
+async def test_etag_and_cache_control_with_conditional_get(client):
+    """Test that responses carry a content ETag and Cache-Control, and a matching If-None-Match gets 304."""
+    async with client:
+        first = await client.get("/items/a")
+        assert first.json() == [{"kind": "a", "n": 1}]
+        assert first.headers["cache-control"] == "public, max-age=60, stale-while-revalidate=600"
+        etag = first.headers["etag"]
+
+        revalidated = await client.get("/items/a", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304 and revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        weak = await client.get("/items/a", headers={"If-None-Match": f'"stale", W/{etag}'})
+        other = await client.get("/items/b", headers={"If-None-Match": etag})
+
+    assert weak.status_code == 304
+    assert other.status_code == 200 and other.headers["etag"] != etag
+    assert client._transport.app.state.calls == ["a", "b"]  # the Redis cache still sits underneath
+
+
+@pytest.mark.asyncio
+async def test_error_results_are_not_cacheable(client):
+    """Test that {"error": ...} results go out with no-store and no ETag."""
+    async with client:
+        response = await client.get("/items/broken")
+
+    assert response.json() == {"error": "unavailable"}
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
@@ -0,0 +1,118 @@
+import csv
+import json
+import os
+import pytest
+from scripts.seed_scripts.ingestion import Checkpoint, IngestionPipeline
+from scripts.seed_scripts.seed_vectordb import parse_knowledge_chunk_rows
+
+
+def write_chunks_csv(path, rows, bad_rows=()):
+    fields = ["id", "content", "college_name", "university_name", "major_name", "chunk_type", "created_at", "embedding"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow({
+                "id": f"chunk-{i}", "content": "text", "college_name": "PCC", "university_name": "UCLA",
+                "major_name": "CS", "chunk_type": "articulation", "created_at": "2025-01-01 00:00:00",
+                "embedding": "not json" if i in bad_rows else json.dumps([i / 10, 0.5]),
+            })
+
+
+@pytest.mark.asyncio
+async def test_pipeline_ingests_every_row(tmp_path):
+    """Test that all parsable rows are written, rejected rows counted and the checkpoint removed."""
+    path = str(tmp_path / "chunks.csv")
+    write_chunks_csv(path, 25, bad_rows={3, 17})
+    written = []
+
+    async def write(documents):
+        written.extend(documents)
+        return len(documents)
+
+    pipeline = IngestionPipeline(path, parse_knowledge_chunk_rows, write, batch_size=4, parse_workers=2,
+                                 writers=3, checkpoint_path=path + ".checkpoint")
+    stats = await pipeline.run()
+
+    assert (stats.rows_read, stats.rows_rejected, stats.documents_written) == (25, 2, 23)
+    assert sorted(int(doc["id"].split("-")[1]) for doc in written) == [i for i in range(25) if i not in (3, 17)]
+    assert next(doc for doc in written if doc["id"] == "chunk-4")["embedding"] == [0.4, 0.5]
+    assert not os.path.exists(path + ".checkpoint")
+
+
+@pytest.mark.asyncio
+async def test_failed_run_resumes_from_checkpoint(tmp_path):
+    """Test that a rerun after a writer failure skips the rows already written."""
+    path = str(tmp_path / "chunks.csv")
+    checkpoint_path = path + ".checkpoint"
+    write_chunks_csv(path, 20)
+    written = []
+
+    async def failing_write(documents):
+        if documents[0]["id"] == "chunk-10":
+            raise ConnectionError("primary stepped down")
+        written.extend(doc["id"] for doc in documents)
+        return len(documents)
+
+    pipeline = IngestionPipeline(path, parse_knowledge_chunk_rows, failing_write, batch_size=5, parse_workers=1,
+                                 writers=1, checkpoint_path=checkpoint_path)
+    with pytest.raises(ConnectionError):
+        await pipeline.run()
+    assert Checkpoint(checkpoint_path, path).load() == 10
+
+    async def write(documents):
+        written.extend(doc["id"] for doc in documents)
+        return len(documents)
+
+    stats = await IngestionPipeline(path, parse_knowledge_chunk_rows, write, batch_size=5, parse_workers=1,
+                                    writers=1, checkpoint_path=checkpoint_path).run()
+
+    assert stats.resumed_from == 10
+    assert written == [f"chunk-{i}" for i in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_keeps_first_row_of_a_repeated_id(tmp_path):
+    """Test that dedupe_column drops later rows repeating an id and keeps the first."""
+    path = str(tmp_path / "chunks.csv")
+    write_chunks_csv(path, 6)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerow(["chunk-1", "second copy", "PCC", "UCLA", "CS", "articulation",
+                                "2025-01-01 00:00:00", json.dumps([0.9, 0.9])])
+    written = []
+
+    async def write(documents):
+        written.extend(documents)
+        return len(documents)
+
+    stats = await IngestionPipeline(path, parse_knowledge_chunk_rows, write, batch_size=4, parse_workers=2,
+                                    writers=2, dedupe_column="id").run()
+
+    assert (stats.rows_read, stats.rows_duplicate, stats.documents_written) == (7, 1, 6)
+    assert stats.duplicate_keys == ["chunk-1"]
+    assert [doc["content"] for doc in written if doc["id"] == "chunk-1"] == ["text"]
+    assert "1 duplicates skipped" in stats.summary()
+
+
+@pytest.mark.asyncio
+async def test_resume_remembers_ids_of_the_skipped_prefix(tmp_path):
+    """Test that rows skipped on resume, read a batch at a time, still count as seen ids."""
+    path = str(tmp_path / "chunks.csv")
+    checkpoint_path = path + ".checkpoint"
+    write_chunks_csv(path, 10)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerow(["chunk-2", "second copy", "PCC", "UCLA", "CS", "articulation",
+                                "2025-01-01 00:00:00", json.dumps([0.9, 0.9])])
+    Checkpoint(checkpoint_path, path).save(7)
+    written = []
+
+    async def write(documents):
+        written.extend(doc["id"] for doc in documents)
+        return len(documents)
+
+    stats = await IngestionPipeline(path, parse_knowledge_chunk_rows, write, batch_size=2, parse_workers=1, writers=1,
+                                    checkpoint_path=checkpoint_path, dedupe_column="id").run()
+
+    assert stats.resumed_from == 7
+    assert sorted(written) == ["chunk-7", "chunk-8", "chunk-9"]
+    assert stats.duplicate_keys == ["chunk-2"]
@@ -0,0 +1,63 @@
+import json
+import logging
+import queue
+import random
+from app.utils.logging_config import DeferredQueueHandler, JSONFormatter, LazyPayload, SamplingFilter, parse_sample_rates
+
+
+def make_record(name="app.utils.cache_wrapper", level=logging.INFO, msg="Cache hit for %s", args=("major_list",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_sampling_filter_keeps_warnings_and_honors_rates():
+    """Test per-logger sampling, per-record overrides and that warnings always pass."""
+    sampler = SamplingFilter({"app.utils": 0.0, "RAG": 1.0}, rng=random.Random(0))
+
+    assert not sampler.filter(make_record())
+    assert sampler.filter(make_record(level=logging.WARNING))
+    assert sampler.filter(make_record(name="RAG.services.synthesizer"))
+    assert sampler.filter(make_record(sample_rate=1.0))
+    assert sampler.filter(make_record(name="app.services.transfer_service"))
+
+    half = SamplingFilter({"app": 0.5}, rng=random.Random(1))
+    kept = sum(half.filter(make_record(name="app.x")) for _ in range(1000))
+    assert 400 < kept < 600
+
+
+def test_parse_sample_rates_overrides_defaults():
+    """Test that LOG_SAMPLE_RATES entries override defaults and bad values are ignored."""
+    rates = parse_sample_rates("app.utils.cache_wrapper=1, custom.logger=0.25, broken=abc")
+
+    assert rates["app.utils.cache_wrapper"] == 1.0
+    assert rates["custom.logger"] == 0.25
+    assert "broken" not in rates
+
+
+def test_lazy_payload_truncates_and_defers():
+    """Test that payloads serialize only when rendered and are capped."""
+    payload = {"term_plan": [{"code": f"MATH {i:03d}"} for i in range(100)]}
+
+    lazy = LazyPayload(payload, limit=50)
+    text = str(lazy)
+
+    assert text.startswith('{"term_plan":[{"code":"MATH 000"}')
+    assert text.endswith("chars)")
+    assert len(text) < 80
+
+
+def test_deferred_queue_handler_leaves_formatting_to_listener():
+    """Test that queued records keep msg/args and render as JSON with extras."""
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.emit(make_record(args=(LazyPayload({"a": 1}),), request_id="abc"))
+
+    queued = log_queue.get_nowait()
+    assert queued.msg == "Cache hit for %s"
+    assert isinstance(queued.args[0], LazyPayload)
+
+    entry = json.loads(JSONFormatter().format(queued))
+    assert entry["msg"] == 'Cache hit for {"a":1}'
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc"
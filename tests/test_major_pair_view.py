@@ -0,0 +1,86 @@
+import mongomock_motor
+import pytest
+from unittest.mock import patch
+from bson.objectid import ObjectId
+from app.db.connection.mongo_connection import MongoDB
+from app.db.services.major_pair_view import MajorPairView
+from app.db.services.mongo_services import CollegeUniMajorPairService
+
+COLLEGE_ID, UNIVERSITY_ID = ObjectId(), ObjectId()
+CS, MATH, DS = ObjectId(), ObjectId(), ObjectId()
+
+
+@pytest.fixture
+def main_db():
+    with patch("app.db.connection.mongo_connection.AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient):
+        MongoDB._instances.clear()
+        MajorPairView.reset()
+        yield MongoDB("main_db")
+        MajorPairView.reset()
+        MongoDB._instances.clear()
+
+
+async def seed(db):
+    await db.get_collection("majors").insert_many([
+        {"_id": CS, "major_name": "Computer Science"},
+        {"_id": MATH, "major_name": "Mathematics"},
+    ])
+    await db.get_collection("college_uni_major_pair").insert_many([
+        pair(CS, alter=MATH), pair(MATH), pair(DS),  # DS has no majors document
+        pair(MATH, active=False), pair(CS, university=ObjectId()),
+    ])
+
+
+def pair(major, alter=None, active=True, university=UNIVERSITY_ID):
+    return {"_id": ObjectId(), "from_college_id": COLLEGE_ID, "to_university_id": university,
+            "major_id": major, "alter_major_id": alter, "is_active": active}
+
+
+async def major_list():
+    return await CollegeUniMajorPairService().get_majors_with_names(str(UNIVERSITY_ID), str(COLLEGE_ID))
+
+
+@pytest.mark.asyncio
+async def test_view_rows_match_the_aggregation(main_db):
+    """Test that after a refresh the view serves exactly what the $lookup aggregation returned."""
+    await seed(main_db)
+    from_aggregation = await major_list()
+
+    assert await MajorPairView().refresh() == 5
+    MajorPairView.reset()
+    from_view = await major_list()
+
+    assert from_view == from_aggregation
+    assert [row["major_name"] for row in from_view] == ["Computer Science", "Mathematics", "Unknown Major"]
+    assert from_view[0]["alter_major_name"] == "Mathematics"
+    assert from_view[1]["alter_major_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_changes_patch_the_view_and_refresh_drops_deleted_pairs(main_db):
+    """Test that pair and major change events update the view, and a refresh removes rows of deleted pairs."""
+    await seed(main_db)
+    view = MajorPairView()
+    await view.refresh()
+    pairs = main_db.get_collection("college_uni_major_pair")
+
+    new_pair = pair(MATH, alter=CS)
+    await pairs.insert_one(new_pair)
+    await view.apply_change("college_uni_major_pair", {"operationType": "insert", "documentKey": {"_id": new_pair["_id"]},
+                                                       "fullDocument": new_pair})
+    await main_db.get_collection("majors").update_one({"_id": CS}, {"$set": {"major_name": "Computing"}})
+    await view.apply_change("majors", {"operationType": "update", "documentKey": {"_id": CS},
+                                       "fullDocument": {"_id": CS, "major_name": "Computing"}})
+
+    rows = await view.get_rows(UNIVERSITY_ID, COLLEGE_ID)
+    assert [(row["major_name"], row["alter_major_name"]) for row in rows] == [
+        ("Computing", "Mathematics"), ("Mathematics", None), ("Mathematics", "Computing"), ("Unknown Major", None)
+    ]
+
+    await pairs.delete_one({"_id": new_pair["_id"]})
+    await view.apply_change("college_uni_major_pair", {"operationType": "delete", "documentKey": {"_id": new_pair["_id"]}})
+    assert len(await view.get_rows(UNIVERSITY_ID, COLLEGE_ID)) == 3
+
+    await pairs.delete_one({"major_id": DS})  # missed by the view, e.g. while the watcher was down
+    assert await view.refresh() == 4
+    assert [row["major_name"] for row in await view.get_rows(UNIVERSITY_ID, COLLEGE_ID)] == ["Computing", "Mathematics"]
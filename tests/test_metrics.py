@@ -0,0 +1,60 @@
+import pytest
+from app.utils import metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.registry.reset()
+    metrics.configure(True)
+    yield metrics
+    metrics.configure(False)
+    metrics.registry.reset()
+
+
+def test_spans_are_noops_when_disabled():
+    """Test that disabled metrics record nothing and reuse a shared no-op span."""
+    metrics.configure(False)
+    metrics.registry.reset()
+
+    with metrics.span("plan.articulation") as first, metrics.span("plan.validate") as second:
+        pass
+    metrics.record_cache("transfer_plan", True)
+
+    assert first is second
+    assert metrics.STAGE_LATENCY.series == {}
+    assert metrics.CACHE_REQUESTS.values == {}
+
+
+@pytest.mark.asyncio
+async def test_traced_records_stage_latency_and_trace(enabled_metrics):
+    """Test that traced coroutines feed the histogram and the request trace."""
+    @metrics.traced("llm.plan")
+    async def call_llm():
+        return "plan"
+
+    token = metrics.start_trace()
+    assert await call_llm() == "plan"
+    with metrics.span("plan.validate"):
+        pass
+    spans = metrics.finish_trace(token)
+
+    assert [name for name, _ in spans] == ["llm.plan", "plan.validate"]
+    assert metrics.STAGE_LATENCY.series[("llm.plan",)][2] == 1
+    assert metrics.server_timing(spans).startswith("llm_plan;dur=")
+
+
+def test_render_prometheus_text(enabled_metrics):
+    """Test histogram buckets, token counts and the derived cache hit ratio."""
+    metrics.STAGE_LATENCY.observe(0.02, "embedding")
+    metrics.record_tokens("plan", 1200, 300)
+    metrics.record_cache("major_list", True)
+    metrics.record_cache("major_list", True)
+    metrics.record_cache("major_list", False)
+
+    text = metrics.render()
+
+    assert 'better_transfer_stage_duration_seconds_bucket{stage="embedding",le="0.01"} 0' in text
+    assert 'better_transfer_stage_duration_seconds_bucket{stage="embedding",le="0.025"} 1' in text
+    assert 'better_transfer_stage_duration_seconds_count{stage="embedding"} 1' in text
+    assert 'better_transfer_llm_tokens_sum{kind="plan",direction="prompt"} 1200' in text
+    assert 'better_transfer_cache_hit_ratio{cache="major_list"} 0.6667' in text
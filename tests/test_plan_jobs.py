@@ -0,0 +1,196 @@
+import asyncio
+import socket
+import time
+import fakeredis
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pydantic import ValidationError
+from RAG.config.settings import JobSettings
+from app.schemas.transferPlanRequest import FullRequest, PlanJobRequest
+from app.utils.webhooks import WebhookRejected, check_webhook_url, resolve_webhook_host
+from app.services.plan_jobs import DuplicateJobError, PlanJobQueue, QueueFullError
+
+
+def make_request(major_id="m1", terms=4):
+    return FullRequest(request=[{"college_id": "c1", "university_id": "u1", "major_id": major_id}], number_of_terms=terms)
+
+
+def make_queue(**overrides):
+    settings = JobSettings(**{"max_queue_depth": 10, **overrides})
+    return PlanJobQueue(fakeredis.FakeRedis(), settings, cache_key=lambda r: f"transfer_plan:{r.number_of_terms}")
+
+
+def test_submit_deduplicates_identical_requests():
+    """Test that an identical request returns the live job instead of queueing twice."""
+    queue = make_queue()
+
+    first = queue.submit(make_request())
+    second = queue.submit(make_request())
+    other = queue.submit(make_request(major_id="m2"))
+
+    assert first["job_id"] == second["job_id"]
+    assert other["job_id"] != first["job_id"]
+    assert queue.queue_depth() == 2
+
+
+def test_finished_jobs_do_not_outlive_plan_cache_invalidation():
+    """Test that once a job is done, identical submits follow the plan cache rather than the old result."""
+    queue = make_queue()
+    job = queue.submit(make_request())
+    queue.complete(queue.claim(), {"term_plan": ["old"]})
+
+    queue.redis.set("transfer_plan:4", b'{"term_plan": ["cached"]}')
+    assert queue.submit(make_request())["result"] == {"term_plan": ["cached"]}
+
+    queue.redis.delete("transfer_plan:4")  # what a plan tag invalidation does
+    fresh = queue.submit(make_request())
+    assert fresh["job_id"] != job["job_id"] and fresh["status"] == "queued"
+
+
+def test_duplicate_submit_with_another_webhook_is_rejected():
+    """Test that a second caller's webhook is never silently dropped by deduplication."""
+    queue = make_queue()
+    job = queue.submit(make_request(), webhook_url="https://a.example.com/hook")
+
+    assert queue.submit(make_request(), webhook_url="https://a.example.com/hook")["job_id"] == job["job_id"]
+    assert queue.submit(make_request())["job_id"] == job["job_id"]
+    with pytest.raises(DuplicateJobError) as excinfo:
+        queue.submit(make_request(), webhook_url="https://b.example.com/hook")
+    assert excinfo.value.job_id == job["job_id"]
+
+
+def test_claim_orders_by_priority_then_fifo():
+    """Test that high priority jobs are claimed first and FIFO holds within a band."""
+    queue = make_queue()
+    low = queue.submit(make_request("a"), priority="low")
+    normal_1 = queue.submit(make_request("b"))
+    normal_2 = queue.submit(make_request("c"))
+    high = queue.submit(make_request("d"), priority="high")
+
+    order = [queue.claim()["job_id"] for _ in range(4)]
+
+    assert order == [high["job_id"], normal_1["job_id"], normal_2["job_id"], low["job_id"]]
+    assert queue.claim() is None
+    assert queue.get(high["job_id"])["status"] == "running"
+
+
+def test_backpressure_and_cached_results():
+    """Test that a full queue rejects new work but cached plans complete immediately."""
+    queue = make_queue(max_queue_depth=1)
+    queue.submit(make_request("a"))
+
+    with pytest.raises(QueueFullError) as excinfo:
+        queue.submit(make_request("b"))
+    assert excinfo.value.retry_after == 30
+
+    queue.redis.set("transfer_plan:6", b'{"term_plan": []}')
+    job = queue.submit(make_request("b", terms=6))
+    assert job["status"] == "done"
+    assert job["result"] == {"term_plan": []}
+
+
+def test_failed_jobs_release_fingerprint_and_stale_jobs_requeue():
+    """Test that failures allow resubmission and crashed workers' jobs go back on the queue."""
+    queue = make_queue(visibility_timeout=0)
+    job = queue.submit(make_request())
+    claimed = queue.claim()
+    queue.fail(claimed, "LLM timeout")
+
+    retry = queue.submit(make_request())
+    assert retry["job_id"] != job["job_id"]
+
+    queue.claim()
+    time.sleep(0.01)
+    assert queue.requeue_stale() == 1
+    assert queue.get(retry["job_id"])["status"] == "queued"
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_job_and_records_errors():
+    """Test that the worker stores results and turns error dicts into failed jobs."""
+    from app.workers.plan_worker import PlanWorker
+
+    service = MagicMock()
+    service.redis_client = fakeredis.FakeRedis()
+    service.plan_cache_key = lambda r: "transfer_plan:none"
+    service.create_RAG_transfer_plan_v2 = AsyncMock(side_effect=[{"term_plan": []}, {"error": "No valid combinations"}])
+    worker = PlanWorker(service=service, concurrency=1)
+
+    ok = worker.queue.submit(make_request("a"))
+    bad = worker.queue.submit(make_request("b"))
+    await worker.process(worker.queue.claim())
+    await worker.process(worker.queue.claim())
+
+    assert worker.queue.get(ok["job_id"])["result"] == {"term_plan": []}
+    assert worker.queue.get(bad["job_id"])["status"] == "failed"
+    assert worker.queue.get(bad["job_id"])["error"] == "No valid combinations"
+
+
+@pytest.mark.parametrize("url", [
+    "http://hooks.example.com/plan", "https://127.0.0.1/x", "https://169.254.169.254/latest/meta-data",
+    "https://10.0.0.5/x", "https://[::1]/x", "https://[::ffff:127.0.0.1]/x", "https://localhost/x",
+    "https://user:pw@hooks.example.com/x",
+])
+def test_job_request_rejects_non_public_webhooks(url):
+    """Test that webhooks must be https and may not name internal hosts."""
+    with pytest.raises(ValidationError):
+        PlanJobRequest(request=make_request().request, webhook_url=url)
+
+
+@pytest.mark.asyncio
+async def test_webhook_host_resolution_and_allowlist():
+    """Test that hosts resolving to private addresses are refused unless allowlisted."""
+    def addresses(*ips):
+        return AsyncMock(return_value=[(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, 443)) for ip in ips])
+
+    assert PlanJobRequest(request=make_request().request, webhook_url="https://hooks.example.com/plan").webhook_url
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "getaddrinfo", addresses("93.184.216.34")):
+        await resolve_webhook_host("https://hooks.example.com/plan")
+    with patch.object(loop, "getaddrinfo", addresses("93.184.216.34", "10.1.2.3")):
+        with pytest.raises(WebhookRejected):
+            await resolve_webhook_host("https://hooks.example.com/plan")
+
+    await resolve_webhook_host("https://hooks.internal/plan", allowed_hosts=["hooks.internal"])
+    with pytest.raises(WebhookRejected):
+        check_webhook_url("https://hooks.example.com/plan", allowed_hosts=["hooks.internal"])
+
+
+@pytest.mark.asyncio
+async def test_worker_refuses_webhooks_that_now_resolve_internally():
+    """Test that delivery re-checks the host and never follows redirects."""
+    from app.workers.plan_worker import PlanWorker
+
+    service = MagicMock()
+    service.redis_client = fakeredis.FakeRedis()
+    service.plan_cache_key = lambda r: "transfer_plan:none"
+    worker = PlanWorker(service=service, concurrency=1)
+    job = {"job_id": "j1", "status": "done", "result": {}, "error": None, "webhook_url": "https://hooks.example.com/plan"}
+
+    with patch("app.workers.plan_worker.resolve_webhook_host", AsyncMock(side_effect=WebhookRejected("private"))), \
+            patch("app.workers.plan_worker.httpx.AsyncClient") as client_cls:
+        await worker.notify(job)
+
+    assert client_cls.call_args.kwargs["follow_redirects"] is False
+    client_cls.return_value.__aenter__.return_value.post.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cached_jobs_still_call_their_webhook():
+    """Test that a job answered from the plan cache queues its webhook for a worker."""
+    from app.workers.plan_worker import PlanWorker
+
+    service = MagicMock()
+    service.redis_client = fakeredis.FakeRedis()
+    service.plan_cache_key = lambda r: f"transfer_plan:{r.number_of_terms}"
+    worker = PlanWorker(service=service, concurrency=1)
+    worker.queue.redis.set("transfer_plan:4", b'{"term_plan": []}')
+
+    job = worker.queue.submit(make_request(), webhook_url="https://hooks.example.com/plan")
+    worker.queue.submit(make_request())  # poll-only cache hit
+
+    with patch.object(worker, "notify", AsyncMock()) as notify:
+        assert await worker.deliver_webhooks() == 1
+    assert job["status"] == "done"
+    assert notify.call_args.args[0]["job_id"] == job["job_id"]
+    assert worker.queue.claim_webhook() is None
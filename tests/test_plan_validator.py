@@ -0,0 +1,80 @@
+from app.services.course_scheduler import CourseScheduler
+from app.services.plan_validator import PlanValidator
+from tests.catalog_data import PREREQUISITES
+
+REQUIREMENTS = [{
+    "university": "University of California, Los Angeles",
+    "major": "Computer Science",
+    "requirements": [
+        {"university_courses": ["MATH 31B"], "options": [["MATH 005B"]]},
+        {"university_courses": ["COM SCI 31"], "options": [["CS 002"]]},
+    ]
+}]
+
+
+def course(code):
+    return {"code": code, "name": code, "units": 4.0, "difficulty": 3, "prerequisites": [], "satisfies": [], "alternatives": []}
+
+
+def make_plan(*terms):
+    return {
+        "targets": [{"university": REQUIREMENTS[0]["university"], "major": REQUIREMENTS[0]["major"]}],
+        "source_college": "Pasadena City College",
+        "term_plan": [{"term": idx + 1, "courses": [course(code) for code in codes]} for idx, codes in enumerate(terms)],
+        "unscheduled_courses": []
+    }
+
+
+def test_valid_plan_scores_full_marks():
+    """Test that an ordered, complete plan passes validation."""
+    report = PlanValidator().validate(make_plan(["MATH 005A", "CS 002"], ["MATH 005B"]), PREREQUISITES, REQUIREMENTS, 2)
+
+    assert report == {"valid": True, "score": 1.0, "violations": []}
+
+
+def test_detects_each_violation_type():
+    """Test ordering, missing, unknown, duplicate and term count violations."""
+    plan = make_plan(["MATH 005B", "MATH 005A", "FAKE 101"], ["MATH 005A"])
+
+    report = PlanValidator().validate(plan, PREREQUISITES, REQUIREMENTS, 3)
+
+    types = {v["type"] for v in report["violations"]}
+    assert types == {"term_count", "prerequisite_order", "missing_articulation", "unknown_course", "duplicate_course"}
+    assert not report["valid"]
+    assert report["score"] < 1.0
+
+
+def test_repair_reschedules_and_fills_missing_courses():
+    """Test that small violations are repaired locally without the LLM."""
+    validator = PlanValidator()
+    plan = make_plan(["MATH 005B", "MATH 005A", "FAKE 101"])
+    report = validator.validate(plan, PREREQUISITES, REQUIREMENTS, 3)
+
+    repaired = validator.repair(plan, report, PREREQUISITES, REQUIREMENTS, 3)
+
+    assert validator.validate(repaired, PREREQUISITES, REQUIREMENTS, 3)["valid"]
+    assert repaired["unscheduled_courses"] == [{"code": "FAKE 101", "reason": "Not offered in the college catalog"}]
+
+
+def test_repair_refuses_large_or_malformed_plans():
+    """Test that plans needing too many fixes are left for regeneration."""
+    validator = PlanValidator(max_repairs=1)
+    plan = make_plan(["FAKE 101", "FAKE 102"])
+
+    assert validator.repair(plan, validator.validate(plan, PREREQUISITES, REQUIREMENTS, 1), PREREQUISITES, REQUIREMENTS, 1) is None
+    assert validator.repair({}, validator.validate({}, PREREQUISITES, REQUIREMENTS, 1), PREREQUISITES, REQUIREMENTS, 1) is None
+
+
+
+def test_repair_rejects_a_reschedule_that_still_breaks_prerequisites():
+    """Test that a repaired plan is only returned once it validates."""
+    class SingleTermScheduler(CourseScheduler):
+        def distribute_courses(self, plan, course_graph):
+            plan["term_plan"][0]["courses"].extend(course["data"] for course in course_graph.values())
+
+    validator = PlanValidator(scheduler=SingleTermScheduler())
+    plan = make_plan(["MATH 005B", "MATH 005A", "CS 002"], [])
+    report = validator.validate(plan, PREREQUISITES, REQUIREMENTS, 2)
+
+    assert validator.repair(plan, report, PREREQUISITES, REQUIREMENTS, 2) is None
+    assert PlanValidator().repair(plan, report, PREREQUISITES, REQUIREMENTS, 2) is not None
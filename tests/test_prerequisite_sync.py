@@ -0,0 +1,92 @@
+import mongomock_motor
+import pytest
+from unittest.mock import MagicMock, patch
+from app.db.services.mongo_services import PrerequisiteService
+from scripts.seed_scripts.prerequisite_sync import PrerequisiteSync, compute_unlocks
+
+COLLEGE = "Pasadena City College"
+
+
+def course(name, department, prerequisites=()):
+    return {"name": name, "units": 4.0, "difficulty": 3, "assessment_allow": False,
+            "prerequisites": [tuple(group) for group in prerequisites], "department": department}
+
+
+def catalog():
+    return [
+        ("math", {"MATH 005A": course("Calculus I", "math"),
+                  "MATH 005B": course("Calculus II", "math", [["MATH 005A"]])}),
+        ("phys", {"PHYS 001A": course("Mechanics", "phys", [["MATH 005A"], ["MATH 005B"]])}),
+    ]
+
+
+def make_sync(db, **kwargs):
+    return PrerequisiteSync(COLLEGE, collection=db["pcc_course_prerequisites"], versions=db["prerequisite_versions"], **kwargs)
+
+
+def test_compute_unlocks_ignores_courses_outside_the_catalog():
+    """Test that reverse edges are built across departments and unknown prerequisites are dropped."""
+    graph = {"MATH 005A": [], "MATH 005B": [["MATH 005A"]], "PHYS 001A": [["MATH 005A", "CHEM 999"]]}
+
+    assert compute_unlocks(graph) == {"MATH 005A": ["MATH 005B", "PHYS 001A"], "MATH 005B": [], "PHYS 001A": []}
+
+
+@pytest.mark.asyncio
+async def test_sync_writes_only_changes_and_bumps_version():
+    """Test that a resync writes nothing, and a changed department updates courses, unlocks and the version."""
+    db = mongomock_motor.AsyncMongoMockClient()["course_prerequisite"]
+    collection = db["pcc_course_prerequisites"]
+
+    first = await make_sync(db).run(catalog())
+    assert (first.inserted, first.version) == (3, 1)
+    math_a = await collection.find_one({"course_code": "MATH 005A"})
+    assert math_a["unlocks"] == ["MATH 005B", "PHYS 001A"]
+    assert math_a["college"] == COLLEGE
+
+    rerun = await make_sync(db).run(catalog())
+    assert (rerun.changed, rerun.unchanged, rerun.version) == (0, 3, 1)
+
+    departments = catalog()
+    departments[1] = ("phys", {"PHYS 001A": course("Mechanics", "phys", [["MATH 005B"]])})
+    departments[0][1].pop("MATH 005B")
+    departments[0][1]["MATH 005C"] = course("Calculus III", "math", [["MATH 005A"]])
+    changed = await make_sync(db).run(departments)
+
+    assert (changed.inserted, changed.updated, changed.deleted, changed.version) == (1, 1, 1, 2)
+    assert (await collection.find_one({"course_code": "MATH 005A"}))["unlocks"] == ["MATH 005C"]
+    assert await collection.find_one({"course_code": "MATH 005B"}) is None
+
+
+@pytest.mark.asyncio
+async def test_partial_scrape_keeps_unseen_courses():
+    """Test that without delete_missing, courses of departments not seen are kept in the graph."""
+    db = mongomock_motor.AsyncMongoMockClient()["course_prerequisite"]
+    await make_sync(db).run(catalog())
+
+    stats = await make_sync(db).run(catalog()[1:], delete_missing=False)
+
+    assert (stats.deleted, stats.unlocks_updated, stats.changed) == (0, 0, 0)
+    assert await db["pcc_course_prerequisites"].count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_prerequisite_service_reuses_catalog_until_version_changes():
+    """Test that the catalog is reloaded only after a sync bumps the college version."""
+    db = mongomock_motor.AsyncMongoMockClient()["course_prerequisite"]
+    await make_sync(db).run(catalog())
+    mongo = MagicMock()
+    mongo.get_collection.side_effect = lambda name: db[name]
+    PrerequisiteService._catalogs.clear()
+
+    with patch("app.db.services.mongo_services.MongoDB", return_value=mongo):
+        service = PrerequisiteService()
+        first = await service.get_all_prerequisites(COLLEGE)
+        assert await service.get_all_prerequisites(COLLEGE) is first
+
+        await make_sync(db).run(catalog()[:1])
+        reloaded = await service.get_all_prerequisites(COLLEGE)
+
+    assert reloaded is not first
+    assert set(reloaded) == {"MATH 005A", "MATH 005B"}
+    assert reloaded["MATH 005A"]["unlocks"] == ["MATH 005B"]
+    PrerequisiteService._catalogs.clear()
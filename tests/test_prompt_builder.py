@@ -0,0 +1,63 @@
+import json
+from RAG.services.prompt_builder import PromptBuilder, PLAN_SYSTEM_PROMPT
+
+ROWS = [
+    {"id": "1", "content": "MATH 31A <- MATH 005A", "college_name": "Pasadena City College",
+     "university_name": "UCLA", "major_name": "Computer Science", "chunk_type": "articulation", "similarity": 1.0},
+    {"id": "2", "content": None, "college_name": "Pasadena City College", "university_name": "UCB",
+     "major_name": "Data Science", "chunk_type": "articulation", "similarity": 0,
+     "requirements": [{"university_courses": ["MATH 1A"], "options": [["MATH 005A"]]}]},
+    {"id": "3", "content": "MATH 005B requires MATH 005A", "college_name": "Pasadena City College",
+     "university_name": None, "major_name": None, "chunk_type": "prerequisite", "similarity": 0.9},
+    {"id": "4", "content": "CS 002 Fundamentals of Computer Science I " * 40, "college_name": "Pasadena City College",
+     "university_name": None, "major_name": None, "chunk_type": "class", "similarity": 0.5},
+    {"id": "5", "content": "MATH 005B requires MATH 005A", "college_name": "Pasadena City College",
+     "university_name": None, "major_name": None, "chunk_type": "prerequisite", "similarity": 0.8},
+]
+
+
+def test_context_is_compact_and_deduplicated():
+    """Test that names appear once and redundant fields are dropped."""
+    context, stats = PromptBuilder().build_context(ROWS)
+    data = json.loads(context)
+
+    assert context.count("Pasadena City College") == 1
+    assert "similarity" not in context and '"id"' not in context
+    assert data["targets"][0]["articulation"] == ["MATH 31A <- MATH 005A"]
+    assert data["targets"][1]["articulation"] == ROWS[1]["requirements"]
+    assert data["courses"][0] == ["prerequisite", "MATH 005B requires MATH 005A"]
+    assert stats["general_chunks_kept"] == 2
+
+
+def test_budget_drops_least_relevant_general_chunks():
+    """Test that general chunks are truncated by relevance but articulation is kept."""
+    context, stats = PromptBuilder(context_token_budget=120).build_context(ROWS)
+    data = json.loads(context)
+
+    assert data["courses"] == [["prerequisite", "MATH 005B requires MATH 005A"]]
+    assert stats["general_chunks_dropped"] == 1
+    assert len(data["targets"]) == 2
+
+
+def test_system_prompt_is_static_across_requests():
+    """Test that request details only go in the user message."""
+    builder = PromptBuilder()
+    first, _ = builder.build_plan_messages("plan A", 4, ROWS)
+    second, stats = builder.build_plan_messages("plan B", 6, ROWS[:1])
+
+    assert first[0]["content"] == second[0]["content"] == PLAN_SYSTEM_PROMPT
+    assert "# Number of terms (N): 6" in second[1]["content"]
+    assert stats["prompt_tokens_estimate"] == stats["system_tokens"] + stats["user_tokens"]
+
+
+def test_reorder_prompt_keeps_every_course_row():
+    """Test that plan course rows, which have no content field, all reach the reorder prompt."""
+    courses = [
+        {"code": "MATH 005A", "name": "Calculus I", "units": 5.0, "difficulty": 4, "prerequisites": []},
+        {"code": "MATH 005B", "name": "Calculus II", "units": 5.0, "difficulty": 4, "prerequisites": ["MATH 005A"]},
+    ]
+
+    messages, stats = PromptBuilder().build_reorder_messages("I took MATH 009", courses)
+
+    assert json.loads(messages[1]["content"].split("# Retrieved information:\n", 1)[1]) == courses
+    assert stats["rows_in"] == 2 and stats["prompt_tokens_estimate"] > 0
@@ -0,0 +1,76 @@
+import math
+import time
+import pytest
+from unittest.mock import patch
+from RAG.services.providers import EmbeddingProvider, LatencyModel, LocalEmbeddingProvider, LocalLLMProvider
+from RAG.services.embedding_services import EmbeddingService
+from RAG.services.synthesizer import Synthesizer
+
+VECTOR_RES = [
+    {"content": "MATH 31A <- MATH 005A", "college_name": "Pasadena City College", "university_name": "UCLA",
+     "major_name": "Computer Science", "chunk_type": "articulation", "similarity": 1.0},
+    {"content": "COM SCI 31 <- CS 002", "college_name": "Pasadena City College", "university_name": "UCLA",
+     "major_name": "Computer Science", "chunk_type": "articulation", "similarity": 1.0},
+]
+
+
+def test_latency_model_is_deterministic():
+    """Test that the same seed yields the same latency sequence."""
+    first = LatencyModel("lognormal:100:0.5", seed=7)
+    second = LatencyModel("lognormal:100:0.5", seed=7)
+
+    assert [first.sample_ms() for _ in range(5)] == [second.sample_ms() for _ in range(5)]
+    assert LatencyModel("fixed:25").sample_ms() == 25
+    assert 10 <= LatencyModel("uniform:10:20").sample_ms() <= 20
+    assert LatencyModel("0").sample_ms() == 0
+
+
+def test_provider_missing_its_method_fails_on_construction():
+    """Test that a provider without its backend method cannot be instantiated."""
+    class Incomplete(EmbeddingProvider):
+        pass
+
+    with pytest.raises(TypeError, match="embed"):
+        Incomplete()
+
+
+@pytest.mark.asyncio
+async def test_local_embeddings_are_stable_unit_vectors():
+    """Test hash-based embeddings: deterministic, normalized, text-dependent."""
+    provider = LocalEmbeddingProvider(dimensions=64)
+
+    first, second, other = await provider.embed("model", ["Calculus", " calculus ", "Physics"])
+
+    assert len(first) == 64
+    assert first == second
+    assert first != other
+    assert math.isclose(sum(v * v for v in first), 1.0, rel_tol=1e-9)
+
+
+@pytest.mark.asyncio
+async def test_embedding_service_with_local_provider():
+    """Test that EmbeddingService works without an OpenAI client."""
+    with patch('RAG.services.embedding_services.CachingService'):
+        service = EmbeddingService(provider=LocalEmbeddingProvider(dimensions=8))
+
+        embedding = await service.create_embedding("test", use_cache=False)
+
+    assert service.client is None
+    assert len(embedding) == 8
+
+
+@pytest.mark.asyncio
+async def test_synthesizer_with_local_provider_returns_canned_plan():
+    """Test that the local LLM builds a plan with the requested term count after its latency."""
+    synthesizer = Synthesizer(provider=LocalLLMProvider(latency="fixed:20"))
+
+    start = time.perf_counter()
+    plan = await synthesizer.generate_response("question", 3, VECTOR_RES)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed >= 0.02
+    assert len(plan["term_plan"]) == 3
+    codes = {course["code"] for term in plan["term_plan"] for course in term["courses"]}
+    assert codes == {"MATH 005A", "CS 002"}
+    assert plan["source_college"] == "Pasadena City College"
+    assert synthesizer.last_usage["completion_tokens"] > 0
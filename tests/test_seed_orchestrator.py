@@ -0,0 +1,114 @@
+import asyncio
+import mongomock_motor
+import pytest
+from unittest.mock import MagicMock
+from scripts.seed_scripts.orchestrator import SeedOrchestrator, Stage, should_defer_indexes
+from scripts.seed_scripts.seed_all import seed_from_csv
+from scripts.seed_scripts.seed_maindb import seed_colleges_from_csv
+
+
+def recording_stage(name, events, delay=0.01, depends_on=(), fail=False):
+    async def run():
+        events.append(f"start:{name}")
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        events.append(f"end:{name}")
+    return Stage(name, run, depends_on=depends_on)
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap_and_dependents_wait():
+    """Test that independent stages start together and a dependent starts after all its dependencies."""
+    events = []
+    orchestrator = SeedOrchestrator([
+        recording_stage("chunks", events, delay=0.05),
+        recording_stage("prereqs", events, delay=0.01),
+        recording_stage("articulations", events, depends_on=("chunks", "prereqs")),
+    ])
+
+    assert await orchestrator.run()
+
+    assert events[:2] == ["start:chunks", "start:prereqs"]
+    assert events.index("start:articulations") > events.index("end:chunks")
+    assert all(stage.status == "ok" and stage.duration > 0 for stage in orchestrator.stages.values())
+
+
+@pytest.mark.asyncio
+async def test_failed_stage_skips_its_dependents_only():
+    """Test that a failure skips the stages depending on it while unrelated stages still run."""
+    events = []
+    orchestrator = SeedOrchestrator([
+        recording_stage("chunks", events, fail=True),
+        recording_stage("colleges", events),
+        recording_stage("articulations", events, depends_on=("chunks",)),
+    ])
+
+    assert not await orchestrator.run()
+
+    statuses = {name: stage.status for name, stage in orchestrator.stages.items()}
+    assert statuses == {"chunks": "failed", "colleges": "ok", "articulations": "skipped"}
+    assert "start:articulations" not in events
+
+
+def test_unknown_dependencies_and_cycles_are_rejected():
+    """Test that the DAG is validated before anything runs."""
+    noop = lambda: asyncio.sleep(0)
+    with pytest.raises(ValueError, match="unknown"):
+        SeedOrchestrator([Stage("a", noop, depends_on=("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        SeedOrchestrator([Stage("a", noop, depends_on=("b",)), Stage("b", noop, depends_on=("a",))])
+
+
+@pytest.mark.asyncio
+async def test_indexes_are_deferred_only_for_empty_collections(tmp_path, monkeypatch):
+    """Test that a fresh load builds indexes afterwards and a reseed keeps them up front."""
+    client = mongomock_motor.AsyncMongoMockClient()
+    collection = client["main_db"]["colleges"]
+    assert await should_defer_indexes(collection, True)
+    assert not await should_defer_indexes(collection, False)
+
+    csv_path = tmp_path / "colleges.csv"
+    csv_path.write_text("id,college_name\n1,PCC\n2,SMC\n", encoding="utf-8")
+    mongo = MagicMock()
+    mongo.get_collection.return_value = collection
+    monkeypatch.setattr("scripts.seed_scripts.seed_maindb.MongoDB", lambda name: mongo)
+
+    await seed_colleges_from_csv(str(csv_path), defer_indexes=True)
+
+    assert await collection.count_documents({}) == 2
+    assert "college_name_1" in await collection.index_information()
+    assert not await should_defer_indexes(collection, True)
+
+
+@pytest.mark.asyncio
+async def test_csv_stage_fails_when_its_loader_does(tmp_path, monkeypatch):
+    """Test that a missing CSV fails the stage while a reseed over existing rows still succeeds."""
+    collection = mongomock_motor.AsyncMongoMockClient()["main_db"]["colleges"]
+    mongo = MagicMock()
+    mongo.get_collection.return_value = collection
+    monkeypatch.setattr("scripts.seed_scripts.seed_maindb.MongoDB", lambda name: mongo)
+
+    with pytest.raises(RuntimeError, match="colleges seeding did not finish"):
+        await seed_from_csv("colleges", seed_colleges_from_csv, str(tmp_path / "missing.csv"))
+
+    csv_path = tmp_path / "colleges.csv"
+    csv_path.write_text("id,college_name\n1,PCC\n2,SMC\n", encoding="utf-8")
+    await seed_from_csv("colleges", seed_colleges_from_csv, str(csv_path))
+    assert await seed_colleges_from_csv(str(csv_path)) == 2  # duplicates of a reseed are skipped
+
+
+@pytest.mark.asyncio
+async def test_deferred_load_keeps_first_of_duplicate_rows(tmp_path, monkeypatch):
+    """Test that repeated ids or names don't break the unique indexes built after a fresh load."""
+    collection = mongomock_motor.AsyncMongoMockClient()["main_db"]["colleges"]
+    mongo = MagicMock()
+    mongo.get_collection.return_value = collection
+    monkeypatch.setattr("scripts.seed_scripts.seed_maindb.MongoDB", lambda name: mongo)
+    csv_path = tmp_path / "colleges.csv"
+    csv_path.write_text("id,college_name\n1,PCC\n1,Pasadena\n2,SMC\n3,SMC\n", encoding="utf-8")
+
+    assert await seed_colleges_from_csv(str(csv_path), defer_indexes=True) == 2
+
+    assert [doc["college_name"] async for doc in collection.find({}).sort("id", 1)] == ["PCC", "SMC"]
+    assert "college_name_1" in await collection.index_information()
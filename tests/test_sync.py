@@ -0,0 +1,73 @@
+import mongomock_motor
+import pytest
+from unittest.mock import patch
+from bson.objectid import ObjectId
+from app.db.connection.mongo_connection import MongoDB
+from scripts.seed_scripts.seed_maindb import college_document, pair_references
+from scripts.seed_scripts.sync import CollectionSync
+
+
+def college_rows(names):
+    return [{"id": str(i), "college_name": name} for i, name in enumerate(names, start=1)]
+
+
+def make_sync(collection, **kwargs):
+    return CollectionSync("main_db", collection, "id", college_document, key_from_row=lambda row: int(row["id"]),
+                          tag_fields=("college_name",), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_sync_writes_only_changed_rows():
+    """Test that a resync inserts, updates and deletes only the rows that differ."""
+    collection = mongomock_motor.AsyncMongoMockClient()["main_db"]["colleges"]
+    first = await make_sync(collection).run(college_rows(["PCC", "SMC", "DVC"]))
+    assert (first.inserted, first.updated, first.deleted) == (3, 0, 0)
+    smc_id = (await collection.find_one({"id": 2}))["_id"]
+
+    second = await make_sync(collection).run(college_rows(["PCC", "Santa Monica College"]))
+
+    assert (second.inserted, second.updated, second.unchanged, second.deleted) == (0, 1, 1, 1)
+    assert {"college:SMC", "college:Santa Monica College", "college:DVC", "kind:colleges_list"} <= second.tags
+    renamed = await collection.find_one({"id": 2})
+    assert renamed["college_name"] == "Santa Monica College"
+    assert renamed["_id"] == smc_id  # references to the college survive the update
+    assert await collection.count_documents({}) == 2
+
+    rerun = await make_sync(collection).run(college_rows(["PCC", "Santa Monica College"]))
+    assert (rerun.changed, rerun.unchanged) == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_and_keep_missing_do_not_write():
+    """Test that dry runs only count and delete_missing=False keeps extra documents."""
+    collection = mongomock_motor.AsyncMongoMockClient()["main_db"]["colleges"]
+    await collection.insert_one({"id": 9, "college_name": "Runtime Entry"})
+
+    dry = await make_sync(collection, dry_run=True).run(college_rows(["PCC"]))
+    assert (dry.inserted, dry.deleted) == (1, 1)
+    assert await collection.count_documents({}) == 1
+
+    kept = await make_sync(collection, delete_missing=False).run(college_rows(["PCC"]))
+    assert (kept.inserted, kept.deleted) == (1, 0)
+    assert await collection.count_documents({}) == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_missing_keeps_rows_a_major_pair_references():
+    """Test that a deleting sync keeps colleges that college_uni_major_pair still points at."""
+    with patch("app.db.connection.mongo_connection.AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient):
+        MongoDB._instances.clear()
+        mongo = MongoDB("main_db")
+        collection = mongo.get_collection("colleges")
+        await make_sync(collection).run(college_rows(["PCC", "SMC", "DVC"]))
+        smc = await collection.find_one({"id": 2})
+        await mongo.get_collection("college_uni_major_pair").insert_one(
+            {"from_college_id": smc["_id"], "to_university_id": ObjectId(), "major_id": ObjectId()})
+
+        stats = await make_sync(collection, referenced=pair_references(mongo, ("from_college_id",))).run(
+            college_rows(["PCC"]))
+        MongoDB._instances.clear()
+
+    assert (stats.deleted, stats.kept_referenced) == (1, 1)
+    assert sorted([doc["id"] async for doc in collection.find({})]) == [1, 2]
+    assert "1 kept (still referenced)" in stats.summary()
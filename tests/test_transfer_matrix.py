@@ -0,0 +1,89 @@
+import asyncio
+import json
+import mongomock_motor
+import pytest
+from unittest.mock import patch
+from bson.objectid import ObjectId
+from app.db.connection.mongo_connection import MongoDB
+from app.db.services.major_pair_view import MajorPairView
+from app.db.services.mongo_services import CollegeUniMajorPairService
+from app.services.cache_invalidation import InvalidationBus
+from app.services.transfer_matrix import TransferMatrixStore
+from app.utils.http_cache import etag_matches
+
+COLLEGE_ID, OTHER_COLLEGE_ID = ObjectId(), ObjectId()
+UCLA, UCSD = ObjectId(), ObjectId()
+CS, MATH, DS = ObjectId(), ObjectId(), ObjectId()
+
+
+@pytest.fixture
+def main_db():
+    with patch("app.db.connection.mongo_connection.AsyncIOMotorClient", mongomock_motor.AsyncMongoMockClient):
+        MongoDB._instances.clear()
+        MajorPairView.reset()
+        TransferMatrixStore.reset()
+        yield MongoDB("main_db")
+        TransferMatrixStore.reset()
+        MajorPairView.reset()
+        MongoDB._instances.clear()
+
+
+def pair(major, university, alter=None, active=True, college=COLLEGE_ID):
+    return {"_id": ObjectId(), "from_college_id": college, "to_university_id": university,
+            "major_id": major, "alter_major_id": alter, "is_active": active}
+
+
+async def seed(db):
+    await db.get_collection("majors").insert_many([
+        {"_id": CS, "major_name": "Computer Science"},
+        {"_id": MATH, "major_name": "Mathematics"},
+    ])
+    await db.get_collection("college_uni_major_pair").insert_many([
+        pair(MATH, UCLA), pair(CS, UCLA, alter=MATH), pair(DS, UCLA), pair(CS, UCLA, active=False),
+        pair(MATH, UCSD), pair(CS, UCSD, college=OTHER_COLLEGE_ID),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_matrix_matches_the_major_list_for_every_university(main_db):
+    """Test that one college's matrix body holds the same rows as a major list call per university."""
+    await seed(main_db)
+    body, etag = await TransferMatrixStore().get_college(str(COLLEGE_ID))
+    matrix = json.loads(body)
+
+    assert set(matrix["universities"]) == {str(UCLA), str(UCSD)}
+    for university_id in (UCLA, UCSD):
+        major_list = await CollegeUniMajorPairService().get_majors_with_names(str(university_id), str(COLLEGE_ID))
+        rows = [{"major_id": major_id, "major_name": matrix["majors"][major_id], "alter_major_id": alter_id,
+                 "alter_major_name": matrix["majors"][alter_id] if alter_id else None}
+                for major_id, alter_id in matrix["universities"][str(university_id)]]
+        assert rows == major_list
+    assert matrix["majors"][str(DS)] == "Unknown Major"
+
+    assert etag_matches(etag, etag) and etag_matches(f'"x", W/{etag}', etag)
+    assert not etag_matches('"x"', etag) and not etag_matches(None, etag)
+    unknown_body, _ = await TransferMatrixStore().get_college(str(ObjectId()))
+    assert json.loads(unknown_body)["universities"] == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_build_until_invalidated(main_db):
+    """Test that concurrent misses build once, and a major list invalidation rebuilds with a new ETag."""
+    await seed(main_db)
+    store = TransferMatrixStore()
+    with patch.object(TransferMatrixStore, "build", side_effect=TransferMatrixStore.build, autospec=True) as build:
+        first = await asyncio.gather(*(store.get_college(str(COLLEGE_ID)) for _ in range(5)))
+        assert build.call_count == 1 and len(set(first)) == 1
+
+        await main_db.get_collection("college_uni_major_pair").insert_one(pair(CS, UCSD))
+        assert await store.get_college(str(COLLEGE_ID)) == first[0]  # served from memory
+
+        bus = InvalidationBus(None)
+        bus.handle_message({"data": json.dumps({"tags": ["kind:colleges_list"]})})
+        assert await store.get_college(str(COLLEGE_ID)) == first[0]
+        bus.handle_message({"data": json.dumps({"tags": [f"college_id:{COLLEGE_ID}", f"university_id:{UCSD}"]})})
+        body, etag = await store.get_college(str(COLLEGE_ID))
+
+    assert build.call_count == 2
+    assert etag != first[0][1]
+    assert [row[0] for row in json.loads(body)["universities"][str(UCSD)]] == [str(CS), str(MATH)]
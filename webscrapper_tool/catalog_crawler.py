@@ -0,0 +1,247 @@
+"""
+catalog_crawler.py
+Crawls many college catalogs in parallel. All colleges share one AsyncFetcher, so
+there is one global request limit, and each host is rate limited on its own. That
+makes different colleges' sites progress side by side. They also share one parser
+process pool.
+
+Each college gets:
+- incremental output under <out_root>/<college-key>/. A department is re-parsed and
+  rewritten only when its page changed.
+- optionally, a streaming PrerequisiteSync into the prerequisite collection.
+- throughput metrics.
+
+Usage:
+    python webscrapper_tool/catalog_crawler.py [--config catalogs.json] [--only COLLEGE ...] [--sync]
+"""
+
+import argparse, asyncio, json, os, pathlib, sys, time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from webscrapper_tool.catalog_parsers import CatalogParser, load_catalogs
+from webscrapper_tool.scraper_engine import AsyncFetcher, FetchResult, HttpCache
+
+OnDepartment = Callable[[str, dict], Awaitable]
+
+# ------------------------------------------------------------
+@dataclass
+class ScrapeStats:
+    college: str = ""
+    departments: int = 0
+    parsed: int = 0        # page changed (or output missing), so it was re-parsed
+    unchanged: int = 0
+    failed: int = 0
+    courses: int = 0
+    requests: int = 0      # HTTP requests made (including 304 revalidations)
+    not_modified: int = 0
+    cache_hits: int = 0    # pages served from the cache without a request
+    bytes_downloaded: int = 0
+    elapsed: float = 0.0
+    error: str = ""        # set when the college could not be crawled at all
+
+    def record_fetch(self, page: FetchResult):
+        if page.source == "cache":
+            self.cache_hits += 1
+            return
+        self.requests += 1
+        if page.source == "revalidated":
+            self.not_modified += 1
+        else:
+            self.bytes_downloaded += len(page.body)
+
+    @property
+    def pages_per_second(self) -> float:
+        return (self.parsed + self.unchanged) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def courses_per_second(self) -> float:
+        return self.courses / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.departments} departments: {self.parsed} parsed, {self.unchanged} unchanged, "
+                f"{self.failed} failed; {self.courses} courses, {self.requests} HTTP requests "
+                f"({self.not_modified} not modified) in {self.elapsed:.1f}s")
+
+
+def _write_json(path: pathlib.Path, data):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+# ------------------------------------------------------------
+async def scrape_college(parser: CatalogParser, fetcher: AsyncFetcher, out_dir: pathlib.Path, pool: Executor,
+                         slugs: List[str] | None = None, force: bool = False, on_department: OnDepartment | None = None,
+                         all_courses_path: pathlib.Path | None = None) -> ScrapeStats:
+    """
+    Scrape every department (or just `slugs`) of one college into out_dir, re-parsing only
+    changed pages unless force. on_department(slug, courses) streams each department to a
+    consumer as soon as it is ready; unchanged departments are read back from their JSON file.
+    """
+    started = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "_manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    stats = ScrapeStats(college=parser.college)
+
+    full_run = slugs is None
+    if full_run:
+        index = await fetcher.fetch(parser.index_url)
+        stats.record_fetch(index)
+        slugs = parser.department_slugs(index.text)
+        print(f"{parser.college}: found {len(slugs)} departments: {' '.join(slugs)}")
+    stats.departments = len(slugs)
+    loop = asyncio.get_running_loop()
+
+    async def process(slug: str):
+        try:
+            page = await fetcher.fetch(parser.department_url(slug))
+            stats.record_fetch(page)
+            out_path = out_dir / f"{slug}.json"
+            if not force and manifest.get(slug) == page.content_hash and out_path.exists():
+                stats.unchanged += 1
+                if on_department:
+                    await on_department(slug, json.loads(out_path.read_text(encoding="utf-8")))
+                return
+            data = await loop.run_in_executor(pool, parser.parse_department, page.text, slug)
+            _write_json(out_path, data)
+            manifest[slug] = page.content_hash
+            # Saved per department, so an interrupted run keeps what it finished
+            _write_json(manifest_path, manifest)
+            stats.parsed += 1
+            print(f"  {parser.college} / {slug}: {len(data)} courses")
+            if on_department:
+                await on_department(slug, data)
+        except Exception as e:
+            stats.failed += 1
+            print(f"  {parser.college} / {slug}: failed: {e}")
+
+    await asyncio.gather(*(process(slug) for slug in slugs))
+
+    if full_run:
+        # Departments that disappeared from the catalog
+        for slug in set(manifest) - set(slugs):
+            (out_dir / f"{slug}.json").unlink(missing_ok=True)
+            del manifest[slug]
+        _write_json(manifest_path, manifest)
+
+    all_courses = {}
+    for slug in sorted(manifest):
+        out_path = out_dir / f"{slug}.json"
+        if out_path.exists():
+            all_courses.update(json.loads(out_path.read_text(encoding="utf-8")))
+    if all_courses_path:
+        _write_json(all_courses_path, all_courses)
+
+    stats.courses = len(all_courses)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+# ------------------------------------------------------------
+class CatalogCrawler:
+    """
+    Usage:
+        async with AsyncFetcher(HttpCache(".scrape_cache")) as fetcher:
+            metrics = await CatalogCrawler(load_catalogs(), fetcher, pathlib.Path("catalogs")).crawl()
+
+    sink(parser) may return an object with async add_department(slug, courses) and
+    finish(delete_missing) (e.g. a PrerequisiteSync); it receives that college's departments.
+    """
+
+    def __init__(self, parsers: List[CatalogParser], fetcher: AsyncFetcher, out_root: pathlib.Path,
+                 parse_workers: int | None = None, max_colleges: int = 8, force: bool = False):
+        self.parsers = parsers
+        self.fetcher = fetcher
+        self.out_root = out_root
+        self.parse_workers = parse_workers
+        self.max_colleges = max_colleges
+        self.force = force
+
+    async def crawl(self, sink: Callable[[CatalogParser], Awaitable] | None = None) -> Dict[str, ScrapeStats]:
+        metrics: Dict[str, ScrapeStats] = {}
+        semaphore = asyncio.Semaphore(self.max_colleges)
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            async def crawl_college(parser: CatalogParser):
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        consumer = await sink(parser) if sink else None
+                        stats = await scrape_college(parser, self.fetcher, self.out_root / parser.key, pool, force=self.force,
+                                                     on_department=consumer.add_department if consumer else None)
+                        if consumer:
+                            # A department that failed to scrape must not look like deleted courses
+                            await consumer.finish(delete_missing=stats.failed == 0)
+                    except Exception as e:
+                        stats = ScrapeStats(college=parser.college, error=str(e), elapsed=time.perf_counter() - started)
+                        print(f"{parser.college}: crawl failed: {e}")
+                    metrics[parser.college] = stats
+
+            await asyncio.gather(*(crawl_college(parser) for parser in self.parsers))
+        return metrics
+
+    @staticmethod
+    def report(metrics: Dict[str, ScrapeStats]):
+        print("\n" + "=" * 96)
+        print(f"{'college':32s} {'depts':>6s} {'parsed':>7s} {'same':>5s} {'fail':>5s} {'courses':>8s} "
+              f"{'req':>5s} {'304':>5s} {'KiB':>7s} {'secs':>6s} {'pages/s':>8s}")
+        for college, stats in sorted(metrics.items()):
+            if stats.error:
+                print(f"{college[:32]:32s} error: {stats.error}")
+                continue
+            print(f"{college[:32]:32s} {stats.departments:6d} {stats.parsed:7d} {stats.unchanged:5d} {stats.failed:5d} "
+                  f"{stats.courses:8d} {stats.requests:5d} {stats.not_modified:5d} {stats.bytes_downloaded / 1024:7.0f} "
+                  f"{stats.elapsed:6.1f} {stats.pages_per_second:8.1f}")
+        print("=" * 96)
+
+# ------------------------------------------------------------
+async def main():
+    parser = argparse.ArgumentParser(description="Crawl every configured college catalog in parallel")
+    parser.add_argument("--config", help="JSON list of {college, parser, base_url, ...} entries to add or override")
+    parser.add_argument("--only", nargs="+", metavar="COLLEGE", help="Crawl only these colleges")
+    parser.add_argument("--out-root", default="catalogs")
+    parser.add_argument("--cache-dir", default=".scrape_cache")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight across all colleges")
+    parser.add_argument("--interval", type=float, default=0.5, help="Minimum seconds between requests to one host")
+    parser.add_argument("--max-colleges", type=int, default=8, help="Colleges crawled at once")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-parse every page")
+    parser.add_argument("--sync", action="store_true", help="Stream courses into the prerequisite collection")
+    args = parser.parse_args()
+
+    parsers = load_catalogs(args.config)
+    if args.only:
+        parsers = [p for p in parsers if p.college in args.only]
+
+    sink = None
+    if args.sync:
+        from dotenv import load_dotenv
+        from app.services.cache_invalidation import publish_invalidation
+        from scripts.seed_scripts.prerequisite_sync import PrerequisiteSync
+        load_dotenv()
+
+        class PublishingSync(PrerequisiteSync):
+            async def finish(self, delete_missing: bool = True):
+                stats = await super().finish(delete_missing)
+                print(f"{self.college} prerequisites: {stats.summary()}")
+                if stats.changed:
+                    publish_invalidation([f"college:{self.college}"], reason="prerequisite sync")
+                return stats
+
+        async def sink(catalog_parser):
+            sync = PublishingSync(catalog_parser.college)
+            await sync.start()
+            return sync
+
+    async with AsyncFetcher(HttpCache(args.cache_dir), concurrency=args.concurrency,
+                            per_host_interval=args.interval) as fetcher:
+        crawler = CatalogCrawler(parsers, fetcher, pathlib.Path(args.out_root), parse_workers=args.parse_workers,
+                                 max_colleges=args.max_colleges, force=args.force)
+        metrics = await crawler.crawl(sink)
+    CatalogCrawler.report(metrics)
+
+if __name__ == "__main__":
+    asyncio.run(main())
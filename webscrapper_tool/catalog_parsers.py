@@ -0,0 +1,146 @@
+"""
+catalog_parsers.py
+Per-college catalog plugins. A parser knows where one college's course catalog lives
+and how to turn its pages into {course_code: course}. Fetching, caching, scheduling
+and storage are shared and live in catalog_crawler.py.
+
+A college on a supported catalog system only needs an entry in COLLEGE_CATALOGS (or
+in a --config JSON file). A new catalog system is a CatalogParser subclass
+registered with @register_parser("name").
+"""
+
+import json, re
+from typing import Dict, List, Type
+from urllib.parse import urljoin, urlsplit
+from bs4 import BeautifulSoup
+
+COURSE_CODE = re.compile(r"[A-Z]{2,4}\s?\d{3}[A-Z]?")
+
+# ------------------------------------------------------------
+class CatalogParser:
+    """Parsers run in worker processes, so they must be picklable (plain attributes only)."""
+    kind = ""
+
+    def __init__(self, college: str, base_url: str, **options):
+        self.college = college
+        self.base_url = base_url.rstrip("/")
+        self.options = options
+
+    @property
+    def key(self) -> str:
+        """Filesystem-safe name, e.g. for the output directory."""
+        return re.sub(r"[^a-z0-9]+", "-", self.college.lower()).strip("-")
+
+    @property
+    def index_url(self) -> str:
+        return f"{self.base_url}/"
+
+    def department_url(self, slug: str) -> str:
+        return f"{self.base_url}/{slug}/"
+
+    def department_slugs(self, index_html: str) -> List[str]:
+        raise NotImplementedError
+
+    def parse_department(self, html: str, slug: str) -> Dict[str, dict]:
+        raise NotImplementedError
+
+
+PARSER_TYPES: Dict[str, Type[CatalogParser]] = {}
+
+
+def register_parser(kind: str):
+    def decorator(cls):
+        cls.kind = kind
+        PARSER_TYPES[kind] = cls
+        return cls
+    return decorator
+
+# ------------------------------------------------------------
+def parse_course(block: BeautifulSoup, dept: str, skip_honors: bool = True) -> dict | None:
+    code_tag  = block.select_one("span.detail-code strong")
+    name_tag  = block.select_one("span.detail-title strong")
+    units_tag = block.select_one("span.detail-hours_html strong")
+
+    if not code_tag:
+        return None
+    code = code_tag.text.strip().replace("\xa0", " ")
+    if skip_honors and (code.endswith("H") or "HONORS" in name_tag.text):
+        return None
+
+    units = 0.0
+    if units_tag and (m := re.search(r"\d+\.?\d*", units_tag.text)):
+        units = float(m.group())
+
+    prereq_span = block.find("strong", string=re.compile("Prerequisite", re.I))
+    prereq_text = prereq_span.find_next("em").get_text(" ", strip=True) if prereq_span else ""
+
+    assessment_allow = bool(re.search(r"(placement|assessment)", prereq_text, re.I))
+
+    groups = re.split(r"\bor\b", prereq_text, flags=re.I)
+    prereqs = []
+    for g in groups:
+        codes = COURSE_CODE.findall(g)
+        if codes:
+            prereqs.append(tuple(c.replace("\xa0", " ") for c in codes))
+
+    return {
+        code: {
+            "name": name_tag.text.strip().title(),
+            "units": units,
+            "difficulty": 3,
+            "assessment_allow": assessment_allow,
+            "prerequisites": prereqs,
+            "department": dept,
+        }
+    }
+
+
+@register_parser("courseleaf")
+class CourseLeafParser(CatalogParser):
+    """
+    CourseLeaf catalogs (div.courseblock / span.detail-code markup), one page per
+    department under <base_url>/<slug>/. Options: skip_honors (default True).
+    """
+
+    def department_slugs(self, index_html: str) -> List[str]:
+        """Grab the list of slugs directly from the site so you never hard-code it."""
+        soup = BeautifulSoup(index_html, "html.parser")
+        prefix = urlsplit(self.base_url).path.rstrip("/") + "/"
+        slugs = set()
+        for a in soup.select("main a[href]"):
+            path = urlsplit(urljoin(self.index_url, a["href"])).path
+            if path.startswith(prefix) and path.rstrip("/") != prefix.rstrip("/"):
+                slugs.add(path[len(prefix):].strip("/").split("/")[0])
+        return sorted(slugs)
+
+    def parse_department(self, html: str, slug: str) -> Dict[str, dict]:
+        soup = BeautifulSoup(html, "html.parser")
+        catalog = {}
+        for block in soup.select("div.courseblock"):
+            item = parse_course(block, slug, self.options.get("skip_honors", True))
+            if item:
+                catalog.update(item)
+        return catalog
+
+# ------------------------------------------------------------
+# Catalogs crawled by default; extend with --config <file.json> holding entries of the same shape
+COLLEGE_CATALOGS = [
+    {"college": "Pasadena City College", "parser": "courseleaf",
+     "base_url": "https://curriculum.pasadena.edu/course-descriptions"},
+]
+
+
+def build_parser(entry: dict) -> CatalogParser:
+    entry = dict(entry)
+    kind = entry.pop("parser")
+    if kind not in PARSER_TYPES:
+        raise ValueError(f"Unknown catalog parser {kind!r} for {entry.get('college')} (known: {', '.join(sorted(PARSER_TYPES))})")
+    return PARSER_TYPES[kind](entry.pop("college"), entry.pop("base_url"), **entry)
+
+
+def load_catalogs(config_path: str | None = None) -> List[CatalogParser]:
+    entries = {entry["college"]: entry for entry in COLLEGE_CATALOGS}
+    if config_path:
+        with open(config_path, "r", encoding="utf-8") as f:
+            entries.update({entry["college"]: entry for entry in json.load(f)})
+    return [build_parser(entry) for entry in entries.values()]
@@ -1,90 +1,65 @@
 """
 scrape_all_courses.py
-Python ≥3.9   pip install beautifulsoup4 requests tqdm
-"""
-
-import json, re, time, pathlib, requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm               # simple progress bar
-
-BASE = "https://curriculum.pasadena.edu/course-descriptions"
-COURSE_CODE = re.compile(r"[A-Z]{2,4}\s?\d{3}[A-Z]?")
-
-# ------------------------------------------------------------
-def parse_course(block: BeautifulSoup, dept: str) -> dict | None:
-    code_tag  = block.select_one("span.detail-code strong")
-    name_tag  = block.select_one("span.detail-title strong")
-    units_tag = block.select_one("span.detail-hours_html strong")
+Python ≥3.9   pip install beautifulsoup4 httpx
 
-    if not code_tag:
-        return None
-    code = code_tag.text.strip().replace("\xa0", " ")
-    if code.endswith("H") or "HONORS" in name_tag.text:
-        return None
-
-    units = 0.0
-    if units_tag and (m := re.search(r"\d+\.?\d*", units_tag.text)):
-        units = float(m.group())
+Pasadena City College entry point of the catalog crawler: PCC's catalog is a
+CourseLeaf site (catalog_parsers.CourseLeafParser) scraped by
+catalog_crawler.scrape_college. Output is incremental: pcc_courses/<slug>.json is
+rewritten only when its page changed, tracked by content hash in
+pcc_courses/_manifest.json. For every college at once see catalog_crawler.py.
+"""
 
-    prereq_span = block.find("strong", string=re.compile("Prerequisite", re.I))
-    prereq_text = prereq_span.find_next("em").get_text(" ", strip=True) if prereq_span else ""
+import argparse, asyncio, os, sys, pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable
 
-    assessment_allow = bool(re.search(r"(placement|assessment)", prereq_text, re.I))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-    groups = re.split(r"\bor\b", prereq_text, flags=re.I)
-    prereqs = []
-    for g in groups:
-        codes = COURSE_CODE.findall(g)
-        if codes:
-            prereqs.append(tuple(c.replace("\xa0", " ") for c in codes))
+from webscrapper_tool.catalog_crawler import ScrapeStats, scrape_college
+from webscrapper_tool.catalog_parsers import COURSE_CODE, CourseLeafParser, parse_course  # noqa: F401
+from webscrapper_tool.scraper_engine import AsyncFetcher, HttpCache
 
-    return {
-        code: {
-            "name": name_tag.text.strip().title(),
-            "units": units,
-            "difficulty": 3,
-            "assessment_allow": assessment_allow,
-            "prerequisites": prereqs,
-            "department": dept,
-        }
-    }
+BASE = "https://curriculum.pasadena.edu/course-descriptions"
+PCC_PARSER = CourseLeafParser("Pasadena City College", BASE)
 
 # ------------------------------------------------------------
-def scrape_department(slug: str) -> dict:
-    url = f"{BASE}/{slug}/"
-    soup = BeautifulSoup(requests.get(url, timeout=30).text, "html.parser")
-    catalog = {}
-    for block in soup.select("div.courseblock"):
-        item = parse_course(block, slug)
-        if item:
-            catalog.update(item)
-    return catalog
+def parse_department(html: str, slug: str) -> dict:
+    return PCC_PARSER.parse_department(html, slug)
 
 # ------------------------------------------------------------
-def discover_slugs() -> list[str]:
-    """Grab the list of slugs directly from the site so you never hard-code it."""
-    soup = BeautifulSoup(requests.get(BASE, timeout=30).text, "html.parser")
-    links = soup.select("main a[href^='/course-descriptions/']")
-    slugs = sorted({a["href"].split("/")[-2] for a in links})
-    return slugs
+def parse_slugs(html: str) -> list[str]:
+    return PCC_PARSER.department_slugs(html)
 
 # ------------------------------------------------------------
-if __name__ == "__main__":
-    out_dir = pathlib.Path("pcc_courses")
-    out_dir.mkdir(exist_ok=True)
+async def scrape_catalog(fetcher: AsyncFetcher, out_dir: pathlib.Path, slugs: list[str] | None = None,
+                         parse_workers: int | None = None, all_courses_path: pathlib.Path | None = None,
+                         force: bool = False,
+                         on_department: Callable[[str, dict], Awaitable] | None = None) -> ScrapeStats:
+    """Scrape PCC's catalog into out_dir; see catalog_crawler.scrape_college."""
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        return await scrape_college(PCC_PARSER, fetcher, out_dir, pool, slugs=slugs, force=force,
+                                    on_department=on_department, all_courses_path=all_courses_path)
 
-    slugs = discover_slugs()
-    print(f"Found {len(slugs)} departments: {' '.join(slugs)}")
+# ------------------------------------------------------------
+async def main():
+    parser = argparse.ArgumentParser(description="Scrape PCC course descriptions into pcc_courses/<slug>.json")
+    parser.add_argument("slugs", nargs="*", help="Only these departments (default: discover all)")
+    parser.add_argument("--out-dir", default="pcc_courses")
+    parser.add_argument("--cache-dir", default=".scrape_cache")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--interval", type=float, default=0.5, help="Minimum seconds between requests to the site")
+    parser.add_argument("--max-age", type=float, default=0.0, help="Reuse cached pages younger than this without revalidating")
+    parser.add_argument("--offline", action="store_true", help="Parse from the cache only, no network")
+    parser.add_argument("--force", action="store_true", help="Re-parse every page, e.g. after changing parse_course")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    args = parser.parse_args()
 
-    all_courses = {}
-    for slug in tqdm(slugs, desc="Scraping"):
-        data = scrape_department(slug)
-        if data:
-            all_courses.update(data)
-            (out_dir / f"{slug}.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
-        time.sleep(0.5)          # polite pause
+    fetcher = AsyncFetcher(HttpCache(args.cache_dir), concurrency=args.concurrency, per_host_interval=args.interval,
+                           max_age=args.max_age, offline=args.offline)
+    async with fetcher:
+        stats = await scrape_catalog(fetcher, pathlib.Path(args.out_dir), args.slugs or None,
+                                     parse_workers=args.parse_workers, all_courses_path=pathlib.Path("all_courses.json"), force=args.force)
+    print(f"\nSaved {stats.courses} total courses. {stats.summary()}")
 
-    pathlib.Path("all_courses.json").write_text(
-        json.dumps(all_courses, indent=2), encoding="utf-8"
-    )
-    print(f"\nSaved {len(all_courses)} total courses.")
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,189 @@
+"""
+scraper_engine.py
+Async HTTP fetching for the catalog scrapers: bounded concurrency, a polite minimum
+interval between requests to the same host, retries on 429/5xx, and an on-disk HTTP
+cache revalidated with ETag / If-Modified-Since so unchanged pages cost a 304.
+"""
+
+import asyncio, hashlib, json, os, time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+DEFAULT_USER_AGENT = "better-transfer-catalog-scraper/1.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: bytes
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    @property
+    def hash(self) -> str:
+        return content_hash(self.body)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    body: bytes
+    source: str            # "network", "revalidated" (304) or "cache" (served without a request)
+    content_hash: str
+    changed: bool          # body differs from the previously cached copy (True on first fetch)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+# ------------------------------------------------------------
+class HttpCache:
+    """One metadata JSON + one body file per URL, both written atomically."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{key}.json"), os.path.join(self.directory, f"{key}.body")
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        return CachedPage(url, body, meta.get("etag"), meta.get("last_modified"), meta.get("fetched_at", 0.0))
+
+    def put(self, page: CachedPage):
+        meta_path, body_path = self._paths(page.url)
+        # Body first: metadata only ever points at a complete body
+        self._write(body_path, page.body)
+        meta = {"url": page.url, "etag": page.etag, "last_modified": page.last_modified, "fetched_at": page.fetched_at}
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+
+# ------------------------------------------------------------
+class HostRateLimiter:
+    """Spaces requests to the same host at least `interval` seconds apart."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def wait(self, host: str):
+        if self.interval <= 0:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+
+# ------------------------------------------------------------
+class AsyncFetcher:
+    """
+    Usage:
+        async with AsyncFetcher(HttpCache(".scrape_cache")) as fetcher:
+            result = await fetcher.fetch(url)
+
+    max_age serves cached pages younger than that many seconds without a request;
+    offline serves only from the cache (a miss raises), e.g. for reparsing.
+    """
+
+    def __init__(self, cache: Optional[HttpCache] = None, concurrency: int = 8, per_host_interval: float = 0.5,
+                 timeout: float = 30.0, max_retries: int = 3, max_age: float = 0.0, offline: bool = False,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, user_agent: str = DEFAULT_USER_AGENT):
+        self.cache = cache
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = HostRateLimiter(per_host_interval)
+        self.max_retries = max_retries
+        self.max_age = max_age
+        self.offline = offline
+        self.client = httpx.AsyncClient(timeout=timeout, transport=transport, follow_redirects=True,
+                                        headers={"User-Agent": user_agent})
+        self.requests = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def fetch(self, url: str) -> FetchResult:
+        cached = self.cache.get(url) if self.cache else None
+        if cached and (self.offline or time.time() - cached.fetched_at < self.max_age):
+            return FetchResult(url, cached.body, "cache", cached.hash, changed=False)
+        if self.offline:
+            raise LookupError(f"{url} is not in the scrape cache")
+
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self._request(url, headers)
+        if response.status_code == 304 and cached:
+            cached.fetched_at = time.time()
+            self.cache.put(cached)
+            return FetchResult(url, cached.body, "revalidated", cached.hash, changed=False)
+        response.raise_for_status()
+
+        page = CachedPage(url, response.content, response.headers.get("ETag"),
+                          response.headers.get("Last-Modified"), time.time())
+        if self.cache:
+            self.cache.put(page)
+        return FetchResult(url, page.body, "network", page.hash, changed=cached is None or cached.hash != page.hash)
+
+    async def _request(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            async with self.semaphore:
+                await self.rate_limiter.wait(host)
+                self.requests += 1
+                try:
+                    response = await self.client.get(url, headers=headers)
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+            if response is not None and (response.status_code not in RETRY_STATUSES or attempt == self.max_retries):
+                return response
+            # Back off outside the semaphore so other hosts' requests keep flowing
+            await asyncio.sleep(self._retry_delay(response, attempt))
+
+    @staticmethod
+    def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(60.0, float(retry_after))
+        return min(30.0, 0.5 * 2 ** attempt)